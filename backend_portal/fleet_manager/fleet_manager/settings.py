@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'portal.middleware.RequestBudgetMiddleware',
+    'portal.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -76,13 +79,92 @@ WSGI_APPLICATION = 'fleet_manager.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# SQLite production profile:
+# - WAL: readers and the writer stop blocking each other
+# - busy_timeout: wait for another process's write lock instead of failing
+# - synchronous=NORMAL: durable under WAL, fsyncs only at checkpoints
+# - mmap_size: reads come straight from the page cache
+# - IMMEDIATE: write transactions take the lock at BEGIN rather than failing
+#   half-way through when a read lock cannot be upgraded
+# portal.backends.sqlite3 additionally queues writers within a process
+# (writer_timeout bounds that wait). Compare with `manage.py bench_sqlite_concurrency`.
+# It is used when PORTAL_SQLITE_PROFILE=production, which is the default once
+# DEBUG is off; development and the test suite otherwise run on the stock backend.
+SQLITE_PRODUCTION_OPTIONS = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA busy_timeout=10000;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA mmap_size=268435456;'
+    ),
+    'transaction_mode': 'IMMEDIATE',
+    'writer_timeout': 30,
+}
+
+SQLITE_PRODUCTION_PROFILE = os.environ.get('PORTAL_SQLITE_PROFILE', 'stock' if DEBUG else 'production') == 'production'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'portal.backends.sqlite3' if SQLITE_PRODUCTION_PROFILE else 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': SQLITE_PRODUCTION_OPTIONS if SQLITE_PRODUCTION_PROFILE else {},
     }
 }
 
+# Read replicas (portal.routing). Read-only API actions and admin list partials
+# are served from these aliases; writes and everything else use 'default'.
+# Locally, a copy of the SQLite file stands in for a replica and is refreshed
+# with `manage.py sync_replica`; a Postgres replica is configured the same way.
+#
+# DATABASES['replica'] = {
+#     'ENGINE': 'portal.backends.sqlite3',
+#     'NAME': BASE_DIR / 'db.replica.sqlite3',
+#     'OPTIONS': SQLITE_PRODUCTION_OPTIONS,
+#     'TEST': {'MIRROR': 'default'},
+# }
+# PORTAL_READ_REPLICAS = ['replica']
+DATABASE_ROUTERS = ['portal.routing.ReplicaRouter']
+PORTAL_READ_REPLICAS = []
+# After a write the client reads from 'default' for this long (read-your-writes).
+PORTAL_REPLICA_PIN_SECONDS = 10
+# Token clients are pinned through this cache; it must be shared by every worker
+# (a system check rejects process-local backends once replicas are configured).
+PORTAL_REPLICA_PIN_CACHE = 'replica_pins'
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Pre-rendered checklist catalog; file-based so every worker process sees version bumps.
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'catalog',
+    },
+    # Read-your-writes pins for token clients (portal.routing); shared across workers.
+    'replica_pins': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'replica_pins',
+    },
+    # Token revocation stamps (portal.authentication.TokenCache); shared across workers.
+    'token_revocations': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache' / 'token_revocations',
+    },
+}
+
+
+# Authentication
+# PrincipalBackend loads the user with their portal and role profiles in one
+# query; ModelBackend stays listed so sessions it issued remain valid.
+AUTHENTICATION_BACKENDS = [
+    'portal.authentication.PrincipalBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -123,6 +205,22 @@ STATIC_URL = 'static/'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Resumable photo uploads: size cap and where partial chunks are assembled
+PHOTO_UPLOAD_MAX_BYTES = 25 * 1024 * 1024
+PHOTO_UPLOAD_TEMP_DIR = MEDIA_ROOT / 'uploads_partial'
+
+# Customer report PDFs (portal.reports): rendered in a pool of worker processes
+# off the request path and cached on disk by a hash of the report's content.
+# PORTAL_REPORT_PDF_PROCESSES = 0 renders inline instead.
+PORTAL_REPORT_PDF_DIR = MEDIA_ROOT / 'report_pdfs'
+PORTAL_REPORT_PDF_PROCESSES = 2
+# `manage.py prune_report_pdfs` deletes cached files not served for this long.
+PORTAL_REPORT_PDF_RETENTION_DAYS = 30
+
+# Search index backend (dotted path). Unset picks SQLite FTS5 on SQLite and the
+# unindexed icontains fallback elsewhere.
+# PORTAL_SEARCH_BACKEND = 'portal.search.FTS5SearchBackend'
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -131,7 +229,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'portal.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -145,6 +243,42 @@ REST_FRAMEWORK = {
     ],
 }
 
+# API token cache (portal.authentication.CachedTokenAuthentication): a per-process
+# LRU of tokens with their user and profiles, kept per process. Deleting or
+# rotating a token, or saving the user or their profiles, stamps the revocation
+# in REVOCATION_CACHE (which every worker must share). Cache hits check it at
+# most every REVOCATION_CHECK_SECONDS per entry, which bounds how long another
+# worker keeps serving a revoked token; TTL_SECONDS only bounds staleness after
+# queryset update() calls.
+PORTAL_TOKEN_CACHE = {
+    'MAX_SIZE': 10000,
+    'TTL_SECONDS': 300,
+    'REVOCATION_CACHE': 'token_revocations',
+    'REVOCATION_CHECK_SECONDS': 1,
+}
+
+# Per-request instrumentation (portal.middleware.RequestBudgetMiddleware).
+# Budgets are keyed by URL name; requests over budget are logged to "portal.budget".
+# REQUEST_SERVER_TIMING adds the measurements to a Server-Timing response header;
+# it reveals query counts to clients, so keep it off in production.
+REQUEST_INSTRUMENTATION = True
+REQUEST_SERVER_TIMING = DEBUG
+REQUEST_BUDGETS = {
+    'default': {'queries': 30, 'ms': 500},
+    'inspection-list': {'queries': 15, 'ms': 800},
+    'inspection-detail': {'queries': 30, 'ms': 500},
+    'portal-app': {'queries': 10, 'ms': 300},
+}
+
+# Mobile delta sync: clients older than this get a full snapshot instead of tombstones
+SYNC_TOMBSTONE_RETENTION_DAYS = 30
+# Rows per page of that full snapshot (vehicles, then assignments, then inspections)
+SYNC_RESET_PAGE_SIZE = 1000
+
+# Customer report job queue (see `manage.py run_report_worker`)
+REPORT_JOB_MAX_ATTEMPTS = 3
+REPORT_JOB_TIMEOUT_SECONDS = 300
+
 # Auth redirects
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/admin/'
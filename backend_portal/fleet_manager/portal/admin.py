@@ -1,6 +1,21 @@
 from django.contrib import admin
 
 from . import models
+from .forms import VehicleAssignmentAdminForm
+from .search import KIND_CUSTOMER, KIND_VEHICLE, get_search_backend
+
+
+class IndexedSearchMixin:
+    """Answer the changelist search box from the search index instead of LIKE scans."""
+
+    search_kind: str
+    search_limit = 1000
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return queryset, False
+        hits = get_search_backend().search(search_term, [self.search_kind], self.search_limit)
+        return queryset.filter(pk__in=[hit.object_id for hit in hits]), False
 
 
 @admin.register(models.PortalUser)
@@ -11,7 +26,8 @@ class PortalUserAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.Customer)
-class CustomerAdmin(admin.ModelAdmin):
+class CustomerAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    search_kind = KIND_CUSTOMER
     list_display = ("legal_name", "contact_email", "contact_phone", "city", "country", "created_at")
     search_fields = ("legal_name", "contact_email", "contact_phone", "city")
     autocomplete_fields = ("profile",)
@@ -26,7 +42,8 @@ class InspectorProfileAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.Vehicle)
-class VehicleAdmin(admin.ModelAdmin):
+class VehicleAdmin(IndexedSearchMixin, admin.ModelAdmin):
+    search_kind = KIND_VEHICLE
     list_display = (
         "license_plate",
         "vin",
@@ -44,6 +61,7 @@ class VehicleAdmin(admin.ModelAdmin):
 
 @admin.register(models.VehicleAssignment)
 class VehicleAssignmentAdmin(admin.ModelAdmin):
+    form = VehicleAssignmentAdminForm
     list_display = ("vehicle", "inspector", "scheduled_for", "status", "assigned_by")
     search_fields = (
         "vehicle__license_plate",
@@ -106,7 +124,45 @@ class InspectionPhotoAdmin(admin.ModelAdmin):
     autocomplete_fields = ("response",)
 
 
+@admin.register(models.PhotoUpload)
+class PhotoUploadAdmin(admin.ModelAdmin):
+    list_display = ("id", "owner", "filename", "received_bytes", "total_size", "status", "updated_at")
+    list_filter = ("status",)
+
+
+@admin.register(models.ReportJob)
+class ReportJobAdmin(admin.ModelAdmin):
+    list_display = ("inspection", "status", "attempts", "worker", "available_at", "finished_at")
+    list_filter = ("status",)
+    autocomplete_fields = ("inspection",)
+
+
 @admin.register(models.CustomerReport)
 class CustomerReportAdmin(admin.ModelAdmin):
     list_display = ("inspection", "published_at")
     autocomplete_fields = ("inspection",)
+
+
+@admin.register(models.SyncTombstone)
+class SyncTombstoneAdmin(admin.ModelAdmin):
+    list_display = ("model", "object_id", "customer_id", "inspector_id", "deleted_at")
+    list_filter = ("model", "deleted_at")
+
+
+@admin.register(models.DashboardCounter)
+class DashboardCounterAdmin(admin.ModelAdmin):
+    list_display = ("key", "value", "updated_at")
+    search_fields = ("key",)
+
+
+@admin.register(models.FailureRollup)
+class FailureRollupAdmin(admin.ModelAdmin):
+    list_display = ("day", "dimension", "key", "checks", "failures", "inspections")
+    list_filter = ("dimension", "day")
+    search_fields = ("key",)
+
+
+@admin.register(models.ChecklistVersion)
+class ChecklistVersionAdmin(admin.ModelAdmin):
+    list_display = ("version", "source", "applied_at", "checksum")
+    readonly_fields = ("version", "checksum", "source", "changes", "applied_at")
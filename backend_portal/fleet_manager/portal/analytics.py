@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
+
+from .models import (
+    ChecklistItem,
+    Customer,
+    FailureRollup,
+    Inspection,
+    InspectionCategory,
+    InspectionItemResponse,
+    RolledUpInspection,
+)
+
+ROLLUP_BATCH_SIZE = 500
+ROLLED_UP_STATUSES = (Inspection.STATUS_SUBMITTED, Inspection.STATUS_APPROVED)
+
+# Path from InspectionItemResponse to the value each dimension groups by.
+DIMENSION_PATHS = {
+    FailureRollup.DIMENSION_ITEM: "checklist_item_id",
+    FailureRollup.DIMENSION_CATEGORY: "checklist_item__category_id",
+    FailureRollup.DIMENSION_VEHICLE_TYPE: "inspection__vehicle__vehicle_type",
+    FailureRollup.DIMENSION_CUSTOMER: "inspection__customer_id",
+}
+
+COUNTER_FIELDS = ("responses", "checks", "failures", "inspections")
+
+
+def pending_inspections():
+    """Submitted or approved inspections not yet counted in the rollup."""
+
+    return Inspection.objects.filter(status__in=ROLLED_UP_STATUSES, failure_rollup__isnull=True)
+
+
+def _inspection_day(prefix: str = ""):
+    return TruncDate(Coalesce(f"{prefix}completed_at", f"{prefix}created_at"))
+
+
+def rollup_failures(batch_size: int = ROLLUP_BATCH_SIZE) -> int:
+    """Fold newly submitted inspections into the daily rollup; returns how many were added."""
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(pending_inspections().order_by("id").values_list("id", flat=True)[:batch_size])
+            if not ids:
+                return total
+            _rollup_batch(ids)
+        total += len(ids)
+
+
+def withdraw_from_rollup(ids: list[int]) -> int:
+    """Take rolled-up inspections back out of the rollup; returns how many were.
+
+    Call it before an inspection's responses, status, day or customer change,
+    or before it is deleted: what is subtracted is read from the rows as stored,
+    which is what ``rollup_failures`` counted. An inspection that is still
+    submitted or approved is pending again and the next run counts it anew.
+    """
+
+    with transaction.atomic():
+        marked = list(
+            RolledUpInspection.objects.select_for_update()
+            .filter(inspection_id__in=ids)
+            .values_list("inspection_id", flat=True)
+        )
+        if not marked:
+            return 0
+        responses = InspectionItemResponse.objects.filter(inspection_id__in=marked).order_by()
+        # The stored day, so a rollup row is debited exactly as it was credited.
+        for dimension, totals in _dimension_totals(responses, F("inspection__failure_rollup__day")):
+            _merge(dimension, totals, sign=-1)
+        RolledUpInspection.objects.filter(inspection_id__in=marked).delete()
+    return len(marked)
+
+
+def _dimension_totals(responses, day):
+    for dimension, path in DIMENSION_PATHS.items():
+        rows = responses.values(day=day, value=F(path)).annotate(
+            responses=Count("id"),
+            checks=Count("id", filter=~Q(result=InspectionItemResponse.RESULT_NA)),
+            failures=Count("id", filter=Q(result=InspectionItemResponse.RESULT_FAIL)),
+            inspections=Count("inspection_id", distinct=True),
+        )
+        yield dimension, {(row["day"], str(row["value"] or "")): row for row in rows}
+
+
+def _rollup_batch(ids: list[int]) -> None:
+    responses = InspectionItemResponse.objects.filter(inspection_id__in=ids).order_by()
+    for dimension, totals in _dimension_totals(responses, _inspection_day("inspection__")):
+        _merge(dimension, totals)
+
+    days = Inspection.objects.filter(pk__in=ids).order_by().values_list("id", _inspection_day())
+    RolledUpInspection.objects.bulk_create(
+        [RolledUpInspection(inspection_id=pk, day=day) for pk, day in days], ignore_conflicts=True
+    )
+
+
+def _merge(dimension: str, totals: dict[tuple[date, str], dict], sign: int = 1) -> None:
+    if not totals:
+        return
+    days = {day for day, _key in totals}
+    keys = {key for _day, key in totals}
+    existing = {
+        (rollup.day, rollup.key): rollup
+        for rollup in FailureRollup.objects.filter(dimension=dimension, day__in=days, key__in=keys)
+    }
+    created, changed, emptied = [], [], []
+    for (day, key), row in totals.items():
+        rollup = existing.get((day, key))
+        if rollup is None:
+            if sign < 0:
+                continue
+            rollup = FailureRollup(dimension=dimension, day=day, key=key)
+            created.append(rollup)
+        for name in COUNTER_FIELDS:
+            setattr(rollup, name, max(getattr(rollup, name) + sign * row[name], 0))
+        if rollup.pk is None:
+            continue
+        if rollup.responses:
+            changed.append(rollup)
+        else:
+            emptied.append(rollup.pk)
+    FailureRollup.objects.bulk_create(created, batch_size=ROLLUP_BATCH_SIZE)
+    FailureRollup.objects.bulk_update(changed, COUNTER_FIELDS, batch_size=ROLLUP_BATCH_SIZE)
+    if emptied:
+        FailureRollup.objects.filter(pk__in=emptied).delete()
+
+
+def _labels(dimension: str, keys: list[str]) -> dict[str, str]:
+    if dimension == FailureRollup.DIMENSION_VEHICLE_TYPE:
+        return {key: key or "Unspecified" for key in keys}
+    ids = [int(key) for key in keys if key.isdigit()]
+    if dimension == FailureRollup.DIMENSION_ITEM:
+        rows = ChecklistItem.objects.filter(pk__in=ids).values_list("id", "title")
+    elif dimension == FailureRollup.DIMENSION_CATEGORY:
+        rows = InspectionCategory.objects.filter(pk__in=ids).values_list("id", "name")
+    else:
+        rows = Customer.objects.filter(pk__in=ids).values_list("id", "legal_name")
+    return {str(pk): label for pk, label in rows}
+
+
+def _with_rate(row: dict) -> dict:
+    row["failure_rate"] = round(row["failures"] / row["checks"], 4) if row["checks"] else 0.0
+    return row
+
+
+def failure_summary(dimension: str, start: date, end: date, limit: int = 50) -> list[dict]:
+    """Totals per dimension value over ``[start, end]``, worst failure rate first."""
+
+    rows = list(
+        FailureRollup.objects.filter(dimension=dimension, day__gte=start, day__lte=end)
+        .values("key")
+        .annotate(**{name: Sum(name) for name in COUNTER_FIELDS})
+        .order_by()
+    )
+    rows = sorted((_with_rate(row) for row in rows), key=lambda row: (-row["failure_rate"], -row["failures"], row["key"]))
+    rows = rows[:limit]
+    labels = _labels(dimension, [row["key"] for row in rows])
+    for row in rows:
+        row["label"] = labels.get(row["key"], row["key"])
+    return rows
+
+
+def failure_series(dimension: str, key: str, start: date, end: date) -> list[dict]:
+    """Daily points for one dimension value."""
+
+    rows = FailureRollup.objects.filter(dimension=dimension, key=key, day__gte=start, day__lte=end).order_by("day")
+    return [_with_rate({"day": row.day, **{name: getattr(row, name) for name in COUNTER_FIELDS}}) for row in rows]
@@ -4,3 +4,15 @@ from django.apps import AppConfig
 class PortalConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'portal'
+
+    def ready(self):
+        from django.core import checks
+        from django.db.models.signals import post_migrate
+
+        from . import signals  # noqa: F401
+        from .authentication import check_revocation_cache
+        from .routing import check_pin_cache
+
+        post_migrate.connect(signals.create_search_schema, sender=self)
+        checks.register(check_pin_cache, checks.Tags.caches)
+        checks.register(check_revocation_cache, checks.Tags.caches)
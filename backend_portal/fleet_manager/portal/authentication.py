@@ -0,0 +1,382 @@
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core import checks
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+from .instrumentation import current_metrics
+from .models import Customer, InspectorProfile, PortalUser
+from .routing import PROCESS_LOCAL_CACHES
+
+# Everything permissions and queryset scoping look at, reachable from the user
+# through one-to-one joins.
+PRINCIPAL_RELATED = (
+    "portal_profile",
+    "portal_profile__customer_profile",
+    "portal_profile__inspector_profile",
+)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user together with their portal profile and role profile."""
+
+    user: object
+    profile: PortalUser | None = None
+    customer: Customer | None = None
+    inspector: InspectorProfile | None = None
+
+    @property
+    def role(self) -> str | None:
+        return self.profile.role if self.profile else None
+
+    def has_role(self, *roles: str) -> bool:
+        return self.role in roles
+
+    @property
+    def is_admin(self) -> bool:
+        return self.role == PortalUser.ROLE_ADMIN
+
+
+def _load_profile(user) -> None:
+    """Fetch and cache the profile chain for a user that was loaded without it."""
+
+    profile = (
+        PortalUser.objects.select_related("customer_profile", "inspector_profile").filter(user_id=user.pk).first()
+    )
+    get_user_model().portal_profile.related.set_cached_value(user, profile)
+    if profile is not None:
+        PortalUser.user.field.set_cached_value(profile, user)
+
+
+def _load_role_profile(profile: PortalUser) -> None:
+    """Cache both role profile relations, querying only the one the role can have."""
+
+    relations = {
+        PortalUser.ROLE_CUSTOMER: (PortalUser.customer_profile.related, Customer),
+        PortalUser.ROLE_INSPECTOR: (PortalUser.inspector_profile.related, InspectorProfile),
+    }
+    for role, (relation, model) in relations.items():
+        if relation.is_cached(profile):
+            continue
+        value = model.objects.filter(profile=profile).first() if profile.role == role else None
+        relation.set_cached_value(profile, value)
+
+
+def principal_for_user(user) -> Principal:
+    """Build the principal from ``user``; free when the user came from a principal-aware loader."""
+
+    if user is None or not user.is_authenticated:
+        return Principal(user)
+    if not get_user_model().portal_profile.related.is_cached(user):
+        _load_profile(user)
+    try:
+        profile = user.portal_profile
+    except PortalUser.DoesNotExist:
+        return Principal(user)
+    _load_role_profile(profile)
+    return Principal(
+        user,
+        profile,
+        customer=getattr(profile, "customer_profile", None),
+        inspector=getattr(profile, "inspector_profile", None),
+    )
+
+
+def get_principal(request) -> Principal:
+    """The request's principal, resolved once and shared by permissions and views.
+
+    Accepts a DRF ``Request`` or a plain ``HttpRequest``; the principal is kept
+    on the underlying ``HttpRequest`` so both see the same object.
+    """
+
+    http_request = getattr(request, "_request", request)
+    user = request.user
+    principal = getattr(http_request, "portal_principal", None)
+    if principal is None or principal.user is not user:
+        principal = principal_for_user(user)
+        http_request.portal_principal = principal
+    return principal
+
+
+class PrincipalTokenAuthentication(TokenAuthentication):
+    """Token authentication that loads the token, user and profiles in one joined query."""
+
+    def authenticate_credentials(self, key):
+        model = self.get_model()
+        related = ["user", *(f"user__{path}" for path in PRINCIPAL_RELATED)]
+        try:
+            token = model.objects.select_related(*related).get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_("Invalid token."))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_("User inactive or deleted."))
+        return (token.user, token)
+
+
+@dataclass
+class TokenCacheStats:
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evictions: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "hit_rate": round(self.hit_rate, 4)}
+
+
+REVOCATION_PREFIX = "portal:tokens:revoked"
+
+
+def revocation_cache_alias() -> str:
+    return getattr(settings, "PORTAL_TOKEN_CACHE", {}).get("REVOCATION_CACHE", "token_revocations")
+
+
+def check_revocation_cache(app_configs=None, **kwargs) -> list[checks.CheckMessage]:
+    """Revoked tokens are announced through a cache, which every worker must share."""
+
+    alias = revocation_cache_alias()
+    config = settings.CACHES.get(alias)
+    if config is None:
+        return [
+            checks.Error(
+                f"PORTAL_TOKEN_CACHE['REVOCATION_CACHE'] names the cache {alias!r}, which is not configured.",
+                hint="Add it to CACHES, backed by a store every worker process shares.",
+                id="portal.E003",
+            )
+        ]
+    if config.get("BACKEND") in PROCESS_LOCAL_CACHES:
+        return [
+            checks.Warning(
+                f"The token revocation cache {alias!r} is local to each process, so a token revoked in one "
+                "worker stays usable in the others until their cached entry expires.",
+                hint="Use a shared backend (file-based, database, Redis or Memcached).",
+                id="portal.W001",
+            )
+        ]
+    return []
+
+
+class TokenCache:
+    """Bounded LRU of authenticated tokens, each entry valid for a TTL.
+
+    Entries hold the token with its user and profiles already joined, so a hit
+    costs no queries. The entries are per process, but invalidating a token,
+    user or portal profile also stamps the revocation time in the shared
+    ``REVOCATION_CACHE``, and hits check those stamps: an entry loaded before
+    its subject was revoked is dropped in whichever process holds it. An entry
+    that passed the check is trusted for ``REVOCATION_CHECK_SECONDS`` before the
+    next one, which bounds how long another process may still serve it (in
+    this process invalidation is immediate). Queryset ``update()`` calls send
+    no signals, so only the TTL bounds staleness after them.
+    """
+
+    def __init__(self, max_size: int | None = None, ttl: float | None = None, check_interval: float | None = None):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._check_interval = check_interval
+        # key -> (expires, loaded_at, token, checked_until); loaded_at is
+        # wall-clock time, comparable with revocation stamps written by other
+        # processes, and checked_until is when the stamps are due again.
+        self._entries: OrderedDict[str, tuple[float, float, object, float]] = OrderedDict()
+        # (kind, value) -> token keys, for invalidating by key, user or portal profile.
+        self._tags: dict[tuple[str, object], set[str]] = {}
+        self._lock = threading.Lock()
+        self.stats = TokenCacheStats()
+
+    @property
+    def max_size(self) -> int:
+        if self._max_size is not None:
+            return self._max_size
+        return getattr(settings, "PORTAL_TOKEN_CACHE", {}).get("MAX_SIZE", 10000)
+
+    @property
+    def ttl(self) -> float:
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, "PORTAL_TOKEN_CACHE", {}).get("TTL_SECONDS", 300)
+
+    @property
+    def check_interval(self) -> float:
+        if self._check_interval is not None:
+            return self._check_interval
+        return getattr(settings, "PORTAL_TOKEN_CACHE", {}).get("REVOCATION_CHECK_SECONDS", 1)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str):
+        """A private copy of the cached token (and its user), or ``None``."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            expires, loaded_at, token, checked_until = entry
+            now = time.monotonic()
+            if expires <= now:
+                self._remove(key)
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return None
+        checked = checked_until > now
+        if not checked and self._revoked_since(loaded_at, _tags_for(token)):
+            with self._lock:
+                if self._remove(key):
+                    self.stats.invalidations += 1
+                self.stats.misses += 1
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if not checked and entry[2] is token:
+                    self._entries[key] = (expires, loaded_at, token, now + self.check_interval)
+            self.stats.hits += 1
+        return _detached(token)
+
+    def set(self, key: str, token, loaded_at: float | None = None) -> None:
+        """Cache ``token``; ``loaded_at`` is when the rows were read (default: now)."""
+
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        snapshot = _detached(token)
+        with self._lock:
+            self._remove(key)
+            # Not checked yet: a revocation may already postdate loaded_at.
+            self._entries[key] = (time.monotonic() + self.ttl, loaded_at or time.time(), snapshot, 0.0)
+            for tag in _tags_for(snapshot):
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        self._invalidate_tag(("token", key))
+
+    def invalidate_user(self, user_id: int) -> None:
+        self._invalidate_tag(("user", user_id))
+
+    def invalidate_profile(self, profile_id: int) -> None:
+        self._invalidate_tag(("profile", profile_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+            self.stats = TokenCacheStats()
+
+    def _invalidate_tag(self, tag: tuple[str, object]) -> None:
+        # Stamp first: a process that loads the old rows after this point
+        # records a later loaded_at and is covered by the on-commit stamp.
+        self._shared().set(_revocation_key(tag), time.time(), timeout=int(self.ttl) + 1)
+        with self._lock:
+            for key in list(self._tags.get(tag, ())):
+                if self._remove(key):
+                    self.stats.invalidations += 1
+
+    def _revoked_since(self, loaded_at: float, tags: list[tuple[str, object]]) -> bool:
+        stamps = self._shared().get_many([_revocation_key(tag) for tag in tags])
+        return any(stamp >= loaded_at for stamp in stamps.values())
+
+    @staticmethod
+    def _shared():
+        return caches[revocation_cache_alias()]
+
+    def _remove(self, key: str) -> bool:
+        # Caller holds the lock.
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in _tags_for(entry[2]):
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+
+def _tags_for(token) -> list[tuple[str, object]]:
+    tags = [("token", token.key), ("user", token.user_id)]
+    profile = getattr(token.user, "portal_profile", None) if _profile_cached(token.user) else None
+    if profile is not None:
+        tags.append(("profile", profile.pk))
+    return tags
+
+
+def _revocation_key(tag: tuple[str, object]) -> str:
+    kind, value = tag
+    return f"{REVOCATION_PREFIX}:{kind}:{value}"
+
+
+def _profile_cached(user) -> bool:
+    return get_user_model().portal_profile.related.is_cached(user)
+
+
+def _detached(token):
+    """Copy the token and its user so requests never share mutable instances.
+
+    The profiles hanging off the user stay shared; nothing on the request path
+    writes to them.
+    """
+
+    token_copy = copy.copy(token)
+    token.__class__.user.field.set_cached_value(token_copy, copy.copy(token.user))
+    return token_copy
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(PrincipalTokenAuthentication):
+    """Token authentication served from ``token_cache``; warm requests run no auth queries.
+
+    Sizing comes from ``PORTAL_TOKEN_CACHE`` (``MAX_SIZE``, ``TTL_SECONDS``).
+    Hits and misses are counted in ``token_cache.stats`` and, with
+    ``REQUEST_SERVER_TIMING`` on, reported in the ``Server-Timing`` header.
+    """
+
+    cache = token_cache
+
+    def authenticate_credentials(self, key):
+        token = self.cache.get(key)
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.auth = "miss" if token is None else "hit"
+        if token is not None:
+            return (token.user, token)
+        loaded_at = time.time()
+        user, token = super().authenticate_credentials(key)
+        self.cache.set(key, token, loaded_at)
+        return (user, token)
+
+
+class PrincipalBackend(ModelBackend):
+    """Session backend whose ``get_user`` joins the profiles in, like the token path."""
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related(*PRINCIPAL_RELATED).get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+
+from django.db.backends.sqlite3 import base
+from django.db.transaction import TransactionManagementError
+
+DEFAULT_WRITER_TIMEOUT = 30.0
+READ_PREFIXES = ("SELECT", "PRAGMA", "EXPLAIN")
+TRANSACTION_PREFIXES = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK")
+
+_writer_locks: dict[str, threading.RLock] = {}
+_registry_lock = threading.Lock()
+
+
+def writer_lock(name: str) -> threading.RLock:
+    """The process-wide writer lock for one database file."""
+
+    with _registry_lock:
+        return _writer_locks.setdefault(name, threading.RLock())
+
+
+class WriterStats:
+    """Running totals of time spent queued for the writer lock, for benchmarks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.acquisitions = 0
+            self.wait_seconds = 0.0
+
+    def record(self, waited: float) -> None:
+        with self._lock:
+            self.acquisitions += 1
+            self.wait_seconds += waited
+
+
+writer_stats = WriterStats()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite backend that lets one thread per process write at a time.
+
+    SQLite allows a single writer per file; contending connections otherwise
+    poll the busy handler and, when a deferred transaction tries to upgrade
+    its read lock, fail straight away with ``database is locked``. Here every
+    write transaction (an ``atomic`` block, or a lone write statement in
+    autocommit) first takes a per-file lock, so writers in this process queue
+    in FIFO-ish order and only cross-process contention reaches SQLite's
+    ``busy_timeout``. Readers never take the lock: autocommit reads run
+    straight away, and transactions opened inside ``reading()`` (see
+    ``portal.transactions.read_transaction``) begin DEFERRED outside the queue
+    and refuse to write.
+
+    ``OPTIONS['writer_timeout']`` (seconds) bounds the wait; running out
+    raises ``OperationalError`` like SQLite's own busy error.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer_timeout = self.settings_dict["OPTIONS"].get("writer_timeout", DEFAULT_WRITER_TIMEOUT)
+        self._writer_depth = 0
+        self._read_depth = 0
+        self._reader_transaction = False
+        self.execute_wrappers.append(self._serialize_autocommit_writes)
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        kwargs.pop("writer_timeout", None)
+        return kwargs
+
+    @contextmanager
+    def reading(self):
+        """Open transactions started in this block as read-only snapshots."""
+
+        self._read_depth += 1
+        try:
+            yield
+        finally:
+            self._read_depth -= 1
+
+    def _acquire_writer(self) -> None:
+        lock = writer_lock(str(self.settings_dict["NAME"]))
+        started = time.perf_counter()
+        if not lock.acquire(timeout=self.writer_timeout):
+            raise self.Database.OperationalError(
+                f"database is locked (waited {self.writer_timeout:.0f}s for the writer queue)"
+            )
+        writer_stats.record(time.perf_counter() - started)
+        self._writer_depth += 1
+
+    def _release_writer(self) -> None:
+        if self._writer_depth:
+            self._writer_depth -= 1
+            writer_lock(str(self.settings_dict["NAME"])).release()
+
+    @contextmanager
+    def _writer(self):
+        with self.wrap_database_errors:
+            self._acquire_writer()
+        try:
+            yield
+        finally:
+            self._release_writer()
+
+    def _serialize_autocommit_writes(self, execute, sql, params, many, context):
+        statement = sql.lstrip().upper()
+        if self._reader_transaction:
+            if not statement.startswith(READ_PREFIXES + TRANSACTION_PREFIXES):
+                raise TransactionManagementError("Write statements are not allowed in a read transaction.")
+            return execute(sql, params, many, context)
+        # Inside atomic() the lock was taken at BEGIN; reads never need it.
+        if self.in_atomic_block or self._writer_depth or statement.startswith(READ_PREFIXES):
+            return execute(sql, params, many, context)
+        with self._writer():
+            return execute(sql, params, many, context)
+
+    def _start_transaction_under_autocommit(self):
+        if self._read_depth:
+            # DEFERRED whatever transaction_mode says: a reader only needs a snapshot.
+            self._reader_transaction = True
+            self.cursor().execute("BEGIN DEFERRED")
+            return
+        with self.wrap_database_errors:
+            self._acquire_writer()
+        try:
+            super()._start_transaction_under_autocommit()
+        except BaseException:
+            self._release_writer()
+            raise
+
+    def _end_transaction(self) -> None:
+        self._reader_transaction = False
+        self._release_writer()
+
+    def _commit(self):
+        try:
+            return super()._commit()
+        finally:
+            self._end_transaction()
+
+    def _rollback(self):
+        try:
+            return super()._rollback()
+        finally:
+            self._end_transaction()
+
+    def _close(self):
+        try:
+            return super()._close()
+        finally:
+            self._reader_transaction = False
+            while self._writer_depth:
+                self._release_writer()
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date
+from typing import Iterable
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, IntegerField, OuterRef, QuerySet, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import InspectorDailyLoad, InspectorProfile, VehicleAssignment
+
+LOAD_BATCH_SIZE = 500
+
+# (inspector_id, day): one cell of the load table.
+Slot = tuple[int, date]
+
+# Finished assignments give their slot back.
+TERMINAL_STATUSES = frozenset({VehicleAssignment.STATUS_COMPLETED})
+
+
+class CapacityExceeded(ValidationError):
+    def __init__(self, inspector: InspectorProfile, day: date):
+        super().__init__(
+            "%(inspector)s is fully booked on %(day)s (%(limit)s per day).",
+            code="capacity",
+            params={"inspector": inspector, "day": day, "limit": inspector.max_daily_inspections},
+        )
+
+
+def slot_for(inspector_id: int | None, day, status: str | None) -> Slot | None:
+    """The slot an assignment with these values occupies; ``None`` once it is finished."""
+
+    if inspector_id is None or day is None or status in TERMINAL_STATUSES:
+        return None
+    return inspector_id, VehicleAssignment._meta.get_field("scheduled_for").to_python(day)
+
+
+def assignment_slot(assignment: VehicleAssignment) -> Slot | None:
+    """The slot an assignment occupies, read from ``__dict__`` so deferred fields are never fetched."""
+
+    values = assignment.__dict__
+    return slot_for(values.get("inspector_id"), values.get("scheduled_for"), values.get("status"))
+
+
+def booked(inspector_id: int, day: date) -> int:
+    return InspectorDailyLoad.objects.filter(inspector_id=inspector_id, day=day).values_list("assigned", flat=True).first() or 0
+
+
+def check_capacity(inspector: InspectorProfile, day: date, current: Slot | None = None) -> None:
+    """Raise ``CapacityExceeded`` if ``inspector`` has no free slot on ``day``.
+
+    ``current`` is where the assignment being edited is booked now; keeping
+    it there needs no extra room. This is the friendly up-front check; the
+    booking itself is enforced by ``reserve``.
+    """
+
+    if current == (inspector.pk, day):
+        return
+    if booked(inspector.pk, day) >= inspector.max_daily_inspections:
+        raise CapacityExceeded(inspector, day)
+
+
+def reserve(inspector: InspectorProfile, day: date, count: int = 1) -> None:
+    """Book ``count`` slots with a conditional UPDATE; raise ``CapacityExceeded`` if they are not free."""
+
+    limit = inspector.max_daily_inspections
+    if count > limit:
+        raise CapacityExceeded(inspector, day)
+    rows = InspectorDailyLoad.objects.filter(inspector_id=inspector.pk, day=day, assigned__lte=limit - count)
+    changes = {"assigned": F("assigned") + count, "updated_at": timezone.now()}
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            InspectorDailyLoad.objects.create(inspector_id=inspector.pk, day=day, assigned=count)
+        return
+    except IntegrityError:
+        # The row exists: either it is full or a concurrent booking just created it.
+        pass
+    if not rows.update(**changes):
+        raise CapacityExceeded(inspector, day)
+
+
+def release(slot: Slot, count: int = 1) -> None:
+    inspector_id, day = slot
+    InspectorDailyLoad.objects.filter(inspector_id=inspector_id, day=day).update(
+        assigned=Greatest(F("assigned") - count, Value(0)), updated_at=timezone.now()
+    )
+
+
+def ensure_load_rows(slots: Iterable[Slot]) -> None:
+    """Create missing load rows at zero so they can be locked and updated in bulk."""
+
+    InspectorDailyLoad.objects.bulk_create(
+        [InspectorDailyLoad(inspector_id=inspector_id, day=day) for inspector_id, day in slots],
+        batch_size=LOAD_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def load_map(inspector_ids: Iterable[int], start: date, end: date, lock: bool = False) -> dict[Slot, int]:
+    """Booked assignments per slot in ``start..end``; ``lock`` holds the rows until the transaction ends."""
+
+    rows = InspectorDailyLoad.objects.filter(inspector_id__in=list(inspector_ids), day__range=(start, end)).order_by()
+    if lock:
+        rows = rows.select_for_update()
+    return {(inspector_id, day): assigned for inspector_id, day, assigned in rows.values_list("inspector_id", "day", "assigned")}
+
+
+def add_loads(deltas: dict[Slot, int]) -> None:
+    """Apply per-slot increments with one UPDATE per day; the rows must already exist."""
+
+    by_day: dict[date, dict[int, int]] = defaultdict(dict)
+    for (inspector_id, day), delta in deltas.items():
+        if delta:
+            by_day[day][inspector_id] = delta
+    now = timezone.now()
+    for day, increments in by_day.items():
+        InspectorDailyLoad.objects.filter(day=day, inspector_id__in=increments).update(
+            assigned=F("assigned")
+            + Case(*[When(inspector_id=pk, then=Value(delta)) for pk, delta in increments.items()], output_field=IntegerField()),
+            updated_at=now,
+        )
+
+
+def inspectors_with_capacity(day: date, queryset: QuerySet | None = None) -> QuerySet:
+    """Active inspectors with a free slot on ``day``, annotated with ``booked`` and ``remaining``, most room first."""
+
+    if queryset is None:
+        queryset = InspectorProfile.objects.filter(is_active=True, profile__user__is_active=True)
+    load = InspectorDailyLoad.objects.filter(inspector=OuterRef("pk"), day=day).values("assigned")[:1]
+    return (
+        queryset.annotate(booked=Coalesce(Subquery(load), Value(0), output_field=IntegerField()))
+        .annotate(remaining=F("max_daily_inspections") - F("booked"))
+        .filter(remaining__gt=0)
+        .order_by("-remaining", "badge_id")
+    )
+
+
+@transaction.atomic
+def rebuild_daily_loads() -> int:
+    """Recount the load table from the assignments, e.g. after bulk loads or ``QuerySet.update()`` moves."""
+
+    rows = (
+        VehicleAssignment.objects.exclude(status__in=TERMINAL_STATUSES)
+        .order_by()
+        .values_list("inspector_id", "scheduled_for")
+        .annotate(total=Count("id"))
+    )
+    InspectorDailyLoad.objects.all().delete()
+    created = InspectorDailyLoad.objects.bulk_create(
+        (InspectorDailyLoad(inspector_id=inspector_id, day=day, assigned=total) for inspector_id, day, total in rows),
+        batch_size=LOAD_BATCH_SIZE,
+    )
+    return len(created)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import uuid
+from typing import Callable
+
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse, HttpResponseNotModified
+from rest_framework.renderers import JSONRenderer
+
+CATALOG_CACHE_ALIAS = "catalog"
+VERSION_KEY = "portal:catalog:version"
+
+
+def _cache():
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def catalog_version() -> str:
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalog_version() -> None:
+    # A fresh token rather than an increment: old blobs simply stop being addressed.
+    _cache().set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def schedule_catalog_bump() -> None:
+    # Bump after commit so no request can cache a blob built from pre-commit rows
+    # under the new version.
+    transaction.on_commit(bump_catalog_version)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    candidates = [value.strip() for value in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def catalog_response(request: HttpRequest, name: str, build: Callable[[], object]) -> HttpResponse:
+    """Serve a pre-rendered catalog document with a strong ETag.
+
+    ``build`` is only called when the blob for the current version is missing;
+    matching ``If-None-Match`` requests are answered 304 without touching it.
+    """
+
+    version = catalog_version()
+    etag = f'"{name}-{version}"'
+    if _etag_matches(request.META.get("HTTP_IF_NONE_MATCH", ""), etag):
+        response = HttpResponseNotModified()
+    else:
+        cache = _cache()
+        blob_key = f"portal:catalog:{name}:{version}"
+        blob = cache.get(blob_key)
+        if blob is None:
+            blob = JSONRenderer().render(build())
+            cache.set(blob_key, blob, timeout=None)
+        response = HttpResponse(blob, content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = "public, no-cache"
+    return response
@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Iterable
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .catalog import schedule_catalog_bump
+from .models import ChecklistItem, ChecklistVersion, InspectionCategory
+
+FORMAT_JSON = "json"
+FORMAT_YAML = "yaml"
+DEFINITION_FORMATS = (FORMAT_JSON, FORMAT_YAML)
+
+UPSERT_BATCH_SIZE = 500
+CATEGORY_FIELDS = ("name", "description", "display_order")
+ITEM_FIELDS = ("title", "description", "requires_photo", "is_active")
+
+
+class ChecklistDefinitionError(ValueError):
+    """The definition is malformed or cannot be applied at its version; ``errors`` lists every problem."""
+
+    def __init__(self, errors: list[str] | str):
+        self.errors = [errors] if isinstance(errors, str) else errors
+        super().__init__("; ".join(self.errors))
+
+
+@dataclass(frozen=True)
+class CategorySpec:
+    code: str
+    name: str
+    description: str = ""
+    display_order: int = 0
+
+
+@dataclass(frozen=True)
+class ItemSpec:
+    category: str
+    code: str
+    title: str
+    description: str = ""
+    requires_photo: bool = False
+    is_active: bool = True
+
+
+@dataclass
+class ChecklistDefinition:
+    version: int
+    categories: list[CategorySpec]
+    items: list[ItemSpec]
+
+    @property
+    def checksum(self) -> str:
+        content = {
+            "version": self.version,
+            "categories": [asdict(category) for category in self.categories],
+            "items": [asdict(item) for item in self.items],
+        }
+        return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+@dataclass
+class ChecklistDiff:
+    """What an import changed (or, for a dry run, would change). Items are keyed ``category/code``."""
+
+    version: int | None = None
+    previous_version: int | None = None
+    dry_run: bool = False
+    categories_created: list[str] = field(default_factory=list)
+    categories_updated: dict[str, dict[str, list]] = field(default_factory=dict)
+    items_created: list[str] = field(default_factory=list)
+    items_updated: dict[str, dict[str, list]] = field(default_factory=dict)
+    items_deactivated: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(
+            self.categories_created or self.categories_updated or self.items_created or self.items_updated or self.items_deactivated
+        )
+
+    def counts(self) -> dict[str, int]:
+        return {
+            "categories_created": len(self.categories_created),
+            "categories_updated": len(self.categories_updated),
+            "items_created": len(self.items_created),
+            "items_updated": len(self.items_updated),
+            "items_deactivated": len(self.items_deactivated),
+            "unchanged": self.unchanged,
+        }
+
+    def as_dict(self) -> dict:
+        return {
+            "version": self.version,
+            "previous_version": self.previous_version,
+            "dry_run": self.dry_run,
+            "counts": self.counts(),
+            "categories_created": self.categories_created,
+            "categories_updated": self.categories_updated,
+            "items_created": self.items_created,
+            "items_updated": self.items_updated,
+            "items_deactivated": self.items_deactivated,
+        }
+
+
+def detect_definition_format(filename: str = "", declared: str | None = None) -> str:
+    if declared:
+        if declared not in DEFINITION_FORMATS:
+            raise ChecklistDefinitionError(f"Unknown format {declared!r}; expected one of {', '.join(DEFINITION_FORMATS)}.")
+        return declared
+    lowered = filename.lower()
+    if lowered.endswith((".yaml", ".yml")):
+        return FORMAT_YAML
+    if lowered.endswith(".json"):
+        return FORMAT_JSON
+    raise ChecklistDefinitionError("Cannot tell the format from the file name; pass json or yaml explicitly.")
+
+
+def load_definition(text: str, fmt: str) -> ChecklistDefinition:
+    """Parse and validate a JSON or YAML checklist definition.
+
+    ``{"version": 3, "categories": [{"code", "name", "description", "items": [...]}], "items": [...]}``;
+    items are ``{"code", "title", "description", "requires_photo"}`` nested under
+    their category, or listed at the top level with a ``category`` code.
+    """
+
+    if fmt == FORMAT_YAML:
+        try:
+            import yaml
+        except ImportError as exc:
+            raise ChecklistDefinitionError("YAML definitions need PyYAML (pip install pyyaml).") from exc
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as exc:
+            raise ChecklistDefinitionError(f"Invalid YAML: {exc}") from exc
+    else:
+        try:
+            data = json.loads(text)
+        except ValueError as exc:
+            raise ChecklistDefinitionError(f"Invalid JSON: {exc}") from exc
+    return parse_definition(data)
+
+
+def _text(data: dict, key: str, path: str, errors: list[str], max_length: int | None = None, required: bool = True) -> str:
+    value = data.get(key)
+    if value is None or value == "":
+        if required:
+            errors.append(f"{path}.{key}: required.")
+        return ""
+    if not isinstance(value, str):
+        errors.append(f"{path}.{key}: must be a string.")
+        return ""
+    value = value.strip()
+    if max_length and len(value) > max_length:
+        errors.append(f"{path}.{key}: at most {max_length} characters.")
+    return value
+
+
+def _flag(data: dict, key: str, path: str, errors: list[str], default: bool) -> bool:
+    value = data.get(key, default)
+    if not isinstance(value, bool):
+        errors.append(f"{path}.{key}: must be true or false.")
+        return default
+    return value
+
+
+def _item(data, category: str, path: str, errors: list[str]) -> ItemSpec | None:
+    if not isinstance(data, dict):
+        errors.append(f"{path}: must be an object.")
+        return None
+    return ItemSpec(
+        category=category,
+        code=_text(data, "code", path, errors, max_length=64),
+        title=_text(data, "title", path, errors, max_length=255),
+        description=_text(data, "description", path, errors, required=False),
+        requires_photo=_flag(data, "requires_photo", path, errors, False),
+    )
+
+
+def parse_definition(data) -> ChecklistDefinition:
+    """Validate parsed data in one pass, collecting every error before raising."""
+
+    errors: list[str] = []
+    if not isinstance(data, dict):
+        raise ChecklistDefinitionError("The definition must be an object with 'version' and 'categories'.")
+    version = data.get("version")
+    if not isinstance(version, int) or isinstance(version, bool) or version < 1:
+        errors.append("version: must be a positive integer.")
+    raw_categories = data.get("categories")
+    if not isinstance(raw_categories, list) or not raw_categories:
+        raise ChecklistDefinitionError([*errors, "categories: must be a non-empty list."])
+
+    categories: list[CategorySpec] = []
+    items: list[ItemSpec] = []
+    for index, raw in enumerate(raw_categories):
+        path = f"categories[{index}]"
+        if not isinstance(raw, dict):
+            errors.append(f"{path}: must be an object.")
+            continue
+        display_order = raw.get("display_order", index + 1)
+        if not isinstance(display_order, int) or isinstance(display_order, bool) or display_order < 0:
+            errors.append(f"{path}.display_order: must be a non-negative integer.")
+            display_order = index + 1
+        category = CategorySpec(
+            code=_text(raw, "code", path, errors, max_length=64),
+            name=_text(raw, "name", path, errors, max_length=120),
+            description=_text(raw, "description", path, errors, required=False),
+            display_order=display_order,
+        )
+        categories.append(category)
+        nested = raw.get("items", [])
+        if not isinstance(nested, list):
+            errors.append(f"{path}.items: must be a list.")
+            continue
+        for position, item in enumerate(nested):
+            items.append(_item(item, category.code, f"{path}.items[{position}]", errors))
+
+    flat = data.get("items", [])
+    if not isinstance(flat, list):
+        errors.append("items: must be a list.")
+        flat = []
+    for position, raw in enumerate(flat):
+        path = f"items[{position}]"
+        category = _text(raw, "category", path, errors) if isinstance(raw, dict) else ""
+        items.append(_item(raw, category, path, errors))
+
+    category_codes = [category.code for category in categories]
+    known = set(category_codes)
+    if len(known) != len(category_codes):
+        errors.append("categories: duplicate category codes.")
+    seen: set[tuple[str, str]] = set()
+    for item in items:
+        if item is None or not item.code:
+            continue
+        if item.category and item.category not in known:
+            errors.append(f"Item {item.code!r} refers to unknown category {item.category!r}.")
+        key = (item.category, item.code)
+        if key in seen:
+            errors.append(f"Item {item.category}/{item.code} is defined twice.")
+        seen.add(key)
+    if errors:
+        raise ChecklistDefinitionError(errors)
+    return ChecklistDefinition(version=version, categories=categories, items=[item for item in items if item])
+
+
+def group_items_by_prefix(categories: Iterable[CategorySpec], items: Iterable[tuple[str, str, str, bool]]) -> list[ItemSpec]:
+    """Assign ``(code, title, description, requires_photo)`` tuples to the category whose code prefixes theirs.
+
+    One regex match per item (longest prefix wins); items matching no category are dropped.
+    """
+
+    codes = sorted((category.code for category in categories), key=len, reverse=True)
+    if not codes:
+        return []
+    prefix = re.compile("|".join(re.escape(code) for code in codes))
+    grouped = []
+    for code, title, description, requires_photo in items:
+        match = prefix.match(code)
+        if match:
+            grouped.append(ItemSpec(match.group(0), code, title, description, requires_photo))
+    return grouped
+
+
+def sync_checklist(
+    categories: list[CategorySpec],
+    items: list[ItemSpec],
+    deactivate_missing: bool = False,
+    dry_run: bool = False,
+    diff: ChecklistDiff | None = None,
+) -> ChecklistDiff:
+    """Diff the definition against the database, then write only what changed.
+
+    Reads are one query for categories and one for their items. Writes are
+    conflict-aware bulk upserts (``INSERT ... ON CONFLICT DO UPDATE``) of the
+    new and changed rows plus one UPDATE deactivating items the definition
+    dropped, so the cost does not grow with one query per item. Bulk writes
+    skip signals, so the catalog version is bumped here.
+    """
+
+    diff = diff or ChecklistDiff()
+    diff.dry_run = dry_run
+    codes = [category.code for category in categories]
+    existing_categories = {category.code: category for category in InspectionCategory.objects.filter(code__in=codes)}
+    category_writes = []
+    for spec in categories:
+        current = existing_categories.get(spec.code)
+        if current is None:
+            diff.categories_created.append(spec.code)
+        else:
+            changes = {
+                name: [getattr(current, name), getattr(spec, name)]
+                for name in CATEGORY_FIELDS
+                if getattr(current, name) != getattr(spec, name)
+            }
+            if not changes:
+                diff.unchanged += 1
+                continue
+            diff.categories_updated[spec.code] = changes
+        category_writes.append(InspectionCategory(code=spec.code, **{name: getattr(spec, name) for name in CATEGORY_FIELDS}))
+
+    existing_items = {
+        (row["category__code"], row["code"]): row
+        for row in ChecklistItem.objects.filter(category__code__in=codes)
+        .order_by()
+        .values("id", "category__code", "code", *ITEM_FIELDS)
+    }
+    item_writes: list[ItemSpec] = []
+    for spec in items:
+        key = (spec.category, spec.code)
+        current = existing_items.pop(key, None)
+        if current is None:
+            diff.items_created.append(f"{spec.category}/{spec.code}")
+        else:
+            changes = {
+                name: [current[name], getattr(spec, name)] for name in ITEM_FIELDS if current[name] != getattr(spec, name)
+            }
+            if not changes:
+                diff.unchanged += 1
+                continue
+            diff.items_updated[f"{spec.category}/{spec.code}"] = changes
+        item_writes.append(spec)
+    # Whatever is left in a listed category was dropped from the definition.
+    dropped = [row for row in existing_items.values() if row["is_active"]] if deactivate_missing else []
+    diff.items_deactivated = [f"{row['category__code']}/{row['code']}" for row in dropped]
+
+    if dry_run or not diff.has_changes:
+        return diff
+
+    with transaction.atomic():
+        if category_writes:
+            InspectionCategory.objects.bulk_create(
+                category_writes,
+                batch_size=UPSERT_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["code"],
+                update_fields=[*CATEGORY_FIELDS, "updated_at"],
+            )
+        if item_writes:
+            if diff.categories_created:
+                category_ids = dict(InspectionCategory.objects.filter(code__in=codes).values_list("code", "id"))
+            else:
+                category_ids = {code: category.pk for code, category in existing_categories.items()}
+            ChecklistItem.objects.bulk_create(
+                [
+                    ChecklistItem(
+                        category_id=category_ids[spec.category],
+                        code=spec.code,
+                        **{name: getattr(spec, name) for name in ITEM_FIELDS},
+                    )
+                    for spec in item_writes
+                ],
+                batch_size=UPSERT_BATCH_SIZE,
+                update_conflicts=True,
+                unique_fields=["category", "code"],
+                update_fields=[*ITEM_FIELDS, "updated_at"],
+            )
+        if dropped:
+            # Soft: responses keep pointing at the item, and sync clients see the new updated_at.
+            ChecklistItem.objects.filter(pk__in=[row["id"] for row in dropped]).update(
+                is_active=False, updated_at=timezone.now()
+            )
+        schedule_catalog_bump()
+    return diff
+
+
+def current_checklist_version() -> ChecklistVersion | None:
+    return ChecklistVersion.objects.order_by("-version").first()
+
+
+@transaction.atomic
+def import_checklist(definition: ChecklistDefinition, dry_run: bool = False, source: str = "") -> ChecklistDiff:
+    """Apply a versioned definition: upsert its categories and items and deactivate items it dropped.
+
+    The version must be newer than the last one applied. Re-applying the
+    current version with identical content is allowed and restores any
+    drift; the same version with different content is rejected.
+    """
+
+    latest = current_checklist_version()
+    diff = ChecklistDiff(version=definition.version, previous_version=latest.version if latest else None)
+    checksum = definition.checksum
+    if latest is not None:
+        if definition.version < latest.version:
+            raise ChecklistDefinitionError(f"Version {definition.version} is older than the applied version {latest.version}.")
+        if definition.version == latest.version and checksum != latest.checksum:
+            raise ChecklistDefinitionError(
+                f"Version {definition.version} was already applied with different content; bump the version."
+            )
+
+    sync_checklist(definition.categories, definition.items, deactivate_missing=True, dry_run=dry_run, diff=diff)
+    if dry_run or (latest is not None and definition.version == latest.version):
+        return diff
+    try:
+        with transaction.atomic():
+            ChecklistVersion.objects.create(version=definition.version, checksum=checksum, source=source, changes=diff.counts())
+    except IntegrityError as exc:
+        raise ChecklistDefinitionError(f"Version {definition.version} was applied concurrently.") from exc
+    return diff
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Case, Count, F, IntegerField, Value, When
+from django.utils import timezone
+
+from .models import Customer, DashboardCounter, Inspection, InspectorProfile, PortalUser, Vehicle, VehicleAssignment
+
+TOTAL_KEYS = ("customers", "users", "vehicles", "inspectors", "inspections")
+
+
+def inspection_status_key(status: str) -> str:
+    return f"inspections:{status}"
+
+
+def assignment_key(day: date, status: str | None = None) -> str:
+    key = f"assignments:{day}"
+    return f"{key}:{status}" if status else key
+
+
+# Counters the rollup always materializes. Their presence means the table has
+# been built, so a missing per-day key can safely be treated as zero.
+STATUS_KEYS = tuple(inspection_status_key(status) for status, _label in Inspection.STATUS_CHOICES)
+GLOBAL_KEYS = TOTAL_KEYS + STATUS_KEYS
+BUILT_KEY = "inspections"
+
+
+def inspection_deltas(status: str, sign: int) -> dict[str, int]:
+    return {"inspections": sign, inspection_status_key(status): sign}
+
+
+def assignment_deltas(day: date, status: str, sign: int) -> dict[str, int]:
+    return {assignment_key(day): sign, assignment_key(day, status): sign}
+
+
+def merge_deltas(*parts: dict[str, int]) -> dict[str, int]:
+    merged: dict[str, int] = {}
+    for part in parts:
+        for key, delta in part.items():
+            merged[key] = merged.get(key, 0) + delta
+    return merged
+
+
+def bump_counters(deltas: dict[str, int]) -> None:
+    """Apply ``deltas`` in one UPDATE; missing per-day rows are created once the table is built."""
+
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    matched = DashboardCounter.objects.filter(key__in=deltas).update(
+        value=F("value") + Case(*[When(key=key, then=Value(delta)) for key, delta in deltas.items()], output_field=IntegerField()),
+        updated_at=timezone.now(),
+    )
+    if matched == len(deltas):
+        return
+    existing = set(DashboardCounter.objects.filter(key__in=[*deltas, BUILT_KEY]).values_list("key", flat=True))
+    if BUILT_KEY not in existing:
+        # Never built: the next rollup counts everything from scratch.
+        return
+    missing = [DashboardCounter(key=key, value=0) for key in deltas if key not in existing]
+    DashboardCounter.objects.bulk_create(missing, ignore_conflicts=True)
+    bump_counters({counter.key: deltas[counter.key] for counter in missing})
+
+
+def compute_counters(using: str = DEFAULT_DB_ALIAS) -> dict[str, int]:
+    counters = dict.fromkeys(GLOBAL_KEYS, 0)
+    counters["customers"] = Customer.objects.using(using).count()
+    counters["users"] = PortalUser.objects.using(using).exclude(role=PortalUser.ROLE_ADMIN).count()
+    counters["vehicles"] = Vehicle.objects.using(using).count()
+    counters["inspectors"] = InspectorProfile.objects.using(using).count()
+    inspections = Inspection.objects.using(using).order_by().values_list("status").annotate(total=Count("id"))
+    for status, total in inspections:
+        counters["inspections"] += total
+        counters[inspection_status_key(status)] = total
+    assignments = (
+        VehicleAssignment.objects.using(using).order_by().values_list("scheduled_for", "status").annotate(total=Count("id"))
+    )
+    for day, status, total in assignments:
+        counters[assignment_key(day)] = counters.get(assignment_key(day), 0) + total
+        counters[assignment_key(day, status)] = total
+    return counters
+
+
+def refresh_dashboard_counters(using: str = DEFAULT_DB_ALIAS) -> dict[str, int]:
+    """Periodic rollup: recount everything and replace the table contents.
+
+    Reads and writes both go to ``using`` (the primary by default), never to
+    a replica the current request happens to be routed to.
+    """
+
+    with transaction.atomic(using=using):
+        counters = compute_counters(using)
+        DashboardCounter.objects.using(using).all().delete()
+        DashboardCounter.objects.using(using).bulk_create(
+            DashboardCounter(key=key, value=value) for key, value in counters.items()
+        )
+    return counters
+
+
+def stored_counters(keys: list[str], using: str | None = None) -> dict[str, int]:
+    """Counter rows for ``keys``; ``using=None`` lets the router pick (a replica on read paths)."""
+
+    return dict(DashboardCounter.objects.using(using).filter(key__in=keys).values_list("key", "value"))
+
+
+def dashboard_counters(day: date | None = None) -> dict[str, int]:
+    """Global totals, per-status inspections and ``day``'s assignments in one query."""
+
+    day = day or timezone.localdate()
+    day_keys = [assignment_key(day)] + [assignment_key(day, status) for status, _label in VehicleAssignment.STATUS_CHOICES]
+    keys = [*GLOBAL_KEYS, *day_keys]
+    values = stored_counters(keys)
+    if BUILT_KEY not in values:
+        # A replica that has not caught up yet reads the primary's table; only
+        # a primary that was never built is recounted, once and in place.
+        values = stored_counters(keys, using=DEFAULT_DB_ALIAS)
+        if BUILT_KEY not in values:
+            values = refresh_dashboard_counters(DEFAULT_DB_ALIAS)
+    return {key: values.get(key, 0) for key in keys}
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import csv
+import io
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from .imports import FORMAT_CSV, FORMAT_NDJSON
+from .models import InspectionItemResponse
+from .pagination import keyset_seek
+from .transactions import read_transaction
+
+EXPORT_CHUNK_SIZE = 1000
+
+# (output column, ORM path) for each inspection and each of its responses.
+INSPECTION_COLUMNS = (
+    ("inspection_id", "id"),
+    ("reference", "reference"),
+    ("status", "status"),
+    ("customer_id", "customer_id"),
+    ("customer", "customer__legal_name"),
+    ("vin", "vehicle__vin"),
+    ("license_plate", "vehicle__license_plate"),
+    ("inspector", "inspector__badge_id"),
+    ("created_at", "created_at"),
+    ("started_at", "started_at"),
+    ("completed_at", "completed_at"),
+    ("odometer_reading", "odometer_reading"),
+    ("general_notes", "general_notes"),
+)
+RESPONSE_COLUMNS = (
+    ("category", "checklist_item__category__code"),
+    ("item_code", "checklist_item__code"),
+    ("item_title", "checklist_item__title"),
+    ("result", "result"),
+    ("severity", "severity"),
+    ("notes", "notes"),
+)
+CSV_HEADER = [name for name, _path in INSPECTION_COLUMNS] + [f"response_{name}" for name, _path in RESPONSE_COLUMNS]
+
+CONTENT_TYPES = {FORMAT_CSV: "text/csv; charset=utf-8", FORMAT_NDJSON: "application/x-ndjson"}
+
+
+def filter_inspections(
+    queryset: QuerySet,
+    customer: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    status: str | None = None,
+) -> QuerySet:
+    """Narrow an inspection queryset by customer, status and an inclusive ``created_at`` date range."""
+
+    if customer is not None:
+        queryset = queryset.filter(customer_id=customer)
+    if status:
+        queryset = queryset.filter(status=status)
+    # Day boundaries rather than ``__date`` so the (…, created_at, id) indexes stay usable.
+    if start is not None:
+        queryset = queryset.filter(created_at__gte=timezone.make_aware(datetime.combine(start, time.min)))
+    if end is not None:
+        queryset = queryset.filter(created_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min)))
+    return queryset
+
+
+class InspectionExport:
+    """Iterate an inspection queryset as CSV or NDJSON text, one chunk at a time.
+
+    Inspections are read in keyset chunks of ``chunk_size`` ordered by
+    ``(created_at, id)``, and each chunk's responses come from one more query,
+    so memory stays flat however many rows match. CSV has one line per
+    response (inspections without any still get one line); NDJSON has one
+    object per inspection with its responses nested.
+    """
+
+    def __init__(self, queryset: QuerySet, fmt: str = FORMAT_CSV, chunk_size: int = EXPORT_CHUNK_SIZE):
+        self.queryset = queryset.order_by()
+        self.fmt = fmt
+        self.chunk_size = max(chunk_size, 1)
+        self.inspections = 0
+        self.responses = 0
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES[self.fmt]
+
+    def filename(self, stem: str = "inspections") -> str:
+        return f"{stem}-{timezone.localdate():%Y%m%d}.{self.fmt}"
+
+    def chunks(self) -> Iterator[list[tuple[dict, list[dict]]]]:
+        paths = [path for _name, path in INSPECTION_COLUMNS]
+        position = None
+        while True:
+            responses: dict[int, list[dict]] = defaultdict(list)
+            # One snapshot per chunk, so the responses match the inspection rows read with them.
+            with read_transaction(using=self.queryset.db):
+                rows = list(keyset_seek(self.queryset, "created_at", position).values(*paths)[: self.chunk_size])
+                if not rows:
+                    return
+                for response in (
+                    InspectionItemResponse.objects.using(self.queryset.db)
+                    .filter(inspection_id__in=[row["id"] for row in rows])
+                    .order_by("inspection_id", "checklist_item__category__display_order", "checklist_item__code")
+                    .values("inspection_id", *(path for _name, path in RESPONSE_COLUMNS))
+                ):
+                    responses[response["inspection_id"]].append(response)
+            self.inspections += len(rows)
+            self.responses += sum(len(items) for items in responses.values())
+            yield [(row, responses.get(row["id"], [])) for row in rows]
+            if len(rows) < self.chunk_size:
+                return
+            position = (rows[-1]["created_at"], rows[-1]["id"])
+
+    def __iter__(self) -> Iterator[str]:
+        if self.fmt == FORMAT_NDJSON:
+            return self._ndjson()
+        return self._csv()
+
+    def _csv(self) -> Iterator[str]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_HEADER)
+        for chunk in self.chunks():
+            for inspection, responses in chunk:
+                head = [_csv_value(inspection[path]) for _name, path in INSPECTION_COLUMNS]
+                if not responses:
+                    writer.writerow(head + [""] * len(RESPONSE_COLUMNS))
+                # Response columns are never null or dates, so they skip ``_csv_value``.
+                for response in responses:
+                    writer.writerow(head + [response[path] for _name, path in RESPONSE_COLUMNS])
+            yield _drain(buffer)
+        if buffer.tell():
+            yield _drain(buffer)
+
+    def _ndjson(self) -> Iterator[str]:
+        encoder = DjangoJSONEncoder(separators=(",", ":"))
+        for chunk in self.chunks():
+            lines = []
+            for inspection, responses in chunk:
+                document = {name: inspection[path] for name, path in INSPECTION_COLUMNS}
+                document["responses"] = [{name: response[path] for name, path in RESPONSE_COLUMNS} for response in responses]
+                lines.append(encoder.encode(document))
+            yield "\n".join(lines) + "\n"
+
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _drain(buffer: io.StringIO) -> str:
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+from datetime import datetime, time, timedelta
+
 from django import forms
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
+from .capacity import TERMINAL_STATUSES, CapacityExceeded, assignment_slot, check_capacity
 from .models import (
     ChecklistItem,
     Customer,
@@ -10,6 +14,7 @@ from .models import (
     InspectionCategory,
     InspectorProfile,
     PortalUser,
+    UpperCaseCharField,
     Vehicle,
     VehicleAssignment,
 )
@@ -177,7 +182,30 @@ class VehicleForm(BaseForm):
         ]
 
 
-class VehicleAssignmentForm(BaseForm):
+class AssignmentCapacityMixin:
+    """Reject an inspector/day that is already at ``max_daily_inspections``."""
+
+    def clean(self):
+        cleaned_data = super().clean()
+        inspector, day = cleaned_data.get("inspector"), cleaned_data.get("scheduled_for")
+        status = cleaned_data.get("status", self.instance.status)
+        if inspector and day and status not in TERMINAL_STATUSES:
+            # The instance still holds the stored values until _post_clean().
+            current = assignment_slot(self.instance) if self.instance.pk else None
+            try:
+                check_capacity(inspector, day, current)
+            except CapacityExceeded as exc:
+                self.add_error("scheduled_for", exc)
+        return cleaned_data
+
+
+class VehicleAssignmentAdminForm(AssignmentCapacityMixin, forms.ModelForm):
+    class Meta:
+        model = VehicleAssignment
+        fields = "__all__"
+
+
+class VehicleAssignmentForm(AssignmentCapacityMixin, BaseForm):
     scheduled_for = forms.DateField(widget=forms.DateInput(attrs={"type": "date"}))
 
     class Meta:
@@ -232,3 +260,126 @@ class ChecklistItemForm(BaseForm):
             "requires_photo",
             "is_active",
         ]
+
+
+class ListFilterForm(forms.Form, StyledFormMixin):
+    """Server-side filters for the HTMX list partials.
+
+    ``lookups`` maps each field to the ORM lookup it filters on; blank fields
+    are ignored, and invalid input simply filters nothing.
+    """
+
+    lookups: dict[str, str] = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._apply_widget_styles()
+
+    def filter(self, queryset):
+        if not self.is_valid():
+            return queryset
+        criteria = {
+            lookup: self.cleaned_data[name]
+            for name, lookup in self.lookups.items()
+            if self.cleaned_data.get(name) not in (None, "")
+        }
+        return queryset.filter(**criteria)
+
+    @property
+    def active(self) -> bool:
+        return self.is_bound and any(self.data.get(name) for name in self.fields)
+
+    @staticmethod
+    def day_start(day, offset: int = 0):
+        # Compare timestamps against day boundaries instead of ``__date`` so the
+        # created_at indexes stay usable.
+        if day is None:
+            return None
+        return timezone.make_aware(datetime.combine(day + timedelta(days=offset), time.min))
+
+    def clean_created_from(self):
+        return self.day_start(self.cleaned_data.get("created_from"))
+
+    def clean_created_to(self):
+        return self.day_start(self.cleaned_data.get("created_to"), offset=1)
+
+
+class CustomerFilterForm(ListFilterForm):
+    city = forms.CharField(required=False, widget=forms.TextInput(attrs={"placeholder": "City"}))
+    created_from = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    created_to = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+
+    # Cities are stored as typed; an exact match can use the city index.
+    lookups = {"city": "city", "created_from": "created_at__gte", "created_to": "created_at__lt"}
+
+
+class VehicleFilterForm(ListFilterForm):
+    customer = forms.IntegerField(required=False, min_value=1, widget=forms.NumberInput(attrs={"placeholder": "Customer #"}))
+    vehicle_type = forms.CharField(required=False, widget=forms.TextInput(attrs={"placeholder": "Vehicle type"}))
+    plate = forms.CharField(required=False, widget=forms.TextInput(attrs={"placeholder": "Plate starts with"}))
+
+    lookups = {"customer": "customer_id", "vehicle_type": "vehicle_type"}
+
+    def clean_plate(self):
+        # Plates are stored normalized, so the prefix is too.
+        return UpperCaseCharField.normalize(self.cleaned_data["plate"])
+
+    def filter(self, queryset):
+        queryset = super().filter(queryset)
+        plate = self.cleaned_data.get("plate") if self.is_valid() else None
+        if plate:
+            # A range rather than LIKE so the (license_plate, id) index is used.
+            queryset = queryset.filter(license_plate__gte=plate, license_plate__lt=plate + "\uffff")
+        return queryset
+
+
+class InspectorChoiceField(forms.ModelChoiceField):
+    def label_from_instance(self, obj):
+        user = obj.profile.user
+        return user.get_full_name() or user.username
+
+
+def _inspector_field():
+    return InspectorChoiceField(
+        queryset=InspectorProfile.objects.select_related("profile__user").order_by("badge_id"),
+        required=False,
+        empty_label="All inspectors",
+    )
+
+
+class AssignmentFilterForm(ListFilterForm):
+    status = forms.ChoiceField(required=False, choices=[("", "All statuses"), *VehicleAssignment.STATUS_CHOICES])
+    inspector = _inspector_field()
+    customer = forms.IntegerField(required=False, min_value=1, widget=forms.NumberInput(attrs={"placeholder": "Customer #"}))
+    scheduled_from = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    scheduled_to = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+
+    lookups = {
+        "status": "status",
+        "inspector": "inspector",
+        "customer": "vehicle__customer_id",
+        "scheduled_from": "scheduled_for__gte",
+        "scheduled_to": "scheduled_for__lte",
+    }
+
+
+class InspectionFilterForm(ListFilterForm):
+    status = forms.ChoiceField(required=False, choices=[("", "All statuses"), *Inspection.STATUS_CHOICES])
+    inspector = _inspector_field()
+    customer = forms.IntegerField(required=False, min_value=1, widget=forms.NumberInput(attrs={"placeholder": "Customer #"}))
+    created_from = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+    created_to = forms.DateField(required=False, widget=forms.DateInput(attrs={"type": "date"}))
+
+    lookups = {
+        "status": "status",
+        "inspector": "inspector",
+        "customer": "customer_id",
+        "created_from": "created_at__gte",
+        "created_to": "created_at__lt",
+    }
+
+
+class PortalUserFilterForm(ListFilterForm):
+    role = forms.ChoiceField(required=False, choices=[("", "All roles"), *PortalUser.ROLE_CHOICES])
+
+    lookups = {"role": "role"}
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import codecs
+import csv
+import json
+import time
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Iterator
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Upper
+
+from .counters import bump_counters
+from .models import Customer, Vehicle
+from .search import KIND_VEHICLE, schedule_reindex
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+FORMATS = (FORMAT_CSV, FORMAT_NDJSON)
+
+IMPORT_BATCH_SIZE = 1000
+# Errors beyond this are counted but not kept; pass ``on_error`` to see them all.
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_COLUMNS = ("vin", "license_plate", "make", "model", "year", "vehicle_type")
+OPTIONAL_COLUMNS = ("axle_configuration", "mileage", "notes")
+IMPORT_FIELDS = {name: Vehicle._meta.get_field(name) for name in REQUIRED_COLUMNS + OPTIONAL_COLUMNS}
+
+
+class ImportFormatError(ValueError):
+    """The file as a whole cannot be read (unknown format, missing columns, bad encoding)."""
+
+
+@dataclass
+class RawRow:
+    line: int
+    data: dict | None = None
+    error: str | None = None
+
+
+@dataclass
+class ImportReport:
+    dry_run: bool = False
+    rows: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+    finished: float | None = None
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+    def as_dict(self) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "rows": self.rows,
+            "created": self.created,
+            "failed": self.failed,
+            "seconds": round(self.seconds, 3),
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+def detect_format(filename: str = "", declared: str | None = None) -> str:
+    if declared:
+        if declared not in FORMATS:
+            raise ImportFormatError(f"Unknown format {declared!r}; expected one of {', '.join(FORMATS)}.")
+        return declared
+    lowered = filename.lower()
+    if lowered.endswith((".ndjson", ".jsonl")):
+        return FORMAT_NDJSON
+    if lowered.endswith(".csv"):
+        return FORMAT_CSV
+    raise ImportFormatError("Cannot tell the format from the file name; pass csv or ndjson explicitly.")
+
+
+def read_rows(stream: BinaryIO, fmt: str) -> Iterator[RawRow]:
+    """Decode ``stream`` one line at a time; nothing beyond the current row is held in memory."""
+
+    lines = codecs.iterdecode(stream, "utf-8-sig")
+    try:
+        if fmt == FORMAT_CSV:
+            yield from _csv_rows(lines)
+        else:
+            yield from _ndjson_rows(lines)
+    except UnicodeDecodeError as exc:
+        raise ImportFormatError(f"The file is not valid UTF-8: {exc}") from exc
+
+
+def _csv_rows(lines) -> Iterator[RawRow]:
+    reader = csv.DictReader(lines)
+    header = [name.strip() for name in reader.fieldnames or ()]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise ImportFormatError(f"Missing required columns: {', '.join(missing)}.")
+    reader.fieldnames = header
+    for row in reader:
+        yield RawRow(reader.line_num, data=row)
+
+
+def _ndjson_rows(lines) -> Iterator[RawRow]:
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            yield RawRow(line_number, error=f"Invalid JSON: {exc}")
+            continue
+        if not isinstance(data, dict):
+            yield RawRow(line_number, error="Expected a JSON object.")
+            continue
+        yield RawRow(line_number, data=data)
+
+
+def clean_row(data: dict) -> tuple[dict, dict[str, list[str]]]:
+    """Validate one row with the model fields' own checks; no queries."""
+
+    values: dict = {}
+    errors: dict[str, list[str]] = {}
+    for name, model_field in IMPORT_FIELDS.items():
+        raw = data.get(name)
+        if isinstance(raw, str):
+            raw = raw.strip()
+        if raw is None or raw == "":
+            if name in REQUIRED_COLUMNS:
+                errors[name] = ["This field is required."]
+            continue
+        try:
+            values[name] = model_field.clean(raw, None)
+        except ValidationError as exc:
+            errors[name] = exc.messages
+    return values, errors
+
+
+class VehicleImporter:
+    """Stream rows into ``customer``'s fleet in chunks of ``batch_size``.
+
+    Each chunk costs one indexed VIN lookup and one multi-row INSERT.
+    Chunks commit independently, so VINs from earlier chunks are already in
+    the table when later ones are checked.
+    """
+
+    def __init__(
+        self,
+        customer: Customer,
+        batch_size: int = IMPORT_BATCH_SIZE,
+        dry_run: bool = False,
+        on_error: Callable[[dict], None] | None = None,
+    ):
+        self.customer = customer
+        self.batch_size = max(batch_size, 1)
+        self.on_error = on_error
+        self.report = ImportReport(dry_run=dry_run)
+        # A dry run inserts nothing, so VINs seen in earlier chunks are tracked here instead.
+        self._seen: set[str] | None = set() if dry_run else None
+
+    def run(self, rows: Iterator[RawRow]) -> ImportReport:
+        batch: list[tuple[int, dict]] = []
+        for raw in rows:
+            self.report.rows += 1
+            if raw.error:
+                self._fail(raw.line, None, {"row": [raw.error]})
+                continue
+            values, errors = clean_row(raw.data)
+            if errors:
+                self._fail(raw.line, values.get("vin") or raw.data.get("vin"), errors)
+                continue
+            batch.append((raw.line, values))
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+        self.report.finished = time.perf_counter()
+        return self.report
+
+    def _fail(self, line: int, vin, errors: dict[str, list[str]]) -> None:
+        error = {"line": line, "vin": vin, "errors": errors}
+        self.report.failed += 1
+        if len(self.report.errors) < MAX_REPORTED_ERRORS:
+            self.report.errors.append(error)
+        if self.on_error:
+            self.on_error(error)
+
+    def _flush(self, batch: list[tuple[int, dict]], retry: bool = True) -> None:
+        pending: dict[str, tuple[int, dict]] = {}
+        for line, values in batch:
+            vin = values["vin"]
+            if vin in pending or (self._seen is not None and vin in self._seen):
+                self._fail(line, vin, {"vin": ["Duplicate VIN in this file."]})
+            else:
+                pending[vin] = (line, values)
+        existing = Vehicle.objects.annotate(normalized_vin=Upper("vin")).filter(normalized_vin__in=list(pending))
+        for vin in existing.values_list("normalized_vin", flat=True):
+            line, _values = pending.pop(vin)
+            self._fail(line, vin, {"vin": ["A vehicle with this VIN already exists."]})
+        if not pending:
+            return
+        if self._seen is not None:
+            self._seen.update(pending)
+            self.report.created += len(pending)
+            return
+        try:
+            with transaction.atomic():
+                created = Vehicle.objects.bulk_create(
+                    [Vehicle(customer=self.customer, **values) for _line, values in pending.values()]
+                )
+                # bulk_create sends no signals: keep the dashboard counter and search index in step here.
+                bump_counters({"vehicles": len(created)})
+                for vehicle in created:
+                    schedule_reindex(KIND_VEHICLE, vehicle.pk)
+        except IntegrityError:
+            if retry:
+                # A VIN was taken between the check and the INSERT; the re-check reports it.
+                self._flush(list(pending.values()), retry=False)
+                return
+            # Still rejected after the re-check: report the chunk rather than abort the import.
+            for vin, (line, _values) in pending.items():
+                self._fail(line, vin, {"row": ["The vehicle could not be saved; import this row again."]})
+            return
+        self.report.created += len(created)
+
+
+def import_vehicles(
+    stream: BinaryIO,
+    customer: Customer,
+    fmt: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    dry_run: bool = False,
+    on_error: Callable[[dict], None] | None = None,
+) -> ImportReport:
+    """Import vehicles from a CSV or NDJSON byte stream; see ``VehicleImporter``."""
+
+    importer = VehicleImporter(customer, batch_size=batch_size, dry_run=dry_run, on_error=on_error)
+    return importer.run(read_rows(stream, fmt))
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from rest_framework import serializers
+
+
+@dataclass
+class RequestMetrics:
+    queries: int = 0
+    db_seconds: float = 0.0
+    serializer_seconds: float = 0.0
+    started: float = field(default_factory=time.perf_counter)
+    # Nesting depth of timed serializer sections, so nested .data calls count once.
+    serializer_depth: int = 0
+    # "hit" or "miss" when the request authenticated through the token cache.
+    auth: str = ""
+
+    @property
+    def total_seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar("portal_request_metrics", default=None)
+
+
+def query_counter(execute, sql, params, many, context):
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_seconds += time.perf_counter() - started
+
+
+@contextmanager
+def serializer_section():
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+    metrics.serializer_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_depth -= 1
+        if metrics.serializer_depth == 0:
+            metrics.serializer_seconds += time.perf_counter() - started
+
+
+class _TimedData:
+    @property
+    def data(self):
+        with serializer_section():
+            return super().data
+
+
+_timed_classes: dict[type, type] = {}
+
+
+def timed(serializer: serializers.BaseSerializer) -> serializers.BaseSerializer:
+    """Count ``serializer.data`` in the request's ``ser`` timing; returns the same instance."""
+
+    cls = type(serializer)
+    if issubclass(cls, _TimedData):
+        return serializer
+    timed_cls = _timed_classes.get(cls)
+    if timed_cls is None:
+        timed_cls = _timed_classes.setdefault(
+            cls,
+            type(cls.__name__, (_TimedData, cls), {"__module__": cls.__module__, "__qualname__": cls.__qualname__}),
+        )
+    serializer.__class__ = timed_cls
+    return serializer
+
+
+class SerializerTimingMixin:
+    """Viewset mixin: serializers from ``get_serializer`` are timed when ``.data`` is read."""
+
+    def get_serializer(self, *args, **kwargs):
+        return timed(super().get_serializer(*args, **kwargs))
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import traceback
+from datetime import timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Inspection, ReportJob
+from .services import generate_customer_report
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_customer_reports(inspection_ids: Iterable[int]) -> None:
+    """Queue report generation; inspections that already have a queued job are skipped."""
+
+    jobs = [ReportJob(inspection_id=inspection_id) for inspection_id in set(inspection_ids)]
+    if jobs:
+        # The partial unique constraint turns duplicates into no-ops.
+        ReportJob.objects.bulk_create(jobs, ignore_conflicts=True)
+
+
+def enqueue_customer_report(inspection: Inspection) -> None:
+    enqueue_customer_reports([inspection.pk])
+
+
+def latest_report_job(inspection: Inspection) -> ReportJob | None:
+    return inspection.report_jobs.order_by("-created_at", "-id").first()
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def requeue_stalled_jobs() -> int:
+    """Return jobs whose worker died mid-run to the queue.
+
+    A stalled job whose inspection got a fresh queued job in the meantime is
+    marked failed instead: the partial unique constraint allows one queued job
+    per inspection, and the newer one redoes the work anyway.
+    """
+
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=_setting("REPORT_JOB_TIMEOUT_SECONDS", 300))
+    stalled = ReportJob.objects.filter(status=ReportJob.STATUS_RUNNING, started_at__lt=cutoff)
+    requeued = 0
+    for job_id in stalled.order_by("started_at", "id").values_list("id", flat=True):
+        try:
+            with transaction.atomic():
+                requeued += stalled.filter(pk=job_id).update(status=ReportJob.STATUS_QUEUED, worker="", updated_at=now)
+        except IntegrityError:
+            stalled.filter(pk=job_id).update(
+                status=ReportJob.STATUS_FAILED, last_error="Superseded after stall", finished_at=now, updated_at=now
+            )
+    return requeued
+
+
+def claim_next_job(worker: str) -> ReportJob | None:
+    """Atomically move the oldest due job from queued to running.
+
+    The claim is a conditional UPDATE, so concurrent workers never run the
+    same job even on SQLite, which has no ``SELECT ... FOR UPDATE``.
+    """
+
+    now = timezone.now()
+    candidates = ReportJob.objects.filter(status=ReportJob.STATUS_QUEUED, available_at__lte=now).order_by(
+        "available_at", "id"
+    )
+    for job_id in candidates.values_list("id", flat=True)[:5]:
+        claimed = ReportJob.objects.filter(pk=job_id, status=ReportJob.STATUS_QUEUED).update(
+            status=ReportJob.STATUS_RUNNING, started_at=now, worker=worker, updated_at=now
+        )
+        if claimed:
+            return ReportJob.objects.select_related("inspection").get(pk=job_id)
+    return None
+
+
+def run_job(job: ReportJob) -> None:
+    max_attempts = _setting("REPORT_JOB_MAX_ATTEMPTS", 3)
+    job.attempts += 1
+    try:
+        with transaction.atomic():
+            generate_customer_report(job.inspection)
+    except Exception:
+        logger.exception("Report job %s for inspection %s failed", job.pk, job.inspection_id)
+        job.last_error = traceback.format_exc(limit=5)
+        if job.attempts < max_attempts:
+            job.status = ReportJob.STATUS_QUEUED
+            job.available_at = timezone.now() + timedelta(seconds=30 * 2 ** (job.attempts - 1))
+        else:
+            job.status = ReportJob.STATUS_FAILED
+            job.finished_at = timezone.now()
+        fields = ["attempts", "last_error", "status", "available_at", "finished_at", "updated_at"]
+        try:
+            job.save(update_fields=fields)
+        except IntegrityError:
+            # A fresh enqueue took the queued slot; that job will redo the work.
+            job.status = ReportJob.STATUS_FAILED
+            job.save(update_fields=fields)
+        return
+    job.status = ReportJob.STATUS_DONE
+    job.finished_at = timezone.now()
+    job.last_error = ""
+    job.save(update_fields=["attempts", "status", "finished_at", "last_error", "updated_at"])
+
+
+def run_pending_jobs(limit: int | None = None, worker: str | None = None) -> int:
+    """Run due jobs until the queue is empty or ``limit`` jobs have run."""
+
+    worker = worker or worker_name()
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job(worker)
+        if job is None:
+            break
+        run_job(job)
+        processed += 1
+    return processed
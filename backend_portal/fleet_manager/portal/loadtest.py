@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import http.cookiejar
+import math
+import random
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable
+
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+
+from .models import Inspection, InspectorProfile, Vehicle
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    """One entry of the replayed traffic mix.
+
+    ``auth`` is ``"token"`` for the DRF API, ``"session"`` for the HTMX shell
+    and ``None`` for anonymous catalog reads.
+    """
+
+    name: str
+    weight: int
+    role: str
+    auth: str | None
+    path: Callable[[random.Random, "Targets"], str]
+
+
+@dataclass
+class Targets:
+    """Ids sampled from the database so detail URLs hit real rows."""
+
+    inspection_ids: list[int]
+    vehicle_ids: list[int]
+
+    @classmethod
+    def sample(cls, rng: random.Random, size: int = 500) -> "Targets":
+        inspection_ids = list(Inspection.objects.order_by("-id").values_list("id", flat=True)[: size * 4])
+        vehicle_ids = list(Vehicle.objects.order_by("-id").values_list("id", flat=True)[: size * 4])
+        return cls(
+            inspection_ids=rng.sample(inspection_ids, min(size, len(inspection_ids))),
+            vehicle_ids=rng.sample(vehicle_ids, min(size, len(vehicle_ids))),
+        )
+
+
+def _pick(ids: list[int], rng: random.Random) -> int:
+    return rng.choice(ids) if ids else 0
+
+
+# Weights approximate a weekday: inspectors polling their queue from the
+# mobile app, admins paging through lists and opening details in the shell.
+TRAFFIC_MIX = [
+    Endpoint("api:inspections-compact", 20, "inspector", "token", lambda r, t: "/api/inspections/?view=compact&page_size=50"),
+    Endpoint("api:inspections-page", 10, "admin", "token", lambda r, t: "/api/inspections/?page_size=50"),
+    Endpoint("api:inspection-detail", 15, "admin", "token", lambda r, t: f"/api/inspections/{_pick(t.inspection_ids, r)}/"),
+    Endpoint("api:assignments", 12, "inspector", "token", lambda r, t: "/api/assignments/?page_size=50"),
+    Endpoint("api:vehicles", 8, "admin", "token", lambda r, t: "/api/vehicles/?page_size=100"),
+    Endpoint("api:vehicle-detail", 5, "admin", "token", lambda r, t: f"/api/vehicles/{_pick(t.vehicle_ids, r)}/"),
+    Endpoint("api:sync", 10, "inspector", "token", lambda r, t: "/api/sync/"),
+    Endpoint("api:categories", 5, "anon", None, lambda r, t: "/api/categories/"),
+    Endpoint("app:shell", 5, "admin", "session", lambda r, t: "/api/app/"),
+    Endpoint("app:customers", 3, "admin", "session", lambda r, t: "/api/app/customers/"),
+    Endpoint("app:vehicles", 3, "admin", "session", lambda r, t: "/api/app/vehicles/"),
+    Endpoint("app:inspections", 4, "admin", "session", lambda r, t: "/api/app/inspections/"),
+]
+
+
+@dataclass
+class Principal:
+    username: str
+    password: str
+    token: str
+
+
+class ClientTransport:
+    """In-process transport built on the Django test client (no network)."""
+
+    def __init__(self, principals: dict[str, Principal]):
+        self.principals = principals
+        self.clients: dict[str, Client] = {}
+
+    def _client(self, role: str, auth: str | None) -> Client:
+        key = f"{role}:{auth}"
+        if key not in self.clients:
+            client = Client()
+            if auth == "session":
+                principal = self.principals[role]
+                client.login(username=principal.username, password=principal.password)
+            self.clients[key] = client
+        return self.clients[key]
+
+    def get(self, endpoint: Endpoint, path: str) -> int:
+        headers = {}
+        if endpoint.auth == "token":
+            headers["HTTP_AUTHORIZATION"] = f"Token {self.principals[endpoint.role].token}"
+        response = self._client(endpoint.role, endpoint.auth).get(path, **headers)
+        if getattr(response, "streaming", False):
+            b"".join(response.streaming_content)
+        return response.status_code
+
+
+class HttpTransport:
+    """Transport that talks to a running server over HTTP."""
+
+    csrf_input = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+    def __init__(self, base_url: str, principals: dict[str, Principal], timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.principals = principals
+        self.timeout = timeout
+        self.openers: dict[str, urllib.request.OpenerDirector] = {}
+
+    def _opener(self, role: str, auth: str | None) -> urllib.request.OpenerDirector:
+        key = f"{role}:{auth}"
+        if key not in self.openers:
+            opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+            if auth == "session":
+                self._login(opener, self.principals[role])
+            self.openers[key] = opener
+        return self.openers[key]
+
+    def _login(self, opener, principal: Principal) -> None:
+        url = f"{self.base_url}/accounts/login/"
+        with opener.open(url, timeout=self.timeout) as response:
+            match = self.csrf_input.search(response.read().decode("utf-8", "replace"))
+        form = {"username": principal.username, "password": principal.password}
+        if match:
+            form["csrfmiddlewaretoken"] = match.group(1)
+        request = urllib.request.Request(url, data=urllib.parse.urlencode(form).encode(), headers={"Referer": url})
+        opener.open(request, timeout=self.timeout).close()
+
+    def get(self, endpoint: Endpoint, path: str) -> int:
+        request = urllib.request.Request(f"{self.base_url}{path}")
+        if endpoint.auth == "token":
+            request.add_header("Authorization", f"Token {self.principals[endpoint.role].token}")
+        try:
+            with self._opener(endpoint.role, endpoint.auth).open(request, timeout=self.timeout) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as exc:
+            return exc.code
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class EndpointStats:
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def record(self, seconds: float, status: int) -> None:
+        self.latencies.append(seconds)
+        if status >= 400:
+            self.errors += 1
+
+
+@dataclass
+class LoadReport:
+    elapsed: float
+    endpoints: dict[str, EndpointStats]
+
+    def rows(self) -> list[dict]:
+        rows = []
+        everything: list[float] = []
+        errors = 0
+        for name, stats in sorted(self.endpoints.items()):
+            rows.append(self._row(name, sorted(stats.latencies), stats.errors))
+            everything.extend(stats.latencies)
+            errors += stats.errors
+        rows.append(self._row("total", sorted(everything), errors))
+        return rows
+
+    def _row(self, name: str, latencies: list[float], errors: int) -> dict:
+        return {
+            "endpoint": name,
+            "requests": len(latencies),
+            "errors": errors,
+            "rps": len(latencies) / self.elapsed if self.elapsed else 0.0,
+            "p50_ms": percentile(latencies, 50) * 1000,
+            "p95_ms": percentile(latencies, 95) * 1000,
+            "p99_ms": percentile(latencies, 99) * 1000,
+        }
+
+
+def build_schedule(rng: random.Random, targets: Targets, total: int, mix=TRAFFIC_MIX) -> list[tuple[Endpoint, str]]:
+    """Deterministic request sequence drawn from the weighted mix."""
+
+    endpoints = rng.choices(mix, weights=[endpoint.weight for endpoint in mix], k=total)
+    return [(endpoint, endpoint.path(rng, targets)) for endpoint in endpoints]
+
+
+def run_schedule(schedule, make_transport: Callable[[], object], concurrency: int = 1) -> LoadReport:
+    """Replay ``schedule`` across ``concurrency`` workers, each with its own transport."""
+
+    shards = [schedule[index::concurrency] for index in range(concurrency)]
+
+    def worker(shard) -> dict[str, EndpointStats]:
+        transport = make_transport()
+        stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+        for endpoint, path in shard:
+            started = time.perf_counter()
+            status = transport.get(endpoint, path)
+            stats[endpoint.name].record(time.perf_counter() - started, status)
+        return stats
+
+    def threaded_worker(shard) -> dict[str, EndpointStats]:
+        try:
+            return worker(shard)
+        finally:
+            connection.close()
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        results = [worker(shards[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(threaded_worker, shards))
+    elapsed = time.perf_counter() - started
+
+    merged: dict[str, EndpointStats] = defaultdict(EndpointStats)
+    for result in results:
+        for name, stats in result.items():
+            merged[name].latencies.extend(stats.latencies)
+            merged[name].errors += stats.errors
+    return LoadReport(elapsed=elapsed, endpoints=dict(merged))
+
+
+def default_inspector() -> InspectorProfile | None:
+    """Busiest inspector, so the inspector endpoints return full pages."""
+
+    return (
+        InspectorProfile.objects.select_related("profile__user")
+        .annotate(load=Count("inspections"))
+        .order_by("-load", "id")
+        .first()
+    )
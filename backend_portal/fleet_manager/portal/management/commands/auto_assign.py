@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from portal.models import PortalUser, Vehicle
+from portal.scheduling import DEFAULT_INSPECTION_INTERVAL_DAYS, MAX_SCHEDULE_DAYS, auto_assign, vehicles_due
+
+
+class Command(BaseCommand):
+    help = (
+        "Schedule vehicles due for inspection across a date range, respecting each active inspector's "
+        "max_daily_inspections and evening out their load."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", type=date.fromisoformat, help="First day (defaults to today).")
+        parser.add_argument("--end", type=date.fromisoformat, help="Last day (defaults to start + 6 days).")
+        parser.add_argument(
+            "--interval-days",
+            type=int,
+            default=DEFAULT_INSPECTION_INTERVAL_DAYS,
+            help="A vehicle is due when its last completed inspection is older than this.",
+        )
+        parser.add_argument("--customer", type=int, help="Only schedule this customer's vehicles.")
+        parser.add_argument("--vehicle", type=int, action="append", help="Schedule these vehicles instead of those due.")
+        parser.add_argument("--assigned-by", help="Admin username recorded on the assignments.")
+        parser.add_argument("--dry-run", action="store_true", help="Plan without writing anything.")
+        parser.add_argument("--json", action="store_true", help="Print the summary as JSON.")
+
+    def handle(self, *args, **options):
+        start = options["start"] or timezone.localdate()
+        end = options["end"] or start + timedelta(days=6)
+        if end < start:
+            raise CommandError("--end must not be before --start.")
+        if (end - start).days >= MAX_SCHEDULE_DAYS:
+            raise CommandError(f"Schedule at most {MAX_SCHEDULE_DAYS} days at a time.")
+
+        assigned_by = None
+        if options["assigned_by"]:
+            assigned_by = PortalUser.objects.filter(
+                user__username=options["assigned_by"], role=PortalUser.ROLE_ADMIN
+            ).first()
+            if assigned_by is None:
+                raise CommandError(f"No admin named {options['assigned_by']!r}.")
+
+        if options["vehicle"]:
+            vehicle_ids = options["vehicle"]
+        else:
+            queryset = Vehicle.objects.all()
+            if options["customer"]:
+                queryset = queryset.filter(customer_id=options["customer"])
+            vehicle_ids = list(vehicles_due(start, options["interval_days"], queryset).values_list("id", flat=True))
+
+        started = time.perf_counter()
+        plan = auto_assign(vehicle_ids, start, end, assigned_by=assigned_by, dry_run=options["dry_run"])
+        summary = {**plan.summary(), "dry_run": options["dry_run"], "seconds": round(time.perf_counter() - started, 3)}
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        verb = "Would schedule" if options["dry_run"] else "Scheduled"
+        self.stdout.write(
+            f"{verb} {summary['scheduled']} of {len(vehicle_ids)} vehicles between {start} and {end} "
+            f"in {summary['seconds']:.2f}s ({summary['already_scheduled']} already scheduled, "
+            f"{summary['unscheduled']} over capacity)."
+        )
+        for day, count in summary["per_day"].items():
+            self.stdout.write(f"  {day}: {count}")
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from portal.models import Customer, Inspection, InspectorProfile, PortalUser, Vehicle
+from portal.serializers import InspectionCompactListSerializer, InspectionListSerializer
+
+User = get_user_model()
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Compare rows/sec of the nested InspectionListSerializer and the compact projection."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=2000, help="Inspections to serialize per run.")
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per mode; the best run is reported.")
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        repeat = options["repeat"]
+        try:
+            with transaction.atomic():
+                if Inspection.objects.count() < rows:
+                    self._build_fixture(rows)
+                self._run(rows, repeat)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _run(self, rows: int, repeat: int) -> None:
+        renderer = JSONRenderer()
+        nested_qs = Inspection.objects.select_related(
+            "vehicle",
+            "vehicle__customer",
+            "inspector",
+            "inspector__profile",
+            "inspector__profile__user",
+            "customer",
+            "customer__profile",
+            "customer__profile__user",
+        )
+
+        def nested():
+            return InspectionListSerializer(list(nested_qs[:rows]), many=True).data
+
+        def compact():
+            projected = InspectionCompactListSerializer.project(Inspection.objects.all())
+            return InspectionCompactListSerializer(list(projected[:rows])).data
+
+        for label, build in (("nested", nested), ("compact", compact)):
+            best = None
+            size = 0
+            for _ in range(repeat):
+                started = time.perf_counter()
+                payload = renderer.render(build())
+                elapsed = time.perf_counter() - started
+                size = len(payload)
+                best = elapsed if best is None else min(best, elapsed)
+            self.stdout.write(
+                f"{label:>8}: {rows / best:>10.0f} rows/sec  {best * 1000:>8.1f} ms  {size / rows:>7.0f} bytes/row"
+            )
+
+    def _build_fixture(self, rows: int) -> None:
+        self.stdout.write(f"Building {rows} throwaway inspections (rolled back afterwards)...")
+        customer_user = User.objects.create_user(username="bench-customer")
+        customer = Customer.objects.create(
+            profile=PortalUser.objects.create(user=customer_user, role=PortalUser.ROLE_CUSTOMER),
+            legal_name="Bench Logistics",
+            contact_email="bench@example.com",
+        )
+        inspector_user = User.objects.create_user(username="bench-inspector", first_name="Bench", last_name="Inspector")
+        inspector = InspectorProfile.objects.create(
+            profile=PortalUser.objects.create(user=inspector_user, role=PortalUser.ROLE_INSPECTOR),
+            badge_id="BENCH-1",
+        )
+        vehicles = Vehicle.objects.bulk_create(
+            Vehicle(
+                customer=customer,
+                vin=f"BENCHVIN{index:08d}",
+                license_plate=f"BN{index:05d}",
+                make="Volvo",
+                model="VNL",
+                year=2022,
+                vehicle_type="Tractor",
+            )
+            for index in range(max(rows // 10, 1))
+        )
+        Inspection.objects.bulk_create(
+            Inspection(vehicle=vehicles[index % len(vehicles)], customer=customer, inspector=inspector)
+            for index in range(rows)
+        )
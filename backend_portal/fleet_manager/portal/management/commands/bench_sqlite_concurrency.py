@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from portal.sqlitebench import PROFILES, copy_database, register_database, run_profile
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the database once per SQLite profile (stock Django vs the production profile) and hammer "
+        "each copy with concurrent inspection submissions and list reads. The source database is not modified."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--operations", type=int, default=200, help="Submissions per writer thread.")
+        parser.add_argument("--profile", choices=PROFILES, action="append", help="Only run these profiles.")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        if connections["default"].vendor != "sqlite":
+            raise CommandError("The default database is not SQLite.")
+        rows = []
+        samples = {}
+        with tempfile.TemporaryDirectory(prefix="sqlitebench-") as scratch:
+            for profile in options["profile"] or PROFILES:
+                alias = f"sqlitebench_{profile}"
+                path = Path(scratch) / f"{profile}.sqlite3"
+                copy_database("default", path, profile)
+                register_database(alias, path, profile)
+                result = run_profile(
+                    alias,
+                    profile,
+                    writers=max(options["writers"], 1),
+                    readers=max(options["readers"], 0),
+                    operations=max(options["operations"], 1),
+                    seed=options["seed"],
+                )
+                connections[alias].close()
+                rows.append(result.row())
+                samples[profile] = sorted(set(result.error_samples))
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"profiles": rows, "error_samples": samples}, indent=2))
+            return
+        self.stdout.write(
+            f"{'profile':<12}{'writes':>8}{'errs':>6}{'w/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+            f"{'reads':>8}{'r/s':>9}{'queue s':>9}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['profile']:<12}{row['writes']:>8}{row['write_errors']:>6}{row['writes_per_s']:>9.1f}"
+                f"{row['write_p50_ms']:>9.1f}{row['write_p95_ms']:>9.1f}{row['write_p99_ms']:>9.1f}"
+                f"{row['reads']:>8}{row['reads_per_s']:>9.1f}{row['writer_queue_s']:>9.2f}"
+            )
+        for profile, messages in samples.items():
+            for message in messages:
+                self.stdout.write(f"  {profile}: {message}")
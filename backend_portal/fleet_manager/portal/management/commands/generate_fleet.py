@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from portal.catalog import bump_catalog_version
+from portal.capacity import rebuild_daily_loads
+from portal.counters import refresh_dashboard_counters
+from portal.search import rebuild_search_index
+from portal.models import (
+    ChecklistItem,
+    Customer,
+    Inspection,
+    InspectionCategory,
+    InspectionItemResponse,
+    InspectorProfile,
+    PortalUser,
+    Vehicle,
+    VehicleAssignment,
+)
+from portal.services import seed_checklist_structure
+
+User = get_user_model()
+
+MAKES = [
+    ("Volvo", ["VNL 760", "VNL 860", "VNR"]),
+    ("Freightliner", ["Cascadia", "M2 106", "122SD"]),
+    ("Kenworth", ["T680", "W990", "T880"]),
+    ("Peterbilt", ["579", "389", "567"]),
+    ("International", ["LT", "HV", "MV"]),
+    ("Ford", ["F-750", "Transit", "E-450"]),
+]
+VEHICLE_TYPES = ["Tractor", "Straight Truck", "Trailer", "Van", "Box Truck", "Tanker"]
+AXLES = ["4x2", "6x4", "6x2", "8x4", ""]
+CITIES = ["Denver", "Dallas", "Chicago", "Atlanta", "Phoenix", "Seattle", "Omaha", "Memphis", "Reno", "Tulsa"]
+RESULTS = [InspectionItemResponse.RESULT_PASS] * 17 + [InspectionItemResponse.RESULT_FAIL] * 2 + [
+    InspectionItemResponse.RESULT_NA
+]
+STATUSES = [Inspection.STATUS_APPROVED] * 6 + [Inspection.STATUS_SUBMITTED] * 2 + [
+    Inspection.STATUS_IN_PROGRESS,
+    Inspection.STATUS_DRAFT,
+]
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+@contextmanager
+def _manual_timestamps():
+    """Let bulk inserts carry historical created_at/updated_at values."""
+
+    fields = []
+    for model in (Customer, InspectorProfile, Vehicle, VehicleAssignment, Inspection, InspectionItemResponse):
+        for name in ("created_at", "updated_at"):
+            field = model._meta.get_field(name)
+            fields.append((field, field.auto_now, field.auto_now_add))
+            field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Deterministically generate a synthetic fleet (customers, inspectors, vehicles, assignments, "
+        "inspections and item responses) with bulk inserts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", type=int, default=1, help="RNG seed; also namespaces generated identifiers.")
+        parser.add_argument("--customers", type=int, default=20000)
+        parser.add_argument("--vehicles", type=int, default=50000)
+        parser.add_argument("--inspectors", type=int, default=300)
+        parser.add_argument("--inspections", type=int, default=40000)
+        parser.add_argument("--items-per-inspection", type=int, default=50)
+        parser.add_argument("--checklist-items", type=int, default=150, help="Checklist size to ensure exists.")
+        parser.add_argument("--days", type=int, default=365, help="History window for timestamps.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--password", default="loadtest", help="Password set on every generated user.")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.prefix = f"syn{options['seed']}"
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        self.days = max(options["days"], 1)
+        if User.objects.filter(username=f"{self.prefix}-admin").exists():
+            raise CommandError(f"A fleet with seed {options['seed']} already exists; pick another --seed.")
+        self.password_hash = make_password(options["password"])
+
+        started = time.perf_counter()
+        with _manual_timestamps():
+            items = self._ensure_checklist(options["checklist_items"])
+            self._create_admin()
+            customers = self._create_customers(options["customers"])
+            inspectors = self._create_inspectors(options["inspectors"])
+            vehicles = self._create_vehicles(customers, options["vehicles"])
+            self._create_inspections(vehicles, inspectors, items, options["inspections"], options["items_per_inspection"])
+        # bulk_create skips the signals that maintain the dashboard counters, inspector
+        # daily loads and search index.
+        refresh_dashboard_counters()
+        rebuild_daily_loads()
+        rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Fleet generated in {time.perf_counter() - started:.1f}s"))
+
+    def _timestamp(self):
+        return self.now - timedelta(seconds=self.rng.randrange(self.days * 86400))
+
+    def _ensure_checklist(self, size: int) -> list[int]:
+        seed_checklist_structure()
+        categories = list(InspectionCategory.objects.order_by("display_order"))
+        existing = ChecklistItem.objects.filter(is_active=True).count()
+        if existing < size:
+            missing = [
+                ChecklistItem(
+                    category=categories[index % len(categories)],
+                    code=f"{categories[index % len(categories)].code}_{self.prefix}_{index:04d}",
+                    title=f"Synthetic check {index}",
+                    requires_photo=index % 7 == 0,
+                )
+                for index in range(size - existing)
+            ]
+            ChecklistItem.objects.bulk_create(missing, batch_size=self.batch_size)
+            bump_catalog_version()
+        return list(ChecklistItem.objects.filter(is_active=True).values_list("id", flat=True)[:size])
+
+    def _create_users(self, usernames: list[str], role: str) -> list[PortalUser]:
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=username,
+                    email=f"{username}@fleet.example",
+                    first_name=username.split("-")[-2].title(),
+                    last_name=username.split("-")[-1],
+                    password=self.password_hash,
+                )
+                for username in usernames
+            ],
+            batch_size=self.batch_size,
+        )
+        return PortalUser.objects.bulk_create(
+            [PortalUser(user=user, role=role) for user in users], batch_size=self.batch_size
+        )
+
+    def _create_admin(self) -> None:
+        with transaction.atomic():
+            self._create_users([f"{self.prefix}-admin"], PortalUser.ROLE_ADMIN)
+
+    def _create_customers(self, count: int) -> list[int]:
+        ids: list[int] = []
+        for batch in _batched(range(count), self.batch_size):
+            with transaction.atomic():
+                profiles = self._create_users([f"{self.prefix}-customer-{index:06d}" for index in batch], PortalUser.ROLE_CUSTOMER)
+                created = Customer.objects.bulk_create(
+                    [
+                        Customer(
+                            profile=profile,
+                            legal_name=f"{self.rng.choice(CITIES)} Freight {index:06d} LLC",
+                            contact_email=f"fleet{index}@{self.prefix}.example",
+                            city=self.rng.choice(CITIES),
+                            created_at=(stamp := self._timestamp()),
+                            updated_at=stamp,
+                        )
+                        for index, profile in zip(batch, profiles)
+                    ]
+                )
+            ids.extend(customer.pk for customer in created)
+        self.stdout.write(f"  customers: {len(ids)}")
+        return ids
+
+    def _create_inspectors(self, count: int) -> list[int]:
+        with transaction.atomic():
+            profiles = self._create_users([f"{self.prefix}-inspector-{index:05d}" for index in range(count)], PortalUser.ROLE_INSPECTOR)
+            stamp = self.now - timedelta(days=self.days)
+            created = InspectorProfile.objects.bulk_create(
+                [
+                    InspectorProfile(
+                        profile=profile,
+                        badge_id=f"{self.prefix.upper()}-{index:05d}",
+                        max_daily_inspections=self.rng.choice([6, 8, 8, 10]),
+                        created_at=stamp,
+                        updated_at=stamp,
+                    )
+                    for index, profile in enumerate(profiles)
+                ],
+                batch_size=self.batch_size,
+            )
+        self.stdout.write(f"  inspectors: {len(created)}")
+        return [inspector.pk for inspector in created]
+
+    def _create_vehicles(self, customers: list[int], count: int) -> list[tuple[int, int]]:
+        vehicles: list[tuple[int, int]] = []
+        for batch in _batched(range(count), self.batch_size):
+            rows = []
+            for index in batch:
+                make, models = self.rng.choice(MAKES)
+                stamp = self._timestamp()
+                rows.append(
+                    Vehicle(
+                        customer_id=customers[index % len(customers)],
+                        vin=f"{self.prefix.upper()}{index:012d}",
+                        license_plate=f"{self.rng.choice('ABCDEFGHJKLMNPRSTUVWXYZ')}{index:07d}",
+                        make=make,
+                        model=self.rng.choice(models),
+                        year=self.rng.randrange(2008, self.now.year + 1),
+                        vehicle_type=self.rng.choice(VEHICLE_TYPES),
+                        axle_configuration=self.rng.choice(AXLES),
+                        mileage=self.rng.randrange(1000, 900000),
+                        created_at=stamp,
+                        updated_at=stamp,
+                    )
+                )
+            with transaction.atomic():
+                created = Vehicle.objects.bulk_create(rows)
+            vehicles.extend((vehicle.pk, vehicle.customer_id) for vehicle in created)
+        self.stdout.write(f"  vehicles: {len(vehicles)}")
+        return vehicles
+
+    def _create_inspections(self, vehicles, inspectors, items, count: int, per_inspection: int) -> None:
+        per_inspection = min(per_inspection, len(items))
+        responses = 0
+        for batch in _batched(range(count), self.batch_size):
+            assignments = []
+            inspections = []
+            for index in batch:
+                vehicle_id, customer_id = vehicles[index % len(vehicles)]
+                inspector_id = self.rng.choice(inspectors)
+                # One visit per vehicle per day keeps (vehicle, inspector, date) unique.
+                day = index // len(vehicles)
+                scheduled_for = (self.now - timedelta(days=day)).date()
+                stamp = self.now - timedelta(days=day, minutes=self.rng.randrange(120, 600))
+                assignments.append(
+                    VehicleAssignment(
+                        vehicle_id=vehicle_id,
+                        inspector_id=inspector_id,
+                        scheduled_for=scheduled_for,
+                        status=VehicleAssignment.STATUS_COMPLETED,
+                        created_at=stamp,
+                        updated_at=stamp,
+                    )
+                )
+                inspections.append(
+                    Inspection(
+                        vehicle_id=vehicle_id,
+                        customer_id=customer_id,
+                        inspector_id=inspector_id,
+                        status=self.rng.choice(STATUSES),
+                        started_at=stamp,
+                        completed_at=stamp + timedelta(minutes=self.rng.randrange(20, 120)),
+                        odometer_reading=self.rng.randrange(1000, 900000),
+                        created_at=stamp,
+                        updated_at=stamp,
+                    )
+                )
+            with transaction.atomic():
+                VehicleAssignment.objects.bulk_create(assignments)
+                for assignment, inspection in zip(assignments, inspections):
+                    inspection.assignment_id = assignment.pk
+                Inspection.objects.bulk_create(inspections)
+                rows = (
+                    InspectionItemResponse(
+                        inspection_id=inspection.pk,
+                        checklist_item_id=item_id,
+                        result=(result := self.rng.choice(RESULTS)),
+                        severity=self.rng.randrange(2, 6) if result == InspectionItemResponse.RESULT_FAIL else 1,
+                        notes="Needs attention" if result == InspectionItemResponse.RESULT_FAIL else "",
+                        created_at=inspection.created_at,
+                        updated_at=inspection.updated_at,
+                    )
+                    for inspection in inspections
+                    for item_id in self.rng.sample(items, per_inspection)
+                )
+                for chunk in _batched(rows, self.batch_size * 5):
+                    InspectionItemResponse.objects.bulk_create(chunk)
+                    responses += len(chunk)
+            self.stdout.write(f"  inspections: {batch[-1] + 1}/{count}  responses: {responses}")
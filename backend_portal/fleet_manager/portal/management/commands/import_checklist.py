@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portal.checklists import (
+    DEFINITION_FORMATS,
+    ChecklistDefinitionError,
+    detect_definition_format,
+    import_checklist,
+    load_definition,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Apply a versioned JSON or YAML checklist definition: upsert its categories and items in bulk, "
+        "deactivate items it no longer lists, and print what changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Definition file, or - for stdin.")
+        parser.add_argument("--format", choices=DEFINITION_FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--dry-run", action="store_true", help="Report the diff without writing anything.")
+        parser.add_argument("--json", action="store_true", help="Print the diff as JSON.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            if path == "-":
+                text, name = sys.stdin.read(), ""
+            else:
+                with open(path, encoding="utf-8") as handle:
+                    text, name = handle.read(), path
+        except OSError as exc:
+            raise CommandError(str(exc)) from exc
+
+        try:
+            definition = load_definition(text, detect_definition_format(name, options["format"]))
+            diff = import_checklist(definition, dry_run=options["dry_run"], source=name)
+        except ChecklistDefinitionError as exc:
+            raise CommandError("\n".join(["Checklist definition rejected:", *exc.errors])) from exc
+
+        if options["json"]:
+            self.stdout.write(json.dumps(diff.as_dict(), indent=2))
+            return
+        for code in diff.categories_created:
+            self.stdout.write(f"+ category {code}")
+        for code, changes in diff.categories_updated.items():
+            self.stdout.write(f"~ category {code}: {self._changes(changes)}")
+        for key in diff.items_created:
+            self.stdout.write(f"+ item {key}")
+        for key, changes in diff.items_updated.items():
+            self.stdout.write(f"~ item {key}: {self._changes(changes)}")
+        for key in diff.items_deactivated:
+            self.stdout.write(f"- item {key}")
+
+        counts = diff.counts()
+        verb = "Would apply" if diff.dry_run else "Applied"
+        previous = f"v{diff.previous_version}" if diff.previous_version else "none"
+        self.stdout.write(
+            f"{verb} checklist v{diff.version} (previous: {previous}): "
+            f"{counts['categories_created']} categories created, {counts['categories_updated']} updated; "
+            f"{counts['items_created']} items created, {counts['items_updated']} updated, "
+            f"{counts['items_deactivated']} deactivated; {counts['unchanged']} unchanged."
+        )
+
+    @staticmethod
+    def _changes(changes: dict[str, list]) -> str:
+        return ", ".join(f"{name} {old!r} -> {new!r}" for name, (old, new) in changes.items())
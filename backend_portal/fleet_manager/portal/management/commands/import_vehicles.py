@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import csv
+import json
+import sys
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portal.imports import FORMATS, IMPORT_BATCH_SIZE, ImportFormatError, detect_format, import_vehicles
+from portal.models import Customer
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream vehicles from a CSV or NDJSON file into a customer's fleet. Valid rows are inserted in "
+        "chunks; invalid rows and duplicate VINs are reported per line."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import, or - for stdin.")
+        parser.add_argument("--customer", type=int, required=True, help="Customer id that owns the vehicles.")
+        parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate and check VINs without inserting.")
+        parser.add_argument("--errors", help="Write every rejected row to this CSV file.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        customer = Customer.objects.filter(pk=options["customer"]).first()
+        if customer is None:
+            raise CommandError(f"No customer with id {options['customer']}.")
+
+        with ExitStack() as stack:
+            if options["path"] == "-":
+                stream, name = sys.stdin.buffer, ""
+            else:
+                try:
+                    stream = stack.enter_context(open(options["path"], "rb"))
+                except OSError as exc:
+                    raise CommandError(str(exc)) from exc
+                name = options["path"]
+
+            on_error = None
+            if options["errors"]:
+                writer = csv.writer(stack.enter_context(open(options["errors"], "w", newline="", encoding="utf-8")))
+                writer.writerow(["line", "vin", "field", "message"])
+
+                def on_error(error):
+                    for field_name, messages in error["errors"].items():
+                        for message in messages:
+                            writer.writerow([error["line"], error["vin"] or "", field_name, message])
+
+            try:
+                report = import_vehicles(
+                    stream,
+                    customer,
+                    detect_format(name, options["format"]),
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                    on_error=on_error,
+                )
+            except ImportFormatError as exc:
+                raise CommandError(str(exc)) from exc
+
+        summary = report.as_dict()
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        verb = "Would import" if report.dry_run else "Imported"
+        self.stdout.write(
+            f"{verb} {report.created} of {report.rows} rows for {customer} in {report.seconds:.2f}s "
+            f"({report.failed} rejected)."
+        )
+        if not options["errors"]:
+            for error in report.errors[:20]:
+                details = "; ".join(f"{name}: {' '.join(messages)}" for name, messages in error["errors"].items())
+                self.stdout.write(f"  line {error['line']}: {details}")
+            if report.failed > 20:
+                self.stdout.write(f"  ... and {report.failed - 20} more (use --errors to write them all).")
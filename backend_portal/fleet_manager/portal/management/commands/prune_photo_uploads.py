@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from portal.models import PhotoUpload
+from portal.uploads import partial_path, staging_directory
+
+
+class Command(BaseCommand):
+    help = "Remove abandoned resumable uploads and the bookkeeping rows of attached ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="Age after which uploads are pruned.")
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        stale = PhotoUpload.objects.filter(updated_at__lt=cutoff)
+
+        abandoned = 0
+        for upload in stale.filter(status=PhotoUpload.STATUS_UPLOADING).iterator():
+            partial_path(upload).unlink(missing_ok=True)
+            abandoned += 1
+        for upload in stale.filter(status=PhotoUpload.STATUS_COMPLETE).iterator():
+            # Finished but never attached: the stored file is orphaned.
+            if upload.file:
+                upload.file.delete(save=False)
+            abandoned += 1
+        # Attached uploads only lose their row; the file now belongs to an InspectionPhoto.
+        deleted, _ = stale.delete()
+        # Chunks staged by a worker that died before splicing them.
+        for chunk in staging_directory().glob("*.chunk"):
+            if chunk.stat().st_mtime < cutoff.timestamp():
+                chunk.unlink(missing_ok=True)
+        self.stdout.write(f"Pruned {deleted} uploads ({abandoned} unfinished or unattached).")
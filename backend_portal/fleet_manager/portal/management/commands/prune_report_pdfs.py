@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from portal.reports import pdf_directory, prune_report_pdfs
+
+
+class Command(BaseCommand):
+    help = "Delete cached report PDFs that have not been rendered or served within the retention window."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "PORTAL_REPORT_PDF_RETENTION_DAYS", 30),
+            help="Keep files used within this many days.",
+        )
+
+    def handle(self, *args, **options):
+        removed = prune_report_pdfs(options["days"])
+        self.stdout.write(f"Removed {removed} cached report PDFs from {pdf_directory()}.")
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from portal.capacity import rebuild_daily_loads
+
+
+class Command(BaseCommand):
+    help = "Recount the per-inspector, per-day assignment loads (repair after bulk loads or QuerySet.update() moves)."
+
+    def handle(self, *args, **options):
+        rows = rebuild_daily_loads()
+        self.stdout.write(f"Rebuilt {rows} inspector daily loads.")
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from portal.search import REINDEX_BATCH_SIZE, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Drop and repopulate the vehicle/customer/inspection search index."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=REINDEX_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        totals = rebuild_search_index(batch_size=options["batch_size"])
+        summary = ", ".join(f"{count} {kind}s" for kind, count in totals.items())
+        self.stdout.write(f"Indexed {summary} in {time.perf_counter() - started:.1f}s.")
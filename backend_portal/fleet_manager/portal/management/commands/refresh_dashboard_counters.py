@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from portal.counters import refresh_dashboard_counters
+
+
+class Command(BaseCommand):
+    help = "Recount the materialized dashboard counters (periodic rollup / repair after bulk loads)."
+
+    def handle(self, *args, **options):
+        counters = refresh_dashboard_counters()
+        self.stdout.write(f"Refreshed {len(counters)} dashboard counters.")
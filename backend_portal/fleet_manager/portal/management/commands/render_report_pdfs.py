@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+
+from portal.models import Inspection
+from portal.reports import render_processes, render_report_pdfs
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render customer report PDFs into the content-addressed cache, so downloads are served "
+        "straight from disk. Reports whose content is already cached are skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--inspection", type=int, action="append", help="Only these inspections.")
+        parser.add_argument("--customer", type=int, help="Only this customer's inspections.")
+        parser.add_argument("--processes", type=int, help="Render processes (defaults to PORTAL_REPORT_PDF_PROCESSES).")
+        parser.add_argument("--json", action="store_true", help="Print the totals as JSON.")
+
+    def handle(self, *args, **options):
+        queryset = Inspection.objects.all()
+        if options["inspection"]:
+            queryset = queryset.filter(pk__in=options["inspection"])
+        if options["customer"]:
+            queryset = queryset.filter(customer_id=options["customer"])
+        processes = render_processes() if options["processes"] is None else options["processes"]
+
+        started = time.perf_counter()
+        totals = render_report_pdfs(queryset, processes=processes)
+        seconds = time.perf_counter() - started
+        if options["json"]:
+            self.stdout.write(json.dumps({**totals, "processes": processes, "seconds": round(seconds, 3)}, indent=2))
+            return
+        self.stdout.write(
+            f"Rendered {totals['rendered']} report PDFs with {processes} processes in {seconds:.2f}s "
+            f"({totals['cached']} already cached, {totals['failed']} failed)."
+        )
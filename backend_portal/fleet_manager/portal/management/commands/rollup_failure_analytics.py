@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from portal.analytics import ROLLUP_BATCH_SIZE, rollup_failures
+
+
+class Command(BaseCommand):
+    help = "Fold newly submitted inspections into the daily checklist failure rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=ROLLUP_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        added = rollup_failures(batch_size=options["batch_size"])
+        self.stdout.write(f"Rolled up {added} inspections.")
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import json
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.models import Token
+
+from portal.authentication import token_cache
+from portal.loadtest import (
+    ClientTransport,
+    HttpTransport,
+    Principal,
+    Targets,
+    build_schedule,
+    default_inspector,
+    run_schedule,
+)
+from portal.models import PortalUser
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted mix of /api/ and /api/app/ traffic and report p50/p95/p99 latency and "
+        "throughput per endpoint. Runs in-process by default, or against --base-url."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--seed", type=int, default=1, help="Seed for the request schedule.")
+        parser.add_argument("--base-url", help="Hit a running server (e.g. http://127.0.0.1:8000) instead of in-process.")
+        parser.add_argument("--admin", help="Admin username (defaults to the first admin).")
+        parser.add_argument("--inspector", help="Inspector username (defaults to the busiest inspector).")
+        parser.add_argument("--password", default="loadtest", help="Password used for session logins.")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        principals = {
+            "admin": self._principal(options["admin"], PortalUser.ROLE_ADMIN, options["password"]),
+            "inspector": self._principal(options["inspector"], PortalUser.ROLE_INSPECTOR, options["password"]),
+        }
+        schedule = build_schedule(rng, Targets.sample(rng), options["requests"])
+
+        if options["base_url"]:
+            make_transport = lambda: HttpTransport(options["base_url"], principals)  # noqa: E731
+        else:
+            make_transport = lambda: ClientTransport(principals)  # noqa: E731
+        token_cache.clear()
+        report = run_schedule(schedule, make_transport, concurrency=max(options["concurrency"], 1))
+        # Only meaningful in-process; a remote server keeps its own cache.
+        cache_stats = None if options["base_url"] else token_cache.stats.as_dict()
+
+        rows = report.rows()
+        if options["json"]:
+            payload = {"elapsed": report.elapsed, "endpoints": rows}
+            if cache_stats is not None:
+                payload["token_cache"] = cache_stats
+            self.stdout.write(json.dumps(payload, indent=2))
+            return
+        self.stdout.write(
+            f"{'endpoint':<26}{'reqs':>7}{'errs':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['endpoint']:<26}{row['requests']:>7}{row['errors']:>6}{row['rps']:>9.1f}"
+                f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+            )
+        self.stdout.write(f"{report.elapsed:.2f}s wall clock")
+        if cache_stats is not None:
+            self.stdout.write(
+                f"token cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+                f"({cache_stats['hit_rate']:.1%} hit rate), {cache_stats['evictions']} evictions"
+            )
+
+    def _principal(self, username: str | None, role: str, password: str) -> Principal:
+        if username:
+            user = User.objects.filter(username=username, portal_profile__role=role).first()
+        elif role == PortalUser.ROLE_INSPECTOR:
+            inspector = default_inspector()
+            user = inspector.profile.user if inspector else None
+        else:
+            user = User.objects.filter(portal_profile__role=role, is_active=True).order_by("id").first()
+        if user is None:
+            raise CommandError(f"No {role} user found; run generate_fleet first or pass --{role}.")
+        token, _created = Token.objects.get_or_create(user=user)
+        return Principal(username=user.username, password=password, token=token.key)
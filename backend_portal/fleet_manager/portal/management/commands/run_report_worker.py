@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from portal.jobs import requeue_stalled_jobs, run_pending_jobs, worker_name
+
+
+def _work_forever(poll_interval: float) -> None:
+    worker = worker_name()
+    while True:
+        close_old_connections()
+        requeue_stalled_jobs()
+        if not run_pending_jobs(worker=worker):
+            time.sleep(poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Process queued customer report jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain the queue once and exit.")
+        parser.add_argument("--processes", type=int, default=1, help="Worker processes to run.")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds to sleep when idle.")
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            requeue_stalled_jobs()
+            processed = run_pending_jobs()
+            self.stdout.write(f"Processed {processed} report jobs.")
+            return
+
+        processes = max(options["processes"], 1)
+        if processes == 1:
+            _work_forever(options["poll_interval"])
+            return
+
+        # Children must open their own database connections.
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(target=_work_forever, args=(options["poll_interval"],), daemon=True)
+            for _ in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {processes} report workers.")
+        try:
+            for worker in workers:
+                worker.join()
+        except KeyboardInterrupt:
+            for worker in workers:
+                worker.terminate()
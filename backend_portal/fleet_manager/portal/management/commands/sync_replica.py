@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from portal.routing import PRIMARY, replica_aliases
+
+
+class Command(BaseCommand):
+    help = "Refresh local SQLite replica stand-ins with a consistent copy of the primary."
+
+    def add_arguments(self, parser):
+        parser.add_argument("aliases", nargs="*", help="Replica aliases to refresh (default: PORTAL_READ_REPLICAS).")
+
+    def handle(self, *args, **options):
+        aliases = options["aliases"] or replica_aliases()
+        if not aliases:
+            raise CommandError("No replicas configured; set PORTAL_READ_REPLICAS.")
+        primary = connections[PRIMARY]
+        if primary.vendor != "sqlite":
+            raise CommandError("Only SQLite stand-ins can be refreshed; real replicas follow the primary themselves.")
+        primary.ensure_connection()
+        for alias in aliases:
+            if alias == PRIMARY or alias not in connections:
+                raise CommandError(f"{alias!r} is not a replica alias in DATABASES.")
+            replica = connections[alias]
+            if replica.vendor != "sqlite":
+                raise CommandError(f"{alias!r} is not SQLite; it cannot be refreshed by copying.")
+            # Drop any open handle so readers reopen the fresh file.
+            replica.close()
+            started = time.perf_counter()
+            target = sqlite3.connect(replica.settings_dict["NAME"])
+            try:
+                # The online backup API copies a consistent snapshot even while
+                # the primary keeps taking writes.
+                primary.connection.backup(target)
+            finally:
+                target.close()
+            self.stdout.write(f"Copied {PRIMARY} to {alias} in {time.perf_counter() - started:.1f}s.")
@@ -1,9 +1,27 @@
 from __future__ import annotations
 
+import logging
+from contextlib import ExitStack
+
 from django.conf import settings
+from django.db import connections
 from django.http import HttpRequest, HttpResponse, JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 
+from .instrumentation import RequestMetrics, current_metrics, query_counter
+from .routing import (
+    SAFE_METHODS,
+    RoutingState,
+    choose_replica,
+    current_routing,
+    is_pinned,
+    pin,
+    replica_aliases,
+    replica_eligible,
+)
+
+budget_logger = logging.getLogger("portal.budget")
+
 
 class DevCorsMiddleware(MiddlewareMixin):
     """Lightweight CORS for development only.
@@ -38,3 +56,108 @@ class DevCorsMiddleware(MiddlewareMixin):
         response["Access-Control-Allow-Methods"] = "GET, POST, PUT, PATCH, DELETE, OPTIONS"
         response["Access-Control-Allow-Headers"] = "Authorization, Content-Type"
         response["Access-Control-Max-Age"] = "86400"
+
+
+class RequestBudgetMiddleware:
+    """Per-request query and latency accounting.
+
+    - Counts queries and DB time on every configured connection
+    - With ``REQUEST_SERVER_TIMING`` on (never in production: it exposes query
+      counts), adds ``db``, ``ser`` (serializer ``.data`` in portal views) and
+      ``total`` entries to the ``Server-Timing`` header, plus ``auth`` when the
+      token cache was used
+    - Logs a warning when a view exceeds its budget in ``REQUEST_BUDGETS``,
+      keyed by URL name with a ``default`` fallback
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        if not getattr(settings, "REQUEST_INSTRUMENTATION", True):
+            return self.get_response(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(query_counter))
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        total = metrics.total_seconds
+        if getattr(settings, "REQUEST_SERVER_TIMING", False):
+            response["Server-Timing"] = self._server_timing(metrics, total)
+        self._check_budget(request, metrics, total)
+        return response
+
+    @staticmethod
+    def _server_timing(metrics: RequestMetrics, total: float) -> str:
+        timings = [
+            f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.queries} queries"',
+            f"ser;dur={metrics.serializer_seconds * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ]
+        if metrics.auth:
+            timings.append(f'auth;desc="token cache {metrics.auth}"')
+        return ", ".join(timings)
+
+    @staticmethod
+    def _check_budget(request: HttpRequest, metrics: RequestMetrics, total: float) -> None:
+        budgets = getattr(settings, "REQUEST_BUDGETS", {})
+        match = getattr(request, "resolver_match", None)
+        view_name = match.view_name if match else None
+        budget = budgets.get(view_name) or budgets.get("default")
+        if not budget:
+            return
+        max_queries = budget.get("queries")
+        max_ms = budget.get("ms")
+        over_queries = max_queries is not None and metrics.queries > max_queries
+        over_time = max_ms is not None and total * 1000 > max_ms
+        if over_queries or over_time:
+            budget_logger.warning(
+                "Request budget exceeded: %s %s view=%s queries=%d/%s db_ms=%.1f ser_ms=%.1f total_ms=%.1f/%s",
+                request.method,
+                request.path,
+                view_name,
+                metrics.queries,
+                max_queries,
+                metrics.db_seconds * 1000,
+                metrics.serializer_seconds * 1000,
+                total * 1000,
+                max_ms,
+            )
+
+
+class ReplicaRoutingMiddleware:
+    """Serves read-only views from a read replica (see ``portal.routing``).
+
+    - Views that only read (viewset ``list``/``retrieve``, ``@replica_reads``)
+      are routed to one of ``PORTAL_READ_REPLICAS``, round-robin
+    - Any write during the request sends its remaining reads to the primary
+    - Unsafe methods and requests that wrote pin the client to the primary for
+      ``PORTAL_REPLICA_PIN_SECONDS`` so it reads its own writes
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest):
+        if not replica_aliases():
+            return self.get_response(request)
+        state = RoutingState()
+        token = current_routing.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_routing.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            pin(request, response)
+        return response
+
+    def process_view(self, request: HttpRequest, view_func, view_args, view_kwargs):
+        state = current_routing.get()
+        if state is None or not replica_eligible(view_func, request.method) or is_pinned(request):
+            return None
+        state.alias = choose_replica()
+        return None
@@ -4,7 +4,8 @@ import uuid
 
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models.functions import Upper
 from django.utils import timezone
 
 User = get_user_model()
@@ -40,6 +41,8 @@ class PortalUser(TimeStampedModel):
         verbose_name_plural = "Portal Users"
         indexes = [
             models.Index(fields=["role"]),
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["role", "created_at", "id"]),
         ]
 
     def __str__(self) -> str:
@@ -66,6 +69,11 @@ class Customer(TimeStampedModel):
 
     class Meta:
         ordering = ["legal_name"]
+        indexes = [
+            models.Index(fields=["legal_name", "id"]),
+            models.Index(fields=["city"]),
+            models.Index(fields=["created_at"]),
+        ]
 
     def __str__(self) -> str:
         return self.legal_name
@@ -90,10 +98,27 @@ class InspectorProfile(TimeStampedModel):
         return f"{self.profile}"
 
 
+class UpperCaseCharField(models.CharField):
+    """Text stored trimmed and upper-cased whichever path writes it (VINs, plates)."""
+
+    @staticmethod
+    def normalize(value):
+        return value.strip().upper() if isinstance(value, str) else value
+
+    def to_python(self, value):
+        return self.normalize(super().to_python(value))
+
+    def pre_save(self, model_instance, add):
+        value = self.to_python(super().pre_save(model_instance, add))
+        setattr(model_instance, self.attname, value)
+        return value
+
+
 class Vehicle(TimeStampedModel):
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name="vehicles")
-    vin = models.CharField(max_length=32, unique=True)
-    license_plate = models.CharField(max_length=20)
+    vin = UpperCaseCharField(max_length=32, unique=True)
+    # Upper-cased so the plate prefix filter can seek the (license_plate, id) index.
+    license_plate = UpperCaseCharField(max_length=20)
     make = models.CharField(max_length=120)
     model = models.CharField(max_length=120)
     year = models.PositiveIntegerField(validators=[MinValueValidator(1900), MaxValueValidator(timezone.now().year + 1)])
@@ -106,6 +131,11 @@ class Vehicle(TimeStampedModel):
         ordering = ["customer", "license_plate"]
         indexes = [
             models.Index(fields=["customer", "vehicle_type"]),
+            models.Index(fields=["vehicle_type"]),
+            models.Index(fields=["license_plate", "id"]),
+            models.Index(fields=["updated_at"]),
+            # Case-insensitive duplicate checks, which also match rows stored before VINs were normalized.
+            models.Index(Upper("vin"), name="portal_vehicle_vin_upper"),
         ]
 
     def __str__(self) -> str:
@@ -139,10 +169,22 @@ class VehicleAssignment(TimeStampedModel):
     class Meta:
         unique_together = ("vehicle", "inspector", "scheduled_for")
         ordering = ["-scheduled_for"]
+        indexes = [
+            models.Index(fields=["scheduled_for", "id"]),
+            models.Index(fields=["inspector", "scheduled_for", "id"]),
+            models.Index(fields=["status", "scheduled_for", "id"]),
+            models.Index(fields=["updated_at"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.vehicle} -> {self.inspector} on {self.scheduled_for}"
 
+    def save(self, *args, **kwargs):
+        # pre_save books the inspector's daily slot (portal.signals); the
+        # booking must roll back with the row if the write fails.
+        with transaction.atomic(using=kwargs.get("using") or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
+
 
 class InspectionCategory(TimeStampedModel):
     code = models.CharField(max_length=64, unique=True)
@@ -208,6 +250,10 @@ class Inspection(TimeStampedModel):
         indexes = [
             models.Index(fields=["status"]),
             models.Index(fields=["customer", "created_at"]),
+            models.Index(fields=["created_at", "id"]),
+            models.Index(fields=["inspector", "created_at", "id"]),
+            models.Index(fields=["status", "created_at", "id"]),
+            models.Index(fields=["updated_at"]),
         ]
 
     def __str__(self) -> str:
@@ -251,6 +297,38 @@ class InspectionPhoto(TimeStampedModel):
         return f"Photo for {self.response}"
 
 
+class PhotoUpload(TimeStampedModel):
+    """Resumable photo upload; the finished file is attached to a response by id."""
+
+    STATUS_UPLOADING = "uploading"
+    STATUS_COMPLETE = "complete"
+    STATUS_ATTACHED = "attached"
+
+    STATUS_CHOICES = [
+        (STATUS_UPLOADING, "Uploading"),
+        (STATUS_COMPLETE, "Complete"),
+        (STATUS_ATTACHED, "Attached"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(PortalUser, on_delete=models.CASCADE, related_name="photo_uploads")
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    total_size = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_UPLOADING)
+    file = models.FileField(upload_to="inspection_photos/%Y/%m/%d", blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "updated_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"Upload {self.id} ({self.received_bytes}/{self.total_size} bytes)"
+
+
 class CustomerReport(TimeStampedModel):
     inspection = models.OneToOneField(Inspection, on_delete=models.CASCADE, related_name="customer_report")
     summary = models.TextField()
@@ -262,3 +340,170 @@ class CustomerReport(TimeStampedModel):
 
     def __str__(self) -> str:
         return f"Customer report for {self.inspection.reference}"
+
+
+class SyncTombstone(models.Model):
+    """Marker left behind when a row the mobile app syncs is deleted."""
+
+    MODEL_VEHICLE = "vehicle"
+    MODEL_ASSIGNMENT = "assignment"
+    MODEL_INSPECTION = "inspection"
+
+    MODEL_CHOICES = [
+        (MODEL_VEHICLE, "Vehicle"),
+        (MODEL_ASSIGNMENT, "Vehicle Assignment"),
+        (MODEL_INSPECTION, "Inspection"),
+    ]
+
+    model = models.CharField(max_length=24, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    # Plain ids rather than foreign keys: the owning rows may be gone too.
+    customer_id = models.BigIntegerField(null=True, blank=True)
+    inspector_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["deleted_at"]
+        indexes = [
+            models.Index(fields=["deleted_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.model} #{self.object_id} deleted at {self.deleted_at}"
+
+
+class ReportJob(TimeStampedModel):
+    """Queued customer report generation for one inspection."""
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    inspection = models.ForeignKey(Inspection, on_delete=models.CASCADE, related_name="report_jobs")
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=64, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "available_at"]),
+        ]
+        constraints = [
+            # At most one waiting job per inspection: repeated enqueues coalesce.
+            models.UniqueConstraint(
+                fields=["inspection"],
+                condition=models.Q(status="queued"),
+                name="portal_reportjob_one_queued_per_inspection",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"Report job for {self.inspection_id} ({self.status})"
+
+
+class DashboardCounter(models.Model):
+    """Materialized row count read by the admin dashboard (see ``portal.counters``)."""
+
+    key = models.CharField(max_length=64, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["key"]
+
+    def __str__(self) -> str:
+        return f"{self.key} = {self.value}"
+
+
+class InspectorDailyLoad(models.Model):
+    """Assignments booked per inspector per day, maintained alongside the assignments (see ``portal.capacity``)."""
+
+    inspector = models.ForeignKey(InspectorProfile, on_delete=models.CASCADE, related_name="daily_loads")
+    day = models.DateField()
+    assigned = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["day", "inspector"]
+        unique_together = ("inspector", "day")
+        indexes = [models.Index(fields=["day", "inspector"])]
+
+    def __str__(self) -> str:
+        return f"{self.inspector} on {self.day}: {self.assigned}"
+
+
+class FailureRollup(models.Model):
+    """Daily checklist outcome totals for one analytics dimension value."""
+
+    DIMENSION_ITEM = "item"
+    DIMENSION_CATEGORY = "category"
+    DIMENSION_VEHICLE_TYPE = "vehicle_type"
+    DIMENSION_CUSTOMER = "customer"
+
+    DIMENSION_CHOICES = [
+        (DIMENSION_ITEM, "Checklist item"),
+        (DIMENSION_CATEGORY, "Category"),
+        (DIMENSION_VEHICLE_TYPE, "Vehicle type"),
+        (DIMENSION_CUSTOMER, "Customer"),
+    ]
+
+    day = models.DateField()
+    dimension = models.CharField(max_length=24, choices=DIMENSION_CHOICES)
+    # Checklist item / category / customer id, or the vehicle type itself.
+    key = models.CharField(max_length=120)
+    responses = models.PositiveIntegerField(default=0)
+    checks = models.PositiveIntegerField(default=0, help_text="Responses other than not applicable.")
+    failures = models.PositiveIntegerField(default=0)
+    inspections = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["dimension", "day", "key"]
+        unique_together = ("dimension", "key", "day")
+        indexes = [
+            models.Index(fields=["dimension", "day"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.dimension}={self.key} on {self.day}: {self.failures}/{self.checks}"
+
+
+class RolledUpInspection(models.Model):
+    """Marks an inspection whose responses are already counted in ``FailureRollup``."""
+
+    inspection = models.OneToOneField(
+        Inspection, on_delete=models.CASCADE, primary_key=True, related_name="failure_rollup"
+    )
+    day = models.DateField()
+    rolled_up_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f"Inspection {self.inspection_id} rolled up into {self.day}"
+
+
+class ChecklistVersion(models.Model):
+    """A checklist definition applied by ``portal.checklists.import_checklist``."""
+
+    version = models.PositiveIntegerField(unique=True)
+    checksum = models.CharField(max_length=64)
+    source = models.CharField(max_length=255, blank=True)
+    changes = models.JSONField(default=dict, help_text="Counts from the import's diff.")
+    applied_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-version"]
+
+    def __str__(self) -> str:
+        return f"Checklist v{self.version}"
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(value, pk) -> str:
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    payload = json.dumps([value, pk], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii")
+
+
+def decode_cursor(encoded: str) -> tuple[object, int]:
+    """Inverse of ``encode_cursor``; raises ``ValueError`` on malformed input."""
+
+    try:
+        value, pk = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+        return value, int(pk)
+    except (TypeError, ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def coerce_position(model, field: str, position: tuple[object, int]) -> tuple[object, int]:
+    """Convert a decoded cursor value to the ordering column's Python type.
+
+    Cursors come back from clients, so a well-formed one can still carry a
+    value of the wrong type; that raises ``ValueError`` here instead of an
+    error from inside the queryset filter.
+    """
+
+    value, pk = position
+    try:
+        value = model._meta.get_field(field).to_python(value)
+    except FieldDoesNotExist:
+        pass
+    except (ValidationError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if value is None:
+        raise ValueError("Invalid cursor")
+    return value, pk
+
+
+def keyset_seek(queryset, ordering: str, position=None):
+    """Order ``queryset`` by ``ordering`` plus ``id`` and start after ``position``.
+
+    Raises ``ValueError`` when ``position`` does not fit the ordering column.
+    """
+
+    descending = ordering.startswith("-")
+    field = ordering.lstrip("-")
+    prefix = "-" if descending else ""
+    queryset = queryset.order_by(f"{prefix}{field}", f"{prefix}id")
+    if position is not None:
+        value, pk = coerce_position(queryset.model, field, position)
+        if descending:
+            seek = Q(**{f"{field}__lt": value}) | Q(**{field: value, "id__lt": pk})
+        else:
+            seek = Q(**{f"{field}__gt": value}) | Q(**{field: value, "id__gt": pk})
+        queryset = queryset.filter(seek)
+    return queryset
+
+
+def keyset_page(queryset, ordering: str, cursor: str | None, page_size: int) -> tuple[list, str | None]:
+    """One page of model instances and the cursor for the next one (``None`` at the end)."""
+
+    position = decode_cursor(cursor) if cursor else None
+    rows = list(keyset_seek(queryset, ordering, position)[: page_size + 1])
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, ordering.lstrip("-")), last.pk)
+
+
+class KeysetPagination(BasePagination):
+    """Opt-in keyset (cursor) pagination.
+
+    - Only paginates when the request carries ``cursor`` or ``page_size``;
+      otherwise the plain list response is returned unchanged
+    - Orders by the view's ``keyset_ordering`` column plus ``id`` as tie-breaker
+    - Each page is a ``WHERE (column, id) > (last_column, last_id)`` seek, so the
+      cost does not depend on how deep the client has scrolled
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 500
+    default_ordering = "-id"
+    invalid_cursor_message = "Invalid cursor"
+
+    def is_requested(self, request) -> bool:
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_ordering(self, view) -> tuple[str, bool]:
+        ordering = getattr(view, "keyset_ordering", self.default_ordering)
+        descending = ordering.startswith("-")
+        return ordering.lstrip("-"), descending
+
+    def get_page_size(self, request) -> int:
+        raw = request.query_params.get(self.page_size_query_param)
+        if raw:
+            try:
+                value = int(raw)
+            except ValueError:
+                value = 0
+            if value > 0:
+                return min(value, self.max_page_size)
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+        self.request = request
+        self.field, self.descending = self.get_ordering(view)
+        self.page_size_value = self.get_page_size(request)
+
+        ordering = f"-{self.field}" if self.descending else self.field
+        try:
+            queryset = keyset_seek(queryset, ordering, self.decode_cursor(request))
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+        rows = list(queryset[: self.page_size_value + 1])
+        self.has_next = len(rows) > self.page_size_value
+        self.page = rows[: self.page_size_value]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        if isinstance(last, dict):
+            cursor = self.encode_cursor(last[self.field], last["id"])
+        else:
+            cursor = self.encode_cursor(getattr(last, self.field), last.pk)
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    @staticmethod
+    def encode_cursor(value, pk) -> str:
+        return encode_cursor(value, pk)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            return decode_cursor(encoded)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
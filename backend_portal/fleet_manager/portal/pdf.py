@@ -0,0 +1,268 @@
+"""A minimal PDF writer and the customer report layout.
+
+Only what the report needs: Helvetica text, JPEG thumbnails, rules and page
+breaks. Output is deterministic (no timestamps), so identical input renders
+identical bytes. This module must not import Django: render pool workers
+are spawned fresh and only ever call ``write_report``.
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+import textwrap
+import zlib
+from pathlib import Path
+
+from PIL import Image, UnidentifiedImageError
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792  # US Letter, in points
+MARGIN = 54
+FOOTER_HEIGHT = 24
+# Rough Helvetica advance per point of font size; only used to wrap lines.
+AVERAGE_CHAR_WIDTH = {False: 0.52, True: 0.58}
+
+THUMBNAIL_PIXELS = 240
+THUMBNAIL_POINTS = 96
+
+RESULT_STYLES = {
+    "pass": ("PASS", (0.1, 0.45, 0.2)),
+    "fail": ("FAIL", (0.75, 0.1, 0.1)),
+    "not_applicable": ("N/A", (0.4, 0.4, 0.4)),
+}
+
+
+def _pdf_string(text: str) -> bytes:
+    data = text.replace("\t", " ").encode("cp1252", "replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _number(value: float) -> bytes:
+    return (f"{value:.2f}".rstrip("0").rstrip(".") or "0").encode()
+
+
+class PDFDocument:
+    """Flowing layout on US Letter pages; ``y`` is the top of the free space on the current page."""
+
+    def __init__(self, title: str = ""):
+        self.title = title
+        self.pages: list[list[bytes]] = []
+        self.page_images: list[list[str]] = []
+        self.images: list[tuple[str, bytes, int, int]] = []
+        self.y = 0.0
+        self.new_page()
+
+    @property
+    def width(self) -> float:
+        return PAGE_WIDTH - 2 * MARGIN
+
+    def new_page(self) -> None:
+        self.pages.append([])
+        self.page_images.append([])
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def ensure_room(self, height: float) -> None:
+        if self.y - height < MARGIN + FOOTER_HEIGHT:
+            self.new_page()
+
+    def text(self, x: float, y: float, text: str, size: float = 10, bold: bool = False, color=None) -> None:
+        self.pages[-1].extend(_text_ops(x, y, text, size, bold, color))
+
+    def paragraph(self, text: str, size: float = 10, bold: bool = False, indent: float = 0, color=None) -> None:
+        leading = size * 1.35
+        columns = max(int((self.width - indent) / (size * AVERAGE_CHAR_WIDTH[bold])), 1)
+        for source in text.splitlines() or [""]:
+            for line in textwrap.wrap(source, columns) or [""]:
+                self.ensure_room(leading)
+                self.y -= leading
+                self.text(MARGIN + indent, self.y, line, size, bold, color)
+
+    def spacer(self, height: float) -> None:
+        self.ensure_room(height)
+        self.y -= height
+
+    def rule(self, gap: float = 6) -> None:
+        self.ensure_room(2 * gap)
+        self.y -= gap
+        self.pages[-1].append(
+            b"0.75 G 0.5 w " + _number(MARGIN) + b" " + _number(self.y) + b" m "
+            + _number(PAGE_WIDTH - MARGIN) + b" " + _number(self.y) + b" l S 0 G"
+        )
+        self.y -= gap
+
+    def image_row(self, images: list[tuple[bytes, int, int]], box: float = THUMBNAIL_POINTS, indent: float = 0, gap: float = 8):
+        """Lay JPEGs out left to right in ``box``-sized cells, wrapping onto new rows as needed."""
+
+        per_row = max(int((self.width - indent + gap) // (box + gap)), 1)
+        for start in range(0, len(images), per_row):
+            self.ensure_room(box + gap)
+            self.y -= box + gap
+            for column, (jpeg, width, height) in enumerate(images[start : start + per_row]):
+                scale = box / max(width, height)
+                name = f"Im{len(self.images) + 1}"
+                self.images.append((name, jpeg, width, height))
+                self.page_images[-1].append(name)
+                x = MARGIN + indent + column * (box + gap)
+                self.pages[-1].append(
+                    b"q " + _number(width * scale) + b" 0 0 " + _number(height * scale) + b" "
+                    + _number(x) + b" " + _number(self.y + gap / 2) + b" cm /" + name.encode() + b" Do Q"
+                )
+
+    def render(self) -> bytes:
+        total = len(self.pages)
+        gray = (0.45, 0.45, 0.45)
+        for number, ops in enumerate(self.pages, start=1):
+            label = f"Page {number} of {total}"
+            if self.title:
+                ops.extend(_text_ops(MARGIN, MARGIN / 2, self.title, 8, False, gray))
+            label_x = PAGE_WIDTH - MARGIN - len(label) * 8 * AVERAGE_CHAR_WIDTH[False]
+            ops.extend(_text_ops(label_x, MARGIN / 2, label, 8, False, gray))
+        return _serialize(self)
+
+
+def _text_ops(x: float, y: float, text: str, size: float, bold: bool, color) -> list[bytes]:
+    ops = []
+    if color:
+        ops.append(b" ".join(_number(part) for part in color) + b" rg")
+    ops.append(
+        b"BT /" + (b"F2 " if bold else b"F1 ") + _number(size) + b" Tf "
+        + _number(x) + b" " + _number(y) + b" Td " + _pdf_string(text) + b" Tj ET"
+    )
+    if color:
+        ops.append(b"0 g")
+    return ops
+
+
+def _serialize(document: PDFDocument) -> bytes:
+    objects: list[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    def stream(header: bytes, data: bytes) -> bytes:
+        return b"<< " + header + b" /Length " + str(len(data)).encode() + b" >>\nstream\n" + data + b"\nendstream"
+
+    add(b"<< /Type /Catalog /Pages 2 0 R >>")
+    add(b"")  # Pages; filled in once the page objects are numbered.
+    regular = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    bold = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+    image_ids = {
+        name: add(
+            stream(
+                f"/Type /XObject /Subtype /Image /Width {width} /Height {height} "
+                f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode".encode(),
+                jpeg,
+            )
+        )
+        for name, jpeg, width, height in document.images
+    }
+    page_ids = []
+    for ops, names in zip(document.pages, document.page_images):
+        content = add(stream(b"/Filter /FlateDecode", zlib.compress(b"\n".join(ops))))
+        xobjects = b" ".join(f"/{name} {image_ids[name]} 0 R".encode() for name in names)
+        page_ids.append(
+            add(
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] ".encode()
+                + f"/Resources << /Font << /F1 {regular} 0 R /F2 {bold} 0 R >> ".encode()
+                + b"/XObject << " + xobjects + b" >> >> "
+                + f"/Contents {content} 0 R >>".encode()
+            )
+        )
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{pk} 0 R' for pk in page_ids)}] /Count {len(page_ids)} >>".encode()
+    info = add(b"<< /Title " + _pdf_string(document.title) + b" /Producer (Fleet Manager) >>")
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        output.write(f"{offset:010d} 00000 n \n".encode())
+    output.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info {info} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return output.getvalue()
+
+
+def thumbnail(path: str, pixels: int = THUMBNAIL_PIXELS) -> tuple[bytes, int, int] | None:
+    """A JPEG thumbnail of the image at ``path``; ``None`` if it is missing or unreadable."""
+
+    try:
+        with Image.open(path) as image:
+            image.thumbnail((pixels, pixels))
+            image = image.convert("RGB")
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=80)
+            return buffer.getvalue(), image.width, image.height
+    except (OSError, UnidentifiedImageError):
+        return None
+
+
+def render_report(payload: dict) -> bytes:
+    """Lay out a customer report built by ``portal.reports.report_payloads``."""
+
+    vehicle = payload["vehicle"]
+    document = PDFDocument(title=f"Inspection {payload['reference']}")
+    document.paragraph("Vehicle inspection report", size=18, bold=True)
+    document.paragraph(payload["customer"], size=12)
+    document.spacer(6)
+    for label, value in (
+        ("Vehicle", f"{vehicle['license_plate']} - {vehicle['year']} {vehicle['make']} {vehicle['model']}"),
+        ("VIN", vehicle["vin"]),
+        ("Inspector", payload["inspector"]),
+        ("Status", payload["status"]),
+        ("Completed", payload["completed_at"] or "-"),
+        ("Odometer", f"{payload['odometer_reading']:,}"),
+        ("Reference", payload["reference"]),
+    ):
+        document.paragraph(f"{label}: {value}", size=10)
+    document.rule()
+
+    document.paragraph("Summary", size=13, bold=True)
+    document.paragraph(payload["summary"])
+    if payload["recommended_actions"]:
+        document.spacer(6)
+        document.paragraph("Recommended actions", size=13, bold=True)
+        document.paragraph(payload["recommended_actions"])
+    if payload["general_notes"]:
+        document.spacer(6)
+        document.paragraph("Inspector notes", size=13, bold=True)
+        document.paragraph(payload["general_notes"])
+
+    files = payload.get("files", {})
+    for category in payload["categories"]:
+        document.rule()
+        document.paragraph(category["name"], size=13, bold=True)
+        for finding in category["findings"]:
+            label, color = RESULT_STYLES.get(finding["result"], (finding["result"].upper(), None))
+            heading = f"{label}  {finding['title']}"
+            if finding["result"] == "fail":
+                heading += f" (severity {finding['severity']})"
+            document.spacer(2)
+            document.paragraph(heading, size=10, bold=True, color=color)
+            if finding["notes"]:
+                document.paragraph(finding["notes"], size=9, indent=12)
+            thumbnails = [thumb for thumb in (thumbnail(files[photo]) for photo in finding["photos"] if photo in files) if thumb]
+            if thumbnails:
+                document.image_row(thumbnails, indent=12)
+    return document.render()
+
+
+def write_report(payload: dict, path: str) -> str:
+    """Render ``payload`` to ``path`` atomically; the unit of work run in the render pool."""
+
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    data = render_report(payload)
+    handle, temporary = tempfile.mkstemp(dir=target.parent, suffix=".part")
+    try:
+        with os.fdopen(handle, "wb") as output:
+            output.write(data)
+        os.replace(temporary, target)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+    return str(target)
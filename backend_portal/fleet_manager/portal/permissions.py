@@ -1,7 +1,6 @@
 from rest_framework.permissions import BasePermission
 
-from rest_framework.permissions import BasePermission
-
+from .authentication import get_principal
 from .models import PortalUser
 
 
@@ -14,29 +13,24 @@ def get_portal_profile(user):
 
 class IsAdmin(BasePermission):
     def has_permission(self, request, view):
-        profile = get_portal_profile(request.user)
-        return bool(profile and profile.role == PortalUser.ROLE_ADMIN)
+        return get_principal(request).has_role(PortalUser.ROLE_ADMIN)
 
 
 class IsInspector(BasePermission):
     def has_permission(self, request, view):
-        profile = get_portal_profile(request.user)
-        return bool(profile and profile.role == PortalUser.ROLE_INSPECTOR)
+        return get_principal(request).has_role(PortalUser.ROLE_INSPECTOR)
 
 
 class IsCustomer(BasePermission):
     def has_permission(self, request, view):
-        profile = get_portal_profile(request.user)
-        return bool(profile and profile.role == PortalUser.ROLE_CUSTOMER)
+        return get_principal(request).has_role(PortalUser.ROLE_CUSTOMER)
 
 
 class IsInspectorOrAdmin(BasePermission):
     def has_permission(self, request, view):
-        profile = get_portal_profile(request.user)
-        return bool(profile and profile.role in [PortalUser.ROLE_INSPECTOR, PortalUser.ROLE_ADMIN])
+        return get_principal(request).has_role(PortalUser.ROLE_INSPECTOR, PortalUser.ROLE_ADMIN)
 
 
 class IsCustomerOrAdmin(BasePermission):
     def has_permission(self, request, view):
-        profile = get_portal_profile(request.user)
-        return bool(profile and profile.role in [PortalUser.ROLE_CUSTOMER, PortalUser.ROLE_ADMIN])
+        return get_principal(request).has_role(PortalUser.ROLE_CUSTOMER, PortalUser.ROLE_ADMIN)
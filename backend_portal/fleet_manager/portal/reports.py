@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Iterable
+
+from django.conf import settings
+from django.db.models import QuerySet
+
+from .models import Inspection, InspectionItemResponse, InspectionPhoto
+from .pdf import write_report
+from .transactions import read_transaction
+
+logger = logging.getLogger(__name__)
+
+# Part of every content hash: bump it when the layout changes so cached files are re-rendered.
+REPORT_PDF_VERSION = 1
+REPORT_RELATED = ("vehicle", "customer", "inspector__profile__user", "customer_report")
+
+
+def pdf_directory() -> Path:
+    return Path(getattr(settings, "PORTAL_REPORT_PDF_DIR", None) or Path(settings.MEDIA_ROOT) / "report_pdfs")
+
+
+def render_processes() -> int:
+    return getattr(settings, "PORTAL_REPORT_PDF_PROCESSES", 2)
+
+
+class ReportRenderFailed(Exception):
+    """Rendering a report PDF raised; the cause is chained and logged."""
+
+
+def report_payloads(inspections: Iterable[Inspection]) -> dict[int, dict]:
+    """Everything the PDF shows, as plain data, for inspections with a published report.
+
+    Load the inspections with ``select_related(*REPORT_RELATED)``; responses
+    and photos for the whole batch then cost one query each. ``files`` maps
+    photo names to local paths and is left out of the content hash.
+    """
+
+    inspections = [inspection for inspection in inspections if getattr(inspection, "customer_report", None)]
+    if not inspections:
+        return {}
+    ids = [inspection.pk for inspection in inspections]
+    responses = (
+        InspectionItemResponse.objects.filter(inspection_id__in=ids)
+        .order_by(
+            "inspection_id", "checklist_item__category__display_order", "checklist_item__category__name", "checklist_item__code"
+        )
+        .values_list(
+            "id", "inspection_id", "checklist_item__category__name", "checklist_item__code", "checklist_item__title",
+            "result", "severity", "notes",
+        )
+    )
+    storage = InspectionPhoto._meta.get_field("image").storage
+    photos: dict[int, list[str]] = {}
+    files: dict[int, dict[str, str]] = {}
+    categories: dict[int, list[dict]] = {}
+    # Responses and photos from one snapshot, so the two queries agree.
+    with read_transaction(using=InspectionItemResponse.objects.db):
+        for response_id, inspection_id, name in (
+            InspectionPhoto.objects.filter(response__inspection_id__in=ids)
+            .order_by("response_id", "created_at", "id")
+            .values_list("response_id", "response__inspection_id", "image")
+        ):
+            photos.setdefault(response_id, []).append(name)
+            try:
+                files.setdefault(inspection_id, {})[name] = storage.path(name)
+            except NotImplementedError:
+                # Remote storage: the thumbnail is skipped rather than downloaded in the request.
+                pass
+
+        for response_id, inspection_id, category, code, title, result, severity, notes in responses:
+            findings = categories.setdefault(inspection_id, [])
+            if not findings or findings[-1]["name"] != category:
+                findings.append({"name": category, "findings": []})
+            findings[-1]["findings"].append(
+                {
+                    "code": code,
+                    "title": title,
+                    "result": result,
+                    "severity": severity,
+                    "notes": notes,
+                    "photos": photos.get(response_id, []),
+                }
+            )
+
+    payloads = {}
+    for inspection in inspections:
+        vehicle = inspection.vehicle
+        user = inspection.inspector.profile.user
+        report = inspection.customer_report
+        payloads[inspection.pk] = {
+            "version": REPORT_PDF_VERSION,
+            "reference": str(inspection.reference),
+            "status": inspection.get_status_display(),
+            "customer": inspection.customer.legal_name,
+            "vehicle": {
+                "vin": vehicle.vin,
+                "license_plate": vehicle.license_plate,
+                "make": vehicle.make,
+                "model": vehicle.model,
+                "year": vehicle.year,
+            },
+            "inspector": f"{user.get_full_name() or user.username} ({inspection.inspector.badge_id})",
+            "completed_at": inspection.completed_at.isoformat(timespec="minutes") if inspection.completed_at else None,
+            "odometer_reading": inspection.odometer_reading,
+            "general_notes": inspection.general_notes,
+            "summary": report.summary,
+            "recommended_actions": report.recommended_actions,
+            "categories": categories.get(inspection.pk, []),
+            "files": files.get(inspection.pk, {}),
+        }
+    return payloads
+
+
+def content_hash(payload: dict) -> str:
+    content = {key: value for key, value in payload.items() if key != "files"}
+    return hashlib.sha256(json.dumps(content, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+def cached_pdf_path(digest: str) -> Path:
+    return pdf_directory() / digest[:2] / f"{digest}.pdf"
+
+
+class RenderPool:
+    """Renders report PDFs in worker processes, at most once at a time per content hash.
+
+    Workers are spawned rather than forked, so they inherit no database
+    connections or locks; they only run ``portal.pdf.write_report``, which
+    needs neither Django nor settings. With ``processes=0`` the render runs
+    inline, which is what tests and single-process deployments want.
+    """
+
+    def __init__(self, processes: int):
+        self.processes = processes
+        self._executor: ProcessPoolExecutor | None = None
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, payload: dict, digest: str | None = None) -> Future:
+        digest = digest or content_hash(payload)
+        path = str(cached_pdf_path(digest))
+        with self._lock:
+            future = self._pending.get(digest)
+            if future is not None:
+                return future
+            if self.processes <= 0:
+                future = Future()
+                try:
+                    future.set_result(write_report(payload, path))
+                except Exception as exc:
+                    logger.exception("Rendering report PDF %s failed", digest)
+                    future.set_exception(exc)
+                return future
+            try:
+                future = self._pool().submit(write_report, payload, path)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM-killed); start over with a fresh pool.
+                self._executor = None
+                future = self._pool().submit(write_report, payload, path)
+            self._pending[digest] = future
+        future.add_done_callback(lambda done: self._finished(digest, done))
+        return future
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.processes, mp_context=multiprocessing.get_context("spawn"))
+        return self._executor
+
+    def _finished(self, digest: str, future: Future) -> None:
+        with self._lock:
+            self._pending.pop(digest, None)
+        if not future.cancelled() and future.exception() is not None:
+            logger.error("Rendering report PDF %s failed", digest, exc_info=future.exception())
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_render_pool: RenderPool | None = None
+_render_pool_lock = threading.Lock()
+
+
+def render_pool() -> RenderPool:
+    """The process-wide pool, sized by ``PORTAL_REPORT_PDF_PROCESSES``."""
+
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None or _render_pool.processes != render_processes():
+            _render_pool = RenderPool(render_processes())
+        return _render_pool
+
+
+def request_report_pdf(inspection: Inspection) -> tuple[Path | None, str | None]:
+    """``(path, digest)`` of the cached PDF, rendering it in the pool on a miss.
+
+    Returns ``(None, digest)`` while the render is in flight and
+    ``(None, None)`` if the inspection has no published report yet. Raises
+    ``ReportRenderFailed`` if the render it finds finished has failed.
+    """
+
+    payload = report_payloads([inspection]).get(inspection.pk)
+    if payload is None:
+        return None, None
+    digest = content_hash(payload)
+    path = cached_pdf_path(digest)
+    try:
+        # Serving a file marks it as recently used, so prune_report_pdfs keeps it.
+        os.utime(path)
+        return path, digest
+    except FileNotFoundError:
+        pass
+    future = render_pool().submit(payload, digest)
+    if future.done():
+        if future.exception() is not None:
+            raise ReportRenderFailed(digest) from future.exception()
+        return path, digest
+    return None, digest
+
+
+def prune_report_pdfs(days: int) -> int:
+    """Delete cached PDFs neither rendered nor served for ``days`` days, and stale partial renders."""
+
+    cutoff = time.time() - days * 24 * 60 * 60
+    removed = 0
+    for path in pdf_directory().glob("*/*"):
+        if path.suffix not in (".pdf", ".part"):
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            # Replaced or pruned concurrently.
+            continue
+    return removed
+
+
+def render_report_pdfs(queryset: QuerySet, processes: int | None = None, batch_size: int = 200) -> dict[str, int]:
+    """Pre-render PDFs for every inspection in ``queryset`` that has a report; cached ones are skipped."""
+
+    pool = RenderPool(render_processes() if processes is None else processes)
+    totals = {"rendered": 0, "cached": 0, "failed": 0}
+    queryset = queryset.filter(customer_report__isnull=False).select_related(*REPORT_RELATED).order_by("id")
+    last_id = 0
+    try:
+        while True:
+            batch = list(queryset.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].pk
+            futures = []
+            for payload in report_payloads(batch).values():
+                digest = content_hash(payload)
+                if cached_pdf_path(digest).exists():
+                    totals["cached"] += 1
+                else:
+                    futures.append(pool.submit(payload, digest))
+            # Drain each batch before loading the next so queued payloads stay bounded.
+            for future in futures:
+                try:
+                    future.result()
+                    totals["rendered"] += 1
+                except Exception:
+                    totals["failed"] += 1
+    finally:
+        pool.shutdown()
+    return totals
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import hashlib
+import itertools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.http import HttpRequest
+
+PRIMARY = "default"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+REPLICA_ACTIONS = ("list", "retrieve")
+PIN_COOKIE = "portal_primary"
+DEFAULT_PIN_SECONDS = 10
+DEFAULT_PIN_CACHE = "replica_pins"
+# Backends whose entries live in one worker process: a pin stored there is
+# invisible to the worker that serves the client's next request.
+PROCESS_LOCAL_CACHES = frozenset(
+    {"django.core.cache.backends.locmem.LocMemCache", "django.core.cache.backends.dummy.DummyCache"}
+)
+
+# Sessions and tokens are created by one request and read by the very next one,
+# often from a client that keeps no cookies, so they never come from a replica.
+PRIMARY_ONLY_APPS = frozenset({"sessions", "authtoken"})
+
+
+@dataclass
+class RoutingState:
+    """Where the current request reads from; ``wrote`` flips it back to the primary."""
+
+    alias: str | None = None
+    wrote: bool = False
+
+
+current_routing: ContextVar[RoutingState | None] = ContextVar("portal_db_routing", default=None)
+
+_rotation = itertools.count()
+
+
+def replica_aliases() -> list[str]:
+    return list(getattr(settings, "PORTAL_READ_REPLICAS", []))
+
+
+def pin_seconds() -> int:
+    return getattr(settings, "PORTAL_REPLICA_PIN_SECONDS", DEFAULT_PIN_SECONDS)
+
+
+def pin_cache_alias() -> str:
+    return getattr(settings, "PORTAL_REPLICA_PIN_CACHE", DEFAULT_PIN_CACHE)
+
+
+def check_pin_cache(app_configs=None, **kwargs) -> list[checks.CheckMessage]:
+    """Token clients are pinned through a cache, which every worker must share."""
+
+    if not replica_aliases():
+        return []
+    alias = pin_cache_alias()
+    config = settings.CACHES.get(alias)
+    if config is None:
+        return [
+            checks.Error(
+                f"PORTAL_REPLICA_PIN_CACHE names the cache {alias!r}, which is not configured.",
+                hint="Add it to CACHES, backed by a store every worker process shares.",
+                id="portal.E001",
+            )
+        ]
+    if config.get("BACKEND") in PROCESS_LOCAL_CACHES:
+        return [
+            checks.Error(
+                f"The replica pin cache {alias!r} is local to each process, so a write handled by one "
+                "worker would not pin the client's next read in another.",
+                hint="Use a shared backend (file-based, database, Redis or Memcached).",
+                id="portal.E002",
+            )
+        ]
+    return []
+
+
+def choose_replica() -> str | None:
+    aliases = replica_aliases()
+    if not aliases:
+        return None
+    return aliases[next(_rotation) % len(aliases)]
+
+
+@contextmanager
+def reading_from(alias: str | None):
+    """Send reads made inside the block to ``alias`` (``None`` means the primary)."""
+
+    state = RoutingState(alias=alias)
+    token = current_routing.set(state)
+    try:
+        yield state
+    finally:
+        current_routing.reset(token)
+
+
+class ReplicaRouter:
+    """Routes reads to a replica only while a request has opted in.
+
+    Everything outside an opted-in request (commands, workers, shell, tests)
+    keeps reading from the primary, and the first write inside one pins the
+    rest of that request to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = current_routing.get()
+        if state is None or state.alias is None:
+            # No opinion: Django falls back to the instance hint, then "default".
+            return None
+        if state.wrote or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return PRIMARY
+        return state.alias
+
+    def db_for_write(self, model, **hints):
+        state = current_routing.get()
+        if state is not None:
+            state.wrote = True
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *replica_aliases()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema from the primary, never from migrate.
+        if db in replica_aliases():
+            return False
+        return None
+
+
+def replica_eligible(view_func, method: str) -> bool:
+    """Whether a resolved view only reads and may be served from a replica.
+
+    - DRF viewsets: the actions listed in the class's ``replica_actions``
+      (``list`` and ``retrieve`` unless overridden)
+    - Other views: those marked with ``@replica_reads`` or, for APIViews, a
+      ``replica_reads = True`` class attribute
+    """
+
+    if method not in SAFE_METHODS:
+        return False
+    if getattr(view_func, "replica_reads", False):
+        return True
+    cls = getattr(view_func, "cls", None)
+    if cls is None:
+        return False
+    actions = getattr(view_func, "actions", None)
+    if actions is None:
+        return bool(getattr(cls, "replica_reads", False))
+    action = actions.get(method.lower())
+    return action in getattr(cls, "replica_actions", REPLICA_ACTIONS)
+
+
+def replica_reads(view_func):
+    """Mark a function view as read-only so it may be served from a replica."""
+
+    view_func.replica_reads = True
+    return view_func
+
+
+def _credential_key(request: HttpRequest) -> str | None:
+    header = request.META.get("HTTP_AUTHORIZATION")
+    if not header:
+        return None
+    return "replica-pin:" + hashlib.sha256(header.encode("utf-8")).hexdigest()
+
+
+def is_pinned(request: HttpRequest) -> bool:
+    """Whether this client wrote recently enough that a replica may not have caught up."""
+
+    try:
+        until = float(request.COOKIES.get(PIN_COOKIE, 0))
+    except ValueError:
+        until = 0
+    if until > time.time():
+        return True
+    key = _credential_key(request)
+    return bool(key and caches[pin_cache_alias()].get(key))
+
+
+def pin(request: HttpRequest, response) -> None:
+    """Keep the client on the primary for the next ``PORTAL_REPLICA_PIN_SECONDS``.
+
+    Browsers carry the pin in a cookie; token clients, which often drop
+    cookies, are pinned by their ``Authorization`` header in the
+    ``PORTAL_REPLICA_PIN_CACHE`` cache, shared by every worker.
+    """
+
+    seconds = pin_seconds()
+    response.set_cookie(PIN_COOKIE, f"{time.time() + seconds:.3f}", max_age=seconds, httponly=True, samesite="Lax")
+    key = _credential_key(request)
+    if key:
+        caches[pin_cache_alias()].set(key, 1, timeout=seconds)
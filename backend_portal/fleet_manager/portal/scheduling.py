@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+import heapq
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import F, Max, Q, QuerySet
+from django.utils import timezone
+
+from .capacity import add_loads, ensure_load_rows, load_map
+from .counters import assignment_deltas, bump_counters, merge_deltas
+from .models import InspectorProfile, PortalUser, Vehicle, VehicleAssignment
+
+ASSIGNMENT_BATCH_SIZE = 500
+DEFAULT_INSPECTION_INTERVAL_DAYS = 365
+MAX_SCHEDULE_DAYS = 92
+
+# A vehicle with one of these already on the calendar is not scheduled again.
+OPEN_STATUSES = (VehicleAssignment.STATUS_ASSIGNED, VehicleAssignment.STATUS_IN_PROGRESS)
+
+
+def vehicles_due(as_of: date, interval_days: int = DEFAULT_INSPECTION_INTERVAL_DAYS, queryset: QuerySet | None = None) -> QuerySet:
+    """Vehicles never inspected or last inspected more than ``interval_days`` before ``as_of``.
+
+    Longest overdue first, never-inspected vehicles ahead of everything else.
+    """
+
+    queryset = Vehicle.objects.all() if queryset is None else queryset
+    cutoff = timezone.make_aware(datetime.combine(as_of - timedelta(days=interval_days), time.min))
+    return (
+        queryset.annotate(last_inspected=Max("inspections__completed_at"))
+        .filter(Q(last_inspected__isnull=True) | Q(last_inspected__lt=cutoff))
+        .order_by(F("last_inspected").asc(nulls_first=True), "id")
+    )
+
+
+@dataclass
+class SchedulePlan:
+    start: date
+    end: date
+    assignments: list[VehicleAssignment] = field(default_factory=list)
+    # Vehicles skipped because an open assignment already covers them.
+    already_scheduled: list[int] = field(default_factory=list)
+    # Vehicles that did not fit into the remaining capacity.
+    unscheduled: list[int] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        per_day = Counter(assignment.scheduled_for.isoformat() for assignment in self.assignments)
+        per_inspector = Counter(assignment.inspector_id for assignment in self.assignments)
+        return {
+            "start": self.start.isoformat(),
+            "end": self.end.isoformat(),
+            "scheduled": len(self.assignments),
+            "already_scheduled": len(self.already_scheduled),
+            "unscheduled": len(self.unscheduled),
+            "per_day": dict(sorted(per_day.items())),
+            "per_inspector": dict(sorted(per_inspector.items())),
+        }
+
+
+def schedule_days(start: date, end: date) -> list[date]:
+    return [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+
+
+def available_inspectors() -> dict[int, int]:
+    """Active inspectors whose user can log in, mapped to their daily capacity."""
+
+    return dict(
+        InspectorProfile.objects.filter(is_active=True, profile__user__is_active=True, max_daily_inspections__gt=0)
+        .order_by("id")
+        .values_list("id", "max_daily_inspections")
+    )
+
+
+def plan_assignments(
+    vehicle_ids: Iterable[int],
+    start: date,
+    end: date,
+    assigned_by: PortalUser | None = None,
+    lock: bool = False,
+    capacity: dict[int, int] | None = None,
+) -> SchedulePlan:
+    """Place each vehicle on the earliest day in ``start..end`` with spare capacity.
+
+    Vehicles are taken in the order given. Within a day the slot goes to the
+    inspector with the fewest assignments across the whole range so far, so
+    load evens out while days fill front to back. Each day is a heap keyed by
+    that running total, which keeps a run at O(vehicles * log inspectors) on
+    top of three queries. Booked slots come from the inspector daily load
+    table; ``lock`` holds its rows for the rest of the transaction.
+    """
+
+    plan = SchedulePlan(start, end)
+    capacity = available_inspectors() if capacity is None else capacity
+    load = load_map(capacity, start, end, lock=lock)
+    totals = Counter()
+    for (inspector_id, _day), booked in load.items():
+        totals[inspector_id] += booked
+
+    covered = set(
+        VehicleAssignment.objects.filter(status__in=OPEN_STATUSES, scheduled_for__gte=start)
+        .order_by()
+        .values_list("vehicle_id", flat=True)
+    )
+    pending = []
+    for vehicle_id in dict.fromkeys(vehicle_ids):
+        (plan.already_scheduled if vehicle_id in covered else pending).append(vehicle_id)
+
+    queue = iter(pending)
+    vehicle_id = next(queue, None)
+    for day in schedule_days(start, end):
+        if vehicle_id is None:
+            break
+        heap = [
+            (totals[inspector_id], inspector_id)
+            for inspector_id, limit in capacity.items()
+            if load.get((inspector_id, day), 0) < limit
+        ]
+        heapq.heapify(heap)
+        while heap and vehicle_id is not None:
+            _total, inspector_id = heapq.heappop(heap)
+            plan.assignments.append(
+                VehicleAssignment(
+                    vehicle_id=vehicle_id,
+                    inspector_id=inspector_id,
+                    assigned_by=assigned_by,
+                    scheduled_for=day,
+                    status=VehicleAssignment.STATUS_ASSIGNED,
+                )
+            )
+            load[(inspector_id, day)] = load.get((inspector_id, day), 0) + 1
+            totals[inspector_id] += 1
+            if load[(inspector_id, day)] < capacity[inspector_id]:
+                heapq.heappush(heap, (totals[inspector_id], inspector_id))
+            vehicle_id = next(queue, None)
+
+    if vehicle_id is not None:
+        plan.unscheduled = [vehicle_id, *queue]
+    return plan
+
+
+@transaction.atomic
+def auto_assign(
+    vehicle_ids: Iterable[int],
+    start: date,
+    end: date,
+    assigned_by: PortalUser | None = None,
+    dry_run: bool = False,
+) -> SchedulePlan:
+    """Plan ``vehicle_ids`` into ``start..end`` and insert the assignments in batches.
+
+    Planning and inserting share one transaction, and the load rows for the
+    range are locked while planning, so concurrent bookings cannot overfill
+    a day the plan has already counted.
+    """
+
+    if dry_run:
+        return plan_assignments(vehicle_ids, start, end, assigned_by=assigned_by)
+    capacity = available_inspectors()
+    days = schedule_days(start, end)
+    ensure_load_rows((inspector_id, day) for inspector_id in capacity for day in days)
+    plan = plan_assignments(vehicle_ids, start, end, assigned_by=assigned_by, lock=True, capacity=capacity)
+    if not plan.assignments:
+        return plan
+    plan.assignments = VehicleAssignment.objects.bulk_create(plan.assignments, batch_size=ASSIGNMENT_BATCH_SIZE)
+    # bulk_create sends no signals, so keep the load table and dashboard counters in step here.
+    add_loads(Counter((assignment.inspector_id, assignment.scheduled_for) for assignment in plan.assignments))
+    per_day = Counter(assignment.scheduled_for for assignment in plan.assignments)
+    bump_counters(
+        merge_deltas(*(assignment_deltas(day, VehicleAssignment.STATUS_ASSIGNED, count) for day, count in per_day.items()))
+    )
+    return plan
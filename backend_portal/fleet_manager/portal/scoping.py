@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from django.db.models import Q, QuerySet
+
+from .models import PortalUser, SyncTombstone, VehicleAssignment
+
+
+def scope_customers(profile: PortalUser | None, queryset: QuerySet) -> QuerySet:
+    if not profile:
+        return queryset.none()
+    if profile.role == PortalUser.ROLE_ADMIN:
+        return queryset
+    customer_profile = getattr(profile, "customer_profile", None)
+    if customer_profile:
+        return queryset.filter(pk=customer_profile.pk)
+    return queryset.none()
+
+
+def scope_vehicles(profile: PortalUser | None, queryset: QuerySet) -> QuerySet:
+    if not profile:
+        return queryset.none()
+    if profile.role == PortalUser.ROLE_ADMIN:
+        return queryset
+    customer_profile = getattr(profile, "customer_profile", None)
+    if customer_profile:
+        return queryset.filter(customer=customer_profile)
+    inspector_profile = getattr(profile, "inspector_profile", None)
+    if inspector_profile:
+        return queryset.filter(assignments__inspector=inspector_profile).distinct()
+    return queryset.none()
+
+
+def vehicles_changed_since(profile: PortalUser | None, queryset: QuerySet, since) -> QuerySet:
+    """Scoped vehicles an incremental sync has to send.
+
+    Besides vehicles edited since ``since``, an inspector gets the ones that
+    became visible through a new or reassigned assignment, however old the
+    vehicle row itself is.
+    """
+
+    queryset = scope_vehicles(profile, queryset)
+    changed = Q(updated_at__gt=since)
+    inspector_profile = getattr(profile, "inspector_profile", None)
+    sees_assigned_only = (
+        profile and profile.role != PortalUser.ROLE_ADMIN and not getattr(profile, "customer_profile", None)
+    )
+    if sees_assigned_only and inspector_profile:
+        changed |= Q(
+            pk__in=VehicleAssignment.objects.filter(inspector=inspector_profile, updated_at__gt=since).values("vehicle_id")
+        )
+    return queryset.filter(changed)
+
+
+def scope_assignments(profile: PortalUser | None, queryset: QuerySet) -> QuerySet:
+    if not profile:
+        return queryset.none()
+    if profile.role == PortalUser.ROLE_ADMIN:
+        return queryset
+    inspector_profile = getattr(profile, "inspector_profile", None)
+    if inspector_profile:
+        return queryset.filter(inspector=inspector_profile)
+    return queryset.none()
+
+
+def scope_inspections(profile: PortalUser | None, queryset: QuerySet) -> QuerySet:
+    if not profile:
+        return queryset.none()
+    if profile.role == PortalUser.ROLE_ADMIN:
+        return queryset
+    inspector_profile = getattr(profile, "inspector_profile", None)
+    if inspector_profile:
+        return queryset.filter(inspector=inspector_profile)
+    customer_profile = getattr(profile, "customer_profile", None)
+    if customer_profile:
+        return queryset.filter(customer=customer_profile)
+    return queryset.none()
+
+
+def scope_tombstones(profile: PortalUser | None, queryset: QuerySet) -> QuerySet:
+    if not profile:
+        return queryset.none()
+    if profile.role == PortalUser.ROLE_ADMIN:
+        return queryset
+    inspector_profile = getattr(profile, "inspector_profile", None)
+    if inspector_profile:
+        return queryset.filter(inspector_id=inspector_profile.pk)
+    customer_profile = getattr(profile, "customer_profile", None)
+    if customer_profile:
+        return queryset.filter(customer_id=customer_profile.pk).exclude(model=SyncTombstone.MODEL_ASSIGNMENT)
+    return queryset.none()
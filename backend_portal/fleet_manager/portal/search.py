@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import Customer, Inspection, InspectionItemResponse, Vehicle
+
+KIND_VEHICLE = "vehicle"
+KIND_CUSTOMER = "customer"
+KIND_INSPECTION = "inspection"
+KINDS = (KIND_VEHICLE, KIND_CUSTOMER, KIND_INSPECTION)
+
+REINDEX_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class SearchDocument:
+    kind: str
+    object_id: int
+    title: str
+    body: str
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    kind: str
+    object_id: int
+    score: float
+
+
+def _join(*parts) -> str:
+    return " ".join(str(part) for part in parts if part)
+
+
+def vehicle_documents(ids) -> list[SearchDocument]:
+    rows = Vehicle.objects.filter(pk__in=ids).order_by().values_list(
+        "id", "vin", "license_plate", "make", "model", "vehicle_type", "notes", "customer__legal_name", "customer__city"
+    )
+    return [
+        SearchDocument(KIND_VEHICLE, pk, _join(vin, plate, make, model), _join(legal_name, city, vehicle_type, notes))
+        for pk, vin, plate, make, model, vehicle_type, notes, legal_name, city in rows
+    ]
+
+
+def customer_documents(ids) -> list[SearchDocument]:
+    rows = Customer.objects.filter(pk__in=ids).order_by().values_list(
+        "id", "legal_name", "city", "state", "contact_email", "notes"
+    )
+    return [
+        SearchDocument(KIND_CUSTOMER, pk, legal_name, _join(city, state, contact_email, notes))
+        for pk, legal_name, city, state, contact_email, notes in rows
+    ]
+
+
+def inspection_documents(ids) -> list[SearchDocument]:
+    rows = Inspection.objects.filter(pk__in=ids).order_by().values_list(
+        "id", "vehicle__vin", "vehicle__license_plate", "customer__legal_name", "customer__city", "general_notes"
+    )
+    notes: dict[int, list[str]] = {}
+    for inspection_id, note in (
+        InspectionItemResponse.objects.filter(inspection_id__in=ids).exclude(notes="").order_by().values_list(
+            "inspection_id", "notes"
+        )
+    ):
+        notes.setdefault(inspection_id, []).append(note)
+    return [
+        SearchDocument(
+            KIND_INSPECTION, pk, _join(plate, vin), _join(legal_name, city, general_notes, *notes.get(pk, ()))
+        )
+        for pk, vin, plate, legal_name, city, general_notes in rows
+    ]
+
+
+DOCUMENT_BUILDERS = {
+    KIND_VEHICLE: vehicle_documents,
+    KIND_CUSTOMER: customer_documents,
+    KIND_INSPECTION: inspection_documents,
+}
+
+KIND_MODELS = {KIND_VEHICLE: Vehicle, KIND_CUSTOMER: Customer, KIND_INSPECTION: Inspection}
+
+
+class SearchBackend:
+    """Interface every search backend implements."""
+
+    def ensure_schema(self, using: str = "default") -> None:
+        pass
+
+    def upsert(self, documents: list[SearchDocument]) -> None:
+        raise NotImplementedError
+
+    def delete(self, kind: str, ids) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def search(self, query: str, kinds=KINDS, limit: int = 20) -> list[SearchHit]:
+        raise NotImplementedError
+
+
+class FTS5SearchBackend(SearchBackend):
+    """SQLite FTS5 index ranked with bm25 (title matches weigh 10x the body).
+
+    Rows are addressed by ``rowid = object_id * 8 + kind code`` so updates and
+    deletes are primary-key lookups rather than scans of UNINDEXED columns.
+    """
+
+    table = "portal_search_index"
+    kind_codes = {KIND_VEHICLE: 1, KIND_CUSTOMER: 2, KIND_INSPECTION: 3}
+    title_weight = 10.0
+    body_weight = 1.0
+
+    def ensure_schema(self, using: str = "default") -> None:
+        with connections[using].cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+                "title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4')"
+            )
+
+    def _rowid(self, kind: str, object_id: int) -> int:
+        return object_id * 8 + self.kind_codes[kind]
+
+    def upsert(self, documents: list[SearchDocument]) -> None:
+        if not documents:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [(self._rowid(doc.kind, doc.object_id),) for doc in documents],
+            )
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, title, body) VALUES (%s, %s, %s)",
+                [(self._rowid(doc.kind, doc.object_id), doc.title, doc.body) for doc in documents],
+            )
+
+    def delete(self, kind: str, ids) -> None:
+        rowids = [(self._rowid(kind, pk),) for pk in ids]
+        if rowids:
+            with connection.cursor() as cursor:
+                cursor.executemany(f"DELETE FROM {self.table} WHERE rowid = %s", rowids)
+
+    def clear(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+
+    @staticmethod
+    def match_expression(query: str) -> str:
+        # Every term must match, each as a prefix so partial VINs and plates hit.
+        terms = re.findall(r"\w+", query.lower())
+        return " ".join(f'"{term}"*' for term in terms)
+
+    def search(self, query: str, kinds=KINDS, limit: int = 20) -> list[SearchHit]:
+        expression = self.match_expression(query)
+        if not expression:
+            return []
+        codes = {self.kind_codes[kind]: kind for kind in kinds}
+        if not codes:
+            return []
+        placeholders = ", ".join(["%s"] * len(codes))
+        sql = (
+            f"SELECT rowid, bm25({self.table}, %s, %s) AS score FROM {self.table} "
+            f"WHERE {self.table} MATCH %s AND (rowid %% 8) IN ({placeholders}) ORDER BY score LIMIT %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [self.title_weight, self.body_weight, expression, *codes, limit])
+            rows = cursor.fetchall()
+        # bm25 is "lower is better"; flip the sign so callers sort descending.
+        return [SearchHit(codes[rowid % 8], rowid // 8, -score) for rowid, score in rows]
+
+
+class DatabaseSearchBackend(SearchBackend):
+    """Unindexed ``icontains`` fallback for databases without a native index."""
+
+    lookups = {
+        KIND_VEHICLE: ("vin", "license_plate", "make", "model", "customer__legal_name", "customer__city", "notes"),
+        KIND_CUSTOMER: ("legal_name", "city", "contact_email", "notes"),
+        KIND_INSPECTION: ("vehicle__vin", "vehicle__license_plate", "customer__legal_name", "general_notes"),
+    }
+
+    def upsert(self, documents: list[SearchDocument]) -> None:
+        pass
+
+    def delete(self, kind: str, ids) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def search(self, query: str, kinds=KINDS, limit: int = 20) -> list[SearchHit]:
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return []
+        hits: list[SearchHit] = []
+        for kind in kinds:
+            condition = Q()
+            for term in terms:
+                condition &= Q(*[Q(**{f"{field}__icontains": term}) for field in self.lookups[kind]], _connector=Q.OR)
+            ids = KIND_MODELS[kind].objects.filter(condition).order_by("-id").values_list("id", flat=True)[:limit]
+            hits.extend(SearchHit(kind, pk, 0.0) for pk in ids)
+        return hits[:limit]
+
+
+@lru_cache(maxsize=None)
+def _load_backend(path: str) -> SearchBackend:
+    return import_string(path)()
+
+
+def get_search_backend() -> SearchBackend:
+    path = getattr(settings, "PORTAL_SEARCH_BACKEND", None)
+    if not path:
+        vendor = connection.vendor
+        path = "portal.search.FTS5SearchBackend" if vendor == "sqlite" else "portal.search.DatabaseSearchBackend"
+    return _load_backend(path)
+
+
+def reindex(kind: str, ids) -> None:
+    """Rewrite the documents for ``ids``; ids whose rows are gone are dropped from the index."""
+
+    ids = set(ids)
+    if not ids:
+        return
+    backend = get_search_backend()
+    documents = DOCUMENT_BUILDERS[kind](ids)
+    # Flushes run from on_commit hooks in autocommit mode; without a transaction
+    # SQLite would commit (and sync) every row's DELETE and INSERT separately.
+    with transaction.atomic():
+        backend.upsert(documents)
+        backend.delete(kind, ids - {doc.object_id for doc in documents})
+
+
+def _flush_pending() -> None:
+    conn = transaction.get_connection()
+    pending = conn.__dict__.pop("_search_pending", None) or {}
+    cascade = pending.pop("cascade", set())
+    # Vehicle and customer documents are denormalized into their dependents.
+    for kind, pk in cascade:
+        if kind == KIND_CUSTOMER:
+            pending.setdefault(KIND_VEHICLE, set()).update(
+                Vehicle.objects.filter(customer_id=pk).values_list("id", flat=True)
+            )
+            pending.setdefault(KIND_INSPECTION, set()).update(
+                Inspection.objects.filter(customer_id=pk).values_list("id", flat=True)
+            )
+        elif kind == KIND_VEHICLE:
+            pending.setdefault(KIND_INSPECTION, set()).update(
+                Inspection.objects.filter(vehicle_id=pk).values_list("id", flat=True)
+            )
+    for kind, ids in pending.items():
+        ids = list(ids)
+        for start in range(0, len(ids), REINDEX_BATCH_SIZE):
+            reindex(kind, ids[start : start + REINDEX_BATCH_SIZE])
+
+
+def schedule_reindex(kind: str, pk: int, cascade: bool = False) -> None:
+    """Queue ``pk`` for reindexing once the current transaction commits.
+
+    Reindexing reads rows back from the database, so a flush also covers
+    deletions and anything a rolled-back savepoint left in the queue.
+    """
+
+    conn = transaction.get_connection()
+    pending = conn.__dict__.setdefault("_search_pending", {})
+    pending.setdefault(kind, set()).add(pk)
+    if cascade:
+        pending.setdefault("cascade", set()).add((kind, pk))
+    # Registered every time: a rolled-back savepoint discards its callbacks but
+    # not the queue, and flushing an already drained queue is free.
+    transaction.on_commit(_flush_pending)
+
+
+def rebuild_search_index(batch_size: int = REINDEX_BATCH_SIZE) -> dict[str, int]:
+    """Drop and repopulate the whole index; returns the number of documents per kind."""
+
+    backend = get_search_backend()
+    backend.ensure_schema()
+    backend.clear()
+    totals = {}
+    for kind, model in KIND_MODELS.items():
+        ids = list(model.objects.order_by("id").values_list("id", flat=True))
+        for start in range(0, len(ids), batch_size):
+            backend.upsert(DOCUMENT_BUILDERS[kind](ids[start : start + batch_size]))
+        totals[kind] = len(ids)
+    return totals
@@ -1,22 +1,40 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
+from datetime import timedelta
+
 from django.contrib.auth import get_user_model
 from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.utils import html
 
 from .models import (
     ChecklistItem,
     Customer,
     CustomerReport,
+    FailureRollup,
     Inspection,
     InspectionCategory,
     InspectionItemResponse,
     InspectionPhoto,
     InspectorProfile,
+    PhotoUpload,
     PortalUser,
+    UpperCaseCharField,
     Vehicle,
     VehicleAssignment,
 )
+from .analytics import withdraw_from_rollup
+from .authentication import get_principal
+from .capacity import TERMINAL_STATUSES, CapacityExceeded, assignment_slot, check_capacity
+from .imports import FORMATS
+from .instrumentation import serializer_section
+from .jobs import latest_report_job
+from .scheduling import DEFAULT_INSPECTION_INTERVAL_DAYS, MAX_SCHEDULE_DAYS, vehicles_due
+from .services import BULK_TRANSITION_MAX_RESULTS
+from .uploads import max_upload_bytes
 
 User = get_user_model()
 
@@ -141,7 +159,19 @@ class InspectorProfileSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class UpperCaseField(serializers.CharField):
+    """Normalizes like the model's ``UpperCaseCharField`` before the uniqueness check sees the value."""
+
+    def to_internal_value(self, data):
+        return UpperCaseCharField.normalize(super().to_internal_value(data))
+
+
 class VehicleSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        UpperCaseCharField: UpperCaseField,
+    }
+
     customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.all())
     customer_display = serializers.SerializerMethodField()
 
@@ -169,6 +199,13 @@ class VehicleSerializer(serializers.ModelSerializer):
         return obj.customer.legal_name
 
 
+class VehicleImportSerializer(serializers.Serializer):
+    file = serializers.FileField()
+    customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.all())
+    format = serializers.ChoiceField(choices=FORMATS, required=False)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+
 class VehicleAssignmentSerializer(serializers.ModelSerializer):
     vehicle = serializers.PrimaryKeyRelatedField(queryset=Vehicle.objects.all())
     inspector = serializers.PrimaryKeyRelatedField(queryset=InspectorProfile.objects.filter(is_active=True))
@@ -189,12 +226,195 @@ class VehicleAssignmentSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at"]
 
+    def validate(self, attrs):
+        inspector = attrs.get("inspector", getattr(self.instance, "inspector", None))
+        day = attrs.get("scheduled_for", getattr(self.instance, "scheduled_for", None))
+        status = attrs.get("status", getattr(self.instance, "status", VehicleAssignment.STATUS_ASSIGNED))
+        if inspector and day and status not in TERMINAL_STATUSES:
+            current = assignment_slot(self.instance) if self.instance else None
+            try:
+                check_capacity(inspector, day, current)
+            except CapacityExceeded as exc:
+                raise serializers.ValidationError({"scheduled_for": exc.messages})
+        return attrs
+
+    def save(self, **kwargs):
+        # The booking itself is made, atomically with the row, by the model save.
+        try:
+            return super().save(**kwargs)
+        except CapacityExceeded as exc:
+            raise serializers.ValidationError({"scheduled_for": exc.messages})
+
+
+class CapacityQuerySerializer(serializers.Serializer):
+    date = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault("date", timezone.localdate())
+        return attrs
+
+
+class AutoAssignSerializer(serializers.Serializer):
+    """Input for the scheduling engine: explicit vehicles, or every vehicle due by ``start``."""
+
+    start = serializers.DateField(required=False)
+    end = serializers.DateField()
+    vehicles = serializers.ListField(child=serializers.IntegerField(), required=False, allow_empty=False, max_length=10000)
+    customer = serializers.IntegerField(required=False)
+    interval_days = serializers.IntegerField(required=False, min_value=1, default=DEFAULT_INSPECTION_INTERVAL_DAYS)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        attrs.setdefault("start", timezone.localdate())
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"end": "Must not be before 'start'."})
+        if (attrs["end"] - attrs["start"]).days >= MAX_SCHEDULE_DAYS:
+            raise serializers.ValidationError({"end": f"Schedule at most {MAX_SCHEDULE_DAYS} days at a time."})
+        if "vehicles" in attrs:
+            requested = list(dict.fromkeys(attrs["vehicles"]))
+            known = set(Vehicle.objects.filter(pk__in=requested).values_list("id", flat=True))
+            unknown = [pk for pk in requested if pk not in known]
+            if unknown:
+                raise serializers.ValidationError({"vehicles": f"Unknown vehicle ids: {unknown[:20]}"})
+            attrs["vehicles"] = requested
+        return attrs
+
+    def vehicle_ids(self) -> list[int]:
+        data = self.validated_data
+        if "vehicles" in data:
+            return data["vehicles"]
+        queryset = Vehicle.objects.all()
+        if "customer" in data:
+            queryset = queryset.filter(customer_id=data["customer"])
+        return list(vehicles_due(data["start"], data["interval_days"], queryset).values_list("id", flat=True))
+
 
 class InspectionPhotoSerializer(serializers.ModelSerializer):
+    # Writable so updates can reference photos that are already stored.
+    id = serializers.IntegerField(required=False)
+    image = serializers.ImageField(required=False)
+    upload = serializers.UUIDField(required=False, write_only=True)
+
     class Meta:
         model = InspectionPhoto
-        fields = ["id", "image", "caption", "created_at"]
-        read_only_fields = ["id", "created_at"]
+        fields = ["id", "image", "upload", "caption", "created_at"]
+        read_only_fields = ["created_at"]
+
+    def validate(self, attrs):
+        if attrs.get("id") is None and not attrs.get("image") and not attrs.get("upload"):
+            raise serializers.ValidationError("Upload an image, reference a finished upload or an existing photo id.")
+        return attrs
+
+
+class PhotoUploadSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source="received_bytes", read_only=True)
+
+    class Meta:
+        model = PhotoUpload
+        fields = ["id", "filename", "content_type", "total_size", "offset", "status", "created_at"]
+        read_only_fields = ["id", "offset", "status", "created_at"]
+
+    def validate_total_size(self, value):
+        limit = max_upload_bytes()
+        if value <= 0 or value > limit:
+            raise serializers.ValidationError(f"Uploads must be between 1 and {limit} bytes.")
+        return value
+
+
+def _upload_owner(serializer) -> PortalUser | None:
+    """The portal user whose finished uploads this request may attach."""
+
+    request = serializer.context.get("request")
+    return get_principal(request).profile if request is not None else None
+
+
+def _delete_files_on_commit(files) -> None:
+    targets = [(file.storage, file.name) for file in files if file]
+    if not targets:
+        return
+
+    def delete_files():
+        for storage, name in targets:
+            storage.delete(name)
+
+    transaction.on_commit(delete_files)
+
+
+class _PhotoChanges:
+    """Collects photo inserts, caption edits and removals across responses.
+
+    Incoming photos without an ``id`` are new files, either inline or a finished
+    resumable ``upload`` belonging to ``owner``; photos with an ``id`` are kept
+    (only the caption may change); stored photos that are not referenced are
+    removed together with their files.
+    """
+
+    def __init__(self, owner: PortalUser | None = None):
+        self.owner = owner
+        self.created: list[InspectionPhoto] = []
+        self.updated: list[InspectionPhoto] = []
+        self.deleted: list[InspectionPhoto] = []
+        self.uploads: list[tuple[InspectionPhoto, object]] = []
+
+    def diff(self, response, photos_data, existing) -> None:
+        existing_by_id = {photo.pk: photo for photo in existing}
+        kept = set()
+        for photo_data in photos_data:
+            photo_id = photo_data.get("id")
+            if photo_id is None and photo_data.get("upload"):
+                photo = InspectionPhoto(response=response, caption=photo_data.get("caption", ""))
+                self.uploads.append((photo, photo_data["upload"]))
+                self.created.append(photo)
+                continue
+            if photo_id is None:
+                self.created.append(
+                    InspectionPhoto(response=response, image=photo_data["image"], caption=photo_data.get("caption", ""))
+                )
+                continue
+            photo = existing_by_id.get(photo_id)
+            if photo is None:
+                raise serializers.ValidationError({"photos": f"Photo {photo_id} does not belong to this response."})
+            kept.add(photo_id)
+            caption = photo_data.get("caption", photo.caption)
+            if caption != photo.caption:
+                photo.caption = caption
+                self.updated.append(photo)
+        self.deleted.extend(photo for photo_id, photo in existing_by_id.items() if photo_id not in kept)
+
+    def _attach_uploads(self) -> None:
+        upload_ids = {upload_id for _photo, upload_id in self.uploads}
+        error = serializers.ValidationError(
+            {"photos": "Uploads must be your own, finished and referenced only once."}
+        )
+        if self.owner is None or len(upload_ids) != len(self.uploads):
+            raise error
+        with transaction.atomic():
+            # Claiming is the conditional UPDATE itself: of two requests attaching
+            # the same upload only one sees its rows change, and the other fails
+            # instead of pointing a second photo at the same file.
+            claimed = PhotoUpload.objects.filter(
+                pk__in=upload_ids, owner=self.owner, status=PhotoUpload.STATUS_COMPLETE
+            ).update(status=PhotoUpload.STATUS_ATTACHED, updated_at=timezone.now())
+            if claimed != len(upload_ids):
+                raise error
+        files = dict(PhotoUpload.objects.filter(pk__in=upload_ids).values_list("pk", "file"))
+        for photo, upload_id in self.uploads:
+            # The finished file already lives under the photo upload_to path.
+            photo.image = files[upload_id]
+
+    def flush(self) -> None:
+        if self.uploads:
+            self._attach_uploads()
+        if self.deleted:
+            InspectionPhoto.objects.filter(pk__in=[photo.pk for photo in self.deleted]).delete()
+            _delete_files_on_commit(photo.image for photo in self.deleted)
+        if self.created:
+            InspectionPhoto.objects.bulk_create(self.created)
+        if self.updated:
+            now = timezone.now()
+            for photo in self.updated:
+                photo.updated_at = now
+            InspectionPhoto.objects.bulk_update(self.updated, ["caption", "updated_at"])
 
 
 class ChecklistItemSerializer(serializers.ModelSerializer):
@@ -218,12 +438,62 @@ class ChecklistItemSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "category_name", "created_at", "updated_at"]
 
 
+class BatchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Primary key field that can resolve from a map loaded once per list.
+
+    A parent list serializer sets ``prefetched`` before validating its children
+    and clears it afterwards; outside that window it behaves like the stock field.
+    """
+
+    prefetched: dict | None = None
+
+    def to_internal_value(self, data):
+        if self.prefetched is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return self.prefetched[pk]
+        except KeyError:
+            self.fail("does_not_exist", pk_value=data)
+
+
+class InspectionItemResponseListSerializer(serializers.ListSerializer):
+    """Loads every referenced checklist item in one query before validating rows."""
+
+    def to_internal_value(self, data):
+        if html.is_html_input(data):
+            data = html.parse_html_list(data, default=[])
+        field = self.child.fields["checklist_item"]
+        pks = set()
+        if isinstance(data, list):
+            for item in data:
+                value = item.get("checklist_item") if isinstance(item, Mapping) else None
+                if isinstance(value, bool):
+                    continue
+                try:
+                    pks.add(int(value))
+                except (TypeError, ValueError):
+                    continue
+        field.prefetched = field.get_queryset().in_bulk(pks)
+        try:
+            return super().to_internal_value(data)
+        finally:
+            field.prefetched = None
+
+
 class InspectionItemResponseSerializer(serializers.ModelSerializer):
+    checklist_item = BatchedPrimaryKeyRelatedField(queryset=ChecklistItem.objects.all())
     checklist_item_detail = ChecklistItemSerializer(source="checklist_item", read_only=True)
     photos = InspectionPhotoSerializer(many=True, required=False)
 
     class Meta:
         model = InspectionItemResponse
+        list_serializer_class = InspectionItemResponseListSerializer
         fields = [
             "id",
             "checklist_item",
@@ -240,8 +510,9 @@ class InspectionItemResponseSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         photos_data = validated_data.pop("photos", [])
         response = InspectionItemResponse.objects.create(**validated_data)
-        for photo_data in photos_data:
-            InspectionPhoto.objects.create(response=response, **photo_data)
+        photo_changes = _PhotoChanges(_upload_owner(self))
+        photo_changes.diff(response, photos_data, [])
+        photo_changes.flush()
         return response
 
     def update(self, instance, validated_data):
@@ -250,9 +521,9 @@ class InspectionItemResponseSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
         if photos_data is not None:
-            instance.photos.all().delete()
-            for photo_data in photos_data:
-                InspectionPhoto.objects.create(response=instance, **photo_data)
+            photo_changes = _PhotoChanges(_upload_owner(self))
+            photo_changes.diff(instance, photos_data, instance.photos.all())
+            photo_changes.flush()
         return instance
 
 
@@ -269,6 +540,10 @@ class InspectionSerializer(serializers.ModelSerializer):
     vehicle = serializers.PrimaryKeyRelatedField(queryset=Vehicle.objects.all())
     customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.all(), required=False)
     customer_report = CustomerReportSerializer(read_only=True)
+    report_job = serializers.SerializerMethodField()
+
+    # Response columns compared when diffing an update.
+    response_fields = ("result", "severity", "notes")
 
     class Meta:
         model = Inspection
@@ -286,18 +561,33 @@ class InspectionSerializer(serializers.ModelSerializer):
             "general_notes",
             "item_responses",
             "customer_report",
+            "report_job",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = [
+            "id",
+            "reference",
             "created_at",
             "updated_at",
+            "customer",
+            "customer_report",
+            "report_job",
         ]
-        read_only_fields = ["id", "reference", "created_at", "updated_at", "customer", "customer_report"]
+
+    def get_report_job(self, obj):
+        job = latest_report_job(obj)
+        if job is None:
+            return None
+        return {"status": job.status, "attempts": job.attempts, "updated_at": job.updated_at}
 
     def validate(self, attrs):
         vehicle = attrs.get("vehicle")
         inspector = attrs.get("inspector")
         assignment = attrs.get("assignment")
-        if assignment and assignment.vehicle != vehicle:
+        if assignment and assignment.vehicle_id != getattr(vehicle, "pk", None):
             raise serializers.ValidationError("Assignment vehicle does not match the selected vehicle.")
-        if assignment and assignment.inspector != inspector:
+        if assignment and assignment.inspector_id != getattr(inspector, "pk", None):
             raise serializers.ValidationError("Assignment inspector does not match the selected inspector.")
         return attrs
 
@@ -305,12 +595,19 @@ class InspectionSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         responses_data = validated_data.pop("item_responses", [])
         vehicle = validated_data["vehicle"]
-        validated_data["customer"] = vehicle.customer
+        validated_data["customer_id"] = vehicle.customer_id
         inspection = Inspection.objects.create(**validated_data)
-        for response_data in responses_data:
-            response_serializer = InspectionItemResponseSerializer(data=response_data)
-            response_serializer.is_valid(raise_exception=True)
-            response_serializer.save(inspection=inspection)
+        self._sync_item_responses(inspection, responses_data, existing={})
+        # Prime the caches the response body reads so it does not query per row.
+        prefetch_related_objects(
+            [inspection],
+            Prefetch(
+                "item_responses",
+                queryset=InspectionItemResponse.objects.select_related(
+                    "checklist_item", "checklist_item__category"
+                ).prefetch_related("photos"),
+            ),
+        )
         return inspection
 
     @transaction.atomic
@@ -320,13 +617,75 @@ class InspectionSerializer(serializers.ModelSerializer):
             setattr(instance, attr, value)
         instance.save()
         if responses_data is not None:
-            instance.item_responses.all().delete()
-            for response_data in responses_data:
-                response_serializer = InspectionItemResponseSerializer(data=response_data)
-                response_serializer.is_valid(raise_exception=True)
-                response_serializer.save(inspection=instance)
+            self._sync_item_responses(instance, responses_data)
         return instance
 
+    def _sync_item_responses(self, inspection, responses_data, existing=None):
+        """Upsert responses keyed by checklist item, touching only changed rows.
+
+        Responses missing from the payload are removed; a response whose payload
+        omits ``photos`` keeps its stored photos as they are. ``existing`` may be
+        passed for a brand-new inspection to skip the lookup.
+        """
+
+        new = existing is not None
+        if existing is None:
+            existing = {
+                response.checklist_item_id: response
+                for response in inspection.item_responses.prefetch_related("photos")
+            }
+        photo_changes = _PhotoChanges(_upload_owner(self))
+        created: list[InspectionItemResponse] = []
+        updated: list[InspectionItemResponse] = []
+        pending_photos = []
+        seen = set()
+        now = timezone.now()
+
+        for response_data in responses_data:
+            response_data = dict(response_data)
+            photos_data = response_data.pop("photos", None)
+            item_id = response_data["checklist_item"].pk
+            if item_id in seen:
+                raise serializers.ValidationError(
+                    {"item_responses": f"Checklist item {item_id} appears more than once."}
+                )
+            seen.add(item_id)
+
+            response = existing.get(item_id)
+            if response is None:
+                response = InspectionItemResponse(inspection=inspection, **response_data)
+                created.append(response)
+                if photos_data:
+                    pending_photos.append((response, photos_data))
+                continue
+
+            changed = False
+            for attr in self.response_fields:
+                if attr in response_data and getattr(response, attr) != response_data[attr]:
+                    setattr(response, attr, response_data[attr])
+                    changed = True
+            if changed:
+                response.updated_at = now
+                updated.append(response)
+            if photos_data is not None:
+                photo_changes.diff(response, photos_data, response.photos.all())
+
+        stale = [response for item_id, response in existing.items() if item_id not in seen]
+        if not new and (stale or created or updated):
+            # Bulk writes send no signals: take a rolled-up inspection out of the failure rollup first.
+            withdraw_from_rollup([inspection.pk])
+        if stale:
+            for response in stale:
+                _delete_files_on_commit(photo.image for photo in response.photos.all())
+            InspectionItemResponse.objects.filter(pk__in=[response.pk for response in stale]).delete()
+        if created:
+            InspectionItemResponse.objects.bulk_create(created)
+            for response, photos_data in pending_photos:
+                photo_changes.diff(response, photos_data, [])
+        if updated:
+            InspectionItemResponse.objects.bulk_update(updated, [*self.response_fields, "updated_at"])
+        photo_changes.flush()
+
 
 class InspectionListSerializer(serializers.ModelSerializer):
     vehicle = VehicleSerializer(read_only=True)
@@ -350,6 +709,60 @@ class InspectionListSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
+class InspectionCompactListSerializer:
+    """Flat inspection list rows read straight from a ``values()`` projection.
+
+    Bypasses DRF field machinery: each row is a plain dict and the JSON renderer
+    takes care of dates and UUIDs.
+    """
+
+    columns = {
+        "id": "id",
+        "reference": "reference",
+        "status": "status",
+        "vehicle": "vehicle_id",
+        "license_plate": "vehicle__license_plate",
+        "customer": "customer_id",
+        "customer_name": "customer__legal_name",
+        "inspector": "inspector_id",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    inspector_name_columns = (
+        "inspector__profile__user__first_name",
+        "inspector__profile__user__last_name",
+        "inspector__profile__user__username",
+    )
+    status_labels = dict(Inspection.STATUS_CHOICES)
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    @classmethod
+    def project(cls, queryset):
+        return queryset.select_related(None).prefetch_related(None).values(
+            *cls.columns.values(), *cls.inspector_name_columns
+        )
+
+    @property
+    def data(self):
+        with serializer_section():
+            return self._build_rows()
+
+    def _build_rows(self):
+        columns = self.columns.items()
+        first_col, last_col, username_col = self.inspector_name_columns
+        labels = self.status_labels
+        data = []
+        for row in self.rows:
+            item = {key: row[column] for key, column in columns}
+            item["status_display"] = labels.get(item["status"], item["status"])
+            full_name = f"{row[first_col]} {row[last_col]}".strip()
+            item["inspector_name"] = full_name or row[username_col]
+            data.append(item)
+        return data
+
+
 class InspectionCategorySerializer(serializers.ModelSerializer):
     items = ChecklistItemSerializer(many=True, read_only=True)
 
@@ -357,3 +770,82 @@ class InspectionCategorySerializer(serializers.ModelSerializer):
         model = InspectionCategory
         fields = ["id", "code", "name", "description", "display_order", "items"]
         read_only_fields = ["id", "display_order", "items"]
+
+
+class InspectionBulkFilterSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Inspection.STATUS_CHOICES, required=False)
+    customer = serializers.IntegerField(required=False)
+    inspector = serializers.IntegerField(required=False)
+    created_after = serializers.DateTimeField(required=False)
+    created_before = serializers.DateTimeField(required=False)
+
+    lookups = {
+        "status": "status",
+        "customer": "customer_id",
+        "inspector": "inspector_id",
+        "created_after": "created_at__gte",
+        "created_before": "created_at__lt",
+    }
+
+
+class InspectionBulkTransitionSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False, max_length=BULK_TRANSITION_MAX_RESULTS
+    )
+    filter = InspectionBulkFilterSerializer(required=False)
+
+    def validate(self, attrs):
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Provide either 'ids' or 'filter'.")
+        return attrs
+
+    def filter_queryset(self, queryset):
+        criteria = self.validated_data.get("filter")
+        if criteria is None:
+            return queryset
+        lookups = InspectionBulkFilterSerializer.lookups
+        return queryset.filter(**{lookup: criteria[key] for key, lookup in lookups.items() if key in criteria})
+
+
+class FailureAnalyticsQuerySerializer(serializers.Serializer):
+    dimension = serializers.ChoiceField(choices=FailureRollup.DIMENSION_CHOICES)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    key = serializers.CharField(required=False, max_length=120)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=500, default=50)
+
+    default_window_days = 30
+
+    def validate(self, attrs):
+        attrs.setdefault("end", timezone.localdate())
+        attrs.setdefault("start", attrs["end"] - timedelta(days=self.default_window_days - 1))
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"start": "Must not be after 'end'."})
+        return attrs
+
+
+class InspectionExportQuerySerializer(serializers.Serializer):
+    # Not ``format``: DRF reserves that query parameter for renderer selection.
+    output = serializers.ChoiceField(choices=FORMATS, required=False, default=FORMATS[0])
+    customer = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Inspection.STATUS_CHOICES, required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if "start" in attrs and "end" in attrs and attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"start": "Must not be after 'end'."})
+        return attrs
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    type = serializers.MultipleChoiceField(choices=["vehicle", "customer", "inspection"], required=False)
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=100, default=20)
+
+    def to_internal_value(self, data):
+        # Accept ``type=vehicle,customer`` as well as repeated ``type`` parameters.
+        if hasattr(data, "getlist") and "type" in data:
+            data = data.copy()
+            data.setlist("type", [kind for value in data.getlist("type") for kind in value.split(",") if kind])
+        return super().to_internal_value(data)
@@ -4,8 +4,13 @@ from dataclasses import dataclass
 from typing import Iterable
 
 from django.db import transaction
+from django.db.models import F, QuerySet, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
-from .models import ChecklistItem, CustomerReport, Inspection, InspectionCategory
+from .checklists import CategorySpec, ChecklistDiff, group_items_by_prefix, sync_checklist
+from .counters import bump_counters, inspection_status_key
+from .models import CustomerReport, Inspection
 
 
 @dataclass
@@ -32,29 +37,18 @@ CHECKLIST_SECTIONS: list[ChecklistSeed] = [
 ]
 
 
-@transaction.atomic
-def seed_checklist_structure(items: Iterable[tuple[str, str, str, bool]] | None = None) -> None:
-    for index, section in enumerate(CHECKLIST_SECTIONS, start=1):
-        category, _ = InspectionCategory.objects.update_or_create(
-            code=section.code,
-            defaults={
-                "name": section.name,
-                "description": section.description,
-                "display_order": index,
-            },
-        )
-        if items:
-            for code, title, description, requires_photo in [entry for entry in items if entry[0].startswith(section.code)]:
-                ChecklistItem.objects.update_or_create(
-                    category=category,
-                    code=code,
-                    defaults={
-                        "title": title,
-                        "description": description,
-                        "requires_photo": requires_photo,
-                        "is_active": True,
-                    },
-                )
+def seed_checklist_structure(items: Iterable[tuple[str, str, str, bool]] | None = None) -> ChecklistDiff:
+    """Upsert the standard sections and any ``(code, title, description, requires_photo)`` items.
+
+    Items go to the section whose code prefixes theirs. Unlike
+    ``import_checklist`` nothing is deactivated and no version is recorded.
+    """
+
+    categories = [
+        CategorySpec(section.code, section.name, section.description, index)
+        for index, section in enumerate(CHECKLIST_SECTIONS, start=1)
+    ]
+    return sync_checklist(categories, group_items_by_prefix(categories, items or ()))
 
 
 def generate_customer_report(inspection: Inspection) -> CustomerReport:
@@ -82,3 +76,72 @@ def generate_customer_report(inspection: Inspection) -> CustomerReport:
         },
     )
     return report
+
+
+# Bulk status transitions: target status -> statuses it may be reached from.
+INSPECTION_TRANSITIONS: dict[str, tuple[str, ...]] = {
+    Inspection.STATUS_SUBMITTED: (Inspection.STATUS_DRAFT, Inspection.STATUS_IN_PROGRESS),
+    Inspection.STATUS_APPROVED: (Inspection.STATUS_SUBMITTED,),
+}
+
+BULK_UPDATE_BATCH_SIZE = 500
+# Per-item result rows returned by one bulk transition; also the most ids one request may list.
+BULK_TRANSITION_MAX_RESULTS = 5000
+
+
+@transaction.atomic
+def bulk_transition_inspections(
+    queryset: QuerySet, target: str, ids: Iterable[int] | None = None, max_results: int = BULK_TRANSITION_MAX_RESULTS
+) -> tuple[list[int], list[dict], dict[str, int]]:
+    """Move every eligible inspection in ``queryset`` to ``target`` with set-based UPDATEs.
+
+    Returns the ids that changed, result rows for the first ``max_results``
+    inspections considered and the count of each outcome over all of them:
+    ``updated``, ``unchanged`` (already in ``target``), ``invalid_status`` or, for
+    requested ids outside the queryset, ``not_found``.
+    """
+
+    sources = INSPECTION_TRANSITIONS[target]
+    if ids is not None:
+        requested = list(dict.fromkeys(ids))
+        queryset = queryset.filter(pk__in=requested)
+    current = dict(queryset.order_by().values_list("id", "status"))
+
+    eligible = [pk for pk, status in current.items() if status in sources]
+    now = timezone.now()
+    changes = {"status": target, "updated_at": now}
+    if target == Inspection.STATUS_SUBMITTED:
+        changes["completed_at"] = Coalesce(F("completed_at"), Value(now))
+
+    updated: list[int] = []
+    for start in range(0, len(eligible), BULK_UPDATE_BATCH_SIZE):
+        batch = eligible[start : start + BULK_UPDATE_BATCH_SIZE]
+        # Re-check the source status in the UPDATE itself so concurrent edits are not clobbered.
+        Inspection.objects.filter(pk__in=batch, status__in=sources).update(**changes)
+        updated.extend(
+            Inspection.objects.filter(pk__in=batch, status=target, updated_at=now).values_list("id", flat=True)
+        )
+
+    deltas = {inspection_status_key(target): len(updated)}
+    for pk in updated:
+        key = inspection_status_key(current[pk])
+        deltas[key] = deltas.get(key, 0) - 1
+    # QuerySet.update() sends no signals, so keep the dashboard counters in step here.
+    bump_counters(deltas)
+
+    updated_set = set(updated)
+    results = []
+    counts = {"updated": 0, "unchanged": 0, "invalid_status": 0, "not_found": 0}
+    for pk in requested if ids is not None else current:
+        if pk not in current:
+            outcome = "not_found"
+        elif pk in updated_set:
+            outcome = "updated"
+        elif current[pk] == target:
+            outcome = "unchanged"
+        else:
+            outcome = "invalid_status"
+        counts[outcome] += 1
+        if len(results) < max_results:
+            results.append({"id": pk, "result": outcome})
+    return updated, results, counts
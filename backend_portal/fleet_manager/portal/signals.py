@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .analytics import ROLLED_UP_STATUSES, withdraw_from_rollup
+from .authentication import token_cache
+from .capacity import assignment_slot, release, reserve, slot_for
+from .catalog import schedule_catalog_bump
+from .counters import assignment_deltas, bump_counters, inspection_deltas, merge_deltas
+from .search import KIND_CUSTOMER, KIND_INSPECTION, KIND_VEHICLE, get_search_backend, schedule_reindex
+from .models import (
+    ChecklistItem,
+    Customer,
+    Inspection,
+    InspectionCategory,
+    InspectionItemResponse,
+    InspectorProfile,
+    PortalUser,
+    SyncTombstone,
+    Vehicle,
+    VehicleAssignment,
+)
+
+
+# Prior state. Receivers that react to a column changing compare against the
+# row as stored, read once per save here (and only when one of those columns
+# is written), so loading instances elsewhere costs nothing extra. This
+# receiver is connected first, ahead of every receiver that reads it.
+
+STORED_COLUMNS = {
+    PortalUser: ("role",),
+    Inspection: ("status", "completed_at", "customer_id", "vehicle_id", "inspector_id"),
+    VehicleAssignment: ("scheduled_for", "status", "inspector_id", "vehicle_id"),
+}
+
+
+@receiver(pre_save, sender=PortalUser)
+@receiver(pre_save, sender=Inspection)
+@receiver(pre_save, sender=VehicleAssignment)
+def load_stored_row(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._stored_row = None
+    if raw or instance._state.adding:
+        return
+    columns = STORED_COLUMNS[sender]
+    if update_fields is not None and not {column.removesuffix("_id") for column in columns} & set(update_fields):
+        # None of the columns is written, so the stored values are the instance's
+        # own; deferred ones stay unknown on both sides, as receivers read current
+        # values from __dict__ and fall back to the stored row.
+        instance._stored_row = {column: instance.__dict__.get(column) for column in columns}
+        return
+    instance._stored_row = sender.objects.filter(pk=instance.pk).values(*columns).first()
+
+
+def stored_values(instance, columns: tuple[str, ...]) -> tuple | None:
+    """``columns`` as stored before the current save, or ``None`` for a new row."""
+
+    row = getattr(instance, "_stored_row", None)
+    return None if row is None else tuple(row[column] for column in columns)
+
+
+@receiver(pre_delete, sender=Vehicle)
+def remember_vehicle_inspectors(sender, instance: Vehicle, **kwargs):
+    # Assignments are cascaded away before post_delete fires, so capture which
+    # inspectors could see the vehicle while they still exist.
+    instance._sync_inspector_ids = set(instance.assignments.values_list("inspector_id", flat=True))
+
+
+@receiver(post_delete, sender=Vehicle)
+def tombstone_vehicle(sender, instance: Vehicle, **kwargs):
+    tombstones = [
+        SyncTombstone(model=SyncTombstone.MODEL_VEHICLE, object_id=instance.pk, customer_id=instance.customer_id)
+    ]
+    for inspector_id in getattr(instance, "_sync_inspector_ids", ()):
+        tombstones.append(
+            SyncTombstone(
+                model=SyncTombstone.MODEL_VEHICLE,
+                object_id=instance.pk,
+                customer_id=instance.customer_id,
+                inspector_id=inspector_id,
+            )
+        )
+    SyncTombstone.objects.bulk_create(tombstones)
+
+
+def _lost_assignment_tombstones(assignment_id: int, vehicle_id: int, inspector_id: int) -> list[SyncTombstone]:
+    """Tombstones for an inspector who no longer holds ``assignment_id``.
+
+    Inspectors see vehicles through their assignments, so the vehicle goes too
+    unless another assignment still links them to it.
+    """
+
+    tombstones = [SyncTombstone(model=SyncTombstone.MODEL_ASSIGNMENT, object_id=assignment_id, inspector_id=inspector_id)]
+    if not VehicleAssignment.objects.filter(vehicle_id=vehicle_id, inspector_id=inspector_id).exists():
+        tombstones.append(SyncTombstone(model=SyncTombstone.MODEL_VEHICLE, object_id=vehicle_id, inspector_id=inspector_id))
+    return tombstones
+
+
+@receiver(post_save, sender=VehicleAssignment)
+def tombstone_reassigned_assignment(sender, instance: VehicleAssignment, created, **kwargs):
+    columns = ("vehicle_id", "inspector_id")
+    previous = None if created else stored_values(instance, columns)
+    if previous is None:
+        return
+    current = tuple(instance.__dict__.get(column, stored) for column, stored in zip(columns, previous))
+    if current == previous:
+        return
+    vehicle_id, inspector_id = previous
+    tombstones = _lost_assignment_tombstones(instance.pk, vehicle_id, inspector_id)
+    if inspector_id == current[1]:
+        # Same inspector, different vehicle: the assignment itself is still theirs.
+        tombstones = tombstones[1:]
+    SyncTombstone.objects.bulk_create(tombstones)
+
+
+@receiver(post_delete, sender=VehicleAssignment)
+def tombstone_assignment(sender, instance: VehicleAssignment, **kwargs):
+    SyncTombstone.objects.bulk_create(_lost_assignment_tombstones(instance.pk, instance.vehicle_id, instance.inspector_id))
+
+
+@receiver(post_delete, sender=Inspection)
+def tombstone_inspection(sender, instance: Inspection, **kwargs):
+    SyncTombstone.objects.create(
+        model=SyncTombstone.MODEL_INSPECTION,
+        object_id=instance.pk,
+        customer_id=instance.customer_id,
+        inspector_id=instance.inspector_id,
+    )
+
+
+@receiver(post_save, sender=Inspection)
+def tombstone_reassigned_inspection(sender, instance: Inspection, created, **kwargs):
+    columns = ("customer_id", "inspector_id")
+    previous = None if created else stored_values(instance, columns)
+    if previous is None:
+        return
+    current = tuple(instance.__dict__.get(column, stored) for column, stored in zip(columns, previous))
+    if current == previous:
+        return
+    # Only the side that lost the inspection gets the tombstone.
+    customer_id, inspector_id = (old if old != new else None for old, new in zip(previous, current))
+    SyncTombstone.objects.create(
+        model=SyncTombstone.MODEL_INSPECTION, object_id=instance.pk, customer_id=customer_id, inspector_id=inspector_id
+    )
+
+
+@receiver(post_save, sender=InspectionCategory)
+@receiver(post_delete, sender=InspectionCategory)
+@receiver(post_save, sender=ChecklistItem)
+@receiver(post_delete, sender=ChecklistItem)
+def invalidate_catalog(sender, **kwargs):
+    schedule_catalog_bump()
+
+
+# Failure analytics. A rolled-up inspection is withdrawn from the rollup before
+# anything it was counted with changes, and counted again by the next run if it
+# is still submitted or approved. The serializer writes responses in bulk and
+# withdraws the inspection itself.
+
+ROLLUP_COLUMNS = ("status", "completed_at", "customer_id", "vehicle_id")
+
+
+@receiver(pre_save, sender=Inspection)
+def withdraw_changed_inspection(sender, instance: Inspection, raw=False, **kwargs):
+    previous = None if raw else stored_values(instance, ROLLUP_COLUMNS)
+    if previous is None or previous[0] not in ROLLED_UP_STATUSES:
+        return
+    current = tuple(instance.__dict__.get(column, stored) for column, stored in zip(ROLLUP_COLUMNS, previous))
+    # Submitted -> approved keeps every count as it is.
+    if current[0] not in ROLLED_UP_STATUSES or current[1:] != previous[1:]:
+        withdraw_from_rollup([instance.pk])
+
+
+@receiver(pre_delete, sender=Inspection)
+def withdraw_deleted_inspection(sender, instance: Inspection, **kwargs):
+    withdraw_from_rollup([instance.pk])
+
+
+@receiver(pre_save, sender=InspectionItemResponse)
+@receiver(pre_delete, sender=InspectionItemResponse)
+def withdraw_response_inspection(sender, instance: InspectionItemResponse, raw=False, **kwargs):
+    if not raw:
+        withdraw_from_rollup([instance.inspection_id])
+
+
+# Dashboard counters. A save moves a row between buckets when a counted field
+# differs from the stored row; current values are read from __dict__ so
+# deferred fields are never fetched.
+
+COUNTED_FIELDS = {
+    PortalUser: ("role",),
+    Inspection: ("status",),
+    VehicleAssignment: ("scheduled_for", "status"),
+}
+
+
+def _counted_state(instance) -> tuple | None:
+    values = tuple(instance.__dict__.get(name) for name in COUNTED_FIELDS[type(instance)])
+    return None if None in values else values
+
+
+def _user_deltas(state, sign: int) -> dict[str, int]:
+    (role,) = state
+    return {} if role == PortalUser.ROLE_ADMIN else {"users": sign}
+
+
+def _inspection_deltas(state, sign: int) -> dict[str, int]:
+    return inspection_deltas(state[0], sign)
+
+
+def _assignment_deltas(state, sign: int) -> dict[str, int]:
+    return assignment_deltas(state[0], state[1], sign)
+
+
+TRACKED_DELTAS = {
+    PortalUser: _user_deltas,
+    Inspection: _inspection_deltas,
+    VehicleAssignment: _assignment_deltas,
+}
+
+
+@receiver(post_save, sender=PortalUser)
+@receiver(post_save, sender=Inspection)
+@receiver(post_save, sender=VehicleAssignment)
+def count_tracked_save(sender, instance, created, **kwargs):
+    deltas_for = TRACKED_DELTAS[sender]
+    previous = None if created else stored_values(instance, COUNTED_FIELDS[sender])
+    current = _counted_state(instance)
+    if current is None or previous == current or (previous is None and not created):
+        # Unknown state (a deferred field, or no stored row to compare with): leave it to the rollup.
+        return
+    bump_counters(merge_deltas(deltas_for(previous, -1) if previous else {}, deltas_for(current, 1)))
+
+
+@receiver(post_delete, sender=PortalUser)
+@receiver(post_delete, sender=Inspection)
+@receiver(post_delete, sender=VehicleAssignment)
+def count_tracked_delete(sender, instance, **kwargs):
+    state = _counted_state(instance)
+    if state is not None:
+        bump_counters(TRACKED_DELTAS[sender](state, -1))
+
+
+PLAIN_COUNTERS = {Customer: "customers", Vehicle: "vehicles", InspectorProfile: "inspectors"}
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_save, sender=Vehicle)
+@receiver(post_save, sender=InspectorProfile)
+def count_plain_create(sender, created, **kwargs):
+    if created:
+        bump_counters({PLAIN_COUNTERS[sender]: 1})
+
+
+@receiver(post_delete, sender=Customer)
+@receiver(post_delete, sender=Vehicle)
+@receiver(post_delete, sender=InspectorProfile)
+def count_plain_delete(sender, **kwargs):
+    bump_counters({PLAIN_COUNTERS[sender]: -1})
+
+
+# Inspector daily load. The slot is booked before the row is written, so a full
+# day rejects the save; VehicleAssignment.save() runs in a transaction, so a
+# failed INSERT/UPDATE takes the booking back with it. Completing an assignment
+# releases its slot.
+
+SLOT_COLUMNS = ("inspector_id", "scheduled_for", "status")
+
+
+@receiver(pre_save, sender=VehicleAssignment)
+def book_assignment_slot(sender, instance: VehicleAssignment, raw=False, **kwargs):
+    if raw:
+        return
+    stored = getattr(instance, "_stored_row", None) or {}
+    previous = slot_for(*stored_values(instance, SLOT_COLUMNS)) if stored else None
+    # Deferred fields are not written, so they keep their stored values.
+    current = slot_for(*(instance.__dict__.get(column, stored.get(column)) for column in SLOT_COLUMNS))
+    if current == previous:
+        return
+    if current is not None:
+        reserve(instance.inspector, current[1])
+    if previous is not None:
+        release(previous)
+
+
+@receiver(post_save, sender=VehicleAssignment)
+def remember_saved_slot(sender, instance: VehicleAssignment, **kwargs):
+    instance._booked_slot = assignment_slot(instance)
+
+
+@receiver(post_delete, sender=VehicleAssignment)
+def release_assignment_slot(sender, instance: VehicleAssignment, **kwargs):
+    slot = instance.__dict__["_booked_slot"] if "_booked_slot" in instance.__dict__ else assignment_slot(instance)
+    if slot is not None:
+        release(slot)
+
+
+# Search index. Customer and vehicle text is copied into dependent documents,
+# so saving one cascades to its vehicles/inspections.
+
+
+def create_search_schema(sender, using="default", **kwargs):
+    # Connected in PortalConfig.ready(): the index is not a model, so migrate
+    # would not create it otherwise.
+    get_search_backend().ensure_schema(using)
+
+
+@receiver(post_save, sender=Customer)
+def reindex_saved_customer(sender, instance: Customer, created, **kwargs):
+    schedule_reindex(KIND_CUSTOMER, instance.pk, cascade=not created)
+
+
+@receiver(post_save, sender=Vehicle)
+def reindex_saved_vehicle(sender, instance: Vehicle, created, **kwargs):
+    schedule_reindex(KIND_VEHICLE, instance.pk, cascade=not created)
+
+
+@receiver(post_delete, sender=Customer)
+def unindex_customer(sender, instance: Customer, **kwargs):
+    schedule_reindex(KIND_CUSTOMER, instance.pk)
+
+
+@receiver(post_delete, sender=Vehicle)
+def unindex_vehicle(sender, instance: Vehicle, **kwargs):
+    schedule_reindex(KIND_VEHICLE, instance.pk)
+
+
+@receiver(post_save, sender=Inspection)
+@receiver(post_delete, sender=Inspection)
+def reindex_inspection(sender, instance: Inspection, **kwargs):
+    schedule_reindex(KIND_INSPECTION, instance.pk)
+
+
+@receiver(post_save, sender=InspectionItemResponse)
+@receiver(post_delete, sender=InspectionItemResponse)
+def reindex_response_inspection(sender, instance: InspectionItemResponse, **kwargs):
+    schedule_reindex(KIND_INSPECTION, instance.inspection_id)
+
+
+# Token cache. Entries are revoked in every worker right away and again on
+# commit, so a request racing the transaction cannot keep serving the old rows.
+
+
+def _forget_tokens(forget) -> None:
+    forget()
+    transaction.on_commit(forget)
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance: Token, **kwargs):
+    # Rotation deletes the old key and creates a new one; drop every key the
+    # user holds either way.
+    _forget_tokens(lambda: (token_cache.invalidate(instance.key), token_cache.invalidate_user(instance.user_id)))
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def forget_user_tokens(sender, instance, **kwargs):
+    _forget_tokens(lambda: token_cache.invalidate_user(instance.pk))
+
+
+@receiver(post_save, sender=PortalUser)
+@receiver(post_delete, sender=PortalUser)
+def forget_portal_user_tokens(sender, instance: PortalUser, **kwargs):
+    _forget_tokens(lambda: token_cache.invalidate_user(instance.user_id))
+
+
+@receiver(post_save, sender=Customer)
+@receiver(post_delete, sender=Customer)
+@receiver(post_save, sender=InspectorProfile)
+@receiver(post_delete, sender=InspectorProfile)
+def forget_role_profile_tokens(sender, instance, **kwargs):
+    _forget_tokens(lambda: token_cache.invalidate_profile(instance.profile_id))
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .backends.sqlite3.base import writer_stats
+from .loadtest import percentile
+from .models import Inspection, InspectionItemResponse
+
+STOCK = "stock"
+PRODUCTION = "production"
+PROFILES = (STOCK, PRODUCTION)
+
+
+def profile_settings(profile: str) -> dict:
+    """ENGINE and OPTIONS for one profile: Django's defaults, or the tuned settings profile."""
+
+    if profile == STOCK:
+        return {"ENGINE": "django.db.backends.sqlite3", "OPTIONS": {}}
+    return {"ENGINE": "portal.backends.sqlite3", "OPTIONS": dict(getattr(settings, "SQLITE_PRODUCTION_OPTIONS", {}))}
+
+
+def copy_database(source_alias: str, path: Path, profile: str) -> None:
+    """Snapshot ``source_alias`` into ``path`` with the journal mode ``profile`` starts from."""
+
+    source = connections[source_alias]
+    source.ensure_connection()
+    target = sqlite3.connect(path)
+    try:
+        source.connection.backup(target)
+        # journal_mode=WAL is persistent in the file; the stock profile must
+        # start from the default rollback journal.
+        target.execute("PRAGMA journal_mode=%s" % ("DELETE" if profile == STOCK else "WAL"))
+    finally:
+        target.close()
+
+
+def register_database(alias: str, path: Path, profile: str) -> None:
+    """Add a throwaway alias pointing at ``path`` to ``connections``."""
+
+    settings_dict = {**connections["default"].settings_dict, **profile_settings(profile), "NAME": str(path)}
+    settings_dict["TEST"] = {**settings_dict.get("TEST", {}), "NAME": None}
+    connections.settings[alias] = settings_dict
+
+
+@dataclass
+class ProfileResult:
+    profile: str
+    elapsed: float = 0.0
+    write_latencies: list[float] = field(default_factory=list)
+    write_errors: int = 0
+    reads: int = 0
+    read_errors: int = 0
+    writer_wait: float = 0.0
+    error_samples: list[str] = field(default_factory=list)
+
+    def row(self) -> dict:
+        latencies = sorted(self.write_latencies)
+        return {
+            "profile": self.profile,
+            "writes": len(latencies),
+            "write_errors": self.write_errors,
+            "writes_per_s": len(latencies) / self.elapsed if self.elapsed else 0.0,
+            "write_p50_ms": percentile(latencies, 50) * 1000,
+            "write_p95_ms": percentile(latencies, 95) * 1000,
+            "write_p99_ms": percentile(latencies, 99) * 1000,
+            "reads": self.reads,
+            "read_errors": self.read_errors,
+            "reads_per_s": self.reads / self.elapsed if self.elapsed else 0.0,
+            "writer_queue_s": self.writer_wait,
+        }
+
+
+def submit_inspection(alias: str, inspection_id: int, rng: random.Random) -> None:
+    """What an inspector's submission does to the database: read, then write in one transaction."""
+
+    with transaction.atomic(using=alias):
+        inspection = Inspection.objects.using(alias).filter(pk=inspection_id).values("id", "status").first()
+        if inspection is None:
+            return
+        now = timezone.now()
+        InspectionItemResponse.objects.using(alias).filter(inspection_id=inspection_id).update(
+            notes=f"bench {rng.random():.6f}", updated_at=now
+        )
+        Inspection.objects.using(alias).filter(pk=inspection_id).update(
+            status=Inspection.STATUS_SUBMITTED,
+            odometer_reading=F("odometer_reading") + 1,
+            updated_at=now,
+        )
+
+
+def list_inspections(alias: str) -> int:
+    return len(
+        Inspection.objects.using(alias)
+        .order_by("-created_at", "-id")
+        .values_list("id", "status", "created_at")[:50]
+    )
+
+
+def run_profile(alias: str, profile: str, writers: int, readers: int, operations: int, seed: int) -> ProfileResult:
+    """``writers`` threads submit ``operations`` inspections each while ``readers`` threads page the list."""
+
+    result = ProfileResult(profile)
+    inspection_ids = list(Inspection.objects.using(alias).order_by("id").values_list("id", flat=True)[:5000])
+    if not inspection_ids:
+        return result
+    lock = threading.Lock()
+    writers_done = threading.Event()
+    remaining = [writers]
+
+    def writer(index: int) -> None:
+        rng = random.Random(seed * 1000 + index)
+        latencies, errors, samples = [], 0, []
+        try:
+            for _ in range(operations):
+                started = time.perf_counter()
+                try:
+                    submit_inspection(alias, rng.choice(inspection_ids), rng)
+                except DatabaseError as exc:
+                    errors += 1
+                    samples.append(str(exc))
+                else:
+                    latencies.append(time.perf_counter() - started)
+        finally:
+            connections[alias].close()
+            with lock:
+                result.write_latencies.extend(latencies)
+                result.write_errors += errors
+                result.error_samples.extend(samples[:3])
+                remaining[0] -= 1
+                if not remaining[0]:
+                    writers_done.set()
+
+    def reader() -> None:
+        reads, errors = 0, 0
+        try:
+            while not writers_done.is_set():
+                try:
+                    list_inspections(alias)
+                    reads += 1
+                except DatabaseError:
+                    errors += 1
+        finally:
+            connections[alias].close()
+            with lock:
+                result.reads += reads
+                result.read_errors += errors
+
+    threads = [threading.Thread(target=writer, args=(index,)) for index in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    writer_stats.reset()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.perf_counter() - started
+    result.writer_wait = writer_stats.wait_seconds
+    return result
@@ -45,6 +45,8 @@ window.addEventListener('DOMContentLoaded', () => {
   // HTMX loading overlay + toasts
   let overlay;
   document.body.addEventListener('htmx:beforeRequest', (evt) => {
+    // Infinite-scroll sentinels append rows in place; don't blank the list.
+    if (evt.detail.elt?.classList.contains('load-more')) return;
     const tgt = document.getElementById('content');
     overlay = document.createElement('div');
     overlay.className = 'loading-overlay';
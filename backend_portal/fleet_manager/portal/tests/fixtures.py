@@ -0,0 +1,64 @@
+"""Rows most portal tests start from: users with their portal and role profiles, and vehicles."""
+
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+
+from portal.models import Customer, InspectorProfile, PortalUser, Vehicle
+
+PASSWORD = "pass1234"
+
+VEHICLE_DEFAULTS = {
+    "vin": "1HGBH41JXMN109186",
+    "license_plate": "FLEET01",
+    "make": "Volvo",
+    "model": "VNL",
+    "year": 2022,
+    "vehicle_type": "Tractor",
+}
+
+
+def create_profile(username: str, role: str, **user_fields) -> PortalUser:
+    """A user logging in with ``PASSWORD`` and their portal profile."""
+
+    user = get_user_model().objects.create_user(username=username, password=PASSWORD, **user_fields)
+    return PortalUser.objects.create(user=user, role=role)
+
+
+def create_admin(username: str = "admin", **user_fields) -> PortalUser:
+    return create_profile(username, PortalUser.ROLE_ADMIN, **user_fields)
+
+
+def create_customer(
+    username: str = "customer",
+    legal_name: str = "Acme Logistics",
+    contact_email: str = "fleet@acme.com",
+    user_fields: dict | None = None,
+    **fields,
+) -> Customer:
+    return Customer.objects.create(
+        profile=create_profile(username, PortalUser.ROLE_CUSTOMER, **(user_fields or {})),
+        legal_name=legal_name,
+        contact_email=contact_email,
+        **fields,
+    )
+
+
+def create_inspector(
+    username: str = "inspector", badge_id: str = "INS-1", user_fields: dict | None = None, **fields
+) -> InspectorProfile:
+    return InspectorProfile.objects.create(
+        profile=create_profile(username, PortalUser.ROLE_INSPECTOR, **(user_fields or {})), badge_id=badge_id, **fields
+    )
+
+
+def build_vehicle(customer: Customer, **fields) -> Vehicle:
+    """An unsaved vehicle, for ``bulk_create``."""
+
+    return Vehicle(customer=customer, **{**VEHICLE_DEFAULTS, **fields})
+
+
+def create_vehicle(customer: Customer, **fields) -> Vehicle:
+    vehicle = build_vehicle(customer, **fields)
+    vehicle.save()
+    return vehicle
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import json
+from datetime import date, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.counters import assignment_key, dashboard_counters, refresh_dashboard_counters
+from portal.models import Inspection, InspectorProfile, Vehicle, VehicleAssignment
+from portal.scheduling import auto_assign, plan_assignments, vehicles_due
+from portal.tests.fixtures import build_vehicle, create_admin, create_customer, create_inspector
+
+
+class AutoAssignTests(APITestCase):
+    def setUp(self):
+        self.admin = create_admin()
+        self.admin_user = self.admin.user
+        self.customer = create_customer()
+        self.inspectors = [self._inspector(index, capacity) for index, capacity in enumerate((2, 3))]
+        self.vehicles = Vehicle.objects.bulk_create(
+            [build_vehicle(self.customer, vin=f"VIN{index:05d}", license_plate=f"PL{index}") for index in range(12)]
+        )
+        self.ids = [vehicle.id for vehicle in self.vehicles]
+        self.start = date(2026, 3, 2)
+
+    def _inspector(self, index: int, capacity: int) -> InspectorProfile:
+        return create_inspector(f"inspector{index}", f"INS-{index}", max_daily_inspections=capacity)
+
+    def _load(self) -> dict[tuple[int, date], int]:
+        load: dict[tuple[int, date], int] = {}
+        open_assignments = VehicleAssignment.objects.exclude(status=VehicleAssignment.STATUS_COMPLETED)
+        for inspector_id, day in open_assignments.values_list("inspector_id", "scheduled_for"):
+            load[(inspector_id, day)] = load.get((inspector_id, day), 0) + 1
+        return load
+
+    def test_daily_capacity_is_never_exceeded(self):
+        VehicleAssignment.objects.create(
+            vehicle=self.vehicles[0], inspector=self.inspectors[1], scheduled_for=self.start,
+            status=VehicleAssignment.STATUS_IN_PROGRESS,
+        )
+        # A completed assignment has given its slot back.
+        VehicleAssignment.objects.create(
+            vehicle=self.vehicles[0], inspector=self.inspectors[0], scheduled_for=self.start,
+            status=VehicleAssignment.STATUS_COMPLETED,
+        )
+        plan = auto_assign(self.ids, self.start, self.start + timedelta(days=1), assigned_by=self.admin)
+        # 2 + 3 slots a day, one already taken on the first day.
+        self.assertEqual(plan.already_scheduled, [self.ids[0]])
+        self.assertEqual(len(plan.assignments), 9)
+        self.assertEqual(plan.unscheduled, self.ids[-2:])
+        capacity = {inspector.id: inspector.max_daily_inspections for inspector in self.inspectors}
+        for (inspector_id, _day), count in self._load().items():
+            self.assertLessEqual(count, capacity[inspector_id])
+        self.assertTrue(all(assignment.pk for assignment in plan.assignments))
+
+    def test_load_is_balanced_across_inspectors(self):
+        for inspector in self.inspectors:
+            inspector.max_daily_inspections = 10
+            inspector.save()
+        plan = plan_assignments(self.ids[:8], self.start, self.start)
+        per_inspector = plan.summary()["per_inspector"]
+        self.assertEqual(sorted(per_inspector.values()), [4, 4])
+
+    def test_days_fill_front_to_back_and_inactive_inspectors_are_skipped(self):
+        inactive = self._inspector(9, 10)
+        inactive.is_active = False
+        inactive.save()
+        plan = plan_assignments(self.ids[:6], self.start, self.start + timedelta(days=3))
+        self.assertNotIn(inactive.id, {assignment.inspector_id for assignment in plan.assignments})
+        self.assertEqual(plan.summary()["per_day"], {"2026-03-02": 5, "2026-03-03": 1})
+
+    def test_vehicles_with_open_assignments_are_not_scheduled_twice(self):
+        VehicleAssignment.objects.create(
+            vehicle=self.vehicles[0], inspector=self.inspectors[0], scheduled_for=self.start + timedelta(days=5)
+        )
+        plan = plan_assignments(self.ids[:3], self.start, self.start)
+        self.assertEqual(plan.already_scheduled, [self.ids[0]])
+        self.assertEqual([assignment.vehicle_id for assignment in plan.assignments], self.ids[1:3])
+
+    def test_bulk_insert_keeps_dashboard_counters_in_step(self):
+        refresh_dashboard_counters()
+        # Load rows, three reads, the INSERT and the load UPDATE, then the
+        # counter upsert for a day not seen before.
+        with self.assertNumQueries(12):
+            auto_assign(self.ids[:4], self.start, self.start)
+        counters = dashboard_counters(self.start)
+        self.assertEqual(counters[assignment_key(self.start)], 4)
+        self.assertEqual(counters[assignment_key(self.start, VehicleAssignment.STATUS_ASSIGNED)], 4)
+
+    def test_vehicles_due_puts_never_inspected_first(self):
+        inspected = Inspection.objects.create(
+            vehicle=self.vehicles[1], customer=self.customer, inspector=self.inspectors[0],
+            completed_at=timezone.now() - timedelta(days=400),
+        )
+        Inspection.objects.create(
+            vehicle=self.vehicles[2], customer=self.customer, inspector=self.inspectors[0], completed_at=timezone.now()
+        )
+        due = list(vehicles_due(timezone.localdate(), 365).values_list("id", flat=True))
+        self.assertNotIn(self.vehicles[2].id, due)
+        self.assertEqual(due[-1], inspected.vehicle_id)
+        self.assertEqual(len(due), 11)
+
+    def test_api_schedules_due_vehicles(self):
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("assignment-auto-assign")
+        end = self.start + timedelta(days=2)
+        response = self.client.post(url, {"start": self.start, "end": end, "dry_run": True}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["scheduled"], 12)
+        self.assertFalse(VehicleAssignment.objects.exists())
+
+        response = self.client.post(url, {"start": self.start, "end": end}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(VehicleAssignment.objects.filter(assigned_by=self.admin).count(), 12)
+
+        response = self.client.post(url, {"end": self.start, "start": end}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(url, {"end": end, "vehicles": [999999]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_api_is_admin_only(self):
+        self.client.force_authenticate(user=self.inspectors[0].profile.user)
+        response = self.client.post(reverse("assignment-auto-assign"), {"end": self.start}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command_reports_the_plan(self):
+        out = StringIO()
+        call_command(
+            "auto_assign", "--start", "2026-03-02", "--end", "2026-03-03", "--assigned-by", "admin", "--json", stdout=out
+        )
+        summary = json.loads(out.getvalue())
+        self.assertEqual(summary["scheduled"], 10)
+        self.assertEqual(summary["unscheduled"], 2)
+        self.assertEqual(VehicleAssignment.objects.count(), 10)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.counters import refresh_dashboard_counters
+from portal.models import Inspection, ReportJob
+from portal.services import bulk_transition_inspections
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+class BulkTransitionTests(APITestCase):
+    def setUp(self):
+        self.admin_user = create_admin().user
+        self.customer = create_customer()
+        self.inspector = create_inspector()
+        self.inspector_user = self.inspector.profile.user
+        self.vehicle = create_vehicle(self.customer)
+
+    def _inspection(self, status_value):
+        return Inspection.objects.create(
+            vehicle=self.vehicle, customer=self.customer, inspector=self.inspector, status=status_value
+        )
+
+    def test_bulk_approve_reports_per_item_results(self):
+        submitted = [self._inspection(Inspection.STATUS_SUBMITTED) for _ in range(3)]
+        draft = self._inspection(Inspection.STATUS_DRAFT)
+        approved = self._inspection(Inspection.STATUS_APPROVED)
+        self.client.force_authenticate(user=self.admin_user)
+
+        ids = [inspection.id for inspection in submitted] + [draft.id, approved.id, 999999]
+        refresh_dashboard_counters()
+        with self.assertNumQueries(7):
+            response = self.client.post(reverse("inspection-bulk-approve"), {"ids": ids}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated"], 3)
+        outcomes = {row["id"]: row["result"] for row in response.data["results"]}
+        self.assertEqual(outcomes[draft.id], "invalid_status")
+        self.assertEqual(outcomes[approved.id], "unchanged")
+        self.assertEqual(outcomes[999999], "not_found")
+        self.assertEqual(Inspection.objects.filter(status=Inspection.STATUS_APPROVED).count(), 4)
+        self.assertEqual(ReportJob.objects.filter(status=ReportJob.STATUS_QUEUED).count(), 3)
+
+    def test_bulk_submit_by_filter_is_scoped_to_the_inspector(self):
+        mine = [self._inspection(Inspection.STATUS_IN_PROGRESS) for _ in range(2)]
+        other = create_inspector("other", "INS-2")
+        theirs = Inspection.objects.create(
+            vehicle=self.vehicle, customer=self.customer, inspector=other, status=Inspection.STATUS_IN_PROGRESS
+        )
+        self.client.force_authenticate(user=self.inspector_user)
+
+        response = self.client.post(
+            reverse("inspection-bulk-submit"), {"filter": {"status": "in_progress"}}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(row["id"] for row in response.data["results"]), sorted(i.id for i in mine))
+        theirs.refresh_from_db()
+        self.assertEqual(theirs.status, Inspection.STATUS_IN_PROGRESS)
+        self.assertTrue(all(i.completed_at for i in Inspection.objects.filter(pk__in=[i.id for i in mine])))
+
+    def test_inspectors_cannot_bulk_approve(self):
+        self.client.force_authenticate(user=self.inspector_user)
+        response = self.client.post(reverse("inspection-bulk-approve"), {"ids": [1]}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_filter_results_are_capped_but_counted(self):
+        for status_value in (Inspection.STATUS_SUBMITTED,) * 3 + (Inspection.STATUS_APPROVED,):
+            self._inspection(status_value)
+        updated, results, counts = bulk_transition_inspections(
+            Inspection.objects.all(), Inspection.STATUS_APPROVED, max_results=2
+        )
+        self.assertEqual(len(updated), 3)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(counts, {"updated": 3, "unchanged": 1, "invalid_status": 0, "not_found": 0})
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post(reverse("inspection-bulk-approve"), {"filter": {"status": "approved"}}, format="json")
+        self.assertEqual(response.data["counts"]["unchanged"], 4)
+        self.assertFalse(response.data["results_truncated"])
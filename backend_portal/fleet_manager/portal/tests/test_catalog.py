@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from django.core.cache import caches
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.models import ChecklistItem, InspectionCategory
+from portal.services import seed_checklist_structure
+
+
+class CatalogCacheTests(APITestCase):
+    def setUp(self):
+        caches["catalog"].clear()
+        seed_checklist_structure()
+        self.category = InspectionCategory.objects.get(code="pre_trip")
+        ChecklistItem.objects.create(category=self.category, code="pre_trip_vin", title="Confirm VIN")
+
+    def test_revalidation_returns_304_without_queries(self):
+        first = self.client.get(reverse("category-list"))
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        etag = first["ETag"]
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(reverse("category-list"))
+            not_modified = self.client.get(reverse("category-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_saving_an_item_bumps_the_version(self):
+        etag = self.client.get(reverse("checklist-item-list"))["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            ChecklistItem.objects.create(category=self.category, code="pre_trip_plate", title="Confirm plate")
+
+        response = self.client.get(reverse("checklist-item-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn(b"Confirm plate", response.content)
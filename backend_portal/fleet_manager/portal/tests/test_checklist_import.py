@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from portal.catalog import catalog_version
+from portal.checklists import (
+    FORMAT_JSON,
+    FORMAT_YAML,
+    ChecklistDefinitionError,
+    import_checklist,
+    load_definition,
+)
+from portal.models import ChecklistItem, ChecklistVersion, InspectionCategory
+from portal.services import seed_checklist_structure
+
+
+def definition(version: int = 1, **overrides) -> dict:
+    data = {
+        "version": version,
+        "categories": [
+            {
+                "code": "brakes",
+                "name": "Brakes",
+                "items": [
+                    {"code": "brakes_pads", "title": "Brake pads", "requires_photo": True},
+                    {"code": "brakes_lines", "title": "Brake lines"},
+                ],
+            },
+            {"code": "lights", "name": "Lights", "description": "Exterior lighting"},
+        ],
+        "items": [{"category": "lights", "code": "lights_head", "title": "Headlights"}],
+    }
+    data.update(overrides)
+    return data
+
+
+class ChecklistImportTests(TestCase):
+    def setUp(self):
+        caches["catalog"].clear()
+
+    def _import(self, data: dict, **kwargs):
+        return import_checklist(load_definition(json.dumps(data), FORMAT_JSON), **kwargs)
+
+    def test_first_import_creates_everything_and_records_the_version(self):
+        before = catalog_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            diff = self._import(definition(), source="checklist.json")
+
+        self.assertEqual(diff.categories_created, ["brakes", "lights"])
+        self.assertEqual(diff.items_created, ["brakes/brakes_pads", "brakes/brakes_lines", "lights/lights_head"])
+        self.assertEqual(
+            list(InspectionCategory.objects.values_list("code", "display_order")), [("brakes", 1), ("lights", 2)]
+        )
+        self.assertTrue(ChecklistItem.objects.get(code="brakes_pads").requires_photo)
+        self.assertEqual(ChecklistItem.objects.get(code="lights_head").category.code, "lights")
+        version = ChecklistVersion.objects.get()
+        self.assertEqual((version.version, version.source, version.changes["items_created"]), (1, "checklist.json", 3))
+        self.assertNotEqual(catalog_version(), before)
+
+    def test_next_version_reports_a_diff_and_deactivates_dropped_items(self):
+        self._import(definition())
+        ChecklistItem.objects.filter(code="brakes_lines").update(is_active=False)
+        yaml_text = """
+version: 2
+categories:
+  - code: brakes
+    name: Braking system
+    items:
+      - {code: brakes_pads, title: Brake pads and rotors, requires_photo: true}
+      - {code: brakes_lines, title: Brake lines}
+  - code: lights
+    name: Lights
+    description: Exterior lighting
+    items:
+      - {code: lights_tail, title: Tail lights}
+"""
+        preview = import_checklist(load_definition(yaml_text, FORMAT_YAML), dry_run=True)
+        self.assertTrue(preview.dry_run)
+        self.assertFalse(ChecklistItem.objects.filter(code="lights_tail").exists())
+
+        diff = import_checklist(load_definition(yaml_text, FORMAT_YAML))
+        self.assertEqual(diff.as_dict(), {**preview.as_dict(), "dry_run": False})
+        self.assertEqual(diff.previous_version, 1)
+        self.assertEqual(diff.categories_updated, {"brakes": {"name": ["Brakes", "Braking system"]}})
+        self.assertEqual(
+            diff.items_updated,
+            {
+                "brakes/brakes_pads": {"title": ["Brake pads", "Brake pads and rotors"]},
+                "brakes/brakes_lines": {"is_active": [False, True]},
+            },
+        )
+        self.assertEqual(diff.items_created, ["lights/lights_tail"])
+        self.assertEqual(diff.items_deactivated, ["lights/lights_head"])
+        self.assertEqual(diff.unchanged, 1)
+        self.assertEqual(
+            set(ChecklistItem.objects.filter(is_active=True).values_list("code", flat=True)),
+            {"brakes_pads", "brakes_lines", "lights_tail"},
+        )
+        self.assertEqual(list(ChecklistVersion.objects.values_list("version", flat=True)), [2, 1])
+
+    def test_versions_only_move_forward(self):
+        self._import(definition(version=2))
+        with self.assertRaisesMessage(ChecklistDefinitionError, "older than the applied version 2"):
+            self._import(definition(version=1))
+        changed = definition(version=2)
+        changed["categories"][1]["name"] = "Lamps"
+        with self.assertRaisesMessage(ChecklistDefinitionError, "bump the version"):
+            self._import(changed)
+
+        # Re-applying the current definition is allowed and repairs drift.
+        ChecklistItem.objects.filter(code="brakes_pads").update(title="Edited by hand")
+        diff = self._import(definition(version=2))
+        self.assertEqual(list(diff.items_updated), ["brakes/brakes_pads"])
+        self.assertEqual(ChecklistItem.objects.get(code="brakes_pads").title, "Brake pads")
+        self.assertEqual(ChecklistVersion.objects.count(), 1)
+
+    def test_every_problem_is_reported(self):
+        data = definition(version=0)
+        data["categories"][0]["items"].append({"code": "brakes_pads", "title": "Again"})
+        data["categories"][1]["code"] = ""
+        data["items"].append({"category": "tyres", "code": "tyres_tread", "title": "Tread", "requires_photo": "yes"})
+        with self.assertRaises(ChecklistDefinitionError) as caught:
+            load_definition(json.dumps(data), FORMAT_JSON)
+        self.assertEqual(
+            caught.exception.errors,
+            [
+                "version: must be a positive integer.",
+                "categories[1].code: required.",
+                "items[1].requires_photo: must be true or false.",
+                "Item brakes/brakes_pads is defined twice.",
+                "Item 'lights_head' refers to unknown category 'lights'.",
+                "Item 'tyres_tread' refers to unknown category 'tyres'.",
+            ],
+        )
+
+    def test_large_definition_costs_a_fixed_number_of_queries(self):
+        data = {
+            "version": 1,
+            "categories": [
+                {
+                    "code": f"section_{section}",
+                    "name": f"Section {section}",
+                    "items": [{"code": f"section_{section}_{index:03d}", "title": f"Check {index}"} for index in range(80)],
+                }
+                for section in range(13)
+            ],
+        }
+        parsed = load_definition(json.dumps(data), FORMAT_JSON)
+        with CaptureQueriesContext(connection) as queries:
+            diff = import_checklist(parsed)
+        statements = [query["sql"].split(" ", 1)[0] for query in queries.captured_queries]
+        # Latest version, categories, items and the upserted category ids; the item upsert is
+        # batched (how many rows fit per INSERT depends on the backend), never per row.
+        self.assertEqual(statements.count("SELECT"), 4)
+        self.assertEqual(statements.count("UPDATE"), 0)
+        self.assertLessEqual(statements.count("INSERT"), 12)
+        self.assertEqual(len(diff.items_created), 1040)
+        self.assertEqual(ChecklistItem.objects.count(), 1040)
+
+    def test_seed_groups_items_by_section_prefix(self):
+        seed_checklist_structure(
+            [
+                ("pre_trip_vin", "Confirm VIN", "", False),
+                ("braking_system_pads", "Brake pads", "", True),
+                ("unknown_item", "Ignored", "", False),
+            ]
+        )
+        self.assertEqual(InspectionCategory.objects.count(), 13)
+        self.assertEqual(
+            dict(ChecklistItem.objects.values_list("code", "category__code")),
+            {"pre_trip_vin": "pre_trip", "braking_system_pads": "braking_system"},
+        )
+        # Seeding again changes nothing and never deactivates other items.
+        ChecklistItem.objects.create(category=InspectionCategory.objects.get(code="pre_trip"), code="pre_trip_extra", title="Extra")
+        with self.assertNumQueries(2):
+            diff = seed_checklist_structure([("pre_trip_vin", "Confirm VIN", "", False)])
+        self.assertFalse(diff.has_changes)
+        self.assertTrue(ChecklistItem.objects.get(code="pre_trip_extra").is_active)
+
+    def test_command_prints_the_diff(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        source = directory / "checklist.json"
+        source.write_text(json.dumps(definition()))
+        out = StringIO()
+        call_command("import_checklist", str(source), "--dry-run", stdout=out)
+        self.assertIn("+ item brakes/brakes_pads", out.getvalue())
+        self.assertIn("Would apply checklist v1 (previous: none)", out.getvalue())
+        self.assertFalse(ChecklistVersion.objects.exists())
+
+        out = StringIO()
+        call_command("import_checklist", str(source), "--json", stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["counts"]["items_created"], 3)
+
+        source.write_text(json.dumps(definition(version=0)))
+        with self.assertRaisesMessage(CommandError, "version: must be a positive integer."):
+            call_command("import_checklist", str(source))
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest import mock
+
+from django.db.models.signals import post_init
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from portal.counters import compute_counters, dashboard_counters, refresh_dashboard_counters, stored_counters
+from portal.models import DashboardCounter, Inspection, PortalUser, VehicleAssignment
+from portal.services import bulk_transition_inspections
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+class DashboardCounterTests(TestCase):
+    def setUp(self):
+        self.admin_user = create_admin().user
+        self.customer = create_customer()
+        self.inspector = create_inspector()
+        self.vehicle = create_vehicle(self.customer)
+        refresh_dashboard_counters()
+
+    def assertCountersMatchRecount(self):
+        stored = dict(DashboardCounter.objects.values_list("key", "value"))
+        expected = compute_counters()
+        self.assertEqual({key: stored.get(key, 0) for key in expected}, expected)
+        self.assertFalse([key for key, value in stored.items() if value and key not in expected])
+
+    def test_signals_keep_counters_in_step(self):
+        today = timezone.localdate()
+        assignment = VehicleAssignment.objects.create(vehicle=self.vehicle, inspector=self.inspector, scheduled_for=today)
+        inspection = Inspection.objects.create(vehicle=self.vehicle, customer=self.customer, inspector=self.inspector)
+        self.assertCountersMatchRecount()
+
+        inspection.status = Inspection.STATUS_SUBMITTED
+        inspection.save()
+        assignment.status = VehicleAssignment.STATUS_COMPLETED
+        assignment.scheduled_for = today + timedelta(days=1)
+        assignment.save()
+        self.assertCountersMatchRecount()
+
+        reloaded = Inspection.objects.get(pk=inspection.pk)
+        reloaded.status = Inspection.STATUS_APPROVED
+        reloaded.save()
+        self.assertCountersMatchRecount()
+
+        self.vehicle.delete()
+        self.assertCountersMatchRecount()
+        self.assertEqual(dashboard_counters()["inspections"], 0)
+
+    def test_prior_state_is_read_on_save_not_on_load(self):
+        inspection = Inspection.objects.create(vehicle=self.vehicle, customer=self.customer, inspector=self.inspector)
+        self.assertFalse(post_init.has_listeners(Inspection))
+        self.assertFalse(post_init.has_listeners(PortalUser))
+
+        # Even a partially loaded instance is compared with the stored row.
+        partial = Inspection.objects.only("id").get(pk=inspection.pk)
+        partial.status = Inspection.STATUS_SUBMITTED
+        # Stored row, the UPDATE and the counter bump.
+        with self.assertNumQueries(3):
+            partial.save(update_fields=["status"])
+        self.assertCountersMatchRecount()
+        # Saves that cannot move a row between buckets skip the lookup.
+        partial.general_notes = "Rechecked"
+        with self.assertNumQueries(1):
+            partial.save(update_fields=["general_notes"])
+
+    def test_bulk_transition_adjusts_status_counts(self):
+        inspections = [
+            Inspection.objects.create(
+                vehicle=self.vehicle, customer=self.customer, inspector=self.inspector, status=Inspection.STATUS_SUBMITTED
+            )
+            for _ in range(3)
+        ]
+        bulk_transition_inspections(Inspection.objects.all(), Inspection.STATUS_APPROVED, [i.pk for i in inspections])
+        counters = dashboard_counters()
+        self.assertEqual(counters["inspections:approved"], 3)
+        self.assertEqual(counters["inspections:submitted"], 0)
+
+    def test_dashboard_reads_counters_in_one_query(self):
+        VehicleAssignment.objects.create(
+            vehicle=self.vehicle, inspector=self.inspector, scheduled_for=timezone.localdate()
+        )
+        with self.assertNumQueries(1):
+            counters = dashboard_counters()
+        self.assertEqual(counters["customers"], 1)
+        self.assertEqual(counters["users"], 2)
+        self.assertEqual(counters[f"assignments:{timezone.localdate()}:assigned"], 1)
+
+        self.client.force_login(self.admin_user)
+        response = self.client.get(reverse("portal-app"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["kpi_assignments_today"], 1)
+
+    def test_unbuilt_table_is_rolled_up_on_first_read(self):
+        DashboardCounter.objects.all().delete()
+        create_customer("second", "Second Freight", "ops@second.com")
+        self.assertFalse(DashboardCounter.objects.exists())
+        self.assertEqual(dashboard_counters()["customers"], 2)
+        self.assertCountersMatchRecount()
+
+    def test_lagging_replica_reads_the_primary_and_never_rebuilds(self):
+        def replica_not_built(keys, using=None):
+            # Routed reads (using=None) see a replica whose table is still empty.
+            return {} if using is None else stored_counters(keys, using)
+
+        with (
+            mock.patch("portal.counters.stored_counters", side_effect=replica_not_built) as stored,
+            mock.patch("portal.counters.refresh_dashboard_counters") as refresh,
+        ):
+            values = dashboard_counters()
+        refresh.assert_not_called()
+        self.assertEqual([call.kwargs.get("using") for call in stored.call_args_list], [None, "default"])
+        self.assertEqual(values["customers"], 1)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.analytics import rollup_failures
+from portal.models import ChecklistItem, FailureRollup, Inspection, InspectionCategory, InspectionItemResponse
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+class FailureAnalyticsTests(APITestCase):
+    def setUp(self):
+        self.admin_user = create_admin().user
+        self.customer = create_customer()
+        self.inspector = create_inspector()
+        self.vehicle = create_vehicle(self.customer)
+        category = InspectionCategory.objects.create(code="brakes", name="Brakes")
+        self.pads = ChecklistItem.objects.create(category=category, code="pads", title="Brake pads")
+        self.lines = ChecklistItem.objects.create(category=category, code="lines", title="Brake lines")
+
+    def _inspection(self, status, results, completed_at=None):
+        inspection = Inspection.objects.create(
+            vehicle=self.vehicle,
+            customer=self.customer,
+            inspector=self.inspector,
+            status=status,
+            completed_at=completed_at or timezone.now(),
+        )
+        InspectionItemResponse.objects.bulk_create(
+            InspectionItemResponse(inspection=inspection, checklist_item=item, result=result)
+            for item, result in results
+        )
+        return inspection
+
+    def test_rollup_is_incremental(self):
+        fail, ok, na = InspectionItemResponse.RESULT_FAIL, InspectionItemResponse.RESULT_PASS, InspectionItemResponse.RESULT_NA
+        self._inspection(Inspection.STATUS_SUBMITTED, [(self.pads, fail), (self.lines, ok)])
+        self._inspection(Inspection.STATUS_DRAFT, [(self.pads, fail)])
+        self.assertEqual(rollup_failures(), 1)
+        self.assertEqual(rollup_failures(), 0)
+
+        self._inspection(Inspection.STATUS_APPROVED, [(self.pads, ok), (self.lines, na)])
+        self.assertEqual(rollup_failures(), 1)
+
+        pads = FailureRollup.objects.get(dimension=FailureRollup.DIMENSION_ITEM, key=str(self.pads.pk))
+        self.assertEqual((pads.checks, pads.failures, pads.inspections), (2, 1, 2))
+        lines = FailureRollup.objects.get(dimension=FailureRollup.DIMENSION_ITEM, key=str(self.lines.pk))
+        self.assertEqual((lines.responses, lines.checks, lines.failures), (2, 1, 0))
+        vehicle_type = FailureRollup.objects.get(dimension=FailureRollup.DIMENSION_VEHICLE_TYPE)
+        self.assertEqual((vehicle_type.key, vehicle_type.checks, vehicle_type.failures), ("Tractor", 3, 1))
+
+    def _item_rollup(self, item):
+        rollup = FailureRollup.objects.filter(dimension=FailureRollup.DIMENSION_ITEM, key=str(item.pk)).first()
+        return rollup and (rollup.responses, rollup.checks, rollup.failures, rollup.inspections)
+
+    def test_edited_responses_are_recounted(self):
+        fail, ok = InspectionItemResponse.RESULT_FAIL, InspectionItemResponse.RESULT_PASS
+        inspection = self._inspection(Inspection.STATUS_SUBMITTED, [(self.pads, fail), (self.lines, ok)])
+        rollup_failures()
+        self.assertEqual(self._item_rollup(self.pads), (1, 1, 1, 1))
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.patch(
+            reverse("inspection-detail", args=[inspection.pk]),
+            {"item_responses": [{"checklist_item": self.pads.pk, "result": ok}]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(self._item_rollup(self.pads))
+        self.assertIsNone(self._item_rollup(self.lines))
+        self.assertEqual(rollup_failures(), 1)
+        self.assertEqual(self._item_rollup(self.pads), (1, 1, 0, 1))
+        self.assertIsNone(self._item_rollup(self.lines))
+
+        pads = inspection.item_responses.get()
+        pads.result = fail
+        pads.save()
+        rollup_failures()
+        self.assertEqual(self._item_rollup(self.pads), (1, 1, 1, 1))
+
+    def test_draft_and_deleted_inspections_leave_the_rollup(self):
+        fail = InspectionItemResponse.RESULT_FAIL
+        first = self._inspection(Inspection.STATUS_SUBMITTED, [(self.pads, fail)])
+        second = self._inspection(Inspection.STATUS_APPROVED, [(self.pads, fail)])
+        rollup_failures()
+        self.assertEqual(self._item_rollup(self.pads), (2, 2, 2, 2))
+
+        second.status = Inspection.STATUS_DRAFT
+        second.save()
+        self.assertEqual(self._item_rollup(self.pads), (1, 1, 1, 1))
+        self.assertEqual(rollup_failures(), 0)
+
+        second.status = Inspection.STATUS_SUBMITTED
+        second.save()
+        self.assertEqual(rollup_failures(), 1)
+        self.assertEqual(self._item_rollup(self.pads), (2, 2, 2, 2))
+
+        first.delete()
+        second.delete()
+        self.assertFalse(FailureRollup.objects.exists())
+
+    def test_api_reads_summary_and_series(self):
+        fail, ok = InspectionItemResponse.RESULT_FAIL, InspectionItemResponse.RESULT_PASS
+        yesterday = timezone.now() - timedelta(days=1)
+        self._inspection(Inspection.STATUS_SUBMITTED, [(self.pads, fail), (self.lines, ok)], completed_at=yesterday)
+        self._inspection(Inspection.STATUS_SUBMITTED, [(self.pads, ok), (self.lines, ok)])
+        rollup_failures()
+
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("analytics-failures")
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {"dimension": "item"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        top = response.data["results"][0]
+        self.assertEqual((top["label"], top["failures"], top["checks"], top["failure_rate"]), ("Brake pads", 1, 2, 0.5))
+
+        response = self.client.get(url, {"dimension": "customer", "key": str(self.customer.pk)})
+        self.assertEqual(response.data["results"][0]["label"], "Acme Logistics")
+        self.assertEqual([point["failures"] for point in response.data["series"]], [1, 0])
+
+    def test_api_is_admin_only_and_validates_dimension(self):
+        self.client.force_authenticate(user=self.inspector.profile.user)
+        self.assertEqual(
+            self.client.get(reverse("analytics-failures"), {"dimension": "item"}).status_code,
+            status.HTTP_403_FORBIDDEN,
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertEqual(
+            self.client.get(reverse("analytics-failures"), {"dimension": "planet"}).status_code,
+            status.HTTP_400_BAD_REQUEST,
+        )
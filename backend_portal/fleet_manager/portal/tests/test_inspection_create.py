@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.models import ChecklistItem, InspectionCategory, InspectionItemResponse
+from portal.tests.fixtures import create_customer, create_inspector, create_vehicle
+
+
+class BulkInspectionCreateTests(APITestCase):
+    def setUp(self):
+        customer = create_customer()
+        self.inspector = create_inspector()
+        self.inspector_user = self.inspector.profile.user
+        self.vehicle = create_vehicle(customer)
+        category = InspectionCategory.objects.create(code="brakes", name="Brakes")
+        self.items = [
+            ChecklistItem.objects.create(category=category, code=f"brakes_{index:02d}", title=f"Brake check {index}")
+            for index in range(20)
+        ]
+        self.client.force_authenticate(user=self.inspector_user)
+
+    def _create(self, items):
+        payload = {
+            "vehicle": self.vehicle.id,
+            "inspector": self.inspector.id,
+            "item_responses": [{"checklist_item": item.id, "result": "pass"} for item in items],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse("inspection-list"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response, len(queries)
+
+    def test_query_count_does_not_grow_with_checklist_size(self):
+        _small, small_count = self._create(self.items[:2])
+        large, large_count = self._create(self.items)
+        self.assertEqual(small_count, large_count)
+        self.assertEqual(len(large.data["item_responses"]), 20)
+        self.assertEqual(InspectionItemResponse.objects.filter(inspection_id=large.data["id"]).count(), 20)
+
+    def test_unknown_checklist_item_is_rejected(self):
+        payload = {
+            "vehicle": self.vehicle.id,
+            "inspector": self.inspector.id,
+            "item_responses": [{"checklist_item": 999999, "result": "pass"}],
+        }
+        response = self.client.post(reverse("inspection-list"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("checklist_item", response.data["item_responses"][0])
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import shutil
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.exports import CSV_HEADER, InspectionExport
+from portal.imports import FORMAT_CSV
+from portal.models import ChecklistItem, Customer, Inspection, InspectionCategory, InspectionItemResponse
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+class InspectionExportTests(APITestCase):
+    def setUp(self):
+        self.admin_user = create_admin().user
+        self.inspector = create_inspector()
+        self.acme = self._customer("acme", "Acme Logistics")
+        self.other = self._customer("other", "Other Freight")
+
+        brakes = InspectionCategory.objects.create(code="brakes", name="Brakes", display_order=1)
+        lights = InspectionCategory.objects.create(code="lights", name="Lights", display_order=2)
+        self.items = [
+            ChecklistItem.objects.create(category=lights, code="lights.head", title="Headlights"),
+            ChecklistItem.objects.create(category=brakes, code="brakes.pads", title="Brake pads"),
+        ]
+
+        self.inspections = []
+        for day, customer, state in (
+            (1, self.acme, Inspection.STATUS_APPROVED),
+            (2, self.acme, Inspection.STATUS_SUBMITTED),
+            (3, self.other, Inspection.STATUS_APPROVED),
+            (4, self.acme, Inspection.STATUS_DRAFT),
+            (5, self.acme, Inspection.STATUS_APPROVED),
+        ):
+            vehicle = create_vehicle(customer, vin=f"VIN{day:05d}", license_plate=f"PL{day}")
+            inspection = Inspection.objects.create(vehicle=vehicle, customer=customer, inspector=self.inspector, status=state)
+            Inspection.objects.filter(pk=inspection.pk).update(created_at=datetime(2026, 3, day, 12, tzinfo=dt_timezone.utc))
+            self.inspections.append(inspection)
+        # The draft has no responses yet; every other inspection answered both items.
+        for inspection in self.inspections:
+            if inspection.status != Inspection.STATUS_DRAFT:
+                InspectionItemResponse.objects.create(inspection=inspection, checklist_item=self.items[0], result="pass")
+                InspectionItemResponse.objects.create(
+                    inspection=inspection, checklist_item=self.items[1], result="fail", severity=4, notes="Worn, replace"
+                )
+
+    def _customer(self, username: str, name: str) -> Customer:
+        return create_customer(username, name, f"{username}@example.com")
+
+    def _get(self, **params):
+        response = self.client.get(reverse("inspection-export"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_csv_has_one_line_per_response(self):
+        self.client.force_authenticate(user=self.admin_user)
+        response, body = self._get()
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertIn("attachment;", response["Content-Disposition"])
+        rows = list(csv.DictReader(io.StringIO(body)))
+        self.assertEqual(list(rows[0]), CSV_HEADER)
+        self.assertEqual(len(rows), 4 * 2 + 1)
+        # Oldest first, responses in checklist order (brakes before lights).
+        self.assertEqual(
+            [(row["vin"], row["response_item_code"]) for row in rows[:3]],
+            [("VIN00001", "brakes.pads"), ("VIN00001", "lights.head"), ("VIN00002", "brakes.pads")],
+        )
+        self.assertEqual((rows[0]["response_result"], rows[0]["response_severity"]), ("fail", "4"))
+        self.assertEqual(rows[0]["created_at"], "2026-03-01T12:00:00+00:00")
+        draft = [row for row in rows if row["status"] == Inspection.STATUS_DRAFT]
+        self.assertEqual([(row["vin"], row["response_item_code"]) for row in draft], [("VIN00004", "")])
+
+    def test_filters_and_ndjson(self):
+        self.client.force_authenticate(user=self.admin_user)
+        _response, body = self._get(
+            output="ndjson", customer=self.acme.pk, status=Inspection.STATUS_APPROVED, start="2026-03-01", end="2026-03-04"
+        )
+        documents = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([document["vin"] for document in documents], ["VIN00001"])
+        self.assertEqual([item["item_code"] for item in documents[0]["responses"]], ["brakes.pads", "lights.head"])
+        self.assertEqual(documents[0]["reference"], str(self.inspections[0].reference))
+
+        response = self.client.get(reverse("inspection-export"), {"start": "2026-03-05", "end": "2026-03-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_customers_only_export_their_own(self):
+        self.client.force_authenticate(user=self.other.profile.user)
+        _response, body = self._get()
+        self.assertEqual({row["vin"] for row in csv.DictReader(io.StringIO(body))}, {"VIN00003"})
+
+    def test_each_chunk_costs_two_queries(self):
+        export = InspectionExport(Inspection.objects.all(), FORMAT_CSV, chunk_size=2)
+        with CaptureQueriesContext(connection) as queries:
+            lines = "".join(export).splitlines()
+        # Each chunk is its own read transaction, a savepoint inside the test case.
+        statements = [query["sql"].split(" ", 1)[0] for query in queries.captured_queries]
+        self.assertEqual(statements.count("SELECT"), 2 * 3)
+        self.assertEqual(set(statements), {"SELECT", "SAVEPOINT", "RELEASE"})
+        self.assertEqual(len(lines), 1 + 9)
+        self.assertEqual((export.inspections, export.responses), (5, 8))
+
+    def test_command_writes_a_file(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        target = directory / "export.ndjson"
+        err = StringIO()
+        call_command("export_inspections", "-o", str(target), "--customer", str(self.other.pk), stderr=err)
+        documents = [json.loads(line) for line in target.read_text().splitlines()]
+        self.assertEqual([document["vin"] for document in documents], ["VIN00003"])
+        self.assertIn("Exported 1 inspections (2 responses)", err.getvalue())
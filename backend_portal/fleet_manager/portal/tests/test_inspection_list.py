@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.models import Inspection
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+class CompactInspectionListTests(APITestCase):
+    def setUp(self):
+        self.admin_user = create_admin().user
+
+        self.customer = create_customer()
+        self.inspector = create_inspector(user_fields={"first_name": "Ida", "last_name": "Stone"})
+        self.vehicle = create_vehicle(self.customer)
+        for _ in range(3):
+            Inspection.objects.create(
+                vehicle=self.vehicle,
+                customer=self.customer,
+                inspector=self.inspector,
+                status=Inspection.STATUS_SUBMITTED,
+            )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_compact_rows_are_flat(self):
+        response = self.client.get(reverse("inspection-list"), {"view": "compact"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 3)
+        row = response.data[0]
+        self.assertEqual(row["license_plate"], "FLEET01")
+        self.assertEqual(row["customer_name"], "Acme Logistics")
+        self.assertEqual(row["inspector_name"], "Ida Stone")
+        self.assertEqual(row["status_display"], "Submitted")
+        self.assertFalse(any(isinstance(value, dict) for value in row.values()))
+
+    def test_compact_rows_paginate_with_cursor(self):
+        first = self.client.get(reverse("inspection-list"), {"view": "compact", "page_size": 2})
+        self.assertEqual(len(first.data["results"]), 2)
+        second = self.client.get(first.data["next"])
+        self.assertEqual(len(second.data["results"]), 1)
+        self.assertIsNone(second.data["next"])
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.models import ChecklistItem, Inspection, InspectionCategory, InspectionItemResponse, InspectionPhoto
+from portal.tests.fixtures import create_customer, create_inspector, create_vehicle
+
+
+class InspectionDiffUpdateTests(APITestCase):
+    def setUp(self):
+        customer = create_customer()
+        inspector = create_inspector()
+        self.inspector_user = inspector.profile.user
+        vehicle = create_vehicle(customer)
+        category = InspectionCategory.objects.create(code="brakes", name="Brakes")
+        self.items = [
+            ChecklistItem.objects.create(category=category, code=f"brakes_{index}", title=f"Brake check {index}")
+            for index in range(4)
+        ]
+        self.inspection = Inspection.objects.create(vehicle=vehicle, customer=customer, inspector=inspector)
+        self.responses = [
+            InspectionItemResponse.objects.create(inspection=self.inspection, checklist_item=item, result="pass")
+            for item in self.items[:3]
+        ]
+        self.photo = InspectionPhoto.objects.create(
+            response=self.responses[0], image="inspection_photos/front.jpg", caption="Front"
+        )
+        self.client.force_authenticate(user=self.inspector_user)
+
+    def _patch(self, item_responses):
+        return self.client.patch(
+            reverse("inspection-detail", args=[self.inspection.id]),
+            {
+                "vehicle": self.inspection.vehicle_id,
+                "inspector": self.inspection.inspector_id,
+                "item_responses": item_responses,
+            },
+            format="json",
+        )
+
+    def test_unchanged_rows_and_photos_are_left_alone(self):
+        before = {response.id: response.updated_at for response in InspectionItemResponse.objects.all()}
+        response = self._patch(
+            [
+                {"checklist_item": self.items[0].id, "result": "pass"},
+                {"checklist_item": self.items[1].id, "result": "fail", "severity": 4, "notes": "Worn pads"},
+                {"checklist_item": self.items[3].id, "result": "pass"},
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        after = {row.checklist_item_id: row for row in InspectionItemResponse.objects.all()}
+        self.assertEqual(set(after), {self.items[0].id, self.items[1].id, self.items[3].id})
+        untouched = after[self.items[0].id]
+        self.assertEqual(untouched.id, self.responses[0].id)
+        self.assertEqual(untouched.updated_at, before[untouched.id])
+        changed = after[self.items[1].id]
+        self.assertEqual(changed.id, self.responses[1].id)
+        self.assertEqual((changed.result, changed.severity), ("fail", 4))
+        self.assertTrue(InspectionPhoto.objects.filter(pk=self.photo.pk).exists())
+
+    def test_referenced_photos_are_kept_and_others_removed(self):
+        InspectionPhoto.objects.create(response=self.responses[0], image="inspection_photos/rear.jpg")
+        response = self._patch(
+            [
+                {
+                    "checklist_item": self.items[0].id,
+                    "result": "pass",
+                    "photos": [{"id": self.photo.id, "caption": "Front bumper"}],
+                },
+            ]
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        photos = list(InspectionPhoto.objects.all())
+        self.assertEqual([photo.id for photo in photos], [self.photo.id])
+        self.assertEqual(photos[0].caption, "Front bumper")
+
+    def test_foreign_photo_reference_is_rejected(self):
+        response = self._patch(
+            [{"checklist_item": self.items[1].id, "result": "pass", "photos": [{"id": self.photo.id}]}]
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(InspectionItemResponse.objects.count(), 3)
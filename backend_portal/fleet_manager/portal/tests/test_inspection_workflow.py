@@ -1,44 +1,30 @@
 from __future__ import annotations
 
 from datetime import date
+from io import StringIO
 
-from django.contrib.auth import get_user_model
+from django.core.management import call_command
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
 
-from portal.models import (
-    ChecklistItem,
-    Customer,
-    Inspection,
-    InspectionCategory,
-    InspectorProfile,
-    PortalUser,
-)
+from portal.models import ChecklistItem, Inspection, InspectionCategory
 from portal.services import seed_checklist_structure
-
-User = get_user_model()
+from portal.tests.fixtures import create_admin, create_customer, create_inspector
 
 
 class InspectionWorkflowTests(APITestCase):
     def setUp(self):
-        self.admin_user = User.objects.create_user(username="admin", password="pass1234", email="admin@example.com")
-        self.admin_profile = PortalUser.objects.create(user=self.admin_user, role=PortalUser.ROLE_ADMIN)
-
-        self.customer_user = User.objects.create_user(username="customer", password="pass1234", email="customer@example.com")
-        customer_portal = PortalUser.objects.create(user=self.customer_user, role=PortalUser.ROLE_CUSTOMER)
-        self.customer = Customer.objects.create(
-            profile=customer_portal,
-            legal_name="Acme Logistics",
-            contact_email="fleet@acme.com",
-            contact_phone="555-0100",
-            city="Denver",
-            country="USA",
+        self.admin_profile = create_admin(email="admin@example.com")
+        self.admin_user = self.admin_profile.user
+
+        self.customer = create_customer(
+            user_fields={"email": "customer@example.com"}, contact_phone="555-0100", city="Denver", country="USA"
         )
+        self.customer_user = self.customer.profile.user
 
-        self.inspector_user = User.objects.create_user(username="inspector", password="pass1234", email="inspector@example.com")
-        inspector_portal = PortalUser.objects.create(user=self.inspector_user, role=PortalUser.ROLE_INSPECTOR)
-        self.inspector_profile = InspectorProfile.objects.create(profile=inspector_portal, badge_id="INS-1001")
+        self.inspector_profile = create_inspector(badge_id="INS-1001", user_fields={"email": "inspector@example.com"})
+        self.inspector_user = self.inspector_profile.profile.user
 
         seed_checklist_structure()
         self.category = InspectionCategory.objects.get(code="pre_trip")
@@ -120,6 +106,7 @@ class InspectionWorkflowTests(APITestCase):
         self.assertEqual(approve_response.data["status"], Inspection.STATUS_APPROVED)
         self.assertIn("report", approve_response.data)
 
+        call_command("run_report_worker", "--once", stdout=StringIO())
         inspection = Inspection.objects.get(id=inspection_id)
         self.assertTrue(hasattr(inspection, "customer_report"))
         self.assertIn("No critical issues", inspection.customer_report.summary)
@@ -168,7 +155,7 @@ class InspectionWorkflowTests(APITestCase):
         )
 
         self.client.force_authenticate(user=self.inspector_user)
-        response = self.client.get(reverse("vehicle-list"))
+        response = self.client.get(reverse("vehicle-list"), {"page_size": 50})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         plates = {vehicle["license_plate"] for vehicle in response.data["results"]}
         self.assertIn("FLEET02", plates)
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.capacity import CapacityExceeded, inspectors_with_capacity, rebuild_daily_loads
+from portal.forms import VehicleAssignmentAdminForm, VehicleAssignmentForm
+from portal.models import InspectorDailyLoad, InspectorProfile, VehicleAssignment
+from portal.scheduling import auto_assign
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+class InspectorCapacityTests(APITestCase):
+    def setUp(self):
+        self.admin = create_admin()
+        self.admin_user = self.admin.user
+        self.customer = create_customer()
+        self.busy = self._inspector("busy", 2)
+        self.spare = self._inspector("spare", 3)
+        self.vehicles = [
+            create_vehicle(self.customer, vin=f"VIN{index:05d}", license_plate=f"PL{index}") for index in range(5)
+        ]
+        self.day = date(2026, 3, 2)
+
+    def _inspector(self, name: str, capacity: int) -> InspectorProfile:
+        return create_inspector(name, f"INS-{name}", max_daily_inspections=capacity)
+
+    def _assign(self, vehicle, inspector=None, day=None) -> VehicleAssignment:
+        return VehicleAssignment.objects.create(vehicle=vehicle, inspector=inspector or self.busy, scheduled_for=day or self.day)
+
+    def _load(self, inspector, day=None) -> int:
+        row = InspectorDailyLoad.objects.filter(inspector=inspector, day=day or self.day).first()
+        return row.assigned if row else 0
+
+    def test_load_follows_creates_moves_and_deletes(self):
+        first = self._assign(self.vehicles[0])
+        self._assign(self.vehicles[1])
+        self.assertEqual(self._load(self.busy), 2)
+
+        first.scheduled_for = self.day + timedelta(days=1)
+        first.save()
+        self.assertEqual(self._load(self.busy), 1)
+        self.assertEqual(self._load(self.busy, first.scheduled_for), 1)
+
+        moved = VehicleAssignment.objects.get(pk=first.pk)
+        moved.inspector = self.spare
+        moved.status = VehicleAssignment.STATUS_IN_PROGRESS
+        moved.save()
+        self.assertEqual(self._load(self.busy, first.scheduled_for), 0)
+        self.assertEqual(self._load(self.spare, first.scheduled_for), 1)
+
+        VehicleAssignment.objects.filter(pk=first.pk).delete()
+        self.assertEqual(self._load(self.spare, first.scheduled_for), 0)
+
+    def test_completing_an_assignment_releases_its_slot(self):
+        first = self._assign(self.vehicles[0])
+        self._assign(self.vehicles[1])
+        first.status = VehicleAssignment.STATUS_COMPLETED
+        first.save(update_fields=["status", "updated_at"])
+        self.assertEqual(self._load(self.busy), 1)
+        self._assign(self.vehicles[2])
+        self.assertEqual(self._load(self.busy), 2)
+
+        # Reopening it needs a free slot again; completed ones are free to move.
+        first.status = VehicleAssignment.STATUS_ASSIGNED
+        with self.assertRaises(CapacityExceeded):
+            first.save()
+        first.refresh_from_db()
+        first.scheduled_for = self.day + timedelta(days=1)
+        first.save()
+        self.assertEqual(self._load(self.busy, first.scheduled_for), 0)
+        first.delete()
+        self.assertEqual(self._load(self.busy), 2)
+
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse("assignment-detail", args=[VehicleAssignment.objects.filter(inspector=self.busy).first().pk])
+        response = self.client.patch(url, {"status": VehicleAssignment.STATUS_COMPLETED}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self._load(self.busy), 1)
+
+    def test_failed_write_takes_the_booking_back(self):
+        self._assign(self.vehicles[0])
+        # Same vehicle, inspector and day: the INSERT violates unique_together
+        # after the slot was booked, outside any caller transaction.
+        with self.assertRaises(IntegrityError):
+            self._assign(self.vehicles[0])
+        self.assertEqual(self._load(self.busy), 1)
+
+    def test_full_day_rejects_the_save(self):
+        self._assign(self.vehicles[0])
+        self._assign(self.vehicles[1])
+        with self.assertRaises(CapacityExceeded):
+            self._assign(self.vehicles[2])
+        self.assertEqual(VehicleAssignment.objects.filter(inspector=self.busy).count(), 2)
+        self.assertEqual(self._load(self.busy), 2)
+
+        # Editing an assignment in place does not need a free slot.
+        assignment = VehicleAssignment.objects.filter(inspector=self.busy).first()
+        assignment.remarks = "Bring the brake gauge"
+        assignment.save()
+        self.assertEqual(self._load(self.busy), 2)
+
+    def test_api_rejects_an_overbooked_inspector(self):
+        self._assign(self.vehicles[0])
+        self._assign(self.vehicles[1])
+        self.client.force_authenticate(user=self.admin_user)
+        payload = {
+            "vehicle": self.vehicles[2].id,
+            "inspector": self.busy.id,
+            "assigned_by": self.admin.id,
+            "scheduled_for": self.day,
+        }
+        response = self.client.post(reverse("assignment-list"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fully booked", response.data["scheduled_for"][0])
+
+        payload["inspector"] = self.spare.id
+        response = self.client.post(reverse("assignment-list"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        # Moving within the same slot passes; moving onto the full inspector does not.
+        url = reverse("assignment-detail", args=[response.data["id"]])
+        response = self.client.patch(url, {"status": VehicleAssignment.STATUS_IN_PROGRESS}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.patch(url, {"inspector": self.busy.id}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._load(self.spare), 1)
+
+    def test_forms_check_capacity(self):
+        self._assign(self.vehicles[0])
+        self._assign(self.vehicles[1])
+        data = {"vehicle": self.vehicles[2].id, "inspector": self.busy.id, "scheduled_for": self.day, "status": "assigned"}
+        form = VehicleAssignmentForm(data)
+        self.assertFalse(form.is_valid())
+        self.assertIn("scheduled_for", form.errors)
+        admin_form = VehicleAssignmentAdminForm({**data, "remarks": ""})
+        self.assertFalse(admin_form.is_valid())
+        self.assertIn("scheduled_for", admin_form.errors)
+
+        existing = VehicleAssignment.objects.filter(inspector=self.busy).first()
+        form = VehicleAssignmentForm(
+            {"vehicle": existing.vehicle_id, "inspector": self.busy.id, "scheduled_for": self.day, "status": "completed"},
+            instance=existing,
+        )
+        self.assertTrue(form.is_valid(), form.errors)
+
+    def test_who_has_capacity(self):
+        self._assign(self.vehicles[0])
+        self._assign(self.vehicles[1])
+        self._assign(self.vehicles[2], inspector=self.spare)
+        self.assertEqual([inspector.pk for inspector in inspectors_with_capacity(self.day)], [self.spare.pk])
+
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.get(reverse("inspector-available"), {"date": self.day.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row["id"], row["booked"], row["remaining"]) for row in response.data["inspectors"]],
+            [(self.spare.id, 1, 2)],
+        )
+        response = self.client.get(reverse("inspector-available"), {"date": "2026-03-03"})
+        self.assertEqual([row["remaining"] for row in response.data["inspectors"]], [3, 2])
+
+    def test_auto_assign_books_the_load_table(self):
+        self._assign(self.vehicles[0])
+        plan = auto_assign([vehicle.id for vehicle in self.vehicles[1:]], self.day, self.day)
+        self.assertEqual(len(plan.assignments), 4)
+        self.assertEqual(self._load(self.busy), 2)
+        self.assertEqual(self._load(self.spare), 3)
+        with self.assertRaises(CapacityExceeded):
+            self._assign(create_vehicle(self.customer, vin="VIN99999", license_plate="X"))
+
+    def test_rebuild_recounts_from_assignments(self):
+        self._assign(self.vehicles[0])
+        self._assign(self.vehicles[1])
+        VehicleAssignment.objects.filter(inspector=self.busy).update(scheduled_for=self.day + timedelta(days=3))
+        VehicleAssignment.objects.filter(vehicle=self.vehicles[1]).update(status=VehicleAssignment.STATUS_COMPLETED)
+        self.assertEqual(rebuild_daily_loads(), 1)
+        self.assertEqual(self._load(self.busy), 0)
+        self.assertEqual(self._load(self.busy, self.day + timedelta(days=3)), 1)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from portal.loadtest import percentile
+from portal.models import Customer, Inspection, InspectionItemResponse, Vehicle, VehicleAssignment
+
+User = get_user_model()
+
+
+class GenerateFleetTests(TestCase):
+    def generate(self, seed=7):
+        call_command(
+            "generate_fleet",
+            "--seed", str(seed),
+            "--customers", "5",
+            "--vehicles", "12",
+            "--inspectors", "3",
+            "--inspections", "30",
+            "--items-per-inspection", "4",
+            "--checklist-items", "10",
+            "--batch-size", "7",
+            stdout=StringIO(),
+        )
+
+    def test_generates_requested_volumes(self):
+        self.generate()
+        self.assertEqual(Customer.objects.count(), 5)
+        self.assertEqual(Vehicle.objects.count(), 12)
+        self.assertEqual(Inspection.objects.count(), 30)
+        self.assertEqual(VehicleAssignment.objects.count(), 30)
+        self.assertEqual(InspectionItemResponse.objects.count(), 120)
+        self.assertEqual(VehicleAssignment.objects.filter(inspections=None).count(), 0)
+
+    def test_same_seed_is_deterministic_and_not_reapplied(self):
+        self.generate()
+        vehicles = list(Vehicle.objects.order_by("vin").values_list("vin", "license_plate", "make", "year"))
+        with self.assertRaises(CommandError):
+            self.generate()
+        Vehicle.objects.all().delete()
+        Customer.objects.all().delete()
+        User.objects.filter(username__startswith="syn7-").delete()
+        self.generate()
+        self.assertEqual(vehicles, list(Vehicle.objects.order_by("vin").values_list("vin", "license_plate", "make", "year")))
+
+
+class RunLoadTests(TestCase):
+    def test_reports_every_endpoint(self):
+        call_command(
+            "generate_fleet",
+            "--customers", "3", "--vehicles", "6", "--inspectors", "2",
+            "--inspections", "10", "--items-per-inspection", "3", "--checklist-items", "5",
+            stdout=StringIO(),
+        )
+        out = StringIO()
+        call_command("run_load", "--requests", "60", "--concurrency", "1", "--json", stdout=out)
+        report = json.loads(out.getvalue())
+        rows = {row["endpoint"]: row for row in report["endpoints"]}
+        self.assertEqual(rows["total"]["requests"], 60)
+        self.assertEqual(rows["total"]["errors"], 0)
+        self.assertIn("app:shell", rows)
+        self.assertLessEqual(rows["total"]["p50_ms"], rows["total"]["p99_ms"])
+        self.assertGreater(report["token_cache"]["hits"], 0)
+
+    def test_percentile_is_nearest_rank(self):
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(percentile(values, 50), 50.0)
+        self.assertEqual(percentile(values, 99), 99.0)
+        self.assertEqual(percentile([], 95), 0.0)
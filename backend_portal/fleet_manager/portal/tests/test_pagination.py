@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.models import Vehicle, VehicleAssignment
+from portal.pagination import encode_cursor
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.admin_profile = create_admin()
+        self.admin_user = self.admin_profile.user
+
+        self.customer = create_customer()
+        self.inspector = create_inspector()
+
+        # Duplicate plates make the id tie-breaker matter.
+        for index in range(7):
+            create_vehicle(self.customer, vin=f"VIN{index:05d}", license_plate=f"PLATE{index // 2}")
+        self.client.force_authenticate(user=self.admin_user)
+
+    def _walk(self, url, params):
+        seen = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(response.data["results"])
+            if not response.data["next"]:
+                return seen
+            response = self.client.get(response.data["next"])
+
+    def test_list_is_unpaginated_without_opt_in(self):
+        response = self.client.get(reverse("vehicle-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_cursor_walk_visits_every_row_once_in_order(self):
+        rows = self._walk(reverse("vehicle-list"), {"page_size": 2})
+        ids = [row["id"] for row in rows]
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(len(set(ids)), 7)
+        expected = list(Vehicle.objects.order_by("license_plate", "id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_descending_date_ordering(self):
+        vehicles = list(Vehicle.objects.all())
+        today = date.today()
+        for index, vehicle in enumerate(vehicles):
+            VehicleAssignment.objects.create(
+                vehicle=vehicle,
+                inspector=self.inspector,
+                assigned_by=self.admin_profile,
+                scheduled_for=today - timedelta(days=index // 3),
+            )
+        rows = self._walk(reverse("assignment-list"), {"page_size": 3})
+        expected = list(
+            VehicleAssignment.objects.order_by("-scheduled_for", "-id").values_list("id", flat=True)
+        )
+        self.assertEqual([row["id"] for row in rows], expected)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse("vehicle-list"), {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor_is_rejected(self):
+        for cursor in (encode_cursor("not-a-date", 1), encode_cursor(None, 1), encode_cursor({"a": 1}, 1)):
+            response = self.client.get(reverse("assignment-list"), {"cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, cursor)
+        response = self.client.get(reverse("vehicle-list"), {"cursor": encode_cursor(12, 1)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import io
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.models import ChecklistItem, InspectionCategory, InspectionPhoto, PhotoUpload
+from portal.uploads import UploadOffsetMismatch, append_chunk, partial_path
+from portal.tests.fixtures import create_customer, create_inspector, create_vehicle
+
+
+def _png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), color=(200, 40, 40)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class ResumablePhotoUploadTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(
+            MEDIA_ROOT=self.media_root, PHOTO_UPLOAD_TEMP_DIR=f"{self.media_root}/uploads_partial"
+        )
+        self.override.enable()
+
+        customer = create_customer()
+        self.inspector = create_inspector()
+        self.inspector_user = self.inspector.profile.user
+        self.vehicle = create_vehicle(customer)
+        category = InspectionCategory.objects.create(code="brakes", name="Brakes")
+        self.item = ChecklistItem.objects.create(category=category, code="brakes_pads", title="Brake pads")
+        self.client.force_authenticate(user=self.inspector_user)
+        self.payload = _png_bytes()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def _start(self):
+        response = self.client.post(
+            reverse("photo-upload-list"),
+            {"filename": "pads.png", "content_type": "image/png", "total_size": len(self.payload)},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return reverse("photo-upload-detail", args=[response.data["id"]]), response.data["id"]
+
+    def _send(self, url, offset, chunk):
+        return self.client.generic(
+            "PATCH", url, chunk, content_type="application/offset+octet-stream", HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_upload_resumes_after_interruption_and_attaches(self):
+        url, upload_id = self._start()
+        middle = len(self.payload) // 2
+        self.assertEqual(self._send(url, 0, self.payload[:middle]).status_code, status.HTTP_200_OK)
+
+        # The client lost the ack and retries from zero: it is told where to resume.
+        stale = self._send(url, 0, self.payload[:middle])
+        self.assertEqual(stale.status_code, status.HTTP_409_CONFLICT)
+        resume_at = int(self.client.get(url)["Upload-Offset"])
+        self.assertEqual(resume_at, middle)
+
+        done = self._send(url, resume_at, self.payload[resume_at:])
+        self.assertEqual(done.data["status"], PhotoUpload.STATUS_COMPLETE)
+
+        response = self.client.post(
+            reverse("inspection-list"),
+            {
+                "vehicle": self.vehicle.id,
+                "inspector": self.inspector.id,
+                "item_responses": [
+                    {"checklist_item": self.item.id, "result": "fail", "photos": [{"upload": upload_id}]}
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        photo = InspectionPhoto.objects.get()
+        with photo.image.open("rb") as handle:
+            self.assertEqual(handle.read(), self.payload)
+        self.assertEqual(PhotoUpload.objects.get().status, PhotoUpload.STATUS_ATTACHED)
+
+    def test_stale_retry_never_touches_committed_bytes(self):
+        url, upload_id = self._start()
+        stale = PhotoUpload.objects.get(pk=upload_id)
+        middle = len(self.payload) // 2
+        self.assertEqual(self._send(url, 0, self.payload[:middle]).status_code, status.HTTP_200_OK)
+
+        # A retry that read the row before that chunk committed loses the claim,
+        # and the partial file keeps every committed byte.
+        with self.assertRaises(UploadOffsetMismatch) as caught:
+            append_chunk(stale, 0, io.BytesIO(b"x" * 10), 10)
+        self.assertEqual(caught.exception.expected, middle)
+        self.assertEqual(partial_path(stale).read_bytes(), self.payload[:middle])
+        self.assertEqual(list(partial_path(stale).parent.glob("*.chunk")), [])
+
+        # Uploading carries on from the committed offset, in chunks of any size.
+        self.assertEqual(self._send(url, middle, self.payload[middle : middle + 5]).status_code, status.HTTP_200_OK)
+        done = self._send(url, middle + 5, self.payload[middle + 5 :])
+        self.assertEqual(done.data["status"], PhotoUpload.STATUS_COMPLETE)
+        with PhotoUpload.objects.get(pk=upload_id).file.open("rb") as handle:
+            self.assertEqual(handle.read(), self.payload)
+
+    def test_unfinished_upload_cannot_be_attached(self):
+        _url, upload_id = self._start()
+        response = self.client.post(
+            reverse("inspection-list"),
+            {
+                "vehicle": self.vehicle.id,
+                "inspector": self.inspector.id,
+                "item_responses": [
+                    {"checklist_item": self.item.id, "result": "fail", "photos": [{"upload": upload_id}]}
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _complete_upload(self) -> str:
+        url, upload_id = self._start()
+        self.assertEqual(self._send(url, 0, self.payload).data["status"], PhotoUpload.STATUS_COMPLETE)
+        return upload_id
+
+    def _inspect_with(self, upload_id):
+        return self.client.post(
+            reverse("inspection-list"),
+            {
+                "vehicle": self.vehicle.id,
+                "inspector": self.inspector.id,
+                "item_responses": [
+                    {"checklist_item": self.item.id, "result": "fail", "photos": [{"upload": upload_id}]}
+                ],
+            },
+            format="json",
+        )
+
+    def test_uploads_are_attached_by_their_owner_only_once(self):
+        upload_id = self._complete_upload()
+        intruder = create_inspector("intruder", "INS-2").profile.user
+        self.client.force_authenticate(user=intruder)
+        self.assertEqual(self._inspect_with(upload_id).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(PhotoUpload.objects.get().status, PhotoUpload.STATUS_COMPLETE)
+
+        self.client.force_authenticate(user=self.inspector_user)
+        self.assertEqual(self._inspect_with(upload_id).status_code, status.HTTP_201_CREATED)
+        # A second attach (e.g. a concurrent request that lost the claim) is refused.
+        self.assertEqual(self._inspect_with(upload_id).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(InspectionPhoto.objects.count(), 1)
+
+    def test_non_image_payload_is_rejected(self):
+        url, _upload_id = self._start()
+        response = self._send(url, 0, b"x" * len(self.payload))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PhotoUpload.objects.exists())
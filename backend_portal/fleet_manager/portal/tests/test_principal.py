@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from portal.authentication import PrincipalBackend, PrincipalTokenAuthentication, get_principal, principal_for_user
+from portal.models import PortalUser, VehicleAssignment
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+User = get_user_model()
+
+
+class PrincipalResolutionTests(TestCase):
+    def setUp(self):
+        self.admin_user = create_admin().user
+
+        self.customer = create_customer()
+        self.inspector = create_inspector()
+        vehicle = create_vehicle(self.customer, vin="VIN00001", license_plate="PL1")
+        VehicleAssignment.objects.create(vehicle=vehicle, inspector=self.inspector, scheduled_for=date.today())
+        self.token = Token.objects.create(user=self.inspector.profile.user)
+        self.factory = RequestFactory()
+
+    def test_token_authentication_resolves_the_principal_in_one_query(self):
+        request = self.factory.get("/", HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        with self.assertNumQueries(1):
+            user, _token = PrincipalTokenAuthentication().authenticate(request)
+            request.user = user
+            principal = get_principal(request)
+            # Scoping and permissions walk the same relations; all cached.
+            self.assertEqual(principal.profile.inspector_profile, self.inspector)
+            self.assertIsNone(getattr(principal.profile, "customer_profile", None))
+        self.assertEqual(principal.inspector, self.inspector)
+        self.assertIsNone(principal.customer)
+        self.assertTrue(principal.has_role(PortalUser.ROLE_INSPECTOR))
+        self.assertIs(get_principal(request), principal)
+
+    def test_unknown_token_is_rejected(self):
+        request = self.factory.get("/", HTTP_AUTHORIZATION="Token nope")
+        with self.assertRaises(AuthenticationFailed):
+            PrincipalTokenAuthentication().authenticate(request)
+
+    def test_session_backend_joins_the_profiles(self):
+        with self.assertNumQueries(1):
+            user = PrincipalBackend().get_user(self.customer.profile.user_id)
+            principal = principal_for_user(user)
+        self.assertEqual(principal.customer, self.customer)
+        self.assertIsNone(principal.inspector)
+
+    def test_users_loaded_elsewhere_are_completed_lazily(self):
+        admin = User.objects.get(pk=self.admin_user.pk)
+        with self.assertNumQueries(1):
+            principal = principal_for_user(admin)
+        self.assertTrue(principal.is_admin)
+        self.assertIsNone(principal.customer)
+
+        outsider = User.objects.create_user(username="outsider", password="pass1234")
+        principal = principal_for_user(outsider)
+        self.assertIsNone(principal.profile)
+        self.assertFalse(principal.has_role(PortalUser.ROLE_ADMIN))
+
+    def test_api_request_resolves_the_principal_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("assignment-list"), HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+        principal_tables = (
+            'FROM "authtoken_token"',
+            'FROM "portal_portaluser"',
+            'FROM "portal_inspectorprofile"',
+            'FROM "portal_customer"',
+        )
+        principal_queries = [
+            query["sql"] for query in queries.captured_queries if any(table in query["sql"] for table in principal_tables)
+        ]
+        self.assertEqual(len(principal_queries), 1)
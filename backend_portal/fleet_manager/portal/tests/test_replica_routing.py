@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import router
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve
+from rest_framework.authtoken.models import Token
+
+from portal.middleware import ReplicaRoutingMiddleware
+from portal.models import Vehicle
+from portal.routing import (
+    PIN_COOKIE,
+    PRIMARY,
+    ReplicaRouter,
+    check_pin_cache,
+    current_routing,
+    reading_from,
+    replica_eligible,
+)
+from portal.tests.fixtures import create_admin
+
+
+class ReplicaRouterTests(TestCase):
+    router = ReplicaRouter()
+
+    def test_reads_use_primary_outside_a_routed_request(self):
+        self.assertEqual(router.db_for_read(Vehicle), PRIMARY)
+        with reading_from(None):
+            self.assertEqual(router.db_for_read(Vehicle), PRIMARY)
+
+    def test_writes_follow_the_instance_hint(self):
+        # Objects loaded with .using() keep writing related rows to that database.
+        vehicle = Vehicle(pk=1)
+        vehicle._state.db = "other"
+        self.assertEqual(router.db_for_write(Vehicle, instance=vehicle), "other")
+
+    def test_routed_reads_go_to_the_replica_until_a_write(self):
+        with reading_from("replica") as state:
+            self.assertEqual(self.router.db_for_read(Vehicle), "replica")
+            self.assertEqual(self.router.db_for_read(Token), PRIMARY)
+            self.assertEqual(self.router.db_for_read(Session), PRIMARY)
+            self.assertEqual(router.db_for_write(Vehicle), PRIMARY)
+            self.assertTrue(state.wrote)
+            self.assertEqual(self.router.db_for_read(Vehicle), PRIMARY)
+
+    @override_settings(PORTAL_READ_REPLICAS=["replica"])
+    def test_replicas_are_never_migrated(self):
+        self.assertIs(self.router.allow_migrate("replica", "portal"), False)
+        self.assertIsNone(self.router.allow_migrate(PRIMARY, "portal"))
+
+    def test_eligible_views(self):
+        self.assertTrue(replica_eligible(resolve("/api/vehicles/").func, "GET"))
+        self.assertTrue(replica_eligible(resolve("/api/inspections/1/").func, "GET"))
+        self.assertFalse(replica_eligible(resolve("/api/vehicles/").func, "POST"))
+        self.assertFalse(replica_eligible(resolve("/api/uploads/1/").func, "GET"))
+        self.assertFalse(replica_eligible(resolve("/api/sync/").func, "GET"))
+        self.assertTrue(replica_eligible(resolve("/api/analytics/failures/").func, "GET"))
+        self.assertTrue(replica_eligible(resolve("/api/app/vehicles/").func, "GET"))
+        self.assertFalse(replica_eligible(resolve("/api/app/vehicles/new/").func, "GET"))
+
+
+@override_settings(PORTAL_READ_REPLICAS=["replica-a", "replica-b"])
+class ReplicaRoutingMiddlewareTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = []
+        caches["replica_pins"].clear()
+
+    def _run(self, request, write=False):
+        def view(_request):
+            state = current_routing.get()
+            self.seen.append(router.db_for_read(Vehicle))
+            if write:
+                router.db_for_write(Vehicle)
+            self.seen.append(bool(state and state.wrote))
+            return HttpResponse("ok")
+
+        func = resolve(request.path).func
+
+        def get_response(req):
+            middleware.process_view(req, func, (), {})
+            return view(req)
+
+        middleware = ReplicaRoutingMiddleware(get_response)
+        return middleware(request)
+
+    def test_read_only_views_rotate_across_replicas(self):
+        self._run(self.factory.get("/api/vehicles/"))
+        self._run(self.factory.get("/api/vehicles/"))
+        self.assertEqual({self.seen[0], self.seen[2]}, {"replica-a", "replica-b"})
+
+    def test_write_views_stay_on_primary_and_pin_the_client(self):
+        response = self._run(self.factory.post("/api/vehicles/"))
+        self.assertEqual(self.seen[0], PRIMARY)
+        pinned_until = float(response.cookies[PIN_COOKIE].value)
+        self.assertGreater(pinned_until, time.time())
+
+        request = self.factory.get("/api/vehicles/")
+        request.COOKIES[PIN_COOKIE] = response.cookies[PIN_COOKIE].value
+        self._run(request)
+        self.assertEqual(self.seen[2], PRIMARY)
+
+    def test_token_clients_are_pinned_without_cookies(self):
+        self._run(self.factory.post("/api/inspections/", HTTP_AUTHORIZATION="Token abc"))
+        self._run(self.factory.get("/api/inspections/", HTTP_AUTHORIZATION="Token abc"))
+        self.assertEqual(self.seen[2], PRIMARY)
+        self._run(self.factory.get("/api/inspections/", HTTP_AUTHORIZATION="Token other"))
+        self.assertIn(self.seen[4], {"replica-a", "replica-b"})
+
+    def test_token_pins_live_in_the_shared_cache(self):
+        self._run(self.factory.post("/api/inspections/", HTTP_AUTHORIZATION="Token abc"))
+        # Nothing is kept in the process-local default cache.
+        with self.settings(PORTAL_REPLICA_PIN_CACHE="default"):
+            self._run(self.factory.get("/api/inspections/", HTTP_AUTHORIZATION="Token abc"))
+        self.assertIn(self.seen[2], {"replica-a", "replica-b"})
+
+    def test_process_local_pin_cache_fails_the_system_check(self):
+        self.assertEqual(check_pin_cache(), [])
+        with self.settings(PORTAL_REPLICA_PIN_CACHE="default"):
+            self.assertEqual([error.id for error in check_pin_cache()], ["portal.E002"])
+        with self.settings(PORTAL_REPLICA_PIN_CACHE="missing"):
+            self.assertEqual([error.id for error in check_pin_cache()], ["portal.E001"])
+        with self.settings(PORTAL_READ_REPLICAS=[], PORTAL_REPLICA_PIN_CACHE="default"):
+            self.assertEqual(check_pin_cache(), [])
+
+    def test_write_during_a_read_request_pins_the_client(self):
+        response = self._run(self.factory.get("/api/vehicles/"), write=True)
+        self.assertTrue(self.seen[1])
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_reads_stay_on_primary_without_replicas(self):
+        with self.settings(PORTAL_READ_REPLICAS=[]):
+            response = self._run(self.factory.post("/api/vehicles/"))
+        self.assertEqual(self.seen[0], PRIMARY)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+@override_settings(PORTAL_READ_REPLICAS=[PRIMARY])
+class ReplicaRoutingEndToEndTests(TestCase):
+    # The primary doubles as the "replica" so the full stack runs against one database.
+
+    def test_list_partial_and_api_list_are_served(self):
+        admin_user = create_admin().user
+        self.client.force_login(admin_user)
+        self.assertEqual(self.client.get("/api/app/vehicles/").status_code, 200)
+        self.assertEqual(self.client.get("/api/vehicles/").status_code, 200)
+        self.assertNotIn(PIN_COOKIE, self.client.cookies)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from portal.jobs import claim_next_job, enqueue_customer_report, requeue_stalled_jobs, run_pending_jobs
+from portal.models import CustomerReport, Inspection, ReportJob
+from portal.tests.fixtures import create_customer, create_inspector, create_vehicle
+
+
+class ReportJobQueueTests(TestCase):
+    def setUp(self):
+        customer = create_customer()
+        inspector = create_inspector()
+        vehicle = create_vehicle(customer)
+        self.inspection = Inspection.objects.create(vehicle=vehicle, customer=customer, inspector=inspector)
+
+    def test_repeated_enqueues_coalesce(self):
+        enqueue_customer_report(self.inspection)
+        enqueue_customer_report(self.inspection)
+        self.assertEqual(ReportJob.objects.filter(status=ReportJob.STATUS_QUEUED).count(), 1)
+
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertEqual(ReportJob.objects.get().status, ReportJob.STATUS_DONE)
+        self.assertTrue(CustomerReport.objects.filter(inspection=self.inspection).exists())
+
+    def test_enqueue_while_running_queues_a_follow_up(self):
+        enqueue_customer_report(self.inspection)
+        running = claim_next_job("test-worker")
+        self.assertEqual(running.status, ReportJob.STATUS_RUNNING)
+        enqueue_customer_report(self.inspection)
+        self.assertEqual(ReportJob.objects.count(), 2)
+        follow_up = claim_next_job("other-worker")
+        self.assertNotEqual(follow_up.pk, running.pk)
+
+    def test_failures_are_retried_then_marked_failed(self):
+        enqueue_customer_report(self.inspection)
+        with self.settings(REPORT_JOB_MAX_ATTEMPTS=2), mock.patch(
+            "portal.jobs.generate_customer_report", side_effect=RuntimeError("boom")
+        ), self.assertLogs("portal.jobs", level="ERROR"):
+            run_pending_jobs()
+            job = ReportJob.objects.get()
+            self.assertEqual((job.status, job.attempts), (ReportJob.STATUS_QUEUED, 1))
+
+            ReportJob.objects.update(available_at=job.created_at)
+            run_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ReportJob.STATUS_FAILED, 2))
+        self.assertIn("boom", job.last_error)
+
+    def test_stalled_jobs_superseded_by_a_fresh_enqueue_are_failed(self):
+        enqueue_customer_report(self.inspection)
+        first = claim_next_job("dead-worker")
+        enqueue_customer_report(self.inspection)
+        second = claim_next_job("dead-worker")
+        ReportJob.objects.update(started_at=timezone.now() - timedelta(hours=1))
+
+        # Two stalled jobs for one inspection: only one can go back to the queue.
+        self.assertEqual(requeue_stalled_jobs(), 1)
+        self.assertEqual(ReportJob.objects.get(pk=first.pk).status, ReportJob.STATUS_QUEUED)
+        self.assertEqual(ReportJob.objects.get(pk=second.pk).status, ReportJob.STATUS_FAILED)
+
+        # A fresh job enqueued after the stall covers the stalled one.
+        ReportJob.objects.all().delete()
+        enqueue_customer_report(self.inspection)
+        stalled = claim_next_job("dead-worker")
+        ReportJob.objects.filter(pk=stalled.pk).update(started_at=timezone.now() - timedelta(hours=1))
+        enqueue_customer_report(self.inspection)
+        self.assertEqual(requeue_stalled_jobs(), 0)
+        stalled.refresh_from_db()
+        self.assertEqual((stalled.status, stalled.last_error), (ReportJob.STATUS_FAILED, "Superseded after stall"))
+        self.assertEqual(ReportJob.objects.filter(status=ReportJob.STATUS_QUEUED).count(), 1)
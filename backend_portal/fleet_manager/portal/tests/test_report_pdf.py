@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import io
+import os
+import re
+import shutil
+import tempfile
+import zlib
+from io import StringIO
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.models import ChecklistItem, Inspection, InspectionCategory, InspectionItemResponse, InspectionPhoto
+from portal.pdf import render_report
+from portal.reports import REPORT_RELATED, cached_pdf_path, content_hash, render_pool, report_payloads
+from portal.services import generate_customer_report
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+def png_upload(name: str = "brake.png") -> SimpleUploadedFile:
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), color=(180, 30, 30)).save(buffer, format="PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+def pdf_text(data: bytes) -> bytes:
+    """Decompressed page content, checking on the way that every xref offset points at its object."""
+
+    xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    entries = re.findall(rb"(\d{10}) 00000 n ", data[xref:])
+    for number, offset in enumerate(entries, start=1):
+        assert data[int(offset) :].startswith(f"{number} 0 obj".encode()), number
+    streams = re.findall(rb"/FlateDecode /Length \d+ >>\nstream\n(.*?)\nendstream", data, re.S)
+    return b"\n".join(zlib.decompress(stream) for stream in streams)
+
+
+class ReportPdfTests(APITestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(
+            MEDIA_ROOT=self.media_root, PORTAL_REPORT_PDF_DIR=f"{self.media_root}/report_pdfs", PORTAL_REPORT_PDF_PROCESSES=0
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.admin_user = create_admin().user
+        self.customer = create_customer()
+        inspector = create_inspector(user_fields={"first_name": "Ida", "last_name": "Stone"})
+        vehicle = create_vehicle(self.customer)
+        brakes = InspectionCategory.objects.create(code="brakes", name="Brakes", display_order=1)
+        lights = InspectionCategory.objects.create(code="lights", name="Lights", display_order=2)
+        self.inspection = Inspection.objects.create(
+            vehicle=vehicle, customer=self.customer, inspector=inspector, status=Inspection.STATUS_SUBMITTED
+        )
+        InspectionItemResponse.objects.create(
+            inspection=self.inspection,
+            checklist_item=ChecklistItem.objects.create(category=lights, code="lights.head", title="Headlights"),
+            result="pass",
+        )
+        self.pads = InspectionItemResponse.objects.create(
+            inspection=self.inspection,
+            checklist_item=ChecklistItem.objects.create(category=brakes, code="brakes.pads", title="Brake pads"),
+            result="fail",
+            severity=4,
+            notes="Pads worn (2mm)",
+        )
+        InspectionPhoto.objects.create(response=self.pads, image=png_upload(), caption="Front left")
+        generate_customer_report(self.inspection)
+        self.url = reverse("inspection-report-pdf", args=[self.inspection.pk])
+
+    def _payload(self) -> dict:
+        inspection = Inspection.objects.select_related(*REPORT_RELATED).get(pk=self.inspection.pk)
+        return report_payloads([inspection])[inspection.pk]
+
+    def test_findings_are_grouped_by_category_with_thumbnails(self):
+        payload = self._payload()
+        self.assertEqual([category["name"] for category in payload["categories"]], ["Brakes", "Lights"])
+        data = render_report(payload)
+        self.assertTrue(data.startswith(b"%PDF-1.4"))
+        self.assertEqual(data.count(b"/Filter /DCTDecode"), 1)
+        text = pdf_text(data)
+        self.assertLess(text.index(b"(Brakes)"), text.index(b"(Lights)"))
+        self.assertIn(b"(FAIL  Brake pads \\(severity 4\\))", text)
+        self.assertIn(b"(Pads worn \\(2mm\\))", text)
+        self.assertIn(b"(Page 1 of 1)", text)
+        # Same content, same bytes: the cache key really addresses the file.
+        self.assertEqual(render_report(self._payload()), data)
+
+    def test_downloads_are_served_from_the_cache_until_the_content_changes(self):
+        self.client.force_authenticate(user=self.customer.profile.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        first = b"".join(response.streaming_content)
+        etag = response["ETag"]
+        self.assertEqual(etag, f'"{content_hash(self._payload())}"')
+
+        with mock.patch("portal.reports.write_report") as write_report:
+            response = self.client.get(self.url)
+            self.assertEqual(b"".join(response.streaming_content), first)
+        write_report.assert_not_called()
+
+        InspectionItemResponse.objects.filter(pk=self.pads.pk).update(notes="Pads replaced")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        response.close()
+
+    def test_missing_report_and_other_customers(self):
+        self.inspection.customer_report.delete()
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+        generate_customer_report(self.inspection)
+        stranger = create_customer("stranger", "Other", "other@example.com").profile.user
+        self.client.force_authenticate(user=stranger)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_pool_renders_off_the_request_path(self):
+        self.client.force_authenticate(user=self.admin_user)
+        with override_settings(PORTAL_REPORT_PDF_PROCESSES=1):
+            pool = render_pool()
+            self.addCleanup(pool.shutdown)
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response["Retry-After"], "2")
+            payload = self._payload()
+            pool.submit(payload, content_hash(payload)).result(timeout=60)
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response.close()
+
+    def test_command_prerenders_and_skips_cached(self):
+        out = StringIO()
+        call_command("render_report_pdfs", "--processes", "0", stdout=out)
+        self.assertIn("Rendered 1 report PDFs", out.getvalue())
+        out = StringIO()
+        call_command("render_report_pdfs", "--processes", "0", stdout=out)
+        self.assertIn("Rendered 0 report PDFs", out.getvalue())
+        self.assertIn("1 already cached", out.getvalue())
+
+    def test_failed_render_is_an_error_response(self):
+        self.client.force_authenticate(user=self.admin_user)
+        with mock.patch("portal.reports.write_report", side_effect=RuntimeError("disk full")):
+            with self.assertLogs("portal.reports", "ERROR"):
+                response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(response.data["detail"], "The report PDF could not be rendered.")
+        # Nothing failed is cached, so the next request renders again.
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response.close()
+
+    def test_prune_keeps_recently_served_pdfs(self):
+        call_command("render_report_pdfs", "--processes", "0", stdout=StringIO())
+        path = cached_pdf_path(content_hash(self._payload()))
+        stale = path.with_name("0" * 64 + ".pdf")
+        stale.write_bytes(b"%PDF-1.4")
+        leftover = path.with_name("abandoned.part")
+        leftover.write_bytes(b"")
+        for old in (path, stale, leftover):
+            os.utime(old, (0, 0))
+
+        # Serving the report refreshes its file, so only the unused ones go.
+        self.client.force_authenticate(user=self.customer.profile.user)
+        self.client.get(self.url).close()
+        out = StringIO()
+        call_command("prune_report_pdfs", "--days", "30", stdout=out)
+        self.assertIn("Removed 2 cached report PDFs", out.getvalue())
+        self.assertTrue(path.exists())
+        self.assertFalse(stale.exists() or leftover.exists())
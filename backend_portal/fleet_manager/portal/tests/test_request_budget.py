@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from portal.instrumentation import RequestMetrics, current_metrics, timed
+from portal.models import Customer
+from portal.serializers import CustomerSerializer
+from portal.tests.fixtures import create_admin, create_customer
+
+
+class RequestBudgetMiddlewareTests(APITestCase):
+    def setUp(self):
+        self.admin_user = create_admin().user
+        for index in range(3):
+            create_customer(f"customer{index}", f"Customer {index}", f"c{index}@example.com")
+        self.client.force_authenticate(user=self.admin_user)
+
+    @override_settings(REQUEST_SERVER_TIMING=True)
+    def test_server_timing_header_reports_queries(self):
+        response = self.client.get(reverse("customer-list"))
+        timing = response["Server-Timing"]
+        self.assertIn("db;dur=", timing)
+        self.assertIn("ser;dur=", timing)
+        self.assertIn("total;dur=", timing)
+        self.assertRegex(timing, r'desc="[1-9]\d* queries"')
+
+    @override_settings(REQUEST_SERVER_TIMING=False)
+    def test_server_timing_header_is_off_by_setting(self):
+        response = self.client.get(reverse("customer-list"))
+        self.assertNotIn("Server-Timing", response)
+
+    def test_serializers_are_timed_only_through_the_view_layer(self):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            CustomerSerializer(Customer.objects.all(), many=True).data
+            self.assertEqual(metrics.serializer_seconds, 0)
+            timed(CustomerSerializer(Customer.objects.all(), many=True)).data
+        finally:
+            current_metrics.reset(token)
+        self.assertGreater(metrics.serializer_seconds, 0)
+
+    @override_settings(REQUEST_BUDGETS={"customer-list": {"queries": 0}})
+    def test_over_budget_requests_are_logged(self):
+        with self.assertLogs("portal.budget", level="WARNING") as logs:
+            self.client.get(reverse("customer-list"))
+        self.assertIn("view=customer-list", logs.output[0])
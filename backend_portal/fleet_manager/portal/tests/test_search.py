@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.models import Inspection, VehicleAssignment
+from portal.search import get_search_backend, rebuild_search_index
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        self.admin_user = create_admin().user
+        self.acme = self._customer("acme", "Acme Logistics", "Denver")
+        self.globex = self._customer("globex", "Globex Freight", "Dallas")
+        self.inspector = create_inspector()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.volvo = self._vehicle(self.acme, "1HGBH41JXMN109186", "FLEET01", "Volvo", "VNL")
+            self.kenworth = self._vehicle(self.globex, "3AKJHHDR5JSJH1234", "GLX220", "Kenworth", "T680")
+            self.inspection = Inspection.objects.create(
+                vehicle=self.volvo,
+                customer=self.acme,
+                inspector=self.inspector,
+                general_notes="Cracked windshield on passenger side",
+            )
+
+    def _customer(self, username, legal_name, city):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_customer(username, legal_name, f"fleet@{username}.com", city=city)
+
+    def _vehicle(self, customer, vin, plate, make, model):
+        return create_vehicle(customer, vin=vin, license_plate=plate, make=make, model=model)
+
+    def search(self, user, **params):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(reverse("search"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [(row["type"], row["id"]) for row in response.data["results"]]
+
+    def test_prefix_matches_vin_plate_and_notes(self):
+        self.assertEqual(self.search(self.admin_user, q="1HGBH41", type="vehicle"), [("vehicle", self.volvo.pk)])
+        self.assertEqual(self.search(self.admin_user, q="glx22"), [("vehicle", self.kenworth.pk)])
+        self.assertEqual(self.search(self.admin_user, q="windshield"), [("inspection", self.inspection.pk)])
+
+    def test_title_matches_rank_first(self):
+        results = self.search(self.admin_user, q="acme")
+        self.assertEqual(results[0], ("customer", self.acme.pk))
+        self.assertIn(("vehicle", self.volvo.pk), results)
+
+    def test_index_follows_saves_and_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.acme.legal_name = "Initech Haulage"
+            self.acme.save()
+        self.assertIn(("vehicle", self.volvo.pk), self.search(self.admin_user, q="initech", type="vehicle"))
+        self.assertIn(("inspection", self.inspection.pk), self.search(self.admin_user, q="initech haulage"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.kenworth.delete()
+        self.assertEqual(self.search(self.admin_user, q="kenworth"), [])
+
+    def test_results_are_scoped(self):
+        globex_user = self.globex.profile.user
+        self.assertEqual(self.search(globex_user, q="volvo"), [])
+        self.assertEqual(self.search(globex_user, q="globex"), [("customer", self.globex.pk), ("vehicle", self.kenworth.pk)])
+
+        VehicleAssignment.objects.create(vehicle=self.volvo, inspector=self.inspector, scheduled_for="2026-01-05")
+        inspector_results = self.search(self.inspector.profile.user, q="acme")
+        self.assertEqual(set(inspector_results), {("vehicle", self.volvo.pk), ("inspection", self.inspection.pk)})
+
+    def test_rebuild_repopulates_index(self):
+        get_search_backend().clear()
+        self.assertEqual(self.search(self.admin_user, q="volvo"), [])
+        totals = rebuild_search_index()
+        self.assertEqual(totals, {"vehicle": 2, "customer": 2, "inspection": 1})
+        self.assertEqual(self.search(self.admin_user, q="volvo", type="vehicle"), [("vehicle", self.volvo.pk)])
+
+    def test_query_is_required(self):
+        self.client.force_authenticate(user=self.admin_user)
+        self.assertEqual(self.client.get(reverse("search")).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import OperationalError, connections, transaction
+from django.db.transaction import TransactionManagementError
+
+from portal.models import Customer, Inspection, InspectorProfile, PortalUser, Vehicle
+from portal.sqlitebench import PRODUCTION, STOCK, copy_database, register_database, run_profile
+from portal.transactions import read_transaction
+from portal.tests.fixtures import build_vehicle
+
+User = get_user_model()
+
+
+class SQLiteProductionProfileTests(unittest.TestCase):
+    # A plain TestCase on standalone file databases: they are written from
+    # several threads, which Django's test case isolation does not allow.
+
+    def use_scratch(self, profile: str, **options) -> str:
+        """A seeded file database under a throwaway alias, copied the way the benchmark copies."""
+
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        source = self._register("scratch_source", directory / "source.sqlite3", PRODUCTION)
+        with connections[source].schema_editor() as editor:
+            for model in apps.get_models():
+                if model._meta.managed and not model._meta.proxy:
+                    editor.create_model(model)
+        self._seed(source)
+
+        alias = f"scratch_{profile}"
+        copy_database(source, directory / "db.sqlite3", profile)
+        self._register(alias, directory / "db.sqlite3", profile)
+        connections.settings[alias]["OPTIONS"].update(options)
+        return alias
+
+    def _register(self, alias: str, path: Path, profile: str) -> str:
+        register_database(alias, path, profile)
+        self.addCleanup(self._drop_alias, alias)
+        return alias
+
+    @staticmethod
+    def _drop_alias(alias: str) -> None:
+        connections[alias].close()
+        del connections[alias]
+        del connections.settings[alias]
+
+    @staticmethod
+    def _seed(alias: str) -> None:
+        # bulk_create keeps the counter and search signals, which write to the
+        # default database, out of it.
+        users = User.objects.using(alias).bulk_create(
+            [User(username="customer", password="!"), User(username="inspector", password="!")]
+        )
+        customer_portal, inspector_portal = PortalUser.objects.using(alias).bulk_create(
+            [
+                PortalUser(user=users[0], role=PortalUser.ROLE_CUSTOMER),
+                PortalUser(user=users[1], role=PortalUser.ROLE_INSPECTOR),
+            ]
+        )
+        [customer] = Customer.objects.using(alias).bulk_create(
+            [Customer(profile=customer_portal, legal_name="Acme Logistics", contact_email="fleet@acme.com")]
+        )
+        [inspector] = InspectorProfile.objects.using(alias).bulk_create(
+            [InspectorProfile(profile=inspector_portal, badge_id="INS-1")]
+        )
+        vehicles = Vehicle.objects.using(alias).bulk_create(
+            [build_vehicle(customer, vin=f"VIN{index:05d}", license_plate=f"PL{index}") for index in range(5)]
+        )
+        Inspection.objects.using(alias).bulk_create(
+            [Inspection(vehicle=vehicle, customer=customer, inspector=inspector) for vehicle in vehicles]
+        )
+
+    def test_pragmas_are_applied_to_every_connection(self):
+        alias = self.use_scratch(PRODUCTION)
+        with connections[alias].cursor() as cursor:
+            pragmas = {}
+            for name in ("journal_mode", "busy_timeout", "synchronous", "mmap_size"):
+                cursor.execute(f"PRAGMA {name}")
+                pragmas[name] = cursor.fetchone()[0]
+        self.assertEqual(pragmas["journal_mode"], "wal")
+        self.assertEqual(pragmas["busy_timeout"], 10000)
+        self.assertEqual(pragmas["synchronous"], 1)
+        self.assertGreater(pragmas["mmap_size"], 0)
+        self.assertEqual(connections[alias].transaction_mode, "IMMEDIATE")
+
+    def _hold_write_transaction(self, alias: str):
+        entered, release = threading.Event(), threading.Event()
+
+        def hold():
+            try:
+                with transaction.atomic(using=alias):
+                    Inspection.objects.using(alias).update(odometer_reading=1)
+                    entered.set()
+                    release.wait(5)
+            finally:
+                connections[alias].close()
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        self.assertTrue(entered.wait(5))
+        return thread, release
+
+    def test_writers_queue_behind_the_open_write_transaction(self):
+        alias = self.use_scratch(PRODUCTION, writer_timeout=0.2)
+        thread, release = self._hold_write_transaction(alias)
+        try:
+            with self.assertRaisesRegex(OperationalError, "writer queue"):
+                with transaction.atomic(using=alias):
+                    pass
+            # Lone autocommit writes queue as well; reads do not.
+            with self.assertRaisesRegex(OperationalError, "writer queue"):
+                Inspection.objects.using(alias).update(odometer_reading=2)
+            self.assertEqual(Inspection.objects.using(alias).count(), 5)
+        finally:
+            release.set()
+            thread.join()
+
+        # Once the holder commits, the queue moves again.
+        Inspection.objects.using(alias).update(odometer_reading=3)
+        self.assertEqual(set(Inspection.objects.using(alias).values_list("odometer_reading", flat=True)), {3})
+
+    def test_read_transactions_stay_out_of_the_writer_queue(self):
+        alias = self.use_scratch(PRODUCTION, writer_timeout=0.2)
+        thread, release = self._hold_write_transaction(alias)
+        try:
+            with read_transaction(using=alias):
+                # The snapshot predates the holder's commit.
+                self.assertEqual(Inspection.objects.using(alias).filter(odometer_reading=1).count(), 0)
+                with transaction.atomic(using=alias):
+                    self.assertEqual(Inspection.objects.using(alias).count(), 5)
+        finally:
+            release.set()
+            thread.join()
+
+        with self.assertRaises(TransactionManagementError):
+            with read_transaction(using=alias):
+                Inspection.objects.using(alias).update(odometer_reading=4)
+        # The refused write left neither a transaction nor the lock behind.
+        self.assertFalse(connections[alias].in_atomic_block)
+        Inspection.objects.using(alias).update(odometer_reading=5)
+        self.assertEqual(set(Inspection.objects.using(alias).values_list("odometer_reading", flat=True)), {5})
+
+    def test_profile_is_off_unless_enabled(self):
+        # DEBUG settings (and so the test suite) keep Django's stock backend.
+        self.assertFalse(settings.SQLITE_PRODUCTION_PROFILE)
+        self.assertEqual(connections["default"].settings_dict["ENGINE"], "django.db.backends.sqlite3")
+        with read_transaction():
+            self.assertTrue(connections["default"].in_atomic_block)
+
+    def test_rollback_releases_the_writer_lock(self):
+        alias = self.use_scratch(PRODUCTION, writer_timeout=0.2)
+        with self.assertRaises(ZeroDivisionError):
+            with transaction.atomic(using=alias):
+                Inspection.objects.using(alias).update(odometer_reading=9)
+                1 / 0
+        thread, release = self._hold_write_transaction(alias)
+        release.set()
+        thread.join()
+
+    def test_benchmark_production_profile_has_no_lock_errors(self):
+        alias = self.use_scratch(PRODUCTION)
+        result = run_profile(alias, PRODUCTION, writers=4, readers=2, operations=10, seed=1)
+        row = result.row()
+        self.assertEqual(row["writes"], 40)
+        self.assertEqual(row["write_errors"], 0)
+        self.assertEqual(row["read_errors"], 0)
+        self.assertEqual(
+            set(Inspection.objects.using(alias).values_list("status", flat=True)), {Inspection.STATUS_SUBMITTED}
+        )
+
+    def test_stock_copy_keeps_the_rollback_journal(self):
+        alias = self.use_scratch(STOCK)
+        with connections[alias].cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            self.assertEqual(cursor.fetchone()[0], "delete")
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.models import Inspection, Vehicle, VehicleAssignment
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+@override_settings(SYNC_WATERMARK_OVERLAP_SECONDS=0)
+class DeltaSyncTests(APITestCase):
+    def setUp(self):
+        self.admin_profile = create_admin()
+
+        self.customer = create_customer()
+        self.inspector = create_inspector()
+        self.inspector_user = self.inspector.profile.user
+        self.assigned = self._vehicle("VIN-A", "FLEET01")
+        self.unassigned = self._vehicle("VIN-B", "POOL01")
+        self.assignment = VehicleAssignment.objects.create(
+            vehicle=self.assigned,
+            inspector=self.inspector,
+            assigned_by=self.admin_profile,
+            scheduled_for=date.today(),
+        )
+        self.client.force_authenticate(user=self.inspector_user)
+
+    def _vehicle(self, vin, plate):
+        return create_vehicle(self.customer, vin=vin, license_plate=plate)
+
+    def test_first_sync_is_a_scoped_full_snapshot(self):
+        response = self.client.get(reverse("sync"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["reset"])
+        self.assertEqual([row["license_plate"] for row in response.data["vehicles"]], ["FLEET01"])
+        self.assertEqual(len(response.data["assignments"]), 1)
+        self.assertIn("watermark", response.data)
+
+    def test_delta_returns_only_changes_and_tombstones(self):
+        watermark = self.client.get(reverse("sync")).data["watermark"]
+
+        inspection = Inspection.objects.create(
+            vehicle=self.assigned, customer=self.customer, inspector=self.inspector
+        )
+        assignment_id = self.assignment.id
+        self.assignment.delete()
+
+        response = self.client.get(reverse("sync"), {"since": watermark.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data["reset"])
+        self.assertEqual(response.data["vehicles"], [])
+        self.assertEqual([row["id"] for row in response.data["inspections"]], [inspection.id])
+        self.assertEqual(response.data["deleted"]["assignments"], [assignment_id])
+
+    def test_tombstones_respect_role_scope(self):
+        watermark = timezone.now()
+        self.unassigned.delete()
+        response = self.client.get(reverse("sync"), {"since": watermark.isoformat()})
+        self.assertEqual(response.data["deleted"]["vehicles"], [])
+
+        vehicle_id = self.assigned.id
+        self.assigned.delete()
+        response = self.client.get(reverse("sync"), {"since": watermark.isoformat()})
+        self.assertEqual(response.data["deleted"]["vehicles"], [vehicle_id])
+
+    def test_stale_watermark_forces_reset(self):
+        stale = timezone.now() - timedelta(days=365)
+        response = self.client.get(reverse("sync"), {"since": stale.isoformat()})
+        self.assertTrue(response.data["reset"])
+
+    def test_invalid_watermark_is_rejected(self):
+        response = self.client.get(reverse("sync"), {"since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def _delta(self, since, user=None):
+        self.client.force_authenticate(user=user or self.inspector_user)
+        response = self.client.get(reverse("sync"), {"since": since.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_newly_assigned_old_vehicle_is_sent(self):
+        Vehicle.objects.filter(pk=self.unassigned.pk).update(updated_at=timezone.now() - timedelta(days=3))
+        since = timezone.now()
+        assignment = VehicleAssignment.objects.create(
+            vehicle=self.unassigned, inspector=self.inspector, assigned_by=self.admin_profile, scheduled_for=date.today()
+        )
+        data = self._delta(since)
+        self.assertEqual([row["license_plate"] for row in data["vehicles"]], ["POOL01"])
+        self.assertEqual([row["id"] for row in data["assignments"]], [assignment.id])
+
+    def test_losing_an_assignment_removes_the_vehicle(self):
+        other = create_inspector("other", "INS-2")
+        since = timezone.now()
+        self.assignment.inspector = other
+        self.assignment.save()
+
+        data = self._delta(since)
+        self.assertEqual(data["deleted"], {"vehicles": [self.assigned.id], "assignments": [self.assignment.id], "inspections": []})
+        data = self._delta(since, other.profile.user)
+        self.assertEqual([row["license_plate"] for row in data["vehicles"]], ["FLEET01"])
+        self.assertEqual(data["deleted"], {"vehicles": [], "assignments": [], "inspections": []})
+        # Nothing was deleted from the point of view of callers who can still see the rows.
+        data = self._delta(since, self.admin_profile.user)
+        self.assertEqual(data["deleted"], {"vehicles": [], "assignments": [], "inspections": []})
+        data = self._delta(since, self.customer.profile.user)
+        self.assertEqual(data["deleted"]["vehicles"], [])
+
+        # Assigned back: the vehicle is sent again and no longer reported as removed.
+        VehicleAssignment.objects.create(
+            vehicle=self.assigned, inspector=self.inspector, assigned_by=self.admin_profile, scheduled_for=date.today()
+        )
+        data = self._delta(since)
+        self.assertEqual([row["license_plate"] for row in data["vehicles"]], ["FLEET01"])
+        self.assertEqual(data["deleted"]["vehicles"], [])
+
+    def test_reassigned_inspection_is_removed_from_the_old_scope(self):
+        other = create_inspector("other", "INS-2")
+        inspection = Inspection.objects.create(vehicle=self.assigned, customer=self.customer, inspector=self.inspector)
+        since = timezone.now()
+        inspection.inspector = other
+        inspection.save()
+
+        self.assertEqual(self._delta(since)["deleted"]["inspections"], [inspection.id])
+        data = self._delta(since, other.profile.user)
+        self.assertEqual([row["id"] for row in data["inspections"]], [inspection.id])
+        self.assertEqual(data["deleted"]["inspections"], [])
+        self.assertEqual(self._delta(since, self.customer.profile.user)["deleted"]["inspections"], [])
+
+    def test_reassigned_assignment_is_removed_from_the_old_scope(self):
+        other = create_inspector("other", "INS-2")
+        since = timezone.now()
+        # A partial save through update_fields takes the same path.
+        self.assignment.inspector = other
+        self.assignment.save(update_fields=["inspector", "updated_at"])
+        self.assertEqual(self._delta(since)["deleted"]["assignments"], [self.assignment.id])
+
+    @override_settings(SYNC_RESET_PAGE_SIZE=1)
+    def test_full_snapshot_is_paged(self):
+        self.client.force_authenticate(user=self.admin_profile.user)
+        inspection = Inspection.objects.create(vehicle=self.assigned, customer=self.customer, inspector=self.inspector)
+        response = self.client.get(reverse("sync"))
+        watermark = response.data["watermark"]
+        pages = [response.data]
+        while pages[-1]["next"]:
+            response = self.client.get(pages[-1]["next"])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+
+        self.assertTrue(all(page["reset"] and page["watermark"] == watermark for page in pages))
+        self.assertTrue(all(sum(len(page[key]) for key in ("vehicles", "assignments", "inspections")) <= 1 for page in pages))
+        self.assertEqual(
+            [row["id"] for page in pages for row in page["vehicles"]], [self.assigned.id, self.unassigned.id]
+        )
+        self.assertEqual([row["id"] for page in pages for row in page["assignments"]], [self.assignment.id])
+        self.assertEqual([row["id"] for page in pages for row in page["inspections"]], [inspection.id])
+
+        response = self.client.get(reverse("sync"), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_deleting_one_of_two_assignments_keeps_the_vehicle(self):
+        VehicleAssignment.objects.create(
+            vehicle=self.assigned,
+            inspector=self.inspector,
+            assigned_by=self.admin_profile,
+            scheduled_for=date.today() + timedelta(days=1),
+        )
+        since = timezone.now()
+        self.assignment.delete()
+        self.assertEqual(self._delta(since)["deleted"]["vehicles"], [])
+
+    @override_settings(SYNC_WATERMARK_OVERLAP_SECONDS=60)
+    def test_watermark_overlaps_rows_committed_late(self):
+        response = self.client.get(reverse("sync"))
+        watermark = response.data["watermark"]
+        self.assertLess(watermark, timezone.now() - timedelta(seconds=59))
+        # Stamped before the watermark was handed out, committed after the snapshot was read.
+        VehicleAssignment.objects.filter(pk=self.assignment.pk).update(
+            remarks="late", updated_at=timezone.now() - timedelta(seconds=30)
+        )
+        data = self._delta(watermark)
+        self.assertEqual([row["remarks"] for row in data["assignments"]], ["late"])
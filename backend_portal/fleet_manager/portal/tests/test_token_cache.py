@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from portal.authentication import (
+    REVOCATION_PREFIX,
+    CachedTokenAuthentication,
+    TokenCache,
+    check_revocation_cache,
+    get_principal,
+    token_cache,
+)
+from portal.tests.fixtures import create_inspector
+
+User = get_user_model()
+
+
+class TokenCacheTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.addCleanup(token_cache.clear)
+        caches["token_revocations"].clear()
+        self.inspector = create_inspector()
+        self.profile = self.inspector.profile
+        self.user = self.profile.user
+        self.token = Token.objects.create(user=self.user)
+        self.factory = RequestFactory()
+
+    def authenticate(self, key: str | None = None, cache: TokenCache | None = None):
+        request = self.factory.get("/", HTTP_AUTHORIZATION=f"Token {key or self.token.key}")
+        authentication = CachedTokenAuthentication()
+        if cache is not None:
+            authentication.cache = cache
+        user, token = authentication.authenticate(request)
+        request.user = user
+        return request, token
+
+    def test_warm_cache_authenticates_without_queries(self):
+        with self.assertNumQueries(1):
+            self.authenticate()
+        with self.assertNumQueries(0):
+            request, token = self.authenticate()
+            principal = get_principal(request)
+        self.assertEqual(token.key, self.token.key)
+        self.assertEqual(principal.inspector, self.inspector)
+        self.assertEqual((token_cache.stats.hits, token_cache.stats.misses), (1, 1))
+        self.assertEqual(token_cache.stats.hit_rate, 0.5)
+
+    def test_hits_hand_out_private_copies(self):
+        first, _ = self.authenticate()
+        first.user.first_name = "mutated"
+        second, _ = self.authenticate()
+        self.assertIsNot(first.user, second.user)
+        self.assertEqual(second.user.first_name, "")
+
+    def test_deleting_the_token_invalidates_it(self):
+        self.authenticate()
+        self.token.delete()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_rotating_the_token_invalidates_the_old_key(self):
+        self.authenticate()
+        old_key = self.token.key
+        self.token.delete()
+        new_token = Token.objects.create(user=self.user)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(old_key)
+        _request, token = self.authenticate(new_token.key)
+        self.assertEqual(token.key, new_token.key)
+
+    def test_deactivating_the_user_invalidates_their_tokens(self):
+        self.authenticate()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(len(token_cache), 0)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_role_profile_changes_invalidate_their_tokens(self):
+        self.authenticate()
+        self.inspector.max_daily_inspections = 3
+        self.inspector.save()
+        self.assertEqual(len(token_cache), 0)
+        request, _token = self.authenticate()
+        self.assertEqual(get_principal(request).inspector.max_daily_inspections, 3)
+
+    def other_worker(self) -> TokenCache:
+        """A second process's cache: its own entries, the same revocation stamps."""
+
+        cache = TokenCache()
+        self.authenticate(cache=cache)
+        self.assertEqual(len(cache), 1)
+        return cache
+
+    def test_revoking_a_token_reaches_other_workers(self):
+        other = self.other_worker()
+        old_key = self.token.key
+        self.token.delete()
+        Token.objects.create(user=self.user)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(old_key, cache=other)
+        self.assertEqual(len(other), 0)
+
+    def test_deactivating_a_user_reaches_other_workers(self):
+        other = self.other_worker()
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(cache=other)
+
+    def test_role_profile_changes_reach_other_workers(self):
+        other = self.other_worker()
+        self.inspector.max_daily_inspections = 3
+        self.inspector.save()
+        request, _token = self.authenticate(cache=other)
+        self.assertEqual(get_principal(request).inspector.max_daily_inspections, 3)
+        # Reloaded after the revocation, so the fresh entry is served again.
+        with self.assertNumQueries(0):
+            self.authenticate(cache=other)
+
+    def test_rows_read_before_a_revocation_are_never_served(self):
+        # A worker that read the token just before another committed the change
+        # caches it only afterwards; its load time still predates the stamp.
+        loaded_at = time.time()
+        stale = Token.objects.select_related("user").get(pk=self.token.pk)
+        self.user.save()
+        other = TokenCache()
+        other.set(self.token.key, stale, loaded_at)
+        self.assertIsNone(other.get(self.token.key))
+
+    @override_settings(CACHES={"token_revocations": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}})
+    def test_process_local_revocation_cache_is_flagged(self):
+        self.assertEqual([message.id for message in check_revocation_cache()], ["portal.W001"])
+        with override_settings(PORTAL_TOKEN_CACHE={"REVOCATION_CACHE": "missing"}):
+            self.assertEqual([message.id for message in check_revocation_cache()], ["portal.E003"])
+
+    @override_settings(REQUEST_SERVER_TIMING=True)
+    def test_api_requests_report_cache_hits(self):
+        headers = {"HTTP_AUTHORIZATION": f"Token {self.token.key}"}
+        first = self.client.get(reverse("assignment-list"), **headers)
+        second = self.client.get(reverse("assignment-list"), **headers)
+        self.assertIn('auth;desc="token cache miss"', first["Server-Timing"])
+        self.assertIn('auth;desc="token cache hit"', second["Server-Timing"])
+
+
+class TokenCacheBoundsTests(TestCase):
+    def setUp(self):
+        self.users = [User.objects.create_user(username=f"user{index}") for index in range(3)]
+        self.tokens = [Token.objects.create(user=user) for user in self.users]
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set(self.tokens[0].key, self.tokens[0])
+        cache.set(self.tokens[1].key, self.tokens[1])
+        cache.get(self.tokens[0].key)
+        cache.set(self.tokens[2].key, self.tokens[2])
+        self.assertIsNone(cache.get(self.tokens[1].key))
+        self.assertIsNotNone(cache.get(self.tokens[0].key))
+        self.assertEqual(cache.stats.evictions, 1)
+
+    def test_entries_expire_after_the_ttl(self):
+        cache = TokenCache(max_size=10, ttl=30)
+        with mock.patch("portal.authentication.time.monotonic", return_value=100.0):
+            cache.set(self.tokens[0].key, self.tokens[0])
+        with mock.patch("portal.authentication.time.monotonic", return_value=129.0):
+            self.assertIsNotNone(cache.get(self.tokens[0].key))
+        with mock.patch("portal.authentication.time.monotonic", return_value=131.0):
+            self.assertIsNone(cache.get(self.tokens[0].key))
+        self.assertEqual(cache.stats.expired, 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_revocation_stamps_are_checked_once_per_interval(self):
+        cache = TokenCache(max_size=10, ttl=60, check_interval=2)
+        token = self.tokens[0]
+        shared = caches["token_revocations"]
+        shared.clear()
+        with mock.patch.object(type(shared), "get_many", wraps=shared.get_many) as get_many:
+            with mock.patch("portal.authentication.time.monotonic", return_value=100.0):
+                cache.set(token.key, token)
+                self.assertIsNotNone(cache.get(token.key))
+                self.assertIsNotNone(cache.get(token.key))
+            self.assertEqual(get_many.call_count, 1)
+            # Revoked by another worker: served until the entry is due for its next check.
+            shared.set(f"{REVOCATION_PREFIX}:user:{token.user_id}", time.time())
+            with mock.patch("portal.authentication.time.monotonic", return_value=101.5):
+                self.assertIsNotNone(cache.get(token.key))
+            with mock.patch("portal.authentication.time.monotonic", return_value=102.0):
+                self.assertIsNone(cache.get(token.key))
+            self.assertEqual(get_many.call_count, 2)
+
+    @override_settings(PORTAL_TOKEN_CACHE={"MAX_SIZE": 10, "TTL_SECONDS": 0})
+    def test_zero_ttl_disables_caching(self):
+        cache = TokenCache()
+        cache.set(self.tokens[0].key, self.tokens[0])
+        self.assertEqual(len(cache), 0)
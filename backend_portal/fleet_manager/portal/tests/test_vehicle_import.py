@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from portal.counters import dashboard_counters, refresh_dashboard_counters
+from portal.forms import VehicleForm
+from portal.imports import FORMAT_CSV, FORMAT_NDJSON, ImportFormatError, import_vehicles
+from portal.models import Vehicle
+from portal.search import KIND_VEHICLE, get_search_backend
+from portal.tests.fixtures import create_admin, create_customer, create_vehicle
+
+
+HEADER = "vin,license_plate,make,model,year,vehicle_type,mileage\n"
+
+
+def csv_bytes(*rows: str) -> bytes:
+    return (HEADER + "".join(f"{row}\n" for row in rows)).encode()
+
+
+class VehicleImportTests(APITestCase):
+    def setUp(self):
+        self.admin_user = create_admin().user
+        self.customer = create_customer()
+        create_vehicle(self.customer, vin="EXISTING00001", license_plate="OLD1", year=2020)
+
+    def test_valid_rows_are_inserted_and_bad_rows_reported(self):
+        data = csv_bytes(
+            "new00001,PL1,Volvo,VNL,2022,Tractor,1200",
+            "NEW00002,PL2,Kenworth,T680,2021,Tractor,",
+            "NEW00001,PL3,Mack,Anthem,2022,Tractor,0",
+            "existing00001,PL4,Volvo,VNL,2022,Tractor,0",
+            "NEW00005,PL5,Volvo,VNL,1800,Tractor,0",
+            ",PL6,Volvo,VNL,2022,Tractor,0",
+        )
+        refresh_dashboard_counters()
+        with self.captureOnCommitCallbacks(execute=True):
+            report = import_vehicles(io.BytesIO(data), self.customer, FORMAT_CSV, batch_size=3)
+
+        self.assertEqual((report.rows, report.created, report.failed), (6, 2, 4))
+        self.assertEqual(
+            set(Vehicle.objects.filter(license_plate__in=["PL1", "PL2"]).values_list("vin", flat=True)),
+            {"NEW00001", "NEW00002"},
+        )
+        self.assertEqual(Vehicle.objects.get(vin="NEW00002").mileage, 0)
+        by_line = {error["line"]: error["errors"] for error in report.errors}
+        self.assertIn("Duplicate", by_line[4]["vin"][0])
+        self.assertIn("already exists", by_line[5]["vin"][0])
+        self.assertIn("year", by_line[6])
+        self.assertIn("vin", by_line[7])
+
+        self.assertEqual(dashboard_counters()["vehicles"], 3)
+        hits = get_search_backend().search("Kenworth", [KIND_VEHICLE])
+        self.assertEqual([hit.object_id for hit in hits], [Vehicle.objects.get(vin="NEW00002").pk])
+
+    def test_vins_are_normalized_on_every_write_path(self):
+        self.client.force_authenticate(user=self.admin_user)
+        payload = {
+            "customer": self.customer.id, "vin": " api00001 ", "license_plate": "API1", "make": "Volvo", "model": "VNL",
+            "year": 2022, "vehicle_type": "Tractor",
+        }
+        response = self.client.post(reverse("vehicle-list"), payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["vin"], "API00001")
+        response = self.client.post(reverse("vehicle-list"), {**payload, "vin": "existing00001"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("vin", response.data)
+
+        form = VehicleForm({**payload, "vin": "Existing00001", "mileage": 0, "notes": ""})
+        self.assertFalse(form.is_valid())
+        self.assertIn("vin", form.errors)
+        self.assertEqual(Vehicle.objects.create(**{**payload, "customer": self.customer, "vin": "orm00001"}).vin, "ORM00001")
+
+        # Rows stored before normalization still count as duplicates on import.
+        Vehicle.objects.filter(vin="ORM00001").update(vin="orm00001")
+        report = import_vehicles(io.BytesIO(csv_bytes("ORM00001,PL1,Volvo,VNL,2022,Tractor,0")), self.customer, FORMAT_CSV)
+        self.assertEqual((report.created, report.failed), (0, 1))
+        self.assertIn("already exists", report.errors[0]["errors"]["vin"][0])
+
+    def test_each_chunk_costs_one_lookup_and_one_insert(self):
+        rows = [f"BULK{index:05d},P{index},Volvo,VNL,2022,Tractor,0" for index in range(40)]
+        refresh_dashboard_counters()
+        # Per chunk: savepoint, VIN lookup, INSERT, counter UPDATE, release.
+        with self.assertNumQueries(4 * 5):
+            report = import_vehicles(io.BytesIO(csv_bytes(*rows)), self.customer, FORMAT_CSV, batch_size=10)
+        self.assertEqual(report.created, 40)
+
+    def test_chunk_rejected_twice_is_reported_not_raised(self):
+        self.client.force_authenticate(user=self.admin_user)
+        upload = SimpleUploadedFile(
+            "fleet.csv", csv_bytes("RACE00001,R1,Volvo,VNL,2022,Tractor,0", "RACE00002,R2,Volvo,VNL,2022,Tractor,0")
+        )
+        with mock.patch.object(type(Vehicle.objects), "bulk_create", side_effect=IntegrityError("conflict")) as insert:
+            response = self.client.post(
+                reverse("vehicle-import-vehicles"), {"file": upload, "customer": self.customer.pk}, format="multipart"
+            )
+        self.assertEqual(insert.call_count, 2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data["created"], response.data["failed"]), (0, 2))
+        self.assertEqual([error["line"] for error in response.data["errors"]], [2, 3])
+        self.assertFalse(Vehicle.objects.filter(vin__startswith="RACE").exists())
+
+    def test_ndjson_rows_and_dry_run(self):
+        lines = [
+            json.dumps({"vin": "JSON00001", "license_plate": "J1", "make": "Volvo", "model": "VNL", "year": 2022, "vehicle_type": "Tractor"}),
+            "{not json",
+            json.dumps(["a", "list"]),
+            "",
+            json.dumps({"vin": "JSON00001", "license_plate": "J2", "make": "Volvo", "model": "VNL", "year": 2022, "vehicle_type": "Tractor"}),
+        ]
+        stream = io.BytesIO("\n".join(lines).encode())
+        report = import_vehicles(stream, self.customer, FORMAT_NDJSON, batch_size=1, dry_run=True)
+        self.assertEqual((report.rows, report.created, report.failed), (4, 1, 3))
+        self.assertEqual([error["line"] for error in report.errors], [2, 3, 5])
+        self.assertFalse(Vehicle.objects.filter(vin="JSON00001").exists())
+
+    def test_missing_columns_reject_the_file(self):
+        with self.assertRaises(ImportFormatError):
+            import_vehicles(io.BytesIO(b"vin,make\nX,Y\n"), self.customer, FORMAT_CSV)
+
+    def test_api_upload(self):
+        self.client.force_authenticate(user=self.admin_user)
+        upload = SimpleUploadedFile("fleet.csv", csv_bytes("API00001,A1,Volvo,VNL,2022,Tractor,0", "bad,A2,Volvo,VNL,x,Tractor,0"))
+        response = self.client.post(
+            reverse("vehicle-import-vehicles"), {"file": upload, "customer": self.customer.pk}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data["created"], response.data["failed"]), (1, 1))
+        self.assertEqual(response.data["errors"][0]["line"], 3)
+
+        upload = SimpleUploadedFile("fleet.txt", b"vin\n")
+        response = self.client.post(
+            reverse("vehicle-import-vehicles"), {"file": upload, "customer": self.customer.pk}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.customer.profile.user)
+        upload = SimpleUploadedFile("fleet.csv", csv_bytes())
+        response = self.client.post(
+            reverse("vehicle-import-vehicles"), {"file": upload, "customer": self.customer.pk}, format="multipart"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_command_writes_an_error_report(self):
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        source = directory / "fleet.csv"
+        source.write_bytes(csv_bytes("CMD00001,C1,Volvo,VNL,2022,Tractor,0", "CMD00002,C2,Volvo,VNL,2022,,0"))
+        errors = directory / "errors.csv"
+        out = StringIO()
+        call_command(
+            "import_vehicles", str(source), "--customer", str(self.customer.pk), "--errors", str(errors), "--json", stdout=out
+        )
+        self.assertEqual(json.loads(out.getvalue())["created"], 1)
+        self.assertEqual(errors.read_text().splitlines()[1], "3,CMD00002,vehicle_type,This field is required.")
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import re
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from portal import views_web
+from portal.models import Customer, Inspection, PortalUser, VehicleAssignment
+from portal.pagination import encode_cursor
+from portal.tests.fixtures import create_admin, create_customer, create_inspector, create_vehicle
+
+
+NEXT_URL = re.compile(r'class="load-more" hx-get="([^"]+)"')
+
+
+class WebListTests(TestCase):
+    def setUp(self):
+        admin = create_admin()
+
+        self.customers = []
+        for name in ("Acme Logistics", "Globex Freight"):
+            username = name.split()[0].lower()
+            self.customers.append(create_customer(username, name, f"{username}@example.com"))
+
+        self.inspectors = [create_inspector(badge.lower(), badge) for badge in ("INS-1", "INS-2")]
+
+        today = timezone.localdate()
+        for index in range(7):
+            customer = self.customers[index % 2]
+            vehicle = create_vehicle(
+                customer,
+                vin=f"VIN{index:05d}",
+                license_plate=f"PL{index}",
+                vehicle_type="Tractor" if index % 2 else "Trailer",
+            )
+            inspector = self.inspectors[index % 2]
+            VehicleAssignment.objects.create(
+                vehicle=vehicle, inspector=inspector, assigned_by=admin, scheduled_for=today + timedelta(days=index)
+            )
+            Inspection.objects.create(
+                vehicle=vehicle,
+                customer=customer,
+                inspector=inspector,
+                status=Inspection.STATUS_SUBMITTED if index < 3 else Inspection.STATUS_DRAFT,
+            )
+        self.client.force_login(admin.user)
+
+    def _walk(self, url, params=None):
+        pages = []
+        response = self.client.get(url, params or {})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response)
+            match = NEXT_URL.search(response.content.decode())
+            if not match:
+                return pages
+            response = self.client.get(match.group(1).replace("&amp;", "&"))
+
+    def test_scroll_visits_every_inspection_once(self):
+        views_web.LIST_PAGE_SIZE, page_size = 3, views_web.LIST_PAGE_SIZE
+        self.addCleanup(setattr, views_web, "LIST_PAGE_SIZE", page_size)
+
+        pages = self._walk(reverse("portal-inspections"))
+        self.assertEqual(len(pages), 3)
+        # Only the first response carries the filter form; later pages are bare rows.
+        self.assertContains(pages[0], 'class="list-filters"')
+        self.assertNotContains(pages[1], 'class="list-filters"')
+        ids = [ins.pk for page in pages for ins in page.context["inspections"]]
+        expected = list(Inspection.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_filters_keep_applying_across_pages(self):
+        views_web.LIST_PAGE_SIZE, page_size = 1, views_web.LIST_PAGE_SIZE
+        self.addCleanup(setattr, views_web, "LIST_PAGE_SIZE", page_size)
+
+        inspector = self.inspectors[0]
+        pages = self._walk(
+            reverse("portal-inspections"), {"status": Inspection.STATUS_SUBMITTED, "inspector": inspector.pk}
+        )
+        rows = [ins for page in pages for ins in page.context["inspections"]]
+        expected = Inspection.objects.filter(status=Inspection.STATUS_SUBMITTED, inspector=inspector)
+        self.assertEqual({ins.pk for ins in rows}, set(expected.values_list("id", flat=True)))
+        self.assertEqual(len(rows), 2)
+
+    def test_customer_and_date_filters(self):
+        customer = self.customers[1]
+        response = self.client.get(reverse("portal-vehicles"), {"customer": customer.pk})
+        self.assertEqual({v.customer_id for v in response.context["vehicles"]}, {customer.pk})
+        self.assertEqual(len(response.context["vehicles"]), 3)
+
+        response = self.client.get(reverse("portal-vehicles"), {"plate": "pl1"})
+        self.assertEqual([v.license_plate for v in response.context["vehicles"]], ["PL1"])
+        # Plates are normalized on write, so one typed in lower case is still found.
+        create_vehicle(customer, vin="VIN99999", license_plate=" pl1x ")
+        response = self.client.get(reverse("portal-vehicles"), {"plate": "pl1"})
+        self.assertEqual([v.license_plate for v in response.context["vehicles"]], ["PL1X", "PL1"])
+
+        Customer.objects.filter(pk=customer.pk).update(city="Boston")
+        response = self.client.get(reverse("portal-customers"), {"city": "Boston"})
+        self.assertEqual([c.pk for c in response.context["customers"]], [customer.pk])
+
+        today = timezone.localdate()
+        response = self.client.get(
+            reverse("portal-assignments"),
+            {"scheduled_from": today + timedelta(days=2), "scheduled_to": today + timedelta(days=4)},
+        )
+        self.assertEqual(len(response.context["assignments"]), 3)
+
+        response = self.client.get(reverse("portal-inspections"), {"created_to": today - timedelta(days=1)})
+        self.assertEqual(response.context["inspections"], [])
+        response = self.client.get(reverse("portal-inspections"), {"created_from": today, "created_to": today})
+        self.assertEqual(len(response.context["inspections"]), 7)
+
+    def test_invalid_filter_input_is_ignored(self):
+        response = self.client.get(reverse("portal-customers"), {"created_from": "not-a-date"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["customers"]), 2)
+
+    def test_invalid_cursor_is_a_bad_request(self):
+        response = self.client.get(reverse("portal-vehicles"), {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 400)
+        # Well-formed, but the position is not a valid value for the ordering column.
+        response = self.client.get(reverse("portal-inspections"), {"cursor": encode_cursor("yesterday", 1)})
+        self.assertEqual(response.status_code, 400)
+
+    def test_users_cards_page(self):
+        response = self.client.get(reverse("portal-users"), {"role": PortalUser.ROLE_INSPECTOR})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({u.role for u in response.context["users"]}, {PortalUser.ROLE_INSPECTOR})
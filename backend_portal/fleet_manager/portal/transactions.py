@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from contextlib import contextmanager, nullcontext
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+
+@contextmanager
+def read_transaction(using: str | None = None):
+    """``atomic()`` for a group of reads that should see one consistent snapshot.
+
+    On the ``portal.backends.sqlite3`` backend the transaction begins DEFERRED
+    and stays out of the writer queue, so it neither waits behind writers nor
+    holds them up; writing inside it raises ``TransactionManagementError``.
+    Other backends get a plain ``atomic()`` block.
+    """
+
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    reading = getattr(connection, "reading", None)
+    with reading() if reading is not None else nullcontext(), transaction.atomic(using=using):
+        yield
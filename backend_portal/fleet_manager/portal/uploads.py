@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from PIL import Image, UnidentifiedImageError
+
+from .models import PhotoUpload
+
+CHUNK_READ_SIZE = 64 * 1024
+
+
+class UploadOffsetMismatch(Exception):
+    def __init__(self, expected: int):
+        super().__init__(f"Expected offset {expected}")
+        self.expected = expected
+
+
+class UploadRejected(Exception):
+    pass
+
+
+def max_upload_bytes() -> int:
+    return getattr(settings, "PHOTO_UPLOAD_MAX_BYTES", 25 * 1024 * 1024)
+
+
+def staging_directory() -> Path:
+    directory = Path(getattr(settings, "PHOTO_UPLOAD_TEMP_DIR", Path(settings.MEDIA_ROOT) / "uploads_partial"))
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def partial_path(upload: PhotoUpload) -> Path:
+    return staging_directory() / f"{upload.pk}.part"
+
+
+def append_chunk(upload: PhotoUpload, offset: int, stream, length: int) -> PhotoUpload:
+    """Write ``length`` bytes from ``stream`` at ``offset`` without buffering the chunk.
+
+    The offset must equal the bytes already received. The body is staged in a
+    file of its own first; only the request whose conditional UPDATE claims
+    the offset splices it into the partial file, inside that UPDATE's
+    transaction. A stale retry or a dropped connection therefore never
+    touches bytes another request has already committed.
+    """
+
+    if upload.status != PhotoUpload.STATUS_UPLOADING:
+        raise UploadRejected("Upload is already complete.")
+    if offset != upload.received_bytes:
+        raise UploadOffsetMismatch(upload.received_bytes)
+    if offset + length > upload.total_size:
+        raise UploadRejected("Chunk extends past the declared upload size.")
+
+    path = partial_path(upload)
+    handle, staged = tempfile.mkstemp(dir=path.parent, prefix=f"{upload.pk}.", suffix=".chunk")
+    try:
+        written = 0
+        with os.fdopen(handle, "w+b") as chunk:
+            remaining = length
+            while remaining > 0 and stream is not None:
+                block = stream.read(min(CHUNK_READ_SIZE, remaining))
+                if not block:
+                    break
+                chunk.write(block)
+                written += len(block)
+                remaining -= len(block)
+
+            with transaction.atomic():
+                # The row stays locked until commit, so the next chunk cannot splice before this one.
+                updated = PhotoUpload.objects.filter(
+                    pk=upload.pk, status=PhotoUpload.STATUS_UPLOADING, received_bytes=offset
+                ).update(received_bytes=offset + written)
+                if updated:
+                    chunk.seek(0)
+                    with open(path, "r+b" if path.exists() else "wb") as output:
+                        output.seek(offset)
+                        shutil.copyfileobj(chunk, output, CHUNK_READ_SIZE)
+                        output.truncate(offset + written)
+    finally:
+        Path(staged).unlink(missing_ok=True)
+
+    if not updated:
+        upload.refresh_from_db(fields=["received_bytes"])
+        raise UploadOffsetMismatch(upload.received_bytes)
+    upload.received_bytes = offset + written
+    if upload.received_bytes == upload.total_size:
+        finalize_upload(upload)
+    return upload
+
+
+def finalize_upload(upload: PhotoUpload) -> None:
+    path = partial_path(upload)
+    try:
+        with Image.open(path) as image:
+            image.verify()
+    except (UnidentifiedImageError, OSError):
+        discard_upload(upload)
+        raise UploadRejected("Uploaded file is not a valid image.")
+    with transaction.atomic():
+        with open(path, "rb") as handle:
+            upload.file.save(os.path.basename(upload.filename) or f"{upload.pk}.jpg", File(handle), save=False)
+        upload.status = PhotoUpload.STATUS_COMPLETE
+        upload.save(update_fields=["file", "status", "received_bytes", "updated_at"])
+    path.unlink(missing_ok=True)
+
+
+def discard_upload(upload: PhotoUpload) -> None:
+    partial_path(upload).unlink(missing_ok=True)
+    upload.delete()
@@ -6,9 +6,13 @@ from .views import (
     AuthTokenView,
     ChecklistItemViewSet,
     CustomerViewSet,
+    FailureAnalyticsView,
     InspectionCategoryViewSet,
     InspectionViewSet,
     InspectorProfileViewSet,
+    PhotoUploadViewSet,
+    SearchView,
+    SyncView,
     VehicleAssignmentViewSet,
     VehicleViewSet,
 )
@@ -22,6 +26,7 @@ router.register(r'assignments', VehicleAssignmentViewSet, basename='assignment')
 router.register(r'inspections', InspectionViewSet, basename='inspection')
 router.register(r'categories', InspectionCategoryViewSet, basename='category')
 router.register(r'checklist-items', ChecklistItemViewSet, basename='checklist-item')
+router.register(r'uploads', PhotoUploadViewSet, basename='photo-upload')
 
 urlpatterns = [
     # Web admin shell and partials (HTMX)
@@ -67,5 +72,8 @@ urlpatterns = [
 
     # API
     path('auth/token/', AuthTokenView.as_view(), name='auth-token'),
+    path('sync/', SyncView.as_view(), name='sync'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('analytics/failures/', FailureAnalyticsView.as_view(), name='analytics-failures'),
     path('', include(router.urls)),
 ]
@@ -1,13 +1,24 @@
 from __future__ import annotations
 
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import router
 from django.db.models import Prefetch
-from rest_framework import mixins, viewsets
+from django.http import FileResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.exceptions import ValidationError
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
 
 from .models import (
     ChecklistItem,
@@ -16,23 +27,57 @@ from .models import (
     InspectionCategory,
     InspectionItemResponse,
     InspectorProfile,
-    PortalUser,
+    PhotoUpload,
+    ReportJob,
+    SyncTombstone,
     Vehicle,
     VehicleAssignment,
 )
+from .analytics import failure_series, failure_summary
+from .capacity import inspectors_with_capacity
+from .catalog import catalog_response
+from .exports import InspectionExport, filter_inspections
+from .imports import ImportFormatError, detect_format, import_vehicles
+from .instrumentation import SerializerTimingMixin, timed
+from .jobs import enqueue_customer_report, enqueue_customer_reports
+from .pagination import KeysetPagination, decode_cursor, encode_cursor
+from .routing import REPLICA_ACTIONS
+from .authentication import get_principal
 from .permissions import IsAdmin, IsInspectorOrAdmin, get_portal_profile
+from .reports import REPORT_RELATED, ReportRenderFailed, request_report_pdf
+from .scoping import (
+    scope_assignments,
+    scope_customers,
+    scope_inspections,
+    scope_tombstones,
+    scope_vehicles,
+    vehicles_changed_since,
+)
+from .search import KINDS, get_search_backend
+from .scheduling import auto_assign
 from .serializers import (
+    AutoAssignSerializer,
+    CapacityQuerySerializer,
     ChecklistItemSerializer,
     CustomerSerializer,
+    FailureAnalyticsQuerySerializer,
+    InspectionBulkTransitionSerializer,
+    InspectionCompactListSerializer,
     InspectionCategorySerializer,
+    InspectionExportQuerySerializer,
     InspectionListSerializer,
     InspectionSerializer,
     InspectorProfileSerializer,
+    PhotoUploadSerializer,
     PortalUserSerializer,
+    SearchQuerySerializer,
     VehicleAssignmentSerializer,
+    VehicleImportSerializer,
     VehicleSerializer,
 )
-from .services import generate_customer_report
+from .services import bulk_transition_inspections
+from .transactions import read_transaction
+from .uploads import UploadOffsetMismatch, UploadRejected, append_chunk
 
 
 class AuthTokenView(ObtainAuthToken):
@@ -44,43 +89,61 @@ class AuthTokenView(ObtainAuthToken):
         user = serializer.validated_data["user"]
         token, _created = Token.objects.get_or_create(user=user)
         profile = get_portal_profile(user)
-        profile_data = PortalUserSerializer(profile).data if profile else None
+        profile_data = timed(PortalUserSerializer(profile)).data if profile else None
         return Response({"token": token.key, "profile": profile_data})
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.select_related("profile", "profile__user").all()
     serializer_class = CustomerSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
-    pagination_class = None
+    pagination_class = KeysetPagination
+    keyset_ordering = "legal_name"
 
 
-class InspectorProfileViewSet(viewsets.ModelViewSet):
+class InspectorProfileViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     queryset = InspectorProfile.objects.select_related("profile", "profile__user").all()
     serializer_class = InspectorProfileSerializer
     permission_classes = [IsAuthenticated, IsAdmin]
-    pagination_class = None
+    pagination_class = KeysetPagination
+    keyset_ordering = "badge_id"
+
+    @action(detail=False, methods=["get"])
+    def available(self, request):
+        """Inspectors with a free slot on ``?date=`` (default today), most room first."""
+
+        serializer = CapacityQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        day = serializer.validated_data["date"]
+        inspectors = inspectors_with_capacity(day).select_related("profile__user")
+        return Response(
+            {
+                "date": day,
+                "inspectors": [
+                    {
+                        "id": inspector.id,
+                        "badge_id": inspector.badge_id,
+                        "name": inspector.profile.user.get_full_name() or inspector.profile.user.username,
+                        "max_daily_inspections": inspector.max_daily_inspections,
+                        "booked": inspector.booked,
+                        "remaining": inspector.remaining,
+                    }
+                    for inspector in inspectors
+                ],
+            }
+        )
 
 
-class VehicleViewSet(viewsets.ModelViewSet):
+class VehicleViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     serializer_class = VehicleSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = None
+    pagination_class = KeysetPagination
+    keyset_ordering = "license_plate"
 
     def get_queryset(self):
-        profile = get_portal_profile(self.request.user)
+        profile = get_principal(self.request).profile
         queryset = Vehicle.objects.select_related("customer", "customer__profile", "customer__profile__user").all()
-        if not profile:
-            return queryset.none()
-        if profile.role == PortalUser.ROLE_ADMIN:
-            return queryset
-        customer_profile = getattr(profile, "customer_profile", None)
-        if customer_profile:
-            return queryset.filter(customer=customer_profile)
-        inspector_profile = getattr(profile, "inspector_profile", None)
-        if inspector_profile:
-            return queryset.filter(assignments__inspector=inspector_profile).distinct()
-        return queryset.none()
+        return scope_vehicles(profile, queryset)
 
     def get_permissions(self):
         if self.action == "create":
@@ -89,14 +152,41 @@ class VehicleViewSet(viewsets.ModelViewSet):
             return [IsAuthenticated(), IsAdmin()]
         return super().get_permissions()
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        parser_classes=[MultiPartParser, FormParser],
+        permission_classes=[IsAuthenticated, IsAdmin],
+    )
+    def import_vehicles(self, request):
+        """Stream an uploaded CSV/NDJSON file into a customer's fleet and report rejected rows."""
 
-class VehicleAssignmentViewSet(viewsets.ModelViewSet):
+        serializer = VehicleImportSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        upload = data["file"]
+        try:
+            report = import_vehicles(
+                upload,
+                data["customer"],
+                detect_format(upload.name, data.get("format")),
+                dry_run=data["dry_run"],
+            )
+        except ImportFormatError as exc:
+            raise ValidationError({"file": [str(exc)]})
+        inserted = bool(report.created) and not report.dry_run
+        return Response(report.as_dict(), status=status.HTTP_201_CREATED if inserted else status.HTTP_200_OK)
+
+
+class VehicleAssignmentViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     serializer_class = VehicleAssignmentSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = None
+    pagination_class = KeysetPagination
+    keyset_ordering = "-scheduled_for"
 
     def get_queryset(self):
-        profile = get_portal_profile(self.request.user)
+        profile = get_principal(self.request).profile
         queryset = VehicleAssignment.objects.select_related(
             "vehicle",
             "vehicle__customer",
@@ -104,25 +194,50 @@ class VehicleAssignmentViewSet(viewsets.ModelViewSet):
             "inspector__profile",
             "inspector__profile__user",
         )
-        if not profile:
-            return queryset.none()
-        if profile.role == PortalUser.ROLE_ADMIN:
-            return queryset
-        inspector_profile = getattr(profile, "inspector_profile", None)
-        if inspector_profile:
-            return queryset.filter(inspector=inspector_profile)
-        return queryset.none()
+        return scope_assignments(profile, queryset)
 
     def get_permissions(self):
-        if self.action in ["create", "update", "partial_update", "destroy"]:
+        if self.action in ["create", "update", "partial_update", "destroy", "auto_assign"]:
             return [IsAuthenticated(), IsAdmin()]
         return [IsAuthenticated(), IsInspectorOrAdmin()]
 
+    @action(detail=False, methods=["post"], url_path="auto-assign")
+    def auto_assign(self, request):
+        serializer = AutoAssignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        plan = auto_assign(
+            serializer.vehicle_ids(),
+            data["start"],
+            data["end"],
+            assigned_by=get_principal(request).profile,
+            dry_run=data["dry_run"],
+        )
+        return Response(
+            {
+                **plan.summary(),
+                "dry_run": data["dry_run"],
+                "assignments": [
+                    {
+                        "id": assignment.pk,
+                        "vehicle": assignment.vehicle_id,
+                        "inspector": assignment.inspector_id,
+                        "scheduled_for": assignment.scheduled_for,
+                    }
+                    for assignment in plan.assignments
+                ],
+                "unscheduled_vehicles": plan.unscheduled,
+            },
+            status=status.HTTP_200_OK if data["dry_run"] else status.HTTP_201_CREATED,
+        )
 
-class InspectionViewSet(viewsets.ModelViewSet):
+
+class InspectionViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
-    pagination_class = None
+    pagination_class = KeysetPagination
+    keyset_ordering = "-created_at"
     parser_classes = [MultiPartParser, FormParser, JSONParser]
+    replica_actions = (*REPLICA_ACTIONS, "export", "report_pdf")
     queryset = Inspection.objects.select_related(
         "vehicle",
         "vehicle__customer",
@@ -143,56 +258,464 @@ class InspectionViewSet(viewsets.ModelViewSet):
             return InspectionListSerializer
         return InspectionSerializer
 
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get("view") != "compact":
+            return super().list(request, *args, **kwargs)
+        rows = InspectionCompactListSerializer.project(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(InspectionCompactListSerializer(page).data)
+        return Response(InspectionCompactListSerializer(rows).data)
+
     def get_queryset(self):
-        profile = get_portal_profile(self.request.user)
+        profile = get_principal(self.request).profile
         if not profile:
             return Inspection.objects.none()
-        queryset = super().get_queryset()
-        if profile.role == PortalUser.ROLE_ADMIN:
-            return queryset
-        inspector_profile = getattr(profile, "inspector_profile", None)
-        if inspector_profile:
-            return queryset.filter(inspector=inspector_profile)
-        customer_profile = getattr(profile, "customer_profile", None)
-        if customer_profile:
-            return queryset.filter(customer=customer_profile)
-        return queryset.none()
+        return scope_inspections(profile, super().get_queryset())
 
     def perform_create(self, serializer):
-        profile = get_portal_profile(self.request.user)
-        inspector_profile = getattr(profile, "inspector_profile", None) if profile else None
+        inspector_profile = get_principal(self.request).inspector
         if inspector_profile:
             serializer.save(inspector=inspector_profile)
         else:
             serializer.save()
 
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Stream every matching inspection with its item responses as CSV or NDJSON.
+
+        ``GET /api/inspections/export/?output=csv|ndjson&customer=&status=&start=&end=``
+        (dates filter ``created_at``, inclusive). Results are scoped like the
+        list endpoint and written in keyset chunks, so memory does not grow
+        with the size of the export.
+        """
+
+        query = InspectionExportQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = dict(query.validated_data)
+        fmt = params.pop("output")
+        profile = get_principal(request).profile
+        queryset = filter_inspections(scope_inspections(profile, Inspection.objects.all()), **params)
+        # Rows are read after the view returns, once routing has been reset; pin the alias chosen now.
+        export = InspectionExport(queryset.using(queryset.db), fmt)
+        response = StreamingHttpResponse(export, content_type=export.content_type)
+        response["Content-Disposition"] = f'attachment; filename="{export.filename()}"'
+        return response
+
+    @action(detail=True, methods=["get"], url_path="report-pdf")
+    def report_pdf(self, request, pk=None):
+        """The customer report as a PDF, served from the content-addressed cache.
+
+        A cache miss queues the render in the PDF process pool and answers
+        ``202`` with ``Retry-After``; the next request finds the file on disk.
+        A failed render answers ``500`` with a JSON ``detail`` (the next
+        request tries again).
+        """
+
+        profile = get_principal(request).profile
+        queryset = scope_inspections(profile, Inspection.objects.select_related(*REPORT_RELATED))
+        inspection = get_object_or_404(queryset, pk=pk)
+        try:
+            path, digest = request_report_pdf(inspection)
+        except ReportRenderFailed:
+            return Response(
+                {"detail": "The report PDF could not be rendered."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+        if digest is None:
+            return Response({"detail": "No report has been published for this inspection yet."}, status=status.HTTP_404_NOT_FOUND)
+        if path is None:
+            response = Response({"status": "rendering"}, status=status.HTTP_202_ACCEPTED)
+            response["Retry-After"] = "2"
+            return response
+        response = FileResponse(open(path, "rb"), content_type="application/pdf", filename=f"inspection-{inspection.reference}.pdf")
+        response["ETag"] = f'"{digest}"'
+        response["Cache-Control"] = "private, max-age=0"
+        return response
+
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsInspectorOrAdmin])
     def submit(self, request, pk=None):
         inspection = self.get_object()
         inspection.status = Inspection.STATUS_SUBMITTED
         inspection.completed_at = inspection.completed_at or inspection.updated_at
         inspection.save(update_fields=["status", "completed_at", "updated_at"])
-        generate_customer_report(inspection)
-        return Response(InspectionSerializer(inspection).data)
+        enqueue_customer_report(inspection)
+        return Response(timed(InspectionSerializer(inspection)).data)
 
     @action(detail=True, methods=["post"], permission_classes=[IsAuthenticated, IsAdmin])
     def approve(self, request, pk=None):
         inspection = self.get_object()
         inspection.status = Inspection.STATUS_APPROVED
         inspection.save(update_fields=["status", "updated_at"])
-        report = generate_customer_report(inspection)
-        return Response({"status": inspection.status, "report": report.summary})
+        enqueue_customer_report(inspection)
+        report = getattr(inspection, "customer_report", None)
+        return Response(
+            {
+                "status": inspection.status,
+                "report": report.summary if report else None,
+                "report_status": ReportJob.STATUS_QUEUED,
+            }
+        )
+
+    def _bulk_transition(self, request, target):
+        serializer = InspectionBulkTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        profile = get_principal(request).profile
+        queryset = serializer.filter_queryset(scope_inspections(profile, Inspection.objects.all()))
+        updated, results, counts = bulk_transition_inspections(queryset, target, serializer.validated_data.get("ids"))
+        enqueue_customer_reports(updated)
+        return Response(
+            {
+                "status": target,
+                "updated": len(updated),
+                "counts": counts,
+                # A filter can match more rows than an id list may hold; beyond that only the counts are complete.
+                "results": results,
+                "results_truncated": sum(counts.values()) > len(results),
+            }
+        )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk-submit",
+        permission_classes=[IsAuthenticated, IsInspectorOrAdmin],
+    )
+    def bulk_submit(self, request):
+        return self._bulk_transition(request, Inspection.STATUS_SUBMITTED)
+
+    @action(detail=False, methods=["post"], url_path="bulk-approve", permission_classes=[IsAuthenticated, IsAdmin])
+    def bulk_approve(self, request):
+        return self._bulk_transition(request, Inspection.STATUS_APPROVED)
+
+
+class CachedCatalogListMixin:
+    """Serve the unfiltered list from the versioned catalog cache.
 
+    Catalog endpoints are public, so authentication is skipped as well; the
+    common revalidation path then never touches the database.
+    """
 
-class InspectionCategoryViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
-    queryset = InspectionCategory.objects.prefetch_related("items")
+    catalog_name: str
+    authentication_classes: list = []
+
+    def list(self, request, *args, **kwargs):
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        return catalog_response(
+            request,
+            self.catalog_name,
+            lambda: self.get_serializer(self.filter_queryset(self.get_queryset()), many=True).data,
+        )
+
+
+class InspectionCategoryViewSet(
+    SerializerTimingMixin, CachedCatalogListMixin, mixins.ListModelMixin, viewsets.GenericViewSet
+):
+    queryset = InspectionCategory.objects.prefetch_related("items", "items__category")
     serializer_class = InspectionCategorySerializer
     permission_classes = [AllowAny]
     pagination_class = None
+    catalog_name = "categories"
 
 
-class ChecklistItemViewSet(viewsets.ReadOnlyModelViewSet):
+class ChecklistItemViewSet(SerializerTimingMixin, CachedCatalogListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = ChecklistItem.objects.filter(is_active=True).select_related("category")
     serializer_class = ChecklistItemSerializer
     permission_classes = [AllowAny]
+    pagination_class = KeysetPagination
+    keyset_ordering = "code"
+    catalog_name = "checklist-items"
+
+
+class SyncView(APIView):
+    """Delta feed for the mobile app.
+
+    ``GET /api/sync/?since=<watermark>`` returns vehicles, assignments and
+    inspections whose ``updated_at`` is newer than the watermark, ids of rows
+    deleted (or no longer visible to the caller) since then, and the watermark
+    to send next time. Without ``since`` (or with one older than the tombstone
+    retention window) a full snapshot is returned with ``reset: true`` so the
+    client replaces its local copy.
+
+    The full snapshot is paged in id order, ``SYNC_RESET_PAGE_SIZE`` rows at a
+    time across the three lists: while ``next`` is set the client follows it,
+    and every page carries the first page's watermark.
+
+    ``updated_at`` is stamped before the writing transaction commits, so the
+    watermark trails the clock by ``SYNC_WATERMARK_OVERLAP_SECONDS``: a row
+    committed late is picked up by the next sync, and rows near the boundary
+    may arrive twice, which clients apply idempotently.
+    """
+
+    permission_classes = [IsAuthenticated]
+    sections = ("vehicles", "assignments", "inspections")
+    serializer_classes = {"vehicles": VehicleSerializer, "assignments": VehicleAssignmentSerializer}
+    tombstone_keys = {
+        SyncTombstone.MODEL_VEHICLE: "vehicles",
+        SyncTombstone.MODEL_ASSIGNMENT: "assignments",
+        SyncTombstone.MODEL_INSPECTION: "inspections",
+    }
+    scopes = {
+        "vehicles": (scope_vehicles, Vehicle),
+        "assignments": (scope_assignments, VehicleAssignment),
+        "inspections": (scope_inspections, Inspection),
+    }
+
+    def get(self, request):
+        profile = get_principal(request).profile
+        cursor = self._parse_cursor(request.query_params.get("cursor"))
+        if cursor is not None:
+            section, watermark, after = cursor
+            since, reset = None, True
+        else:
+            section, after = 0, 0
+            now = timezone.now()
+            watermark = now - timedelta(seconds=getattr(settings, "SYNC_WATERMARK_OVERLAP_SECONDS", 60))
+            since = self._parse_since(request.query_params.get("since"))
+            retention = timedelta(days=getattr(settings, "SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+            reset = since is None or since < now - retention
+
+        # One snapshot for the whole feed, without queueing behind writers.
+        with read_transaction(using=router.db_for_read(Vehicle)):
+            vehicles = Vehicle.objects.select_related("customer")
+            querysets = {
+                "assignments": scope_assignments(profile, VehicleAssignment.objects.all()),
+                "inspections": InspectionCompactListSerializer.project(
+                    scope_inspections(profile, Inspection.objects.all())
+                ),
+            }
+            position = None
+            if reset:
+                querysets["vehicles"] = scope_vehicles(profile, vehicles)
+                data, position = self._snapshot_page(querysets, section, after)
+            else:
+                querysets = {
+                    "vehicles": vehicles_changed_since(profile, vehicles, since),
+                    **{key: queryset.filter(updated_at__gt=since) for key, queryset in querysets.items()},
+                }
+                data = {key: self._serialize(key, querysets[key]) for key in self.sections}
+
+            deleted = {"vehicles": [], "assignments": [], "inspections": []}
+            if not reset:
+                tombstones = scope_tombstones(profile, SyncTombstone.objects.filter(deleted_at__gt=since))
+                for model, object_id in tombstones.order_by().values_list("model", "object_id").distinct():
+                    deleted[self.tombstone_keys[model]].append(object_id)
+                for key, ids in deleted.items():
+                    if ids:
+                        deleted[key] = self._not_visible(profile, key, ids)
+
+        next_link = None
+        if position is not None:
+            index, pk = position
+            cursor = encode_cursor([index, watermark.isoformat()], pk)
+            next_link = replace_query_param(request.build_absolute_uri(), "cursor", cursor)
+        return Response({"watermark": watermark, "reset": reset, "next": next_link, **data, "deleted": deleted})
+
+    def _snapshot_page(self, querysets, section: int, after: int) -> tuple[dict, tuple[int, int] | None]:
+        """One page of the full snapshot from ``(section, after)`` and where the next one starts."""
+
+        remaining = getattr(settings, "SYNC_RESET_PAGE_SIZE", 1000)
+        data = {key: [] for key in self.sections}
+        for index in range(section, len(self.sections)):
+            key = self.sections[index]
+            start = after if index == section else 0
+            rows = list(querysets[key].filter(id__gt=start).order_by("id")[: remaining + 1])
+            if len(rows) > remaining:
+                rows = rows[:remaining]
+                data[key] = self._serialize(key, rows)
+                return data, (index, self._row_id(rows[-1]) if rows else start)
+            data[key] = self._serialize(key, rows)
+            remaining -= len(rows)
+        return data, None
+
+    @staticmethod
+    def _row_id(row) -> int:
+        # Inspections come from a values() projection.
+        return row["id"] if isinstance(row, dict) else row.pk
+
+    def _serialize(self, key: str, rows):
+        if key == "inspections":
+            return InspectionCompactListSerializer(rows).data
+        return timed(self.serializer_classes[key](rows, many=True)).data
+
+    def _not_visible(self, profile, key: str, ids: list[int]) -> list[int]:
+        # Visibility tombstones (an inspector losing an assignment) do not apply
+        # to callers who can still see the row, e.g. admins, or the same
+        # inspector once the vehicle is assigned back.
+        scope, model = self.scopes[key]
+        visible = set(scope(profile, model.objects.filter(pk__in=ids)).values_list("pk", flat=True))
+        return [object_id for object_id in ids if object_id not in visible]
+
+    def _parse_cursor(self, raw) -> tuple[int, datetime, int] | None:
+        if not raw:
+            return None
+        try:
+            (section, watermark), after = decode_cursor(raw)
+            watermark = parse_datetime(watermark)
+        except (TypeError, ValueError):
+            section = watermark = None
+        if not isinstance(section, int) or not 0 <= section < len(self.sections) or watermark is None:
+            raise ValidationError({"cursor": "Invalid cursor."})
+        return section, watermark, after
+
+    @staticmethod
+    def _parse_since(raw):
+        if not raw:
+            return None
+        try:
+            since = parse_datetime(raw)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValidationError({"since": "Expected an ISO 8601 timestamp."})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+
+class FailureAnalyticsView(APIView):
+    """Checklist failure rates read from the daily ``FailureRollup`` rows.
+
+    ``GET /api/analytics/failures/?dimension=item|category|vehicle_type|customer``
+    returns per-value totals over ``start``..``end`` (default: the last 30 days),
+    worst failure rate first. Passing ``key`` adds that value's daily series.
+    The rollup is fed by ``manage.py rollup_failure_analytics``.
+    """
+
+    permission_classes = [IsAuthenticated, IsAdmin]
+    # Reads only the rollup tables, so a lagging replica just delays new days.
+    replica_reads = True
+
+    def get(self, request):
+        query = FailureAnalyticsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        data = {
+            "dimension": params["dimension"],
+            "start": params["start"],
+            "end": params["end"],
+            "results": failure_summary(params["dimension"], params["start"], params["end"], params["limit"]),
+        }
+        if "key" in params:
+            data["series"] = failure_series(params["dimension"], params["key"], params["start"], params["end"])
+        return Response(data)
+
+
+class SearchView(APIView):
+    """Ranked full-text search over vehicles, customers and inspections.
+
+    ``GET /api/search/?q=<terms>&type=vehicle,customer,inspection&limit=20``
+    matches every term as a prefix against the search index (VIN, plate,
+    make/model, customer legal name and city, inspection notes). Hits the caller
+    may not see are dropped, so results are scoped the same way as the list
+    endpoints.
+    """
+
+    permission_classes = [IsAuthenticated]
+    # Over-fetch so scoping still leaves a full page for non-admin callers.
+    overfetch = 3
+
+    def get(self, request):
+        query = SearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        kinds = [kind for kind in KINDS if kind in (params.get("type") or KINDS)]
+        hits = get_search_backend().search(params["q"], kinds, params["limit"] * self.overfetch)
+
+        profile = get_principal(request).profile
+        ids: dict[str, list[int]] = {}
+        for hit in hits:
+            ids.setdefault(hit.kind, []).append(hit.object_id)
+        rows = {kind: getattr(self, f"_{kind}_rows")(profile, ids.get(kind, [])) for kind in KINDS}
+        results = [
+            {"type": hit.kind, "id": hit.object_id, "score": round(hit.score, 4), **rows[hit.kind][hit.object_id]}
+            for hit in hits
+            if hit.object_id in rows[hit.kind]
+        ]
+        return Response({"query": params["q"], "results": results[: params["limit"]]})
+
+    @staticmethod
+    def _vehicle_rows(profile, ids):
+        queryset = scope_vehicles(profile, Vehicle.objects.filter(pk__in=ids)).order_by()
+        return {
+            row["id"]: {
+                "title": f"{row['license_plate']} · {row['vin']}",
+                "subtitle": f"{row['make']} {row['model']} — {row['customer__legal_name']}",
+            }
+            for row in queryset.values("id", "license_plate", "vin", "make", "model", "customer__legal_name")
+        }
+
+    @staticmethod
+    def _customer_rows(profile, ids):
+        queryset = scope_customers(profile, Customer.objects.filter(pk__in=ids)).order_by()
+        return {row["id"]: {"title": row["legal_name"], "subtitle": row["city"]} for row in queryset.values("id", "legal_name", "city")}
+
+    @staticmethod
+    def _inspection_rows(profile, ids):
+        queryset = scope_inspections(profile, Inspection.objects.filter(pk__in=ids)).order_by()
+        return {
+            row["id"]: {
+                "title": f"{row['vehicle__license_plate']} · {row['status']}",
+                "subtitle": f"{row['customer__legal_name']} — {row['created_at']:%Y-%m-%d}",
+            }
+            for row in queryset.values("id", "vehicle__license_plate", "status", "customer__legal_name", "created_at")
+        }
+
+
+class PhotoUploadViewSet(
+    SerializerTimingMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """Resumable, chunked photo uploads.
+
+    - ``POST /api/uploads/`` declares ``filename`` and ``total_size``
+    - ``GET /api/uploads/{id}/`` reports the ``offset`` to resume from
+    - ``PATCH /api/uploads/{id}/`` with an ``Upload-Offset`` header appends the
+      raw request body at that offset; a stale offset gets ``409`` and the
+      current offset so the client can resume
+    - Once complete, photos reference it as ``{"upload": "<id>"}`` in
+      ``item_responses[].photos``
+    """
+
+    serializer_class = PhotoUploadSerializer
+    permission_classes = [IsAuthenticated, IsInspectorOrAdmin]
     pagination_class = None
+    # The resume offset must be exact; a stale replica would make clients resend.
+    replica_actions = ()
+
+    def get_queryset(self):
+        profile = get_principal(self.request).profile
+        return PhotoUpload.objects.filter(owner=profile)
+
+    def perform_create(self, serializer):
+        serializer.save(owner=get_principal(self.request).profile)
+
+    def partial_update(self, request, *args, **kwargs):
+        upload = self.get_object()
+        try:
+            offset = int(request.META.get("HTTP_UPLOAD_OFFSET", ""))
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return Response(
+                {"detail": "Upload-Offset and Content-Length are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            append_chunk(upload, offset, request.stream, length)
+        except UploadOffsetMismatch as exc:
+            response = Response({"detail": str(exc), "offset": exc.expected}, status=status.HTTP_409_CONFLICT)
+            response["Upload-Offset"] = str(exc.expected)
+            return response
+        except UploadRejected as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        response = Response(self.get_serializer(upload).data)
+        response["Upload-Offset"] = str(upload.received_bytes)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        response["Upload-Offset"] = str(response.data["offset"])
+        return response
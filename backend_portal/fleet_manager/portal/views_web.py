@@ -1,6 +1,8 @@
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, get_object_or_404
-from django.http import HttpRequest, HttpResponse
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest
+from django.utils import timezone
 
 from .models import (
     ChecklistItem,
@@ -12,64 +14,112 @@ from .models import (
     Vehicle,
     VehicleAssignment,
 )
-from .permissions import get_portal_profile
+from .capacity import CapacityExceeded
+from .counters import assignment_key, dashboard_counters, inspection_status_key
+from .authentication import get_principal
 from .forms import (
+    AssignmentFilterForm,
     ChecklistItemForm,
+    CustomerFilterForm,
     CustomerForm,
     InspectionCategoryForm,
+    InspectionFilterForm,
     InspectionForm,
     InspectorProfileForm,
+    ListFilterForm,
     PortalUserCreateForm,
+    PortalUserFilterForm,
     PortalUserUpdateForm,
     VehicleAssignmentForm,
+    VehicleFilterForm,
     VehicleForm,
 )
+from .pagination import keyset_page
+from .routing import replica_reads
+
+LIST_PAGE_SIZE = 50
 
 
 def _require_admin(request: HttpRequest) -> PortalUser | None:
-    user = request.user
-    if not user.is_authenticated:
-        return None
-    profile = get_portal_profile(user)
-    if not profile or profile.role != PortalUser.ROLE_ADMIN:
-        return None
-    return profile
+    principal = get_principal(request)
+    return principal.profile if principal.is_admin else None
 
 
+@replica_reads
 @login_required
 def app_shell(request: HttpRequest) -> HttpResponse:
     profile = _require_admin(request)
     if not profile:
         return render(request, "portal/forbidden.html", status=403)
+    today = timezone.localdate()
+    counters = dashboard_counters(today)
     context = {
         "profile": profile,
-        "kpi_customers": Customer.objects.count(),
-        "kpi_users": PortalUser.objects.exclude(role=PortalUser.ROLE_ADMIN).count(),
-        "kpi_vehicles": Vehicle.objects.count(),
-        "kpi_inspectors": InspectorProfile.objects.count(),
-        "kpi_inspections": Inspection.objects.count(),
+        "kpi_customers": counters["customers"],
+        "kpi_users": counters["users"],
+        "kpi_vehicles": counters["vehicles"],
+        "kpi_inspectors": counters["inspectors"],
+        "kpi_inspections": counters["inspections"],
+        "kpi_inspection_statuses": [
+            (label, counters[inspection_status_key(status)]) for status, label in Inspection.STATUS_CHOICES
+        ],
+        "kpi_assignments_today": counters[assignment_key(today)],
+        "kpi_assignment_statuses": [
+            (label, counters[assignment_key(today, status)]) for status, label in VehicleAssignment.STATUS_CHOICES
+        ],
     }
     return render(request, "portal/dashboard.html", context)
 
 
+def _render_list(
+    request: HttpRequest, queryset, ordering: str, template: str, name: str, filters: ListFilterForm
+) -> HttpResponse:
+    """Render one keyset page of a list partial.
+
+    The first request renders the whole partial with its filter form; the
+    sentinel row at the end of each page fetches the next one (``?cursor=``)
+    when scrolled into view, and only the rows template is rendered for it.
+    """
+
+    cursor = request.GET.get("cursor")
+    try:
+        rows, next_cursor = keyset_page(filters.filter(queryset), ordering, cursor, LIST_PAGE_SIZE)
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor")
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = next_cursor
+        next_url = f"{request.path}?{params.urlencode()}"
+    context = {name: rows, "filters": filters, "next_url": next_url, "list_url": request.path}
+    if cursor:
+        template = template.replace(".html", "_rows.html")
+    return render(request, template, context)
+
+
+@replica_reads
 @login_required
 def customers_view(request: HttpRequest) -> HttpResponse:
     profile = _require_admin(request)
     if not profile:
         return render(request, "portal/forbidden.html", status=403)
-    customers = Customer.objects.select_related("profile", "profile__user").order_by("-id")[:200]
-    return render(request, "portal/partials/customers.html", {"customers": customers})
+    customers = Customer.objects.select_related("profile", "profile__user")
+    filters = CustomerFilterForm(request.GET)
+    return _render_list(request, customers, "-id", "portal/partials/customers.html", "customers", filters)
 
 
+@replica_reads
 @login_required
 def vehicles_view(request: HttpRequest) -> HttpResponse:
     profile = _require_admin(request)
     if not profile:
         return render(request, "portal/forbidden.html", status=403)
-    vehicles = Vehicle.objects.select_related("customer").order_by("-id")[:200]
-    return render(request, "portal/partials/vehicles.html", {"vehicles": vehicles})
+    vehicles = Vehicle.objects.select_related("customer")
+    filters = VehicleFilterForm(request.GET)
+    return _render_list(request, vehicles, "-id", "portal/partials/vehicles.html", "vehicles", filters)
 
 
+@replica_reads
 @login_required
 def inspectors_view(request: HttpRequest) -> HttpResponse:
     profile = _require_admin(request)
@@ -79,34 +129,37 @@ def inspectors_view(request: HttpRequest) -> HttpResponse:
     return render(request, "portal/partials/inspectors.html", {"inspectors": inspectors})
 
 
+@replica_reads
 @login_required
 def assignments_view(request: HttpRequest) -> HttpResponse:
     profile = _require_admin(request)
     if not profile:
         return render(request, "portal/forbidden.html", status=403)
-    assignments = (
-        VehicleAssignment.objects.select_related(
-            "vehicle", "vehicle__customer", "inspector", "inspector__profile", "inspector__profile__user"
-        )
-        .order_by("-scheduled_for")[:200]
+    assignments = VehicleAssignment.objects.select_related(
+        "vehicle", "vehicle__customer", "inspector", "inspector__profile", "inspector__profile__user"
+    )
+    filters = AssignmentFilterForm(request.GET)
+    return _render_list(
+        request, assignments, "-scheduled_for", "portal/partials/assignments.html", "assignments", filters
     )
-    return render(request, "portal/partials/assignments.html", {"assignments": assignments})
 
 
+@replica_reads
 @login_required
 def inspections_view(request: HttpRequest) -> HttpResponse:
     profile = _require_admin(request)
     if not profile:
         return render(request, "portal/forbidden.html", status=403)
-    inspections = (
-        Inspection.objects.select_related(
-            "vehicle", "vehicle__customer", "inspector", "inspector__profile", "inspector__profile__user"
-        )
-        .order_by("-created_at")[:200]
+    inspections = Inspection.objects.select_related(
+        "vehicle", "customer", "inspector", "inspector__profile", "inspector__profile__user"
+    )
+    filters = InspectionFilterForm(request.GET)
+    return _render_list(
+        request, inspections, "-created_at", "portal/partials/inspections.html", "inspections", filters
     )
-    return render(request, "portal/partials/inspections.html", {"inspections": inspections})
 
 
+@replica_reads
 @login_required
 def categories_view(request: HttpRequest) -> HttpResponse:
     profile = _require_admin(request)
@@ -117,13 +170,15 @@ def categories_view(request: HttpRequest) -> HttpResponse:
 
 
 # ------- Portal users -------
+@replica_reads
 @login_required
 def users_view(request: HttpRequest) -> HttpResponse:
     profile = _require_admin(request)
     if not profile:
         return render(request, "portal/forbidden.html", status=403)
-    users = PortalUser.objects.select_related("user").order_by("-created_at")[:200]
-    return render(request, "portal/partials/users.html", {"users": users})
+    users = PortalUser.objects.select_related("user")
+    filters = PortalUserFilterForm(request.GET)
+    return _render_list(request, users, "-created_at", "portal/partials/users.html", "users", filters)
 
 
 @login_required
@@ -304,6 +359,17 @@ def inspector_delete(request: HttpRequest, pk: int) -> HttpResponse:
 
 
 # ------- Assignments -------
+def _save_assignment(form: VehicleAssignmentForm, assignment: VehicleAssignment) -> bool:
+    # The form checked capacity; the booking made by save() is the race-proof check.
+    try:
+        with transaction.atomic():
+            assignment.save()
+    except CapacityExceeded as exc:
+        form.add_error("scheduled_for", exc)
+        return False
+    return True
+
+
 @login_required
 def assignment_create(request: HttpRequest) -> HttpResponse:
     profile = _require_admin(request)
@@ -314,8 +380,8 @@ def assignment_create(request: HttpRequest) -> HttpResponse:
         if form.is_valid():
             assignment = form.save(commit=False)
             assignment.assigned_by = profile
-            assignment.save()
-            return assignments_view(request)
+            if _save_assignment(form, assignment):
+                return assignments_view(request)
     else:
         form = VehicleAssignmentForm()
     return render(request, "portal/forms/assignment_form.html", {"form": form})
@@ -332,8 +398,8 @@ def assignment_edit(request: HttpRequest, pk: int) -> HttpResponse:
         if form.is_valid():
             assignment = form.save(commit=False)
             assignment.assigned_by = assignment.assigned_by or profile
-            assignment.save()
-            return assignments_view(request)
+            if _save_assignment(form, assignment):
+                return assignments_view(request)
     else:
         form = VehicleAssignmentForm(instance=obj)
     return render(request, "portal/forms/assignment_form.html", {"form": form, "object": obj})
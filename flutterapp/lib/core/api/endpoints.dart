@@ -11,4 +11,5 @@ class ApiEndpoints {
   static const inspectionApprove = 'approve/';
   static const categories = 'categories/';
   static const checklistItems = 'checklist-items/';
+  static const sync = 'sync/';
 }